@@ -1,9 +1,6 @@
-# Usage: python3 dse.py [-c config_yaml] [-o output_log_folder] [--auto_clean]
+# Usage: python3 dse.py [-s sweep_yaml] [-c config_yaml] [-o output_log_folder] [--auto_clean] [--batch | --daemon socket | --queue dir_or_broker] [-j jobs]
 
 import argparse
-from concurrent.futures import ThreadPoolExecutor
-import re
-import shutil
 import time
 import pandas as pd
 import yaml
@@ -11,36 +8,8 @@ import subprocess
 import os
 from latency_bd import draw_latency_breakdown
 from interval import draw_cmd_interval_distribution
-
-def update_yaml(data, updates):
-    """
-    递归更新 YAML 数据中的内容。
-    
-    :param data: 原始 YAML 数据
-    :param updates: 用于更新的字典
-    """
-    for key, value in updates.items():
-        if isinstance(value, dict) and key in data:
-            update_yaml(data[key], value)
-        else:
-            data[key] = value
-
-
-def modify_yaml(file_path, updates, new_yaml):
-    """
-    Modify YAML file with provided dict.
-
-    :param file_path: YAML 文件的路径
-    :param updates: 用于更新的字典
-    """
-    with open(file_path, 'r') as file:
-        data = yaml.safe_load(file)
-
-    update_yaml(data, updates)
-
-    with open(new_yaml, 'w') as file:
-        yaml.dump(data, file)
-
+from stats_loader import load_stats, memory_stats, command_counts
+from sweep import Sweep, JobQueue
 
 def analyze(access_log):
     data = pd.read_csv(access_log, header=0, skipinitialspace=True)
@@ -58,114 +27,85 @@ def analyze(access_log):
     return stats
 
 
-def parse_cmd_cnt(file_path):
-    """ 
-    Parse the command count file into dict instance.
+def flatten(data, prefix=""):
     """
-    result = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            key, value = line.strip().split(':')
-            result[key.strip()] = int(value.strip())
-    return result
-
+    Flatten a config into KEY=VALUE parameters (the `-p` syntax of ramulator2).
 
-def parse_memory_stats(file_path):
-    """ 
-    Find out the requests info.
+    :return: Dict of key (e.g., `MemorySystem.Controller.plugins[0].ControllerPlugin.path`) -> value.
+    """
+    if isinstance(data, dict):
+        items = [(f"{prefix}.{key}" if prefix else str(key), value) for key, value in data.items()]
+    elif isinstance(data, list):
+        items = [(f"{prefix}[{i}]", value) for i, value in enumerate(data)]
+    else:
+        return {prefix: data}
+    flat = {}
+    for key, value in items:
+        flat.update(flatten(value, key))
+    return flat
+
+
+def record_result(point):
+    params, files = point.params, point.files
+    stats = analyze(files['access_log'])
+    sim_stats = load_stats(files['stats'])
+    cmd_cnt = command_counts(sim_stats)
+    request = memory_stats(sim_stats)
+    # Utilization of DRAM bandwidth.
+    bw_util = (request['total_num_read_requests'] + request['total_num_write_requests']) * 4 / request['memory_system_cycles']
+
+    with open(TOTAL_LOG, 'a') as file:
+        file.write(f"{params['pattern']}, {params['trace']}, {params['mapping']}, "
+                + f"{request['memory_system_cycles']}, {bw_util}, {stats['process']['mean']}, {stats['process']['median']}, "
+                + f"{request['total_num_read_requests']}, {request['total_num_write_requests']}, "
+                + ', '.join(str(cmd_cnt[command]) for command in params['cmd_to_count']) + '\n')
+
+
+def batch_exec(sweep):
+    """
+    Run all points of a trace in one ramulator2 invocation (Batch section), so the trace is parsed and held in memory once.
+    Each variant applies the parameters in which its config differs from the first config of the trace.
     """
-    result = {}
-    
-    pattern = re.compile(r'(total_num_other_requests|total_num_write_requests|total_num_read_requests|memory_system_cycles):\s*(\d+)')
-    
-    with open(file_path, 'r') as file:
-        for line in file:
-            match = pattern.search(line)
-            if match:
-                key = match.group(1)
-                value = int(match.group(2)) 
-                result[key] = value
-    
-    return result
-
-
-def test_a_mapping(mapping):
-    updates = {
-        'Frontend': {
-            'path': 'to_decide',
-            'access_log': 'to_decide'
-        },
-        'MemorySystem': {
-            'AddrMapper': {
-                'mapping': 'to_decide'
-            },
-            'Controller': {
-                'plugins': [
-                    {
-                        'ControllerPlugin': {
-                            'impl': 'TraceRecorder', 
-                            'path': 'to_decide'
-                        }
-                    },
-                    {
-                        'ControllerPlugin': {
-                            'impl': 'CommandCounter', 
-                            'path': 'to_decide',
-                            'commands_to_count': CMD_TO_COUNT
-                        }
-                    },
-                ]
-            }
-        }
-    }
-
-    cur_path = f"{DSE_ROOT_FOLDER}{mapping}/"
-    if os.path.exists(cur_path):
-        if VERBOSE:
-            print(f'Deleting folder \"{cur_path}\".')
-        shutil.rmtree(cur_path)
-    os.mkdir(cur_path)
-
-    updates['MemorySystem']['AddrMapper']['mapping'] = mapping
-
-    for pattern, trace in TRACE_DICT.items():
-        access_log = f"{cur_path}{pattern}.csv"
-        cmd_issue_log_prefix = f"{cur_path}{pattern}_issue_log"
-        cmd_cnt_log = f"{cur_path}{pattern}_cmd_cnt.log"
-        config_yaml = f"{cur_path}{pattern}.yaml"
-        stdout_log = f"{cur_path}debug.log"
-
-        updates['Frontend']['path'] = trace
-        updates['Frontend']['access_log'] = access_log
-        # Command Tracer Plugin
-        updates['MemorySystem']['Controller']['plugins'][0]['ControllerPlugin']['path'] = cmd_issue_log_prefix
-        # Command Counter Plugin
-        updates['MemorySystem']['Controller']['plugins'][1]['ControllerPlugin']['path'] = cmd_cnt_log
-        modify_yaml(BASE_CONFIG, updates, config_yaml)
-        # Run Ramulator.
-        subprocess.run(f"{RAMULATOR_PATH} -f {config_yaml} > {stdout_log}", shell=True)
-        # Analyze results.
-        stats = analyze(access_log)
-        cmd_cnt = parse_cmd_cnt(cmd_cnt_log)
-        request = parse_memory_stats(stdout_log)
-        # Utilization of DRAM bandwidth.
-        bw_util = (request['total_num_read_requests'] + request['total_num_write_requests']) * 4 / request['memory_system_cycles']
-
-        with open(TOTAL_LOG, 'a') as file:
-            file.write(f"{pattern}, {trace}, {mapping}, "
-                    + f"{request['memory_system_cycles']}, {bw_util}, {stats['process']['mean']}, {stats['process']['median']}, "
-                    + f"{request['total_num_read_requests']}, {request['total_num_write_requests']}, "
-                    + ', '.join(str(cmd_cnt[command]) for command in CMD_TO_COUNT) + '\n')
-
-
-def concurrent_exec():
     start_time = time.time()
-    with ThreadPoolExecutor(max_workers=len(MAPPER_TABLE)) as executor:
-        futures = [executor.submit(test_a_mapping, mapping) for mapping in MAPPER_TABLE]
-    
-        # Sync all threads.
-        for future in futures:
-            future.result()
+    groups = {}
+    done = {}
+    for _, point in sweep.jobs(write_configs=False):
+        groups.setdefault(point.params['trace'], []).append(point)
+        done[point.name] = point
+
+    for trace, points in groups.items():
+        base_params = flatten(points[0].config)
+        variants = []
+        for point in points:
+            for filename in point.files.values():
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+            variants.append({
+                'id': point.name.replace('/', '_'),
+                'output_path': point.files['log'],
+                'stats_path': point.files['stats'],
+                'params': [f"{key}={value}" for key, value in flatten(point.config).items()
+                           if key != 'stats_path' and (key not in base_params or base_params[key] != value)],
+            })
+        config = dict(points[0].config, Batch={'max_parallel': len(variants), 'variants': variants})
+        config_yaml = f"{DSE_ROOT_FOLDER}{points[0].params['pattern']}_batch.yaml"
+        with open(config_yaml, 'w') as file:
+            yaml.dump(config, file)
+        subprocess.run(f"{sweep.params['ramulator']} -f {config_yaml} > {DSE_ROOT_FOLDER}{points[0].params['pattern']}_batch.log", shell=True)
+
+    sweep.copy_duplicates(done)
+    for point in sweep.points():
+        record_result(point)
+
+    print(f"Execution time: {time.time() - start_time} seconds")
+
+
+def concurrent_exec(sweep, queue):
+    start_time = time.time()
+    failed = sweep.run(queue)
+
+    for point in sweep.points():
+        if point.job not in failed:
+            record_result(point)
 
     end_time = time.time()
     execution_time = end_time - start_time
@@ -194,110 +134,67 @@ def print2xlsx(output_file):
         worksheet.set_column('H:Q', None, format_int)     # # of read, # of write, commands
 
 
-def draw_picture(auto_clean=False):
+def draw_picture(sweep, auto_clean=False):
     # Because `matplotlib.pyplot` is multi-thread unsafe, pictures have to be made serially.
     print("Starting to draw figures...")
 
-    for mapper in MAPPER_TABLE:
-        for pattern, trace in TRACE_DICT.items():
-            cur_path = f"{DSE_ROOT_FOLDER}{mapper}/"
-            cmd_trace_file = f"{cur_path}{pattern}_issue_log_ch0.log"
-            access_log = f"{cur_path}{pattern}.csv"
-            plot_name1 = f"{cur_path}{pattern}_latency_breakdown.png"
-            plot_name2 = f"{cur_path}{pattern}_cmd_interval.png"
-            note = f"{mapper}\n{trace}"
-
-            if os.path.exists(plot_name1):
-                os.remove(plot_name1)
-                if VERBOSE:
-                    print(f"Deleting \"{plot_name1}\".")
+    points = {}
+    for point in sweep.points():
+        points[point.name] = point
+        # The TraceRecorder log of a duplicate point is the one of the job that simulated it
+        cmd_trace_file = f"{points[point.job].files['issue_log']}_ch0.log"
+        access_log = point.files['access_log']
+        plot_name1 = point.files['latency_plot']
+        plot_name2 = point.files['interval_plot']
+        note = f"{point.params['mapping']}\n{point.params['trace']}"
+
+        if os.path.exists(plot_name1):
+            os.remove(plot_name1)
             if VERBOSE:
-                print(f"Drawing latency breakdown plot for \"{access_log}\".")
-            draw_latency_breakdown(access_log, plot_name1, note)
-            if auto_clean:
-                if VERBOSE:
-                    print(f"[AUTO CLEAN] Deleting \"{access_log}\".")
-                os.remove(access_log)
-
-            if os.path.exists(plot_name2):
-                os.remove(plot_name2)
-                if VERBOSE:
-                    print(f"Deleting \"{plot_name2}\".")
+                print(f"Deleting \"{plot_name1}\".")
+        if VERBOSE:
+            print(f"Drawing latency breakdown plot for \"{access_log}\".")
+        draw_latency_breakdown(access_log, plot_name1, note)
+        if auto_clean:
+            if VERBOSE:
+                print(f"[AUTO CLEAN] Deleting \"{access_log}\".")
+            os.remove(access_log)
+
+        if os.path.exists(plot_name2):
+            os.remove(plot_name2)
+            if VERBOSE:
+                print(f"Deleting \"{plot_name2}\".")
+        if VERBOSE:
+            print(f"Drawing command interval distribution plot for \"{cmd_trace_file}\".")
+        draw_cmd_interval_distribution(cmd_trace_file, plot_name2, note)
+        if auto_clean and not point.is_duplicate():
             if VERBOSE:
-                print(f"Drawing command interval distribution plot for \"{cmd_trace_file}\".")
-            draw_cmd_interval_distribution(cmd_trace_file, plot_name2, note)
-            if auto_clean:
-                if VERBOSE:
-                    print(f"[AUTO CLEAN] Deleting \"{cmd_trace_file}\".")
-                os.remove(cmd_trace_file)
-
-    print("All figures are done.")          
-            
-
-# Global Variables
-RAMULATOR_PATH = "./build/ramulator2"
-CMD_TO_COUNT = ['ACT', 'PRE', 'PREA', 'RD',  'WR',  'RDA',  'WRA', 'REFab']
-TRACE_DICT = {
-    'stream_1thread':'trace/1thread_cons_6.trace'
-    ,'rand128B_1thread':'trace/1thread_mix_2.trace'
-    ,'rand256B_1thread':'trace/1thread_mix_1.trace'
-    # ,'random_1thread':'trace/1thread_rand_6.trace'
-    # 'stream_1thread':'trace/1thread_stream_readonly_1M_28_addrbit.trace'
-    # ,'rand128B_1thread':'trace/1thread_rand128B_readonly_1M_28_addrbit.trace'
-    # ,'rand256B_1thread':'trace/1thread_rand256B_readonly_1M_28_addrbit.trace'
-    # ,'rand512B_1thread':'trace/1thread_rand512B_readonly_1M_28_addrbit.trace'
-    # ,'random_1thread':'trace/1thread_rand_readonly_1M_28_addrbit.trace'
-    # ,'stream_2thread':'trace/2thread_stream_readonly_1M.trace'
-    # ,'rand128B_2thread':'trace/2thread_rand128B_readonly_1M.trace'
-}
-MAPPER_TABLE = [
-    '1RA-16R-2B-7C-2BG'
-    ,'1RA-16R-7C-2B-2BG'
-    # ,'1RA-16R-4C-2B-3C-2BG'
-    # ,'1RA-16R-1BG-2B-7C-1BG'
-    # ,'1RA-16R-2B-6C-2BG-1C'
-    # ,'1RA-16R-1BG-2B-5C-1BG-2C'
-    # ,'1RA-16R-1BG-2B-4C-1BG-3C'
-    # ,'1RA-16R-2B-4C-2BG-3C'
-    # ,'1RA-16R-1BG-2B-3C-1BG-4C'
-    # ,'1RA-16R-2B-3C-2BG-4C'
-    # ,'16R-1RA-2B-3C-2BG-4C'
-    # ,'1RA-14R-1BG-2R-2B-2C-1BG-5C'
-    # ,'1RA-14R-1BG-2R-4C-1BG-2B-3C'
-    # ,'14R-1BG-2R-2B-4C-1RA-3C-1BG'
-    # ,'14R-1BG-2R-2B-4C-1RA-1BG-3C'
-    # ,'1RA-16R-2B-1C-2BG-6C'
-    # ,'1RA-14R-1BG-2R-2B-1C-1BG-6C'
-    # ,'1RA-14R-2BG-2R-1B-7C-1B'
-    # ,'1RA-14R-1BG-2R-1B-4C-1BG-1B-3C'
-    # ,'1RA-14R-2BG-2R-7C-2B'
-    # ,'1RA-16R-2BG-2B-7C'
-    # ,'1RA-16R-2BG-7C-2B'
-    # ,'1RA-14R-1BG-2R-2B-7C-1BG'
-    # ,'1RA-14R-1BG-2R-2B-6C-1BG-1C'
-    # ,'1RA-14R-1BG-2R-2B-5C-1BG-2C'
-    # ,'1RA-14R-1BG-2R-2B-4C-1BG-3C'
-    # ,'1RA-14R-1BG-2R-2B-3C-1BG-4C'
-    # ,'10R-1RA-2B-6R-2BG-7C'
-    # '2BG-2B-1RA-16R-7C'
-]
+                print(f"[AUTO CLEAN] Deleting \"{cmd_trace_file}\".")
+            os.remove(cmd_trace_file)
+
+    print("All figures are done.")
+
 
 # Program Entry
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Process some input and output files.")
-    parser.add_argument('-c', '--config', type=str, required=False, help='Base ramulator config yaml file.', default='ddr4.yaml')
-    parser.add_argument('-o', '--output_dir', type=str, required=False, help='Output log folder.', default='./log/')
+    parser.add_argument('-s', '--sweep', type=str, required=False, help='Sweep spec with the traces and mappings to explore (see sweep.py).', default='dse_sweep.yaml')
+    parser.add_argument('-c', '--config', type=str, required=False, help='Base ramulator config yaml file (default: base of the sweep spec).', default=None)
+    parser.add_argument('-o', '--output_dir', type=str, required=False, help='Output log folder (default: output_dir of the sweep spec).', default=None)
     parser.add_argument('--auto_clean', action='store_true', help='Whether to delete the log files.')
     parser.add_argument('--verbose', action='store_true', help='Print detail info.')
+    parser.add_argument('--batch', action='store_true', help='Run all mappings of a trace in one ramulator2 process sharing the parsed trace.')
+    parser.add_argument('--daemon', type=str, required=False, help='Submit the simulations to the ramulator2 daemon listening on this socket.', default=None)
+    parser.add_argument('--queue', type=str, required=False, help='Publish the simulations on this work queue (shared directory or broker address) for queue_worker.py processes.', default=None)
+    parser.add_argument('-j', '--jobs', type=int, required=False, help='Maximum number of simulations running at the same time.', default=os.cpu_count())
     args = parser.parse_args()
 
-    global BASE_CONFIG
     global DSE_ROOT_FOLDER
     global TOTAL_LOG
     global VERBOSE
 
-    BASE_CONFIG = args.config
-    DSE_ROOT_FOLDER = f"{args.output_dir}/"
+    sweep = Sweep(args.sweep, output_dir=args.output_dir, base=args.config)
+    DSE_ROOT_FOLDER = f"{sweep.output_dir}/"
     TOTAL_LOG = f"{DSE_ROOT_FOLDER}result.csv"
     VERBOSE = args.verbose
 
@@ -311,8 +208,13 @@ if __name__ == '__main__':
 
     print(f"Program starts. All logs are in folder \"{DSE_ROOT_FOLDER}\".")
     with open(TOTAL_LOG, 'w') as file:
-        file.write('pattern, trace, mapping, total_latency, bw_usage, avg_latency, mid_latency, read_req, write_req, ' + ', '.join(cmd for cmd in CMD_TO_COUNT) + '\n')
-    concurrent_exec()
+        file.write('pattern, trace, mapping, total_latency, bw_usage, avg_latency, mid_latency, read_req, write_req, ' + ', '.join(cmd for cmd in sweep.params['cmd_to_count']) + '\n')
+    if args.batch:
+        batch_exec(sweep)
+    else:
+        backend = "queue" if args.queue else ("daemon" if args.daemon else "local")
+        queue = JobQueue(f"{DSE_ROOT_FOLDER}jobs.json", max_jobs=args.jobs, backend=backend, daemon_socket=args.daemon, queue=args.queue)
+        concurrent_exec(sweep, queue)
     print2xlsx(output_xlsx)
     print(f"Program ends. Excel results can be checked at \"{DSE_ROOT_FOLDER}result.xlsx\".")
-    draw_picture(args.auto_clean)
+    draw_picture(sweep, args.auto_clean)
@@ -0,0 +1,142 @@
+import os
+import re
+import sys
+import argparse
+import subprocess
+import yaml
+import numpy as np
+import pandas as pd
+
+from perf_comparison import TRACES, get_run, time_execution, count_requests, reject_outliers
+from component_bench import GENERIC_BASE, generate_traces, make_config
+
+
+MALLOC_COUNTER_SRC = "./malloc_counter.c"
+MALLOC_COUNTER_LIB = "./malloc_counter.so"
+
+
+def build_malloc_counter():
+  """ Compile the allocation counter (see malloc_counter.c) if it is missing or outdated. """
+  if os.path.exists(MALLOC_COUNTER_LIB) and os.path.getmtime(MALLOC_COUNTER_LIB) >= os.path.getmtime(MALLOC_COUNTER_SRC):
+    return
+  subprocess.run(["cc", "-O2", "-shared", "-fPIC", "-o", MALLOC_COUNTER_LIB, MALLOC_COUNTER_SRC], check = True)
+
+
+def get_workloads(workloads, num_reqs, seed):
+  """
+  (name, config, trace file) of every workload:
+    - loadstore: configs/ramulatorv2.yaml (LoadStoreTrace) on the perf_comparison traces
+    - simpleo3:  the GenericDRAM base of component_bench.py (SimpleO3 with its LLC) on synthetic instruction traces
+  """
+  runs = []
+  if "loadstore" in workloads:
+    for trace in TRACES:
+      args, _, trace_file, _ = get_run("ramulatorv2", trace)
+      if not os.path.exists(trace_file):
+        print(f"Skipping loadstore on {trace}: {trace_file} not found (see traces/gen_all_traces.sh).")
+        continue
+      runs.append((f"loadstore_{trace}", yaml.load(args[2], Loader = yaml.FullLoader), trace_file))
+  if "simpleo3" in workloads:
+    traces = generate_traces("./traces", num_reqs, seed)
+    for trace, trace_file in traces.items():
+      runs.append((f"simpleo3_{trace}", make_config(GENERIC_BASE, lambda c: None, trace_file), trace_file))
+  return runs
+
+
+def count_allocations(executable, config_file, output_dir, name):
+  """ Run one simulation with the allocation counter preloaded. :return: (allocations, allocated bytes). """
+  counter_file = os.path.join(output_dir, name + ".allocs")
+  env = dict(os.environ, LD_PRELOAD = os.path.abspath(MALLOC_COUNTER_LIB), MALLOC_COUNTER_OUTPUT = counter_file)
+  with open(os.path.join(output_dir, name + ".stdout"), "w") as f:
+    subprocess.run([executable, "-f", config_file], stdout = f, stderr = subprocess.STDOUT, env = env)
+  with open(counter_file) as f:
+    num_allocs, num_bytes = f.read().split()
+  return int(num_allocs), int(num_bytes)
+
+
+def main():
+  parser = argparse.ArgumentParser(description = "Compare the heap allocations and the simulation speed of two Ramulator 2.0 executables.")
+  parser.add_argument("--before", required = True, help = "Ramulator 2.0 executable before the change.")
+  parser.add_argument("--after", default = "./ramulatorv2", help = "Ramulator 2.0 executable after the change.")
+  parser.add_argument("--workloads", nargs = "+", default = ["loadstore", "simpleo3"], choices = ["loadstore", "simpleo3"], help = "Workloads to simulate.")
+  parser.add_argument("--num_reqs", type = int, default = 200000, help = "Requests per synthetic instruction trace (simpleo3).")
+  parser.add_argument("-n", "--num_itrs", type = int, default = 3, help = "Timed runs per executable and workload.")
+  parser.add_argument("--cpus", type = int, nargs = "+", default = None, help = "Pin the simulations to these CPUs.")
+  parser.add_argument("--output_dir", default = "./output/allocs", help = "Directory for the configs and simulator outputs.")
+  parser.add_argument("--seed", type = int, default = 0, help = "Seed of the synthetic traces.")
+  args = parser.parse_args()
+
+  executables = {"before": args.before, "after": args.after}
+  for executable in executables.values():
+    if not os.access(executable, os.X_OK):
+      print(f"Ramulator 2.0 executable {executable} not found.")
+      return 1
+
+  os.makedirs(args.output_dir, exist_ok = True)
+  build_malloc_counter()
+
+  results = []
+  for workload, config, trace_file in get_workloads(args.workloads, args.num_reqs, args.seed):
+    config_file = os.path.join(args.output_dir, workload + ".yaml")
+    with open(config_file, "w") as f:
+      yaml.dump(config, f)
+    num_reqs = count_requests(trace_file)
+
+    for version, executable in executables.items():
+      name = f"{workload}_{version}"
+      num_allocs, num_bytes = count_allocations(executable, config_file, args.output_dir, name)
+      for itr in range(args.num_itrs):
+        stdout_file = os.path.join(args.output_dir, name + ".stdout")
+        elapsed, cpu_time, max_rss, exit_code = time_execution([executable, "-f", config_file], stdout_file, args.cpus)
+        with open(stdout_file) as f:
+          m = re.search(r"^\s*memory_system_cycles:\s*(\d+)", f.read(), re.MULTILINE)
+        if exit_code != 0 or m is None:
+          print(f"Warning: {name} failed (exit code {exit_code}), see {stdout_file}.")
+        cycles = int(m.group(1)) if m else np.nan
+        results.append({
+          "workload": workload,
+          "version": version,
+          "itr": itr,
+          "elapsed_time": elapsed,
+          "max_rss_kb": max_rss,
+          "cycles": cycles,
+          "allocations": num_allocs,
+          "allocated_mb": num_bytes / (1 << 20),
+          "allocations_per_request": num_allocs / num_reqs,
+          "requests_per_sec": num_reqs / elapsed,
+          "cycles_per_sec": cycles / elapsed,
+        })
+
+  if not results:
+    print("Nothing to benchmark.")
+    return 0
+
+  df = pd.DataFrame(results)
+  df["outlier"] = False
+  for _, group in df.groupby(["workload", "version"]):
+    df.loc[group.index, "outlier"] = ~reject_outliers(group["elapsed_time"])
+  df.to_csv(os.path.join(args.output_dir, "results.csv"), index = False)
+
+  summary = df[~df["outlier"]].groupby(["workload", "version"], sort = False).agg(
+    allocations = ("allocations", "first"),
+    allocated_mb = ("allocated_mb", "first"),
+    allocations_per_request = ("allocations_per_request", "first"),
+    requests_per_sec = ("requests_per_sec", "mean"),
+    cycles_per_sec = ("cycles_per_sec", "mean"),
+    max_rss_kb = ("max_rss_kb", "max"),
+    cycles = ("cycles", "first"),
+  ).reset_index()
+  print(summary.to_string(index = False))
+
+  # The simulated cycles must not depend on the version, only the cost of simulating them
+  for workload, group in summary.groupby("workload"):
+    if group["cycles"].nunique() > 1:
+      print(f"Warning: {workload} simulates a different number of cycles before and after the change.")
+    before, after = group.set_index("version").loc["before"], group.set_index("version").loc["after"]
+    print(f"{workload}: {after['allocations'] / before['allocations'] - 1:+.1%} allocations, "
+          f"{after['requests_per_sec'] / before['requests_per_sec'] - 1:+.1%} throughput")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,271 @@
+import os
+import re
+import sys
+import copy
+import time
+import socket
+import argparse
+import subprocess
+import yaml
+import numpy as np
+import pandas as pd
+
+from perf_comparison import time_execution, reject_outliers
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from stats_loader import load_stats, memory_stats
+
+
+# Synthetic traces: every configuration of a group runs on the same traces
+PATTERNS = ["stream", "random"]
+
+# RowHammer mitigation parameters for tRH = 1000 (see rh_study/calc_rh_parameters.py)
+RH_PLUGINS = {
+  "PARA":        {"impl": "PARA", "threshold": 0.0339},
+  "Graphene":    {"impl": "Graphene", "num_table_entries": 4654, "activation_threshold": 250, "reset_period_ns": 64000000},
+  "Hydra":       {"impl": "Hydra", "hydra_tracking_threshold": 500, "hydra_group_threshold": 400, "hydra_row_group_size": 128,
+                  "hydra_reset_period_ns": 64000000, "hydra_rcc_num_per_rank": 4096, "hydra_rcc_policy": "RANDOM"},
+  "TWiCe-Ideal": {"impl": "TWiCe-Ideal", "twice_rh_threshold": 250, "twice_pruning_interval_threshold": 0.0305},
+  "OracleRH":    {"impl": "OracleRH", "tRH": 1000},
+}
+
+GENERIC_BASE = {
+  "Frontend": {
+    "impl": "SimpleO3",
+    "clock_ratio": 8,
+    "num_expected_insts": 2000000,
+    "llc_capacity_per_core": "2MB",
+    "llc_num_mshr_per_core": 16,
+    "Translation": {"impl": "RandomTranslation", "max_addr": 17179869184},
+  },
+  "MemorySystem": {
+    "impl": "GenericDRAM",
+    "clock_ratio": 3,
+    "DRAM": {
+      "impl": "DDR4-VRR",
+      "org": {"preset": "DDR4_8Gb_x8", "channel": 1, "rank": 2},
+      "timing": {"preset": "DDR4_2400R"},
+    },
+    "Controller": {
+      "impl": "Generic",
+      "Scheduler": {"impl": "FRFCFS"},
+      "RefreshManager": {"impl": "AllBank"},
+      "plugins": [],
+    },
+    "AddrMapper": {"impl": "RoBaRaCoCh"},
+  },
+}
+
+BH_BASE = {
+  "Frontend": {
+    "impl": "BHO3",
+    "clock_ratio": 8,
+    "num_expected_insts": 2000000,
+    "llc_capacity_per_core": "2MB",
+    "llc_num_mshr_per_core": 16,
+    "inst_window_depth": 128,
+    "Translation": {"impl": "RandomTranslation", "max_addr": 17179869184},
+  },
+  "MemorySystem": {
+    "impl": "BHDRAMSystem",
+    "clock_ratio": 3,
+    "DRAM": {
+      "impl": "DDR4",
+      "org": {"preset": "DDR4_8Gb_x8", "channel": 1, "rank": 2},
+      "timing": {"preset": "DDR4_2400R"},
+    },
+    "BHDRAMController": {
+      "impl": "BHDRAMController",
+      "BHScheduler": {"impl": "BHScheduler"},
+      "RefreshManager": {"impl": "AllBank"},
+      "plugins": [],
+    },
+    "AddrMapper": {"impl": "RoBaRaCoCh_with_rit"},
+  },
+}
+
+
+def plugin(config):
+  return {"ControllerPlugin": config}
+
+
+def generic_variants(output_dir):
+  """ (name, function applying the variant to a copy of the base config) of the GenericDRAM group. """
+  ctrl = lambda c: c["MemorySystem"]["Controller"]
+  def set_mapper(impl, **params):
+    return lambda c: c["MemorySystem"].__setitem__("AddrMapper", {"impl": impl, **params})
+
+  variants = [
+    ("base", lambda c: None),
+    # The scheduler of my_scheduler.cpp
+    ("scheduler:EDP_FRFCFS", lambda c: ctrl(c).__setitem__("Scheduler", {"impl": "EDP_FRFCFS"})),
+    ("mapper:ChRaBaRoCo", set_mapper("ChRaBaRoCo")),
+    ("mapper:MOP4CLXOR", set_mapper("MOP4CLXOR")),
+    ("mapper:CustomizedMapper", set_mapper("CustomizedMapper", mapping="2BG-2B-1RA-16R-7C")),
+    ("plugin:TraceRecorder", lambda c: ctrl(c)["plugins"].append(plugin({"impl": "TraceRecorder", "path": os.path.join(output_dir, "issue_log")}))),
+    ("plugin:CommandCounter", lambda c: ctrl(c)["plugins"].append(plugin({"impl": "CommandCounter", "commands_to_count": ["ACT", "PRE", "RD", "WR"]}))),
+    ("plugin:InfoRecorder", lambda c: ctrl(c)["plugins"].append(plugin({"impl": "InfoRecorder"}))),
+  ]
+  for name, params in RH_PLUGINS.items():
+    variants.append((f"plugin:{name}", lambda c, params = params: ctrl(c)["plugins"].append(plugin(dict(params)))))
+  return variants
+
+
+def bh_variants(output_dir):
+  """ (name, function applying the variant to a copy of the base config) of the BHDRAMSystem group. """
+  ctrl = lambda c: c["MemorySystem"]["BHDRAMController"]
+  add_blockhammer = lambda c: ctrl(c)["plugins"].append(plugin({"impl": "BlockHammerPlugin", "bf_ctr_thresh": 1024, "bf_num_rh": 4096}))
+  return [
+    ("base", lambda c: None),
+    ("plugin:BlockHammer", add_blockhammer),
+    # The blocking scheduler only works together with the BlockHammer plugin
+    ("scheduler:BlockingScheduler+plugin:BlockHammer", lambda c: (add_blockhammer(c), ctrl(c).__setitem__("BHScheduler", {"impl": "BlockingScheduler"}))),
+  ]
+
+
+def generate_traces(trace_dir, num_reqs, seed):
+  """
+  Write the synthetic instruction traces (if they do not exist yet), one per pattern.
+  Every line is "<bubble count> <load address> [<writeback address>]".
+
+  :return: Dict of pattern -> trace path.
+  """
+  os.makedirs(trace_dir, exist_ok = True)
+  rng = np.random.default_rng(seed)
+  traces = {}
+  for pattern in PATTERNS:
+    path = os.path.join(trace_dir, f"component_{pattern}_{num_reqs}.trace")
+    traces[pattern] = path
+    if os.path.exists(path):
+      continue
+    if pattern == "stream":
+      addrs = (np.arange(num_reqs, dtype = np.int64) * 64) % (1 << 32)
+    else:
+      addrs = rng.integers(0, 1 << 32, size = num_reqs, dtype = np.int64) & ~0x3F
+    is_write = rng.random(num_reqs) < 0.2
+    bubbles = rng.integers(0, 8, size = num_reqs)
+    with open(path, "w") as f:
+      f.writelines(f"{b} {a} {a ^ (1 << 30)}\n" if w else f"{b} {a}\n" for b, a, w in zip(bubbles, addrs, is_write))
+  return traces
+
+
+def make_config(base, apply_variant, trace):
+  config = copy.deepcopy(base)
+  config["Frontend"]["traces"] = [trace]
+  apply_variant(config)
+  return config
+
+
+def git_revision():
+  r = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True)
+  return r.stdout.strip() if r.returncode == 0 else ""
+
+
+def marginal_overheads(df):
+  """
+  Cost of every variant relative to the base configuration of its group, on the same trace.
+
+  :return: DataFrame with the wall time per simulated cycle of both and the marginal overhead (relative and in ns/cycle).
+  """
+  valid = df[~df["outlier"] & (df["exit_code"] == 0) & df["cycles"].notna()]
+  per_run = valid.groupby(["group", "variant", "trace"]).agg(
+    ns_per_cycle = ("ns_per_cycle", "mean"),
+    cycles_per_sec = ("cycles_per_sec", "mean"),
+    max_rss_kb = ("max_rss_kb", "max"),
+    runs = ("ns_per_cycle", "size"),
+  ).reset_index()
+  base = per_run[per_run["variant"] == "base"].set_index(["group", "trace"])
+  joined = per_run.join(base[["ns_per_cycle", "max_rss_kb"]], on = ["group", "trace"], rsuffix = "_base")
+  joined["overhead_ns_per_cycle"] = joined["ns_per_cycle"] - joined["ns_per_cycle_base"]
+  joined["overhead"] = joined["ns_per_cycle"] / joined["ns_per_cycle_base"] - 1
+  joined["overhead_rss_kb"] = joined["max_rss_kb"] - joined["max_rss_kb_base"]
+  return joined.drop(columns = ["ns_per_cycle_base", "max_rss_kb_base"])
+
+
+def append_history(df, filename):
+  df.to_csv(filename, mode = "a", header = not os.path.exists(filename), index = False)
+
+
+def main():
+  parser = argparse.ArgumentParser(description = "Measure the simulation cost of Ramulator 2.0 components, one component toggled at a time.")
+  parser.add_argument("--ramulator", default = "./ramulatorv2", help = "Ramulator 2.0 executable.")
+  parser.add_argument("--num_reqs", type = int, default = 200000, help = "Requests per synthetic trace.")
+  parser.add_argument("-n", "--num_itrs", type = int, default = 3, help = "Measured runs per configuration and trace.")
+  parser.add_argument("--cpus", type = int, nargs = "+", default = None, help = "Pin the simulations to these CPUs.")
+  parser.add_argument("--groups", nargs = "+", default = ["generic", "bh"], choices = ["generic", "bh"], help = "Component groups to measure.")
+  parser.add_argument("--variants", nargs = "+", default = None, help = "Only measure these variants (plus the base).")
+  parser.add_argument("--output_dir", default = "./output/components", help = "Directory for the configs and simulator outputs.")
+  parser.add_argument("--history", default = "./component_history.csv", help = "Table the results are appended to.")
+  parser.add_argument("--seed", type = int, default = 0, help = "Seed of the synthetic traces.")
+  args = parser.parse_args()
+
+  if not os.access(args.ramulator, os.X_OK):
+    print(f"Ramulator 2.0 executable {args.ramulator} not found.")
+    return 1
+
+  os.makedirs(args.output_dir, exist_ok = True)
+  traces = generate_traces("./traces", args.num_reqs, args.seed)
+  groups = {"generic": (GENERIC_BASE, generic_variants(args.output_dir)), "bh": (BH_BASE, bh_variants(args.output_dir))}
+
+  timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+  revision = git_revision()
+  host = socket.gethostname()
+
+  results = []
+  for group in args.groups:
+    base, variants = groups[group]
+    for variant, apply_variant in variants:
+      if args.variants and variant != "base" and variant not in args.variants:
+        continue
+      for pattern in PATTERNS:
+        config = make_config(base, apply_variant, traces[pattern])
+        name = f"{group}_{re.sub(r'[:+]', '_', variant)}_{pattern}"
+        config_file = os.path.join(args.output_dir, name + ".yaml")
+        stats_file = os.path.join(args.output_dir, name + "_stats.yaml")
+        config["stats_path"] = stats_file
+        with open(config_file, "w") as f:
+          yaml.dump(config, f)
+        stdout_file = os.path.join(args.output_dir, name + ".stdout")
+
+        for itr in range(args.num_itrs):
+          if os.path.exists(stats_file):
+            os.remove(stats_file)
+          elapsed, cpu_time, max_rss, exit_code = time_execution([args.ramulator, "-f", config_file], stdout_file, args.cpus)
+          cycles = memory_stats(load_stats(stats_file))["memory_system_cycles"] if os.path.exists(stats_file) else np.nan
+          if exit_code != 0 or np.isnan(cycles):
+            print(f"Warning: {name} failed (exit code {exit_code}), see {stdout_file}.")
+          results.append({
+            "timestamp": timestamp,
+            "revision": revision,
+            "host": host,
+            "group": group,
+            "variant": variant,
+            "trace": pattern,
+            "itr": itr,
+            "elapsed_time": elapsed,
+            "cpu_time": cpu_time,
+            "max_rss_kb": max_rss,
+            "exit_code": exit_code,
+            "cycles": cycles,
+            "cycles_per_sec": cycles / elapsed,
+            "ns_per_cycle": 1e9 * elapsed / cycles,
+          })
+
+  df = pd.DataFrame(results)
+  df["outlier"] = False
+  for _, group in df.groupby(["group", "variant", "trace"]):
+    df.loc[group.index, "outlier"] = ~reject_outliers(group["elapsed_time"])
+
+  overheads = marginal_overheads(df)
+  overheads.insert(0, "timestamp", timestamp)
+  overheads.insert(1, "revision", revision)
+  overheads.insert(2, "host", host)
+  print(overheads.drop(columns = ["timestamp", "revision", "host"]).to_string(index = False))
+
+  append_history(df, args.history)
+  append_history(overheads, os.path.splitext(args.history)[0] + "_overheads.csv")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,43 @@
+// Counts the heap allocations of a process (glibc only):
+//   cc -O2 -shared -fPIC -o malloc_counter.so malloc_counter.c
+//   MALLOC_COUNTER_OUTPUT=counts.txt LD_PRELOAD=./malloc_counter.so <command>
+// When the process exits, "<allocations> <allocated bytes>" is written to MALLOC_COUNTER_OUTPUT (stderr if unset).
+// operator new and the standard containers allocate through malloc, so they are counted as well.
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdatomic.h>
+
+extern void* __libc_malloc(size_t size);
+extern void* __libc_calloc(size_t num, size_t size);
+extern void* __libc_realloc(void* ptr, size_t size);
+
+static atomic_ulong num_allocs;
+static atomic_ulong num_bytes;
+
+void* malloc(size_t size) {
+  atomic_fetch_add_explicit(&num_allocs, 1, memory_order_relaxed);
+  atomic_fetch_add_explicit(&num_bytes, size, memory_order_relaxed);
+  return __libc_malloc(size);
+}
+
+void* calloc(size_t num, size_t size) {
+  atomic_fetch_add_explicit(&num_allocs, 1, memory_order_relaxed);
+  atomic_fetch_add_explicit(&num_bytes, num * size, memory_order_relaxed);
+  return __libc_calloc(num, size);
+}
+
+void* realloc(void* ptr, size_t size) {
+  atomic_fetch_add_explicit(&num_allocs, 1, memory_order_relaxed);
+  atomic_fetch_add_explicit(&num_bytes, size, memory_order_relaxed);
+  return __libc_realloc(ptr, size);
+}
+
+__attribute__((destructor)) static void report(void) {
+  const char* path = getenv("MALLOC_COUNTER_OUTPUT");
+  FILE* f = path ? fopen(path, "w") : NULL;
+  fprintf(f ? f : stderr, "%lu %lu\n", atomic_load(&num_allocs), atomic_load(&num_bytes));
+  if (f) {
+    fclose(f);
+  }
+}
@@ -1,106 +1,352 @@
 import os
+import re
 import sys
-import subprocess
+import json
 import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
 import yaml
+import numpy as np
 import pandas as pd
 
 
-def time_execution(args):
-  print(f"Running {args}...")
-  start_time = time.time()
-  r = subprocess.run(args, capture_output = True, text = True)
-  end_time = time.time()
-  
+SIMULATORS = ["ramulatorv1", "ramulatorv2", "dramsim2", "dramsim3", "usimm"]
+TRACES = ["stream", "random"]
+
+
+def get_run(simulator, trace):
+  """
+  Command line of one simulation, the file its stdout goes to, the trace it reads and a function
+  returning the number of simulated cycles (None if the simulator does not report them).
+  """
+  def parse_cycles(filename, pattern):
+    def parse():
+      if not os.path.exists(filename):
+        return None
+      with open(filename) as f:
+        m = re.search(pattern, f.read(), re.MULTILINE)
+      return int(m.group(1)) if m else None
+    return parse
+
+  # Ramulator V1
+  if simulator == "ramulatorv1":
+    trace_file = f"./traces/{trace}_5M_R8W2_ramulatorv1.trace"
+    stats_file = f"./output/ramulatorv1/{trace}.stats"
+    args = [
+      "./ramulatorv1",
+      "./configs/ramulatorv1.cfg",
+      "--mode=dram",
+      "--stats",
+      stats_file,
+      trace_file
+    ]
+    return args, f"./output/ramulatorv1/{trace}.stdout", trace_file, parse_cycles(stats_file, r"ramulator\.dram_cycles\s+(\d+)")
+
+  # Ramulator V2
+  elif simulator == "ramulatorv2":
+    trace_file = f"./traces/{trace}_5M_R8W2_ramulatorv2.trace"
+    stdout_file = f"./output/ramulatorv2/{trace}.stdout"
+    config_file = "./configs/ramulatorv2.yaml"
+    config = None
+    with open(config_file) as f:
+      config = yaml.load(f, Loader=yaml.FullLoader)
+      config["Frontend"]["path"] = trace_file
+
+    args = [
+      "./ramulatorv2",
+      "--config",
+      yaml.dump(config)
+    ]
+    return args, stdout_file, trace_file, parse_cycles(stdout_file, r"^\s*memory_system_cycles:\s*(\d+)")
+
+  # dramsim2
+  elif simulator == "dramsim2":
+    trace_file = f"./traces/mase_{trace}_5M_R8W2_dramsim2.trace"
+    args = [
+      "./dramsim2",
+      "-s", "./configs/dramsim2_system.ini",
+      "-d", "./configs/dramsim2_dram.ini",
+      "-c", "5000000000",
+      "-t", trace_file
+    ]
+    return args, f"./output/dramsim2/{trace}.stdout", trace_file, lambda: None
+
+  # dramsim3
+  elif simulator == "dramsim3":
+    trace_file = f"./traces/{trace}_5M_R8W2_dramsim3.trace"
+    stats_file = f"./output/dramsim3/{trace}.stats"
+    args = [
+      "./dramsim3",
+      "./configs/dramsim3.ini",
+      "-t", trace_file,
+      "-c", "5000000000",
+      "-o", "./output/dramsim3"
+    ]
+    def parse():
+      # dramsim3 always writes dramsim3.txt, keep one per trace
+      if os.path.exists("./output/dramsim3/dramsim3.txt"):
+        os.replace("./output/dramsim3/dramsim3.txt", stats_file)
+      return parse_cycles(stats_file, r"^num_cycles\s*=\s*(\d+)")()
+    return args, f"./output/dramsim3/{trace}.stdout", trace_file, parse
+
+  # usimm
+  elif simulator == "usimm":
+    trace_file = f"./traces/{trace}_5M_R8W2_usimm.trace"
+    args = [
+      "./usimm",
+      "./configs/usimm.cfg",
+      trace_file,
+    ]
+    return args, f"./output/usimm/{trace}.stdout", trace_file, lambda: None
+
+  raise ValueError(f"Unknown simulator {simulator}")
+
+
+def is_available(simulator, trace):
+  args, _, trace_file, _ = get_run(simulator, trace)
+  return os.access(args[0], os.X_OK) and os.path.exists(trace_file)
+
+
+_num_requests = {}
+def count_requests(trace_file):
+  if trace_file not in _num_requests:
+    with open(trace_file, "rb") as f:
+      _num_requests[trace_file] = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 24), b""))
+  return _num_requests[trace_file]
+
+
+def time_execution(args, stdout_file, cpus=None):
+  """
+  Run one simulation and measure it.
+
+  The wall time ends when a blocking waitid() sees the child exit. The CPU time comes from wait4()
+  on the child itself (the per-process counterpart of resource.getrusage(RUSAGE_CHILDREN)). Its
+  ru_maxrss also counts the pages of this Python process that the child inherited before exec, so
+  where /proc is available the peak RSS is taken from the VmHWM of the running simulator instead,
+  sampled by a helper thread.
+
+  :return: Wall time (s), child CPU time (user + system, s), peak RSS (KiB) and the exit code.
+  """
+  print(f"Running {args[0]} ({stdout_file})...")
+  preexec_fn = (lambda: os.sched_setaffinity(0, cpus)) if cpus else None
+  os.makedirs(os.path.dirname(stdout_file), exist_ok = True)
+  with open(stdout_file, "w") as f:
+    start_time = time.perf_counter()
+    p = subprocess.Popen(args, stdout = f, stderr = subprocess.STDOUT, preexec_fn = preexec_fn)
+    exited = threading.Event()
+    max_rss = []
+    sampler = threading.Thread(target = sample_vm_hwm, args = (p.pid, exited, max_rss))
+    sampler.start()
+    # Wait without reaping, so that the pid cannot be reused while the sampler still reads its /proc entry
+    os.waitid(os.P_PID, p.pid, os.WEXITED | os.WNOWAIT)
+    end_time = time.perf_counter()
+    exited.set()
+    sampler.join()
+    _, status, rusage = os.wait4(p.pid, 0)
+    p.returncode = os.waitstatus_to_exitcode(status)
+
   elapsed = end_time - start_time
-  return elapsed, r
+  return elapsed, rusage.ru_utime + rusage.ru_stime, max(max_rss, default = None) or rusage.ru_maxrss, p.returncode
+
+
+def sample_vm_hwm(pid, exited, max_rss):
+  """ Append the VmHWM of the process to max_rss until `exited` is set, sampling more and more rarely up to every 50 ms. """
+  interval = 0.001
+  while True:
+    vm_hwm = read_vm_hwm(pid)
+    if vm_hwm is not None:
+      max_rss.append(vm_hwm)
+    if exited.wait(interval):
+      return
+    interval = min(interval * 2, 0.05)
+
+
+def read_vm_hwm(pid):
+  """ Peak resident set size (KiB) of a running process, None if unavailable. """
+  try:
+    with open(f"/proc/{pid}/status") as f:
+      for line in f:
+        if line.startswith("VmHWM:"):
+          return int(line.split()[1])
+  except OSError:
+    pass
+  return None
+
+
+def reject_outliers(values, threshold = 3.5):
+  """ Mask of the values whose modified z-score (based on the median absolute deviation) is below the threshold. """
+  values = np.asarray(values, dtype = float)
+  median = np.median(values)
+  mad = np.median(np.abs(values - median))
+  if mad == 0:
+    return np.ones(len(values), dtype = bool)
+  return np.abs(0.6745 * (values - median) / mad) <= threshold
+
+
+def bootstrap_ci(values, confidence = 0.95, num_resamples = 10000, rng = None):
+  """ Bootstrap confidence interval of the mean. """
+  rng = rng or np.random.default_rng(0)
+  values = np.asarray(values, dtype = float)
+  if len(values) < 2:
+    return values.mean(), values.mean()
+  means = rng.choice(values, size = (num_resamples, len(values))).mean(axis = 1)
+  return tuple(np.quantile(means, [(1 - confidence) / 2, (1 + confidence) / 2]))
+
+
+def permutation_pvalue(baseline, current, num_resamples = 10000, rng = None):
+  """ One-sided permutation test: probability of a mean slowdown at least this large if both samples came from the same distribution. """
+  rng = rng or np.random.default_rng(0)
+  baseline = np.asarray(baseline, dtype = float)
+  current = np.asarray(current, dtype = float)
+  observed = current.mean() - baseline.mean()
+  pooled = np.concatenate([baseline, current])
+  count = 0
+  for _ in range(num_resamples):
+    rng.shuffle(pooled)
+    if pooled[len(baseline):].mean() - pooled[:len(baseline)].mean() >= observed:
+      count += 1
+  return (count + 1) / (num_resamples + 1)
+
+
+def measured(df):
+  """ The runs that count: the ones that succeeded and are no outliers. """
+  return df[~df["failed"] & ~df["outlier"]]
+
+
+def summarize(df):
+  rows = []
+  for (simulator, trace), group in measured(df).groupby(["simulator", "trace"]):
+    ci_low, ci_high = bootstrap_ci(group["elapsed_time"])
+    rows.append({
+      "simulator": simulator,
+      "trace": trace,
+      "runs": len(group),
+      "elapsed_mean": group["elapsed_time"].mean(),
+      "elapsed_ci_low": ci_low,
+      "elapsed_ci_high": ci_high,
+      "cpu_time_mean": group["cpu_time"].mean(),
+      "max_rss_kb": group["max_rss_kb"].max(),
+      "requests_per_sec": group["requests_per_sec"].mean(),
+      "cycles_per_sec": group["cycles_per_sec"].mean(),
+    })
+  return pd.DataFrame(rows)
+
+
+def check_regressions(df, baseline, threshold, alpha):
+  """
+  Compare the elapsed times with the stored baseline of this host.
+
+  A (simulator, trace) regresses if its mean is more than `threshold` slower and the slowdown is
+  significant at level `alpha`.
+
+  :return: List of human-readable regression messages.
+  """
+  regressions = []
+  for (simulator, trace), group in measured(df).groupby(["simulator", "trace"]):
+    reference = baseline.get(f"{simulator}/{trace}")
+    if not reference:
+      continue
+    current = group["elapsed_time"].to_numpy()
+    slowdown = current.mean() / np.mean(reference) - 1
+    pvalue = permutation_pvalue(reference, current)
+    status = "REGRESSION" if (slowdown > threshold and pvalue < alpha) else "ok"
+    print(f"{simulator}/{trace}: {slowdown:+.1%} vs. baseline (p = {pvalue:.4f}) {status}")
+    if status == "REGRESSION":
+      regressions.append(f"{simulator}/{trace} is {slowdown:.1%} slower (p = {pvalue:.4f})")
+  return regressions
 
 
 def main():
-  simulators = ["ramulatorv1", "ramulatorv2", "dramsim2", "dramsim3", "usimm"]
-  traces = ["stream", "random"]
-  num_itrs = 10
+  parser = argparse.ArgumentParser(description = "Benchmark the simulation speed of the DRAM simulators.")
+  parser.add_argument("--simulators", nargs = "+", default = SIMULATORS, help = "Simulators to benchmark.")
+  parser.add_argument("--traces", nargs = "+", default = TRACES, help = "Traces to simulate.")
+  parser.add_argument("-n", "--num_itrs", type = int, default = 10, help = "Measured runs per simulator and trace.")
+  parser.add_argument("--warmup", type = int, default = 1, help = "Unmeasured runs per simulator and trace before measuring.")
+  parser.add_argument("--cpus", type = int, nargs = "+", default = None, help = "Pin the simulators to these CPUs.")
+  parser.add_argument("--seed", type = int, default = 0, help = "Seed for the order of the runs.")
+  parser.add_argument("--baseline_dir", default = "./baselines", help = "Directory of the per-host baselines.")
+  parser.add_argument("--save_baseline", action = "store_true", help = "Store the results as the baseline of this host.")
+  parser.add_argument("--threshold", type = float, default = 0.05, help = "Relative slowdown that counts as a regression.")
+  parser.add_argument("--alpha", type = float, default = 0.05, help = "Significance level of the regression test.")
+  args = parser.parse_args()
+
+  runs = []
+  for simulator in args.simulators:
+    for trace in args.traces:
+      if is_available(simulator, trace):
+        runs.append((simulator, trace))
+      else:
+        print(f"Skipping {simulator} on {trace}: simulator or trace not found.")
+  if not runs:
+    print("Nothing to benchmark.")
+    return 0
 
-  columns = ["simulator", "trace", "elapsed_time", "itr"]
+  for simulator, trace in runs:
+    for _ in range(args.warmup):
+      sim_args, stdout_file, _, _ = get_run(simulator, trace)
+      time_execution(sim_args, stdout_file, args.cpus)
+
+  # Shuffle the runs of every iteration so that slow drifts of the machine do not favor one simulator
+  rng = random.Random(args.seed)
   results = []
-  for itr in range(num_itrs):
-    for trace in traces:
-      for simulator in simulators:
-
-        # Ramulator V1
-        if simulator == "ramulatorv1":
-          args = [
-            "./ramulatorv1",
-            "./configs/ramulatorv1.cfg",
-            "--mode=dram", 
-            "--stats", 
-            f"./output/ramulatorv1/{trace}.stats", 
-            f"./traces/{trace}_5M_R8W2_ramulatorv1.trace"
-          ]
-          time, r = time_execution(args)
-          results.append(["ramulatorv1", trace, time, itr])
-
-        # Ramulator V2
-        elif simulator == "ramulatorv2":
-          config_file = "./configs/ramulatorv2.yaml"
-          config = None
-          with open(config_file) as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-            config["Frontend"]["path"] = f"./traces/{trace}_5M_R8W2_ramulatorv2.trace"
-
-          args = [
-            "./ramulatorv2",
-            "--config", 
-            yaml.dump(config) 
-          ]
-          time, r = time_execution(args)
-          with open(f"./output/ramulatorv2/{trace}.stdout", "w") as f:
-            f.write(r.stdout)
-          results.append(["ramulatorv2", trace, time, itr])
-
-        # dramsim2
-        elif simulator == "dramsim2":
-          args = [
-            "./dramsim2",
-            "-s", "./configs/dramsim2_system.ini", 
-            "-d", "./configs/dramsim2_dram.ini", 
-            "-c", "5000000000",
-            "-t", f"./traces/mase_{trace}_5M_R8W2_dramsim2.trace"
-          ]
-          time, r = time_execution(args)
-          with open(f"./output/dramsim2/{trace}.stdout", "w") as f:
-            f.write(r.stdout)
-          results.append(["dramsim2", trace, time, itr])
-
-        # dramsim3
-        elif simulator == "dramsim3":
-          args = [
-            "./dramsim3",
-            "./configs/dramsim3.ini", 
-            "-t", f"./traces/{trace}_5M_R8W2_dramsim3.trace",
-            "-c", "5000000000",
-            "-o", "./output/dramsim3"
-          ]
-          time, r = time_execution(args)
-          os.rename(f"./output/dramsim3/dramsim3.txt", f"./output/dramsim3/{trace}.stats")
-          results.append(["dramsim3", trace, time, itr])
-
-        # usimm
-        elif simulator == "usimm":
-          args = [
-            "./usimm",
-            "./configs/usimm.cfg", 
-            f"./traces/{trace}_5M_R8W2_usimm.trace",
-          ]
-          time, r = time_execution(args)
-          with open(f"./output/usimm/{trace}.stdout", "w") as f:
-            f.write(r.stdout)
-          results.append(["usimm", trace, time, itr])
+  for itr in range(args.num_itrs):
+    order = runs[:]
+    rng.shuffle(order)
+    for simulator, trace in order:
+      sim_args, stdout_file, trace_file, parse_cycles = get_run(simulator, trace)
+      elapsed, cpu_time, max_rss, exit_code = time_execution(sim_args, stdout_file, args.cpus)
+      if exit_code != 0:
+        print(f"Error: {simulator} on {trace} exited with code {exit_code}, the run is not counted.")
+      cycles = parse_cycles()
+      results.append({
+        "simulator": simulator,
+        "trace": trace,
+        "itr": itr,
+        "elapsed_time": elapsed,
+        "cpu_time": cpu_time,
+        "max_rss_kb": max_rss,
+        "exit_code": exit_code,
+        "requests_per_sec": count_requests(trace_file) / elapsed,
+        "cycles_per_sec": cycles / elapsed if cycles else np.nan,
+      })
 
   df = pd.DataFrame(results)
-  df.columns = columns
+  df["failed"] = df["exit_code"] != 0
+  df["outlier"] = False
+  for _, group in df[~df["failed"]].groupby(["simulator", "trace"]):
+    df.loc[group.index, "outlier"] = ~reject_outliers(group["elapsed_time"])
   df.to_csv("results.csv")
 
+  summary = summarize(df)
+  summary.to_csv("summary.csv", index = False)
+  print(summary.to_string(index = False))
+
+  baseline_file = os.path.join(args.baseline_dir, f"{socket.gethostname()}.json")
+  regressions = []
+  if os.path.exists(baseline_file):
+    with open(baseline_file) as f:
+      regressions = check_regressions(df, json.load(f), args.threshold, args.alpha)
+  else:
+    print(f"No baseline for this host ({baseline_file}).")
+
+  if args.save_baseline:
+    os.makedirs(args.baseline_dir, exist_ok = True)
+    baseline = {f"{simulator}/{trace}": group["elapsed_time"].tolist()
+                for (simulator, trace), group in measured(df).groupby(["simulator", "trace"])}
+    with open(baseline_file, "w") as f:
+      json.dump(baseline, f, indent = 1)
+    print(f"Saved baseline to {baseline_file}.")
+
+  for regression in regressions:
+    print(f"Regression: {regression}")
+  num_failed = int(df["failed"].sum())
+  if num_failed:
+    print(f"{num_failed} runs failed.")
+  return 1 if regressions or num_failed else 0
+
 
 if __name__ == "__main__":
-  main()
+  sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+import re
+import sys
+import argparse
+import yaml
+import numpy as np
+import pandas as pd
+
+from perf_comparison import time_execution
+from component_bench import GENERIC_BASE, generate_traces, make_config, plugin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rh_study"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from calc_rh_parameters import get_rh_parameters
+from profile_report import load_profile
+
+
+# The activation tracking mitigations, with the parameter names of get_rh_parameters()
+RH_PLUGIN_PARAMS = {
+  "Graphene":    ["num_table_entries", "activation_threshold", "reset_period_ns"],
+  "Hydra":       ["hydra_tracking_threshold", "hydra_group_threshold", "hydra_row_group_size",
+                  "hydra_reset_period_ns", "hydra_rcc_num_per_rank", "hydra_rcc_policy"],
+  "TWiCe-Ideal": ["twice_rh_threshold", "twice_pruning_interval_threshold"],
+}
+
+
+def generate_hammer_trace(trace_dir, num_reqs, seed, num_aggressors = 64):
+  """
+  Write an instruction trace (if it does not exist yet) where half of the loads go to a few aggressor rows and the other
+  half are random, so that the tables of the mitigations see both hot rows and a stream of new rows.
+
+  :return: Trace path.
+  """
+  path = os.path.join(trace_dir, f"rh_hammer_{num_reqs}.trace")
+  if os.path.exists(path):
+    return path
+  os.makedirs(trace_dir, exist_ok = True)
+  rng = np.random.default_rng(seed)
+  aggressors = rng.integers(0, 1 << 32, size = num_aggressors, dtype = np.int64) & ~0x1FFF
+  is_hammer = rng.random(num_reqs) < 0.5
+  addrs = np.where(is_hammer,
+                   aggressors[rng.integers(0, num_aggressors, size = num_reqs)] | (rng.integers(0, 128, size = num_reqs) << 6),
+                   rng.integers(0, 1 << 32, size = num_reqs, dtype = np.int64) & ~0x3F)
+  bubbles = rng.integers(0, 8, size = num_reqs)
+  with open(path, "w") as f:
+    f.writelines(f"{b} {a}\n" for b, a in zip(bubbles, addrs))
+  return path
+
+
+def get_plugin_ns(profile_file, mitigation):
+  """ Total time spent in the update() of the mitigation plugin, in ns. """
+  _, nodes = load_profile(profile_file)
+  label = f"ControllerPlugin[{mitigation}]::update"
+  return sum(node["total_ns"] for node in nodes if node["stack"][-1] == label)
+
+
+def get_num_acts(stdout_file):
+  """ Number of ACT commands of the run (counted by the CommandCounter plugin). """
+  with open(stdout_file) as f:
+    return sum(int(n) for n in re.findall(r"^\s*num_ACT_commands:\s*(\d+)", f.read(), re.MULTILINE))
+
+
+def main():
+  parser = argparse.ArgumentParser(description = "Measure the cost of the RowHammer mitigation plugins per activation, for Ramulator 2.0 executables.")
+  parser.add_argument("--ramulator", nargs = "+", default = ["./ramulatorv2"], help = "Ramulator 2.0 executables to compare.")
+  parser.add_argument("--mitigations", nargs = "+", default = list(RH_PLUGIN_PARAMS), choices = list(RH_PLUGIN_PARAMS), help = "Mitigations to measure.")
+  parser.add_argument("--tRH", type = int, nargs = "+", default = [100, 200, 500, 1000], help = "RowHammer thresholds to configure the mitigations for.")
+  parser.add_argument("--num_reqs", type = int, default = 200000, help = "Requests per synthetic trace.")
+  parser.add_argument("-n", "--num_itrs", type = int, default = 3, help = "Measured runs per configuration and executable.")
+  parser.add_argument("--cpus", type = int, nargs = "+", default = None, help = "Pin the simulations to these CPUs.")
+  parser.add_argument("--output_dir", default = "./output/rh_plugins", help = "Directory for the configs and simulator outputs.")
+  parser.add_argument("--seed", type = int, default = 0, help = "Seed of the synthetic traces.")
+  args = parser.parse_args()
+
+  for executable in args.ramulator:
+    if not os.access(executable, os.X_OK):
+      print(f"Ramulator 2.0 executable {executable} not found.")
+      return 1
+
+  os.makedirs(args.output_dir, exist_ok = True)
+  traces = {"random": generate_traces("./traces", args.num_reqs, args.seed)["random"],
+            "hammer": generate_hammer_trace("./traces", args.num_reqs, args.seed)}
+
+  results = []
+  for mitigation in args.mitigations:
+    for tRH in args.tRH:
+      params = {"impl": mitigation, **dict(zip(RH_PLUGIN_PARAMS[mitigation], get_rh_parameters(mitigation, tRH)))}
+      for pattern, trace in traces.items():
+        for version, executable in enumerate(args.ramulator):
+          name = f"{mitigation}_{tRH}_{pattern}_{version}"
+          profile_file = os.path.join(args.output_dir, name + ".profile")
+          def apply_variant(c):
+            c["MemorySystem"]["Controller"]["plugins"] += [
+              plugin(dict(params)),
+              plugin({"impl": "CommandCounter", "commands_to_count": ["ACT"]}),
+            ]
+            c["Profile"] = {"path": profile_file}
+          config_file = os.path.join(args.output_dir, name + ".yaml")
+          with open(config_file, "w") as f:
+            yaml.dump(make_config(GENERIC_BASE, apply_variant, trace), f)
+          stdout_file = os.path.join(args.output_dir, name + ".stdout")
+
+          for itr in range(args.num_itrs):
+            elapsed, cpu_time, max_rss, exit_code = time_execution([executable, "-f", config_file], stdout_file, args.cpus)
+            if exit_code != 0 or not os.path.exists(profile_file):
+              print(f"Warning: {name} failed (exit code {exit_code}), see {stdout_file}.")
+              continue
+            num_acts = get_num_acts(stdout_file)
+            plugin_ns = get_plugin_ns(profile_file, mitigation)
+            results.append({
+              "mitigation": mitigation,
+              "tRH": tRH,
+              "trace": pattern,
+              "executable": executable,
+              "itr": itr,
+              "elapsed_time": elapsed,
+              "max_rss_kb": max_rss,
+              "acts": num_acts,
+              "plugin_ns": plugin_ns,
+              "ns_per_act": plugin_ns / num_acts if num_acts else np.nan,
+            })
+
+  if not results:
+    print("Nothing to benchmark.")
+    return 0
+
+  df = pd.DataFrame(results)
+  df.to_csv(os.path.join(args.output_dir, "results.csv"), index = False)
+  # The update() of a plugin also runs on the cycles without an activation, so the cost per activation is an upper bound
+  summary = df.groupby(["mitigation", "tRH", "trace", "executable"], sort = False).agg(
+    acts = ("acts", "first"),
+    ns_per_act = ("ns_per_act", "median"),
+    elapsed_time = ("elapsed_time", "median"),
+    max_rss_kb = ("max_rss_kb", "max"),
+  ).reset_index()
+  print(summary.to_string(index = False))
+
+  # The mitigations must make the same decisions with every executable, only their cost may differ
+  for (mitigation, tRH, pattern), group in summary.groupby(["mitigation", "tRH", "trace"]):
+    if group["acts"].nunique() > 1:
+      print(f"Warning: {mitigation} (tRH = {tRH}) issues a different number of ACTs on {pattern} with each executable.")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,99 @@
+# Usage: python3 profile_report.py profile.csv [--top N] [--sort self|total] [--folded out.folded]
+# Encoded in UTF-8
+#
+# Reports where the simulator spends its time, from the call tree written by a run with a Profile section (see
+# src/base/profiler.h). The folded output can be fed to flamegraph.pl or loaded in speedscope.
+
+import sys
+import argparse
+
+
+def load_profile(path):
+    """
+    Read a profile written by Ramulator 2.0.
+
+    :param path: Path to the profile.
+    :return: (sample_period, list of dicts with `stack` (list of frames), `calls`, `total_ns` and `self_ns`). Times are
+             scaled by the sample period so that they estimate the whole run.
+    """
+    sample_period = 1
+    nodes = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                key, _, value = line[1:].partition(':')
+                if key.strip() == 'sample_period':
+                    sample_period = int(value)
+                continue
+            if line.startswith('stack,'):
+                continue
+            # Labels may contain commas, the numbers never do
+            stack, calls, total_ns, self_ns = line.rsplit(',', 3)
+            nodes.append({
+                'stack': stack.split(';'),
+                'calls': int(calls) * sample_period,
+                'total_ns': int(total_ns) * sample_period,
+                'self_ns': int(self_ns) * sample_period,
+            })
+    return sample_period, nodes
+
+
+def rank(nodes, sort_key='self_ns'):
+    """
+    Aggregate the nodes by frame, so that a component reached through several paths is reported once.
+
+    :param sort_key: `self_ns` or `total_ns`.
+    :return: List of (frame, calls, total_ns, self_ns), sorted by the given key in decreasing order.
+    """
+    frames = {}
+    for node in nodes:
+        frame = node['stack'][-1]
+        calls, total_ns, self_ns = frames.get(frame, (0, 0, 0))
+        # A frame nested in itself would otherwise count its inner calls twice in the total
+        nested = frame in node['stack'][:-1]
+        frames[frame] = (calls + node['calls'], total_ns + (0 if nested else node['total_ns']), self_ns + node['self_ns'])
+    index = 2 if sort_key == 'total_ns' else 3
+    return sorted(((frame, *values) for frame, values in frames.items()), key=lambda x: x[index], reverse=True)
+
+
+def write_folded(nodes, path):
+    """
+    Write the profile in the folded stack format (`frame;frame;frame self_ns`) understood by flamegraph.pl and
+    speedscope.
+    """
+    with open(path, 'w') as f:
+        for node in nodes:
+            if node['self_ns'] > 0:
+                f.write(f"{';'.join(node['stack'])} {node['self_ns']}\n")
+
+
+def print_table(ranked, top, file=sys.stdout):
+    """
+    Print the ranked frames with their share of the profiled time.
+    """
+    profiled_ns = sum(entry[3] for entry in ranked)
+    print(f"{'self %':>7} {'self (ms)':>11} {'total (ms)':>11} {'calls':>12} {'ns/call':>9}  frame", file=file)
+    for frame, calls, total_ns, self_ns in ranked[:top]:
+        share = 100.0 * self_ns / profiled_ns if profiled_ns > 0 else 0.0
+        per_call = total_ns / calls if calls > 0 else 0.0
+        print(f"{share:>6.2f}% {self_ns / 1e6:>11.2f} {total_ns / 1e6:>11.2f} {calls:>12} {per_call:>9.1f}  {frame}", file=file)
+    print(f"Profiled time: {profiled_ns / 1e6:.2f} ms", file=file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rank the hotspots of a Ramulator 2.0 profile.")
+    parser.add_argument('profile', help='Profile written by a run with a Profile section.')
+    parser.add_argument('--top', type=int, default=20, help='Number of frames to print.')
+    parser.add_argument('--sort', choices=['self', 'total'], default='self', help='Rank by self or total time.')
+    parser.add_argument('--folded', default=None, help='Also write the folded stacks to this path.')
+    args = parser.parse_args()
+
+    sample_period, nodes = load_profile(args.profile)
+    if sample_period > 1:
+        print(f"Sampled one out of every {sample_period} cycles, times are extrapolated.")
+    print_table(rank(nodes, args.sort + '_ns'), args.top)
+    if args.folded is not None:
+        write_folded(nodes, args.folded)
@@ -0,0 +1,55 @@
+# Usage: python3 queue_worker.py work queue [-j slots] [--ramulator path] [--cwd dir] [--lease 60] [--idle_timeout s]
+#        python3 queue_worker.py broker queue_dir --listen unix:<path>|tcp:<host>:<port> [--lease 60]
+#        python3 queue_worker.py status queue
+# Encoded in UTF-8
+#
+# Workers and broker of the work queue that sweeps publish their simulations on with `--backend queue --queue <queue>`
+# (see rh_study/work_queue.py). The queue is a directory shared by all hosts, or the address of a broker serving a
+# directory of its own host to the hosts that do not share it. Start any number of workers, on any hosts that see the
+# traces and configs at the same paths as the submitter.
+
+import os
+import sys
+import signal
+import argparse
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "rh_study"))
+import work_queue
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the simulations of a work queue.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    work = subparsers.add_parser('work', help='Claim and run jobs of the queue.')
+    work.add_argument('queue', help='Shared directory or broker address (unix:<path>, tcp:<host>:<port>) of the queue.')
+    work.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Maximum number of simulations running at the same time.')
+    work.add_argument('--ramulator', default=None, help='Ramulator 2.0 executable on this host (default: the one of the submitted commands).')
+    work.add_argument('--cwd', default=None, help='Directory the simulations run in (default: the working directory of the submitter).')
+    work.add_argument('--name', default=None, help='Unique name of the worker (default: <host>-<pid>).')
+    work.add_argument('--lease', type=float, default=60.0, help='Seconds a claim stays valid without a renewal (shared directory only).')
+    work.add_argument('--poll_interval', type=float, default=2.0, help='Seconds between checks of the queue and of the running jobs.')
+    work.add_argument('--idle_timeout', type=float, default=None, help='Exit after this many seconds without a job (default: never).')
+
+    broker = subparsers.add_parser('broker', help='Serve a queue directory on a socket.')
+    broker.add_argument('queue', help='Directory of the queue.')
+    broker.add_argument('--listen', required=True, help='Address to serve the queue on (unix:<path> or tcp:<host>:<port>).')
+    broker.add_argument('--lease', type=float, default=60.0, help='Seconds a claim stays valid without a renewal.')
+
+    status = subparsers.add_parser('status', help='Print the pending, claimed and done jobs of the queue.')
+    status.add_argument('queue', help='Shared directory or broker address of the queue.')
+
+    args = parser.parse_args()
+    if args.command == 'broker':
+        work_queue.serve(args.listen, work_queue.DirectoryQueue(args.queue, args.lease))
+    elif args.command == 'status':
+        print(yaml.dump(work_queue.open_queue(args.queue).status(), sort_keys=False), end='')
+    else:
+        # Release the claimed jobs when stopped (e.g., by the scheduler of the host), instead of waiting for their leases to expire
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            work_queue.work(work_queue.open_queue(args.queue, args.lease), worker=args.name, slots=args.jobs, ramulator=args.ramulator,
+                            cwd=args.cwd, poll_interval=args.poll_interval, idle_timeout=args.idle_timeout)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,81 @@
+# Usage: python3 ramulator_client.py -s socket (-f config_yaml [-p KEY=VALUE ...] | -c dumped_config | --status | --shutdown)
+# Encoded in UTF-8
+#
+# Thin client of the Ramulator 2.0 daemon (`ramulator2 --daemon <socket>`). Takes the same configuration arguments as
+# ramulator2 and prints what ramulator2 would have printed, so it can replace the executable in existing scripts.
+
+import os
+import sys
+import socket
+import argparse
+import yaml
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+
+def request(socket_path, message):
+    """
+    Send one request to the daemon and wait for its reply.
+
+    :param message: Request dict (see src/daemon.h).
+    :return: Reply dict.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(yaml.dump(message).encode())
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return yaml.load(b"".join(chunks), Loader=_YAML_LOADER)
+
+
+def submit(socket_path, config=None, config_file=None, params=None):
+    """
+    Run one simulation on the daemon.
+
+    :param config: Configuration as a dict or a dumped YAML string.
+    :param config_file: Path to a configuration file, with `params` (KEY=VALUE strings) overriding its values.
+    :return: Reply dict with `output` (the text ramulator2 prints), `stats` (the per-component records also written
+             to `stats_path`, usable with stats_loader) and `elapsed_s`.
+    """
+    if config_file is not None:
+        message = {'config_file': os.path.abspath(config_file), 'params': list(params or [])}
+    elif config is not None:
+        message = {'config': config if isinstance(config, str) else yaml.dump(config)}
+    else:
+        raise ValueError("Either config or config_file is required.")
+    message['cwd'] = os.getcwd()
+
+    reply = request(socket_path, message)
+    if reply.get('status') != 'ok':
+        raise RuntimeError(f"Simulation failed: {reply.get('message')}")
+    return reply
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Submit a simulation to the Ramulator 2.0 daemon.")
+    parser.add_argument('-s', '--socket', required=True, help='Socket of the daemon.')
+    parser.add_argument('-f', '--config_file', required=False, help='Path to a YAML configuration file.', default=None)
+    parser.add_argument('-c', '--config', required=False, help='String dump of the YAML configuration.', default=None)
+    parser.add_argument('-p', '--param', required=False, action='append', help='KEY=VALUE override of the configuration file.', default=[])
+    parser.add_argument('--status', action='store_true', help='Print the queue and trace cache state of the daemon.')
+    parser.add_argument('--shutdown', action='store_true', help='Stop the daemon once its queued jobs are done.')
+    args = parser.parse_args()
+
+    if args.status or args.shutdown:
+        print(yaml.dump(request(args.socket, {'command': 'shutdown' if args.shutdown else 'status'}), sort_keys=False), end='')
+        sys.exit(0)
+
+    try:
+        reply = submit(args.socket, config=args.config, config_file=args.config_file, params=args.param)
+    except (RuntimeError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(reply['output'], end='')
@@ -0,0 +1,261 @@
+# Usage: python3 aggregate_results.py [-s ./results_singlecore] [-m ./results_multicore] [-o ./aggregated] [-j 8]
+# Encoded in UTF-8
+
+import os, re, sys, json, argparse
+import concurrent.futures
+import numpy as np
+import pandas as pd
+import yaml
+
+from trace_combinations import load_trace_combinations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from stats_loader import load_stats, frontend_stats, command_counts
+
+STAT_PATTERN = re.compile(r"^\s*(num_expected_insts|cycles_recorded_core_(\d+)):\s*(\d+)", re.MULTILINE)
+CYCLES_STAT = re.compile(r"^cycles_recorded_core_(\d+)$")
+CMD_COUNT_PATTERN = re.compile(r"^(\S+)\s*:\s*(\d+)", re.MULTILINE)
+BASELINE_MITIGATION = "NoDefence"
+
+
+def stats_filename(result_filename):
+    """ Stats file (`stats_path`) written next to the simulator output of a run. """
+    return os.path.splitext(result_filename)[0] + ".yaml"
+
+
+def load_stats_file(filename):
+    """
+    :return: The records of the stats file (see stats_loader), None if it is missing or incomplete.
+    """
+    if not os.path.exists(filename):
+        return None
+    try:
+        records = load_stats(filename)
+        frontend_stats(records)
+    except (yaml.YAMLError, KeyError, AttributeError):
+        return None
+    return records
+
+
+def parse_result_file(result_filename, cmd_count_filename):
+    """
+    Parse the stats of one run and its CommandCounter file. The stats come from the stats file of the run, or from
+    the simulator output if the run has no (complete) stats file.
+
+    :return: Dict with `num_expected_insts`, `cycles` (per core, None if missing) and `commands` (name -> count).
+    """
+    records = load_stats_file(stats_filename(result_filename))
+    num_insts = None
+    cycles = {}
+    if records is not None:
+        for stat, value in frontend_stats(records).items():
+            match = CYCLES_STAT.match(stat)
+            if stat == 'num_expected_insts':
+                num_insts = int(value)
+            elif match:
+                cycles[int(match.group(1))] = int(value)
+    else:
+        with open(result_filename, 'r') as result_file:
+            text = result_file.read()
+        for match in STAT_PATTERN.finditer(text):
+            if match.group(2) is None:
+                num_insts = int(match.group(3))
+            else:
+                cycles[int(match.group(2))] = int(match.group(3))
+
+    commands = {}
+    if os.path.exists(cmd_count_filename):
+        with open(cmd_count_filename, 'r') as cmd_count_file:
+            commands = {cmd: int(count) for cmd, count in CMD_COUNT_PATTERN.findall(cmd_count_file.read())}
+    elif records is not None:
+        commands = command_counts(records)
+
+    return {
+        'num_expected_insts': num_insts,
+        'cycles': [cycles[core] for core in sorted(cycles)],
+        'commands': commands,
+    }
+
+
+def list_runs(out_path):
+    """
+    Find the runs of a results directory (`<out_path>/<mitigation>/stats/<tRH>_<trace>.txt`).
+
+    :return: List of (mitigation, tRH, trace, result_filename, cmd_count_filename).
+    """
+    runs = []
+    if not os.path.isdir(out_path):
+        return runs
+    for mitigation in sorted(os.listdir(out_path)):
+        stats_path = os.path.join(out_path, mitigation, "stats")
+        if not os.path.isdir(stats_path):
+            continue
+        for filename in sorted(os.listdir(stats_path)):
+            if not filename.endswith(".txt"):
+                continue
+            trh, _, trace = filename[:-len(".txt")].partition("_")
+            cmd_count_filename = os.path.join(out_path, mitigation, "cmd_count", f"{trh}_{trace}.cmd.count")
+            runs.append((mitigation, int(trh), trace, os.path.join(stats_path, filename), cmd_count_filename))
+    return runs
+
+
+def file_key(filename):
+    if not os.path.exists(filename):
+        return None
+    stat = os.stat(filename)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ResultCache:
+    """
+    Parsed runs keyed by result file, invalidated when the result, the stats or the command count file changes
+    (modification time or size). Only new or changed runs are parsed again.
+    """
+    def __init__(self, cache_filename):
+        self.cache_filename = cache_filename
+        self.entries = {}
+        if os.path.exists(cache_filename):
+            with open(cache_filename, 'r') as cache_file:
+                self.entries = json.load(cache_file)
+
+    def load(self, runs, num_workers=None):
+        """
+        :return: Dict of result filename -> parsed run (see `parse_result_file`).
+        """
+        keys = {run[3]: [file_key(run[3]), file_key(run[4]), file_key(stats_filename(run[3]))] for run in runs}
+        stale = [run for run in runs if self.entries.get(run[3], {}).get('key') != keys[run[3]]]
+
+        if stale:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+                parsed = executor.map(parse_result_file, [run[3] for run in stale], [run[4] for run in stale], chunksize=16)
+                for run, result in zip(stale, parsed):
+                    self.entries[run[3]] = {'key': keys[run[3]], 'result': result}
+
+        print(f"Parsed {len(stale)} of {len(runs)} result files ({len(runs) - len(stale)} cached).")
+        return {run[3]: self.entries[run[3]]['result'] for run in runs}
+
+    def save(self):
+        tmp_filename = self.cache_filename + ".tmp"
+        with open(tmp_filename, 'w') as cache_file:
+            json.dump(self.entries, cache_file)
+        os.replace(tmp_filename, self.cache_filename)
+
+
+def alone_ipcs(singlecore_runs, parsed):
+    """
+    IPC of every trace running alone without mitigation. NoDefence does not depend on tRH, so the
+    first complete run of each trace is used.
+    """
+    ipc_alone = {}
+    for mitigation, trh, trace, result_filename, _ in singlecore_runs:
+        result = parsed[result_filename]
+        if mitigation != BASELINE_MITIGATION or trace in ipc_alone or not result['cycles'] or result['cycles'][0] == 0:
+            continue
+        ipc_alone[trace] = result['num_expected_insts'] / result['cycles'][0]
+    return ipc_alone
+
+
+def multicore_metrics(multicore_runs, parsed, ipc_alone, trace_combs):
+    """
+    Weighted speedup, harmonic speedup and maximum slowdown of every multicore run.
+
+    :return: DataFrame with columns [mitigation, trh, workload, ws, hs, max_slowdown, <commands>...].
+    """
+    rows = []
+    for mitigation, trh, workload, result_filename, _ in multicore_runs:
+        result = parsed[result_filename]
+        traces = trace_combs.get(workload)
+        if traces is None:
+            print(f"Warning: Unknown workload {workload} ({result_filename})")
+            continue
+        if len(result['cycles']) != len(traces) or 0 in result['cycles'] or result['num_expected_insts'] is None:
+            print(f"Warning: Incomplete result {result_filename}")
+            continue
+        missing = [trace for trace in traces if trace not in ipc_alone]
+        if missing:
+            print(f"Warning: No single-core baseline for {', '.join(missing)} ({result_filename})")
+            continue
+
+        ipc_shared = np.array([result['num_expected_insts'] / cycles for cycles in result['cycles']])
+        slowdown = np.array([ipc_alone[trace] for trace in traces]) / ipc_shared
+        row = {
+            'mitigation': mitigation,
+            'trh': trh,
+            'workload': workload,
+            'ws': np.sum(1 / slowdown),
+            'hs': len(traces) / np.sum(slowdown),
+            'max_slowdown': np.max(slowdown),
+        }
+        row.update(result['commands'])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def normalize(df):
+    """ Add the metrics normalized to NoDefence for the same tRH and workload. """
+    metrics = ['ws', 'hs', 'max_slowdown']
+    baseline = df[df['mitigation'] == BASELINE_MITIGATION].set_index(['trh', 'workload'])[metrics]
+    joined = df.join(baseline, on=['trh', 'workload'], rsuffix='_baseline')
+    for metric in metrics:
+        df['norm_' + metric] = joined[metric] / joined[metric + '_baseline']
+    return df
+
+
+def plot_summary(df, out_filename):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    metrics = [('norm_ws', "Normalized WS"), ('norm_hs', "Normalized HS"), ('norm_max_slowdown', "Normalized Max. Slowdown")]
+    summary = df.groupby(['mitigation', 'trh'])[[metric for metric, _ in metrics]].agg(['mean', 'std'])
+
+    fig, axes = plt.subplots(1, len(metrics), figsize=(6 * len(metrics), 4.5))
+    for ax, (metric, label) in zip(axes, metrics):
+        for mitigation in summary.index.get_level_values('mitigation').unique():
+            if mitigation == BASELINE_MITIGATION:
+                continue
+            data = summary.loc[mitigation]
+            ax.errorbar(data.index, data[(metric, 'mean')], yerr=data[(metric, 'std')], label=mitigation,
+                        marker='o', linewidth=2, capsize=4)
+        ax.axhline(y=1.0, color='red', linestyle='--', zorder=0)
+        ax.set_xscale('log')
+        ax.invert_xaxis()
+        ax.grid(axis='both', linestyle='--')
+        ax.set_xlabel("RowHammer Threshold (tRH)")
+        ax.set_ylabel(label)
+    axes[0].legend(loc='lower left')
+    fig.tight_layout()
+    fig.savefig(out_filename)
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate the results of the RowHammer mitigation study.")
+
+    parser.add_argument('-s', '--singlecore', required=False, help='Single-core results directory.', default='./results_singlecore')
+    parser.add_argument('-m', '--multicore', required=False, help='Multi-core results directory.', default='./results_multicore')
+    parser.add_argument('-t', '--trace_combinations', required=False, help='Workload file.', default='multicore_traces.txt')
+    parser.add_argument('-o', '--output', required=False, help='Output directory.', default='./aggregated')
+    parser.add_argument('-j', '--jobs', required=False, type=int, help='Number of parser processes.', default=None)
+
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    cache = ResultCache(os.path.join(args.output, "parse_cache.json"))
+
+    singlecore_runs = list_runs(args.singlecore)
+    multicore_runs = list_runs(args.multicore)
+    parsed = cache.load(singlecore_runs + multicore_runs, args.jobs)
+    cache.save()
+
+    ipc_alone = alone_ipcs(singlecore_runs, parsed)
+    df = multicore_metrics(multicore_runs, parsed, ipc_alone, load_trace_combinations(args.trace_combinations))
+    if df.empty:
+        print("No complete multicore results.")
+        exit(0)
+    df = normalize(df).sort_values(['mitigation', 'trh', 'workload'])
+
+    table_filename = os.path.join(args.output, "rh_results.csv")
+    df.to_csv(table_filename, index=False)
+    print(df.groupby(['mitigation', 'trh'])[['norm_ws', 'norm_hs', 'norm_max_slowdown']].mean().to_string())
+    plot_summary(df, os.path.join(args.output, "rh_summary.pdf"))
+    print(f"Results written to {table_filename}")
@@ -0,0 +1,169 @@
+import os, sys, json, time, subprocess
+import yaml
+import work_queue
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+
+class Job:
+    """
+    One simulation run.
+
+    :param name: Unique name of the job, used as the key of the job state file.
+    :param cmd: Command as an argument list.
+    :param log_filename: File that receives stdout and stderr of the command.
+    :param stats_filename: Stats file written by ramulator2 (`stats_path`). The job is complete once it holds the memory system stats.
+    """
+    def __init__(self, name, cmd, log_filename, stats_filename):
+        self.name = name
+        self.cmd = cmd
+        self.log_filename = log_filename
+        self.stats_filename = stats_filename
+
+    def is_complete(self):
+        if not os.path.exists(self.stats_filename):
+            return False
+        try:
+            with open(self.stats_filename, 'r') as stats_file:
+                records = yaml.load(stats_file, Loader=_YAML_LOADER)
+        except yaml.YAMLError:
+            return False
+        return isinstance(records, dict) and 'MemorySystem' in records
+
+
+class JobQueue:
+    """
+    Runs jobs with at most `max_jobs` of them in flight.
+
+    The state of every job (pending, running, done, failed), its number of attempts, last exit code and
+    wall time are kept in `state_filename`, so an interrupted study can simply be started again: jobs whose stats
+    file is complete are skipped, everything else is (re)run. A job that exits with an error or does not
+    leave a complete stats file is retried up to `max_retries` times.
+
+    :param backend: "local" runs the commands as local processes, "slurm" wraps every command in `srun`
+                    (which blocks until the allocation finishes, so the cap also applies to the cluster),
+                    "daemon" submits the simulations to a running `ramulator2 --daemon <daemon_socket>` through
+                    ramulator_client.py, which takes the same arguments as the executable, "queue" publishes them
+                    on the work queue at `queue` (a shared directory or a broker, see work_queue.py), where
+                    queue_worker.py processes on any host run them and push their results back.
+    """
+    BACKENDS = ["local", "slurm", "daemon", "queue"]
+    CLIENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ramulator_client.py")
+
+    def __init__(self, state_filename, max_jobs=None, backend="local", max_retries=2, srun_args=None, poll_interval=1.0, daemon_socket=None, queue=None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {self.BACKENDS}")
+        if backend == "daemon" and daemon_socket is None:
+            raise ValueError("The daemon backend needs the socket of the daemon")
+        if backend == "queue" and queue is None:
+            raise ValueError("The queue backend needs the directory or broker address of the work queue")
+        self.state_filename = state_filename
+        self.max_jobs = max_jobs or os.cpu_count()
+        self.backend = backend
+        self.max_retries = max_retries
+        self.srun_args = srun_args or []
+        self.daemon_socket = daemon_socket
+        self.work_queue = work_queue.open_queue(queue) if backend == "queue" else None
+        self.poll_interval = poll_interval
+        self.state = self.load_state()
+
+    def load_state(self):
+        if not os.path.exists(self.state_filename):
+            return {}
+        with open(self.state_filename, 'r') as state_file:
+            return json.load(state_file)
+
+    def save_state(self):
+        tmp_filename = self.state_filename + ".tmp"
+        with open(tmp_filename, 'w') as state_file:
+            json.dump(self.state, state_file, indent=1, sort_keys=True)
+        os.replace(tmp_filename, self.state_filename)
+
+    def set_state(self, job, status, returncode=None, elapsed=None):
+        entry = self.state.setdefault(job.name, {'attempts': 0})
+        entry['status'] = status
+        if status == "running":
+            entry['attempts'] += 1
+            entry['start_time'] = time.time()
+        elif status == "done" and returncode is not None:
+            # Wall time of the last attempt (measured by the worker, else up to the poll interval late)
+            entry['elapsed'] = elapsed if elapsed is not None else time.time() - entry['start_time']
+        if returncode is not None:
+            entry['returncode'] = returncode
+        self.save_state()
+
+    def launch(self, job):
+        if self.backend == "queue":
+            process = work_queue.RemoteJob(self.work_queue, job)
+            self.set_state(job, "running")
+            return process
+        cmd = job.cmd
+        if self.backend == "slurm":
+            cmd = ["srun"] + self.srun_args + cmd
+        elif self.backend == "daemon":
+            cmd = [sys.executable, self.CLIENT, "-s", self.daemon_socket] + cmd[1:]
+        log_file = open(job.log_filename, 'w')
+        process = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT)
+        log_file.close()
+        self.set_state(job, "running")
+        return process
+
+    def run(self, jobs):
+        """
+        Run all jobs to completion.
+
+        :param jobs: Iterable of jobs (e.g., a generator), consumed before the first job is launched.
+        :return: Names of the jobs that still failed after all retries.
+        """
+        pending = []
+        num_jobs = 0
+        for job in jobs:
+            num_jobs += 1
+            if job.is_complete():
+                self.set_state(job, "done")
+            else:
+                # Forget the attempts of an earlier session so that a restart retries failed jobs again
+                self.state[job.name] = {'attempts': 0, 'status': "pending"}
+                pending.append(job)
+        self.save_state()
+        print(f"{num_jobs - len(pending)} of {num_jobs} jobs already complete, running {len(pending)} with {self.max_jobs} at a time.")
+
+        failed = []
+        running = {}
+        while pending or running:
+            while pending and len(running) < self.max_jobs:
+                job = pending.pop(0)
+                running[job.name] = (job, self.launch(job))
+
+            time.sleep(self.poll_interval)
+            for name, (job, process) in list(running.items()):
+                returncode = process.poll()
+                if returncode is None:
+                    continue
+                del running[name]
+                if returncode == 0 and job.is_complete():
+                    self.set_state(job, "done", returncode, getattr(process, 'elapsed', None))
+                    print(f"Done: {name}")
+                elif self.state[name]['attempts'] <= self.max_retries:
+                    self.set_state(job, "pending", returncode)
+                    pending.append(job)
+                    print(f"Retrying: {name} (exit code {returncode})")
+                else:
+                    self.set_state(job, "failed", returncode)
+                    failed.append(name)
+                    print(f"Failed: {name} (exit code {returncode}), see {job.log_filename}")
+
+        print(f"Finished: {num_jobs - len(failed)} done, {len(failed)} failed.")
+        return failed
+
+
+def add_queue_arguments(parser):
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Maximum number of simulations running at the same time.')
+    parser.add_argument('--backend', choices=JobQueue.BACKENDS, default='local', help='Run the simulations locally, through srun, on a ramulator2 daemon or on the workers of a work queue.')
+    parser.add_argument('--retries', type=int, default=2, help='Number of times a failed simulation is rerun.')
+    parser.add_argument('--srun_args', default='', help='Extra arguments passed to srun (slurm backend only).')
+    parser.add_argument('--daemon_socket', default=None, help='Socket of the ramulator2 daemon (daemon backend only).')
+    parser.add_argument('--queue', default=None, help='Shared directory or broker address (unix:<path>, tcp:<host>:<port>) of the work queue (queue backend only).')
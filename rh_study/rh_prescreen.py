@@ -0,0 +1,266 @@
+# Usage: python3 rh_prescreen.py -i issue_log_ch0.log [-t 5000 2000 1000 500 200 100] [-m PARA Graphene ...] [-o prescreen.csv]
+# Encoded in UTF-8
+#
+# Estimates how often each RowHammer mitigation would act on a DRAM command trace (TraceRecorder log)
+# without simulating it. The per-row activation counts of every refresh window (of every refresh interval
+# for TWiCe, which prunes its table at every refresh) are replayed against each mitigation's thresholds
+# and table sizes from calc_rh_parameters.py. The estimates ignore the
+# feedback of the mitigation on the schedule (the trace is the one of the unprotected system), so
+# they are meant to rank (mitigation, tRH) points, not to replace the simulation.
+
+import argparse
+import numpy as np
+import pandas as pd
+from calc_rh_parameters import get_rh_parameters
+
+MITIGATIONS = ["PARA", "Hydra", "TWiCe-Ideal", "Graphene", "OracleRH", "RRS"]
+DEFAULT_CHUNK_SIZE = 1 << 20
+tREFW_ns = 64000000
+tREFI_ns = 7800
+
+
+def read_activations(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read the ACT commands of a TraceRecorder log in chunks.
+
+    Both the current format (interval, clk, cmd, ch, ra, bg, ba, ro, co) and the
+    original Ramulator 2.0 format (clk, cmd, ch, ra, bg, ba, ro, co) are accepted.
+
+    :return: Iterator of DataFrames with columns [clk, rank, bankgroup, bank, row].
+    """
+    with open(file_path, 'r') as file:
+        num_fields = len(file.readline().split(','))
+    if num_fields == 9:
+        names = ['interval', 'clk', 'cmd', 'channel', 'rank', 'bankgroup', 'bank', 'row', 'column']
+    elif num_fields == 8:
+        names = ['clk', 'cmd', 'channel', 'rank', 'bankgroup', 'bank', 'row', 'column']
+    else:
+        raise ValueError(f"Unrecognized TraceRecorder format in {file_path}.")
+
+    reader = pd.read_csv(file_path, header=None, names=names, skipinitialspace=True, chunksize=chunk_size,
+                         usecols=['clk', 'cmd', 'rank', 'bankgroup', 'bank', 'row'], dtype={'cmd': str})
+    for chunk in reader:
+        yield chunk[chunk['cmd'] == 'ACT'].drop(columns='cmd')
+
+
+class ActivationCounts:
+    """
+    Activation count of every (refresh window, bank, row) that was activated at least once.
+
+    Counts are accumulated chunk by chunk, so only the distinct activated rows are held in memory.
+    """
+    ROW_BITS = 24
+    BANK_BITS = 12
+
+    def __init__(self, window_clk):
+        self.window_clk = window_clk
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.num_acts = 0
+        self.num_windows = 0
+        self.num_banks = 0
+
+    def add(self, acts):
+        if acts.empty:
+            return
+        clk = acts['clk'].to_numpy(np.int64)
+        # Flat bank id; bank groups and banks of DDR4/DDR5 fit into 3 bits each
+        bank = (acts['rank'].to_numpy(np.int64) << 6) | (acts['bankgroup'].to_numpy(np.int64) << 3) | acts['bank'].to_numpy(np.int64)
+        window = clk // self.window_clk
+        keys = (window << (self.BANK_BITS + self.ROW_BITS)) | (bank << self.ROW_BITS) | acts['row'].to_numpy(np.int64)
+
+        # Merge the counts of this chunk into the running counts
+        merged_keys = np.concatenate([self.keys, keys])
+        merged_counts = np.concatenate([self.counts, np.ones(len(keys), dtype=np.int64)])
+        self.keys, inverse = np.unique(merged_keys, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=merged_counts).astype(np.int64)
+
+        self.num_acts += len(acts)
+        self.num_windows = max(self.num_windows, int(window.max()) + 1)
+        self.num_banks = max(self.num_banks, len(np.unique(bank)))
+
+    def window(self):
+        return self.keys >> (self.BANK_BITS + self.ROW_BITS)
+
+    def bank(self):
+        return (self.keys >> self.ROW_BITS) & ((1 << self.BANK_BITS) - 1)
+
+    def row(self):
+        return self.keys & ((1 << self.ROW_BITS) - 1)
+
+    def rows_per_bank_window(self, weights=None):
+        """ Number (or weighted sum) of the activated rows of every (window, bank). """
+        _, inverse = np.unique(self.keys >> self.ROW_BITS, return_inverse=True)
+        return np.bincount(inverse, weights=weights)
+
+
+def replay_twice(intervals, rh_threshold, pruning_threshold):
+    """
+    Replay the TWiCe table of every bank (TWiCeIdeal in twice.cpp) on the activation counts per refresh interval.
+
+    A row gets an entry on its first activation, and the entry is removed with a VRR once its count reaches
+    `rh_threshold`. At every refresh, an entry whose count is below `life * pruning_threshold` is pruned, where `life`
+    is the number of refreshes it has survived; the others survive with one more life. Rows activated steadily below
+    the threshold therefore keep their entries for a while, so the occupancy depends on the pruning interval.
+
+    :param intervals: ActivationCounts with one window per refresh interval (tREFI).
+    :return: (number of VRRs, peak number of entries of a bank table at a refresh).
+    """
+    def survived(count, life, num_refreshes):
+        """ Number of the next refreshes that keep an entry, at most num_refreshes. """
+        if pruning_threshold <= 0:
+            return num_refreshes
+        # Largest life that keeps the entry, with the comparison of the plugin (count // threshold can be off by one)
+        max_life = int(count / pruning_threshold)
+        while (max_life + 1) * pruning_threshold <= count:
+            max_life += 1
+        while max_life * pruning_threshold > count:
+            max_life -= 1
+        return min(num_refreshes, max(0, max_life - life + 1))
+
+    interval, bank, row, acts = intervals.window(), intervals.bank(), intervals.row(), intervals.counts
+    order = np.lexsort((interval, row, bank))
+    num_vrrs = 0
+    # Refresh intervals at the end of which an entry is in its table: (bank, first, last)
+    lifetimes = []
+    current = None
+    for b, r, i, a in zip(bank[order].tolist(), row[order].tolist(), interval[order].tolist(), acts[order].tolist()):
+        if (b, r) != current:
+            if current is not None and alive:
+                lifetimes.append((current[0], start, last + survived(count, life, intervals.num_windows - 1 - last)))
+            current = (b, r)
+            alive, count, life, start, last = False, 0, 0, 0, 0
+        elif alive:
+            # The refreshes at the ends of the intervals last, ..., i - 1 prune the entry or extend its life
+            keep = survived(count, life, i - last)
+            if keep < i - last:
+                lifetimes.append((b, start, last + keep))
+                alive, count = False, 0
+            else:
+                life += i - last
+        num_vrrs += (count + a) // rh_threshold
+        if not alive or count + a >= rh_threshold:
+            # (Re)inserted in this interval
+            life = 0
+        count = (count + a) % rh_threshold
+        if count == 0:
+            if alive:
+                lifetimes.append((b, start, i - 1))
+            alive = False
+        elif not alive:
+            alive, start = True, i
+        last = i
+    if current is not None and alive:
+        lifetimes.append((current[0], start, last + survived(count, life, intervals.num_windows - 1 - last)))
+
+    if not lifetimes:
+        return num_vrrs, 0
+    # Every entry adds one to its bank from its first interval to its last: the running sum over the banks in order
+    # returns to zero at the end of every bank
+    lifetimes = np.array(lifetimes, dtype=np.int64)
+    banks = np.concatenate([lifetimes[:, 0], lifetimes[:, 0]])
+    times = np.concatenate([lifetimes[:, 1], lifetimes[:, 2] + 1])
+    deltas = np.concatenate([np.ones(len(lifetimes), dtype=np.int64), -np.ones(len(lifetimes), dtype=np.int64)])
+    occupancy = np.cumsum(deltas[np.lexsort((deltas, times, banks))])
+    return num_vrrs, int(occupancy.max())
+
+
+def estimate(counts, mitigation, tRH, intervals=None):
+    """
+    Estimate the preventive actions and table pressure of one mitigation at one tRH.
+
+    :param intervals: ActivationCounts per refresh interval, required for TWiCe-Ideal.
+
+    :return: Dict with `preventive_actions` (victim row refreshes, or row swaps for RRS), `table_entries`
+             (per bank, or per rank for Hydra's counter cache), `peak_table_demand` and `table_pressure`.
+    """
+    c = counts.counts
+    table_entries = np.nan
+    peak_demand = np.nan
+    if mitigation == "PARA":
+        threshold = get_rh_parameters(mitigation, tRH)
+        preventive = counts.num_acts * threshold
+    elif mitigation == "OracleRH":
+        preventive = np.sum(c // get_rh_parameters(mitigation, tRH))
+    elif mitigation == "Graphene":
+        num_table_entries, activation_threshold, _ = get_rh_parameters(mitigation, tRH)
+        # Counts in the table never underestimate the real ones, so this is a lower bound
+        preventive = np.sum(c // activation_threshold)
+        table_entries = num_table_entries
+        peak_demand = np.max(counts.rows_per_bank_window())
+    elif mitigation == "TWiCe-Ideal":
+        twice_rh_threshold, pruning_threshold = get_rh_parameters(mitigation, tRH)
+        # The table is never reset, only pruned at every refresh
+        preventive, peak_demand = replay_twice(intervals, twice_rh_threshold, pruning_threshold)
+    elif mitigation == "Hydra":
+        tracking_threshold, group_threshold, row_group_size, _, rcc_num_per_rank, _ = get_rh_parameters(mitigation, tRH)
+        # Rows are only tracked individually once their group has exceeded the group threshold. Like the group count
+        # table of hydra.cpp, the groups are per bank (the flat bank id includes the rank)
+        group_keys = (counts.window() << (counts.BANK_BITS + counts.ROW_BITS)) | (counts.bank() << counts.ROW_BITS) | (counts.row() // row_group_size)
+        groups, inverse = np.unique(group_keys, return_inverse=True)
+        group_counts = np.bincount(inverse, weights=c)
+        hot = group_counts[inverse] > group_threshold
+        preventive = np.sum(np.where(hot, c // tracking_threshold, 0))
+        # Row counters of hot groups compete for the counter cache of their rank
+        rank_keys = (counts.window() << 8) | (counts.bank() >> 6)
+        _, rank_inverse = np.unique(rank_keys, return_inverse=True)
+        table_entries = rcc_num_per_rank
+        peak_demand = np.max(np.bincount(rank_inverse, weights=hot.astype(np.float64)))
+    elif mitigation == "RRS":
+        num_hrt_entries, _, rss_threshold, _ = get_rh_parameters(mitigation, tRH)
+        preventive = np.sum(c // rss_threshold)
+        table_entries = num_hrt_entries
+        peak_demand = np.max(counts.rows_per_bank_window())
+    else:
+        raise ValueError(f"Unknown mitigation {mitigation}.")
+
+    return {
+        'mitigation': mitigation,
+        'trh': tRH,
+        'preventive_actions': float(preventive),
+        'preventive_per_kilo_act': 1000 * float(preventive) / max(counts.num_acts, 1),
+        'table_entries': table_entries,
+        'peak_table_demand': peak_demand,
+        'table_pressure': peak_demand / table_entries if table_entries == table_entries and table_entries > 0 else np.nan,
+    }
+
+
+def prescreen(trace_path, mitigations, trh_list, tck_ns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    :return: DataFrame with one row per (mitigation, tRH), see `estimate`.
+    """
+    counts = ActivationCounts(int(tREFW_ns / tck_ns))
+    # TWiCe prunes its table at every refresh, so it is replayed on the counts per refresh interval
+    intervals = ActivationCounts(int(round(tREFI_ns / tck_ns))) if "TWiCe-Ideal" in mitigations else None
+    for acts in read_activations(trace_path, chunk_size):
+        counts.add(acts)
+        if intervals is not None:
+            intervals.add(acts)
+
+    rows = [estimate(counts, mitigation, tRH, intervals) for mitigation in mitigations for tRH in trh_list]
+    df = pd.DataFrame(rows)
+    df['num_acts'] = counts.num_acts
+    df['max_row_acts_per_window'] = int(counts.counts.max()) if len(counts.counts) else 0
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Estimate the RowHammer mitigation overheads from a DRAM command trace.")
+
+    parser.add_argument('-i', '--input', required=True, help='TraceRecorder log of the unprotected system.')
+    parser.add_argument('-o', '--output', required=False, help='Output CSV file.', default=None)
+    parser.add_argument('-m', '--mitigations', required=False, nargs='+', help='Mitigations to estimate.', default=MITIGATIONS)
+    parser.add_argument('-t', '--trh', required=False, nargs='+', type=int, help='RowHammer thresholds.', default=[5000, 2000, 1000, 500, 200, 100])
+    parser.add_argument('--tck_ns', required=False, type=float, help='DRAM clock period in ns (DDR4-2400: 0.833).', default=0.833)
+    parser.add_argument('--max_preventive_per_kilo_act', required=False, type=float, default=None,
+                        help='Flag the points with more preventive actions per 1000 ACTs as not worth simulating.')
+    parser.add_argument('--chunk_size', required=False, type=int, help='Number of trace lines read at once.', default=DEFAULT_CHUNK_SIZE)
+
+    args = parser.parse_args()
+
+    df = prescreen(args.input, args.mitigations, args.trh, args.tck_ns, args.chunk_size)
+    if args.max_preventive_per_kilo_act is not None:
+        df['simulate'] = df['preventive_per_kilo_act'] <= args.max_preventive_per_kilo_act
+    print(df.to_string(index=False))
+    if args.output is not None:
+        df.to_csv(args.output, index=False)
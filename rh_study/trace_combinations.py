@@ -0,0 +1,41 @@
+# Encoded in UTF-8
+#
+# Workloads of the RowHammer study, read from the trace combination file written by get_trace_combinations.py
+# (one "<workload>,<trace>,<trace>,..." line per multicore workload). Used by the sweep specs of the study.
+
+import os
+
+
+def load_trace_combinations(trace_combination_filename):
+    """
+    :return: Dict of workload name -> list of trace names, in the order of the file.
+    """
+    trace_combs = {}
+    with open(trace_combination_filename, 'r') as trace_combination_file:
+        for line in trace_combination_file:
+            line = line.strip()
+            if line == "":
+                continue
+            trace_combs[line.split(",")[0]] = line.split(",")[1:]
+    return trace_combs
+
+
+def singlecore_traces(trace_combination_filename):
+    """
+    :return: Every trace that appears in a workload, once, sorted by name.
+    """
+    return sorted({trace for traces in load_trace_combinations(trace_combination_filename).values() for trace in traces})
+
+
+def multicore_workloads(trace_combination_filename):
+    """
+    :return: Workload names, in the order of the file.
+    """
+    return list(load_trace_combinations(trace_combination_filename))
+
+
+def workload_traces(trace_combination_filename, workload, trace_path):
+    """
+    :return: Paths to the traces of one workload.
+    """
+    return [os.path.join(trace_path, trace) for trace in load_trace_combinations(trace_combination_filename)[workload]]
@@ -0,0 +1,392 @@
+import os, json, time, uuid, socket, hashlib, tempfile, socketserver, subprocess
+import yaml
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+
+class DirectoryQueue:
+    """
+    Work queue in a directory shared by the submitter and the workers (e.g., on NFS), with no service running.
+
+    A job is a JSON file that moves between the subdirectories by atomic renames:
+      pending/<id>.json             published, waiting for a worker
+      claimed/<id>@<worker>.json    claimed by a worker and leased to it until `lease_time` seconds after the file was last
+                                    touched; the worker touches it while the job runs
+      done/<id>.json                result pushed back by the worker, consumed by the submitter
+    Whoever renames a pending file first owns the job. A lease that is not renewed in time (the worker died, or lost the
+    directory) is expired by the next claim that finds nothing pending or by the submitter polling for results, and its job
+    goes back to pending. Leases are checked against the clock of the file system (the mtime of a freshly touched file),
+    so the clocks of the hosts need not agree.
+
+    :param lease_time: Seconds a claim stays valid without a renewal.
+    """
+    SUBDIRS = ["pending", "claimed", "done"]
+
+    def __init__(self, path, lease_time=60.0):
+        self.path = self.address = path
+        self.lease_time = lease_time
+        self.last_expiry = 0
+        for subdir in self.SUBDIRS:
+            os.makedirs(os.path.join(path, subdir), exist_ok=True)
+
+    def filename(self, subdir, name):
+        return os.path.join(self.path, subdir, name)
+
+    def write(self, filename, data):
+        tmp_filename = f"{filename}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_filename, 'w') as file:
+            json.dump(data, file)
+        os.replace(tmp_filename, filename)
+
+    def read(self, filename):
+        with open(filename, 'r') as file:
+            return json.load(file)
+
+    def claims(self):
+        """ :return: Dict of job id -> (worker, filename) of the claimed jobs. """
+        claims = {}
+        for name in os.listdir(os.path.join(self.path, "claimed")):
+            if name.endswith(".json"):
+                job_id, _, worker = name[:-len(".json")].partition("@")
+                claims[job_id] = (worker, self.filename("claimed", name))
+        return claims
+
+    def fs_now(self):
+        clock_filename = os.path.join(self.path, ".clock")
+        with open(clock_filename, 'a'):
+            pass
+        os.utime(clock_filename)
+        return os.stat(clock_filename).st_mtime
+
+    def publish(self, job_id, spec):
+        """
+        Publish a job, unless it is already pending, claimed or done (e.g., published by an earlier session of the
+        submitter): its result is then collected by the next call of result().
+        """
+        if any(os.path.exists(self.filename(subdir, f"{job_id}.json")) for subdir in ["pending", "done"]) or job_id in self.claims():
+            return
+        self.write(self.filename("pending", f"{job_id}.json"), dict(spec, id=job_id))
+
+    def claim(self, worker):
+        """ :return: Spec of a pending job, now leased to the worker, or None if nothing is pending. """
+        for name in sorted(os.listdir(os.path.join(self.path, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            claimed_filename = self.filename("claimed", f"{name[:-len('.json')]}@{worker}.json")
+            try:
+                os.rename(self.filename("pending", name), claimed_filename)
+            except FileNotFoundError:
+                continue
+            os.utime(claimed_filename)
+            return self.read(claimed_filename)
+        self.expire_leases()
+        return None
+
+    def renew(self, job_id, worker):
+        """ :return: False if the lease of the worker on the job expired (the job was requeued). """
+        try:
+            os.utime(self.filename("claimed", f"{job_id}@{worker}.json"))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def release(self, job_id, worker):
+        """ Give a claimed job back to the queue without a result. """
+        try:
+            os.rename(self.filename("claimed", f"{job_id}@{worker}.json"), self.filename("pending", f"{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, job_id, worker, result):
+        """
+        Push the result of a claimed job back to the submitter. The claim is taken back first, by the same kind of rename
+        as expire_leases, so that a lease expiring meanwhile cannot both requeue the job and let its result through.
+
+        :return: False if the lease had expired (the job was requeued and the result is dropped).
+        """
+        claimed_filename = self.filename("claimed", f"{job_id}@{worker}.json")
+        try:
+            os.rename(claimed_filename, claimed_filename + ".completed")
+        except FileNotFoundError:
+            return False
+        self.write(self.filename("done", f"{job_id}.json"), result)
+        os.remove(claimed_filename + ".completed")
+        return True
+
+    def result(self, job_id):
+        """
+        Consume the result of a job. Expires the leases at most every quarter of the lease time, so the submitter
+        requeues the jobs of dead workers even when no other worker is idle.
+
+        :return: The result dict pushed by the worker, None if the job is not done yet.
+        """
+        if time.time() - self.last_expiry > self.lease_time / 4:
+            self.expire_leases()
+        done_filename = self.filename("done", f"{job_id}.json")
+        try:
+            result = self.read(done_filename)
+        except FileNotFoundError:
+            return None
+        os.remove(done_filename)
+        return result
+
+    def expire_leases(self):
+        """ Requeue the claimed jobs whose lease ran out. :return: Their ids. """
+        self.last_expiry = time.time()
+        now = self.fs_now()
+        expired = []
+        for job_id, (worker, claimed_filename) in self.claims().items():
+            try:
+                stat = os.stat(claimed_filename)
+                if max(stat.st_mtime, stat.st_ctime) + self.lease_time >= now:
+                    continue
+                # Only one of the processes expiring the lease at the same time wins the rename
+                os.rename(claimed_filename, claimed_filename + ".expired")
+            except FileNotFoundError:
+                continue
+            spec = self.read(claimed_filename + ".expired")
+            spec['expired_leases'] = spec.get('expired_leases', 0) + 1
+            self.write(self.filename("pending", f"{job_id}.json"), spec)
+            os.remove(claimed_filename + ".expired")
+            print(f"Lease of {spec['name']} on {worker} expired, requeued.")
+            expired.append(job_id)
+        return expired
+
+    def status(self):
+        """ :return: Dict with the number of pending and done jobs, and the claimed ones with their workers and lease ages. """
+        now = self.fs_now()
+        claimed = []
+        for job_id, (worker, claimed_filename) in sorted(self.claims().items()):
+            try:
+                stat = os.stat(claimed_filename)
+                spec = self.read(claimed_filename)
+            except FileNotFoundError:
+                continue
+            claimed.append({'id': job_id, 'name': spec['name'], 'worker': worker, 'lease_age': now - max(stat.st_mtime, stat.st_ctime)})
+        count = lambda subdir: sum(name.endswith(".json") for name in os.listdir(os.path.join(self.path, subdir)))
+        return {'pending': count("pending"), 'claimed': claimed, 'done': count("done")}
+
+
+def parse_address(address):
+    """ :return: (socket family, address) of a broker address "unix:<path>" or "tcp:<host>:<port>". """
+    kind, _, location = address.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, location
+    if kind == "tcp":
+        host, _, port = location.rpartition(":")
+        return socket.AF_INET, (host or "localhost", int(port))
+    raise ValueError(f"Unknown broker address {address}, expected unix:<path> or tcp:<host>:<port>")
+
+
+class BrokerQueue:
+    """
+    Client of a broker (see serve) that owns the work queue, for hosts that do not share its directory.
+    Has the methods of DirectoryQueue that the submitter and the workers use. Only the queue is served: the workers still
+    need the configs and traces of the jobs at the paths of the submitter (or under their `cwd`).
+    """
+    OPERATIONS = ["publish", "claim", "renew", "release", "complete", "result", "status"]
+
+    def __init__(self, address):
+        self.address = address
+        self.family, self.location = parse_address(address)
+
+    def call(self, operation, **args):
+        with socket.socket(self.family, socket.SOCK_STREAM) as sock:
+            sock.connect(self.location)
+            sock.sendall(json.dumps({'operation': operation, 'args': args}).encode())
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks))
+        if reply['status'] != "ok":
+            raise RuntimeError(f"Broker {self.address}: {reply['message']}")
+        return reply['value']
+
+    def publish(self, job_id, spec):
+        return self.call("publish", job_id=job_id, spec=spec)
+
+    def claim(self, worker):
+        return self.call("claim", worker=worker)
+
+    def renew(self, job_id, worker):
+        return self.call("renew", job_id=job_id, worker=worker)
+
+    def release(self, job_id, worker):
+        return self.call("release", job_id=job_id, worker=worker)
+
+    def complete(self, job_id, worker, result):
+        return self.call("complete", job_id=job_id, worker=worker, result=result)
+
+    def result(self, job_id):
+        return self.call("result", job_id=job_id)
+
+    def status(self):
+        return self.call("status")
+
+
+def serve(address, queue):
+    """
+    Serve a DirectoryQueue to BrokerQueue clients on a unix or TCP socket, until interrupted. Every connection carries one
+    JSON request ({"operation", "args"}) and its reply ({"status", "value"} or {"status", "message"}).
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                message = json.loads(self.rfile.read())
+                if message['operation'] not in BrokerQueue.OPERATIONS:
+                    raise ValueError(f"Unknown operation {message['operation']}")
+                reply = {'status': "ok", 'value': getattr(queue, message['operation'])(**message['args'])}
+            except Exception as e:
+                reply = {'status': "error", 'message': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode())
+
+    family, location = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(location):
+            os.remove(location)
+        server = socketserver.ThreadingUnixStreamServer(location, Handler)
+    else:
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer(location, Handler)
+    print(f"Serving the work queue in {queue.path} on {address}.")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    if family == socket.AF_UNIX and os.path.exists(location):
+        os.remove(location)
+
+
+def open_queue(address, lease_time=60.0):
+    """ :return: BrokerQueue for a broker address (unix:<path>, tcp:<host>:<port>), DirectoryQueue for a directory. """
+    if address.startswith(("unix:", "tcp:")):
+        return BrokerQueue(address)
+    return DirectoryQueue(address, lease_time)
+
+
+class RemoteJob:
+    """
+    A Job published on a work queue, polled like the subprocess.Popen of a local job. The log and, unless the stats file
+    is already complete (e.g., written by the worker to a shared directory), the stats pushed back by the worker are
+    written to the files of the job.
+    """
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job = job
+        self.returncode = None
+        self.elapsed = None
+        self.worker = None
+        spec = {'name': job.name, 'cmd': job.cmd, 'cwd': os.getcwd(), 'log_filename': job.log_filename, 'stats_filename': job.stats_filename}
+        self.id = hashlib.sha1(json.dumps([spec['name'], spec['cmd'], spec['cwd']]).encode()).hexdigest()[:20]
+        queue.publish(self.id, spec)
+
+    def poll(self):
+        if self.returncode is None:
+            result = self.queue.result(self.id)
+            if result is not None:
+                self.store(result)
+        return self.returncode
+
+    def store(self, result):
+        for filename in [self.job.log_filename, self.job.stats_filename]:
+            if os.path.dirname(filename):
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(self.job.log_filename, 'w') as log_file:
+            log_file.write(f"[{result['worker']}]\n{result['log']}")
+        if result['stats'] is not None and not self.job.is_complete():
+            with open(self.job.stats_filename, 'w') as stats_file:
+                yaml.dump(result['stats'], stats_file, sort_keys=False)
+        self.elapsed = result['elapsed']
+        self.worker = result['worker']
+        self.returncode = result['returncode']
+
+
+def work(queue, worker=None, slots=1, ramulator=None, cwd=None, poll_interval=2.0, idle_timeout=None):
+    """
+    Run the jobs of a work queue until interrupted (or idle for `idle_timeout` seconds): claim up to `slots` jobs at a time,
+    run their commands, renew their leases while they run and push back their exit codes, logs, stats and wall times.
+
+    :param worker: Unique name of the worker (default: <host>-<pid>).
+    :param ramulator: Executable replacing the first word of the commands (e.g., the path of ramulator2 on this host).
+    :param cwd: Directory the commands run in (default: the working directory of the submitter, the same path on every host).
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    running = {}
+    idle_since = time.time()
+    print(f"Worker {worker} running up to {slots} jobs of {queue.address}.")
+    try:
+        while True:
+            while len(running) < slots:
+                spec = queue.claim(worker)
+                if spec is None:
+                    break
+                running[spec['id']] = start(spec, ramulator, cwd)
+                print(f"Running: {spec['name']}")
+
+            for job_id, (spec, process, log_filename, start_time) in list(running.items()):
+                returncode = process.poll() if process is not None else 127
+                if returncode is None:
+                    if not queue.renew(job_id, worker):
+                        process.kill()
+                        process.wait()
+                        os.remove(log_filename)
+                        del running[job_id]
+                        print(f"Lost the lease of {spec['name']}, dropped it.")
+                    continue
+                del running[job_id]
+                if queue.complete(job_id, worker, result(spec, returncode, log_filename, time.time() - start_time, worker, cwd)):
+                    print(f"{'Done' if returncode == 0 else 'Failed'}: {spec['name']} (exit code {returncode})")
+                else:
+                    print(f"Lost the lease of {spec['name']} before pushing its result, dropped it.")
+
+            if running:
+                idle_since = time.time()
+            elif idle_timeout is not None and time.time() - idle_since > idle_timeout:
+                print(f"Idle for {idle_timeout} s, exiting.")
+                break
+            time.sleep(poll_interval)
+    finally:
+        for job_id, (spec, process, log_filename, start_time) in running.items():
+            if process is not None:
+                process.kill()
+                process.wait()
+            os.remove(log_filename)
+            queue.release(job_id, worker)
+            print(f"Released: {spec['name']}")
+
+
+def start(spec, ramulator=None, cwd=None):
+    """ :return: (spec, process, log filename, start time) of a claimed job, with no process if it could not be started. """
+    cmd = ([ramulator] + spec['cmd'][1:]) if ramulator else spec['cmd']
+    fd, log_filename = tempfile.mkstemp(prefix="ramulator_job_", suffix=".log")
+    with os.fdopen(fd, 'w') as log_file:
+        try:
+            process = subprocess.Popen(cmd, cwd=cwd or spec['cwd'], stdout=log_file, stderr=subprocess.STDOUT)
+        except OSError as e:
+            log_file.write(f"Cannot run {' '.join(cmd)} in {cwd or spec['cwd']} on {socket.gethostname()}: {e}\n")
+            process = None
+    return spec, process, log_filename, time.time()
+
+
+def result(spec, returncode, log_filename, elapsed, worker, cwd=None):
+    """ :return: Result dict of a finished job, with its log and the parsed records of its stats file (None if missing). """
+    with open(log_filename, 'r', errors='replace') as log_file:
+        log = log_file.read()
+    os.remove(log_filename)
+    stats = None
+    stats_filename = os.path.join(cwd or spec['cwd'], spec['stats_filename'])
+    if returncode == 0 and os.path.exists(stats_filename):
+        try:
+            with open(stats_filename, 'r') as stats_file:
+                stats = yaml.load(stats_file, Loader=_YAML_LOADER)
+        except yaml.YAMLError:
+            pass
+    return {'returncode': returncode, 'log': log, 'stats': stats, 'elapsed': elapsed, 'worker': worker}
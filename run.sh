@@ -4,7 +4,7 @@
 # Simulation config.
 config_file='ddr4.yaml'
 stdout_file='debug.log'
-cmd_cnt_file='cmd_cnt.log'
+stats_file=$(grep '^stats_path:' $config_file | sed -n 's/.*stats_path: *\(.*\)/\1/p')
 cmd_file='issue_log_ch0.log'
 latency_file=$(grep 'access_log:' $config_file | sed -n 's/.*access_log: *\(.*\)/\1/p')
 output_fig_dir='plot/'
@@ -17,8 +17,7 @@ echo "Trace : $trace_path"
 echo "Mapper: $mapping"
 echo "stdout redirected into $stdout_file"
 build/ramulator2 -f $config_file > $stdout_file
-grep -E 'total_num_read_requests|total_num_write_requests|memory_system_cycles' $stdout_file | sed 's/^[ \t]*//'
-cat $cmd_cnt_file
+python stats_loader.py -i $stats_file -c MemorySystem
 echo '---------- End Simulation -----------'
 
 # Post-simulation process.
@@ -18,6 +18,21 @@ class IAddrMapper {
      * 
      */
     virtual void apply(Request& req) = 0;   
+
+    /**
+     * @brief  Decodes a batch of physical addresses into their DRAM address vectors (e.g., all addresses of a trace)
+     * @details
+     * The default implementation applies the mapping to one request at a time. Mappers with a faster way to decode
+     * many addresses can override it.
+     * 
+     */
+    virtual void decode(const Addr_t* addrs, size_t num_addrs, AddrVec_t* addr_vecs) {
+      for (size_t i = 0; i < num_addrs; i++) {
+        Request req(addrs[i], Request::Type::Read);
+        apply(req);
+        addr_vecs[i] = req.addr_vec;
+      }
+    };
 };
 
 }       // namespace Ramulator
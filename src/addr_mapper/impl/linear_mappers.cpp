@@ -140,6 +140,16 @@ class CustomizedMapper final : public LinearMapperBase, public Implementation {
     std::vector<int> addr_map; // Control every bit belongs to which level.
     int addr_bits;
 
+    // Consecutive address bits that belong to the same level are also consecutive in that level's address,
+    // so the mapping is compiled into one mask and two shifts per such run of bits.
+    struct BitRun {
+      int level;
+      int src_offset;   // Lowest bit of the run in the physical address (after removing the transaction offset)
+      int dst_offset;   // Lowest bit of the run in the address of the level
+      Addr_t mask;
+    };
+    std::vector<BitRun> bit_runs;
+
   public:
     void init() override {
       mapping = param<std::string>("mapping").required();
@@ -235,16 +245,25 @@ class CustomizedMapper final : public LinearMapperBase, public Implementation {
           throw std::runtime_error("Address bit length is not compatible with DRAM devices.");
         }
       }
-    }
 
-    void apply(Request& req) override {
-      req.addr_vec.resize(m_num_levels, 0);
-      Addr_t addr = req.addr >> m_tx_offset;
-      for (int bit_idx = addr_bits-1; bit_idx >= 0; --bit_idx) {
+      // A level's bits keep their order, so the bit at position bit_idx lands above the lower bits of the same level
+      std::vector<int> level_bits(m_num_levels, 0);
+      bit_runs.clear();
+      for (int bit_idx = 0; bit_idx < addr_bits; ++bit_idx) {
         int level = addr_map[bit_idx];
-        req.addr_vec[level] = (req.addr_vec[level] << 1) | ((addr >> bit_idx) & 1);
+        if (!bit_runs.empty() && bit_runs.back().level == level) {
+          bit_runs.back().mask = (bit_runs.back().mask << 1) | 1;
+        } else {
+          bit_runs.push_back({level, bit_idx, level_bits[level], 1});
+        }
+        level_bits[level]++;
       }
+    }
+
+    void apply(Request& req) override {
+      decode_addr(req.addr, req.addr_vec);
 #ifdef TREMBLE
+      Addr_t addr = req.addr >> m_tx_offset;
       // Print detail info.
       std::bitset<28> addr_bit(addr);
       std::cout << "Addr: " << addr_bit << std::endl;
@@ -255,6 +274,22 @@ class CustomizedMapper final : public LinearMapperBase, public Implementation {
       }
 #endif
     }
+
+    void decode(const Addr_t* addrs, size_t num_addrs, AddrVec_t* addr_vecs) override {
+      for (size_t i = 0; i < num_addrs; i++) {
+        decode_addr(addrs[i], addr_vecs[i]);
+      }
+    }
+
+  private:
+    void decode_addr(Addr_t addr, AddrVec_t& addr_vec) const {
+      addr_vec.clear();
+      addr_vec.resize(m_num_levels, 0);
+      addr >>= m_tx_offset;
+      for (const auto& run : bit_runs) {
+        addr_vec[run.level] |= ((addr >> run.src_offset) & run.mask) << run.dst_offset;
+      }
+    }
 };
 
 }   // namespace Ramulator
\ No newline at end of file
@@ -191,11 +191,40 @@ class Implementation {
       emitter << YAML::Newline;
     };
 
+    /**
+     * @brief    Recursively collect the stats of myself and all my childs into flat per-component records
+     *
+     * @details
+     * Each component is keyed by its path in the component tree (e.g., "MemorySystem.Controller[Channel 0].ControllerPlugin[CommandCounter]").
+     * The id (or the implementation name if no id is given) disambiguates siblings of the same interface.
+     *
+     */
+    virtual void collect_stats(YAML::Node& records, const std::string& scope = "") {
+      std::string path = scope.empty() ? get_ifce_name() : fmt::format("{}.{}", scope, get_ifce_name());
+      if (m_parent != nullptr) {
+        path += fmt::format("[{}]", get_id() != "_default_id" ? get_id() : get_name());
+      }
+
+      YAML::Node record;
+      record["interface"] = get_ifce_name();
+      record["impl"] = get_name();
+      if (get_id() != "_default_id") {
+        record["id"] = get_id();
+      }
+      record["stats"] = m_stats.to_node();
+      records[path] = record;
+
+      for (auto child_impl : m_children) {
+        child_impl->collect_stats(records, path);
+      }
+    };
+
     std::string get_id() const { return m_id; };
     void set_id(std::string id) { m_id = id; };
 
     void set_parent(Implementation* parent) { m_parent = parent; };
     void add_child(Implementation* child) { m_children.push_back(child); };
+    void remove_child(Implementation* child) { std::erase(m_children, child); };
 
   private:
     template<class Interface_t>
@@ -289,6 +318,7 @@ class TopLevel {
       if (impl == nullptr) {
         throw ConfigurationError("Error converting a frontend interface to an implementation!");
       }
+      derived->m_components.clear();
       std::queue<Implementation*> queue;
       for (auto child : impl->m_children) {
         queue.push(child);
@@ -321,6 +351,18 @@ class TopLevel {
       throw ConfigurationError("Cannot get Interface {}", Ifce_t::get_name());
     }
 
+    template <class Ifce_t> 
+    std::vector<Ifce_t*> get_ifces() {
+      std::vector<Ifce_t*> targets;
+      for (auto component : m_components) {
+        Ifce_t* target = dynamic_cast<Ifce_t*>(component);
+        if (target != nullptr) {
+          targets.push_back(target);
+        }
+      }
+      return targets;
+    }
+
     template <class Impl_t> 
     Impl_t* get_impl(std::string desired_id = "") {
       for (auto component : m_components) {
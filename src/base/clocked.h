@@ -26,6 +26,22 @@ class Clocked {
       return m_clk;
     };
 
+    /**
+     * @brief    Returns how many of the upcoming ticks would only advance the clock (0 if unknown)
+     * 
+     * @details
+     * The simulation loop jumps over the cycles in which no component has anything to do (see skip_idle_cycles).
+     * Components that cannot tell conservatively return 0, which disables skipping while they are in the simulation.
+     * 
+     */
+    virtual Clk_t get_idle_ticks() { return 0; };
+
+    /**
+     * @brief    Advances the clock by num_ticks ticks, with num_ticks no larger than what get_idle_ticks() returned
+     * 
+     */
+    virtual void skip_ticks(Clk_t num_ticks) { m_clk += num_ticks; };
+
   public:
     Clocked() {};
 };
@@ -12,11 +12,10 @@ YAML::Node Config::parse_config_file(const std::string& path_str, const std::vec
     std::exit(-1);
   }
   
-  const fs::path curr_path(fs::current_path());
+  // Includes of the top-level file resolve against the working directory
   YAML::Node node = YAML::LoadFile(path);
-  Details::resolve_included_configs(node);
+  Details::resolve_included_configs(node, "");
   Details::override_configs(node, params);
-  fs::current_path(curr_path);
   return node;
 }
 
@@ -27,34 +26,32 @@ YAML::Node Config::Details::load_config_file(const std::string& path_str) {
     std::exit(-1);
   }
 
-  YAML::Node node = YAML::LoadFile(path);
-  fs::current_path(path.parent_path());
-  return node;
+  return YAML::LoadFile(path);
 }
 
 
-void Config::Details::resolve_included_configs(YAML::Node node) {
+void Config::Details::resolve_included_configs(YAML::Node node, const fs::path& base_dir) {
   switch (node.Type()) {
     case YAML::NodeType::Scalar: {
       if (node.Tag() == "!include") {
-        const fs::path curr_path = fs::current_path();
-        node = load_config_file(node.as<std::string>());
-        resolve_included_configs(node);
-        fs::current_path(curr_path);
+        // Nested includes resolve against the directory of the file that holds them
+        fs::path path = base_dir / node.as<std::string>();
+        node = load_config_file(path.string());
+        resolve_included_configs(node, path.parent_path());
       }
       break;
     }
 
     case YAML::NodeType::Sequence: {
       for (YAML::const_iterator it = node.begin(); it != node.end(); ++it) {
-        resolve_included_configs(*it);
+        resolve_included_configs(*it, base_dir);
       }
       break;
     }
     
     case YAML::NodeType::Map: {
       for (YAML::const_iterator it = node.begin(); it != node.end(); ++it) {
-        resolve_included_configs(it->second);
+        resolve_included_configs(it->second, base_dir);
       }
       break;
     }
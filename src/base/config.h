@@ -26,7 +26,7 @@ YAML::Node parse_config_file(const std::string& path, const std::vector<std::str
 namespace Details {
 
 /**
- * @brief    Load the YAML file and set the current path to the parent path of the file.
+ * @brief    Load the YAML file.
  * 
  * @param    path_str       Path to the yaml file.
  * @return   YAML::Node 
@@ -37,9 +37,9 @@ YAML::Node load_config_file(const std::string& path_str);
  * @brief    Traverse the YAML document to load any included YAML files.
  *
  * @param    node           The current root node.
- * @param    verbose        Whether to print every node during the traversal.
+ * @param    base_dir       Directory the relative paths of the includes resolve against (that of the file holding them).
  */
-void resolve_included_configs(YAML::Node node);
+void resolve_included_configs(YAML::Node node, const std::filesystem::path& base_dir);
 
 /**
  * @brief    Override the config (add if non-existent) in the YAML file with the command line options.
@@ -0,0 +1,78 @@
+#include "base/lockstep_pool.h"
+
+#include <algorithm>
+
+namespace Ramulator {
+
+namespace {
+
+// Spin this many times before yielding the core to other threads while waiting
+constexpr int num_spins_before_yield = 2048;
+
+template<typename Predicate>
+void wait_until(Predicate done) {
+  int num_spins = 0;
+  while (!done()) {
+    if (++num_spins >= num_spins_before_yield) {
+      std::this_thread::yield();
+    }
+  }
+}
+
+}        // namespace
+
+LockstepPool::LockstepPool(size_t num_threads, size_t num_jobs, std::function<void(size_t)> job):
+m_job(std::move(job)), m_num_jobs(num_jobs), m_num_threads(std::max<size_t>(1, std::min(num_threads, num_jobs))) {
+  m_errors.resize(m_num_threads);
+  for (size_t thread_id = 1; thread_id < m_num_threads; thread_id++) {
+    m_workers.emplace_back(&LockstepPool::work, this, thread_id);
+  }
+}
+
+LockstepPool::~LockstepPool() {
+  m_stop.store(true, std::memory_order_relaxed);
+  m_batch.fetch_add(1, std::memory_order_release);
+  for (auto& worker : m_workers) {
+    worker.join();
+  }
+}
+
+void LockstepPool::run() {
+  m_num_busy.store(m_num_threads - 1, std::memory_order_relaxed);
+  m_batch.fetch_add(1, std::memory_order_release);
+  run_jobs(0);
+  wait_until([this] { return m_num_busy.load(std::memory_order_acquire) == 0; });
+
+  for (auto& error : m_errors) {
+    if (error) {
+      std::exception_ptr e = error;
+      error = nullptr;
+      std::rethrow_exception(e);
+    }
+  }
+}
+
+void LockstepPool::work(size_t thread_id) {
+  uint64_t batch = 0;
+  while (true) {
+    wait_until([this, batch] { return m_batch.load(std::memory_order_acquire) != batch; });
+    batch = m_batch.load(std::memory_order_acquire);
+    if (m_stop.load(std::memory_order_relaxed)) {
+      return;
+    }
+    run_jobs(thread_id);
+    m_num_busy.fetch_sub(1, std::memory_order_acq_rel);
+  }
+}
+
+void LockstepPool::run_jobs(size_t thread_id) {
+  try {
+    for (size_t i = thread_id; i < m_num_jobs; i += m_num_threads) {
+      m_job(i);
+    }
+  } catch (...) {
+    m_errors[thread_id] = std::current_exception();
+  }
+}
+
+}        // namespace Ramulator
@@ -0,0 +1,53 @@
+#ifndef     RAMULATOR_BASE_LOCKSTEP_POOL_H
+#define     RAMULATOR_BASE_LOCKSTEP_POOL_H
+
+#include <atomic>
+#include <thread>
+#include <vector>
+#include <functional>
+#include <exception>
+
+namespace Ramulator {
+
+/**
+ * @brief    A pool of threads that runs the same batch of independent jobs over and over, in lock step
+ *
+ * @details
+ * Every run() calls job(i) once for each i in [0, num_jobs) and returns when all calls are done. Job i always runs on
+ * thread i % num_threads, the calling thread being thread 0, so a job keeps its data in the same core's cache.
+ * Batches are meant to be short and frequent (e.g., one simulated cycle of every channel). The workers therefore spin
+ * between batches instead of sleeping, and only yield their core when they wait for long.
+ * An exception thrown by a job is rethrown by run() once the batch is done.
+ *
+ */
+class LockstepPool {
+  private:
+    std::function<void(size_t)> m_job;
+    size_t m_num_jobs;
+    size_t m_num_threads;
+
+    std::vector<std::thread> m_workers;
+    std::atomic<uint64_t> m_batch = 0;      // Incremented to start a batch
+    std::atomic<size_t> m_num_busy = 0;     // Workers that have not finished the current batch
+    std::atomic<bool> m_stop = false;
+    std::vector<std::exception_ptr> m_errors;
+
+    void work(size_t thread_id);
+    void run_jobs(size_t thread_id);
+
+  public:
+    LockstepPool(size_t num_threads, size_t num_jobs, std::function<void(size_t)> job);
+    ~LockstepPool();
+
+    LockstepPool(const LockstepPool&) = delete;
+    LockstepPool& operator=(const LockstepPool&) = delete;
+
+    size_t get_num_threads() const { return m_num_threads; };
+
+    void run();
+};
+
+}        // namespace Ramulator
+
+
+#endif   // RAMULATOR_BASE_LOCKSTEP_POOL_H
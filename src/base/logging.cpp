@@ -1,10 +1,19 @@
+#include <mutex>
+
 #include "base/logging.h"
 
 
 namespace Ramulator {
 
 Logger_t Logging::create_logger(std::string name, std::string pattern) {
-  auto logger = spdlog::stdout_color_st("Ramulator::" + name);
+  // Simulations running one after another (or concurrently) in the same process share the logger of a component
+  static std::mutex registry_mutex;
+  std::lock_guard<std::mutex> lock(registry_mutex);
+  if (auto logger = spdlog::get("Ramulator::" + name)) {
+    return logger;
+  }
+
+  auto logger = spdlog::stdout_color_mt("Ramulator::" + name);
 
   if (!logger) {
     throw InitializationError("Error creating logger {}!", name);
@@ -0,0 +1,84 @@
+#include <fstream>
+#include <functional>
+
+#include <spdlog/spdlog.h>
+
+#include "base/base.h"
+#include "base/profiler.h"
+
+
+namespace Ramulator {
+
+bool Profiler::s_enabled = false;
+bool Profiler::s_active = false;
+uint64_t Profiler::s_sample_period = 1;
+std::string Profiler::s_path;
+Profiler::Node Profiler::s_root;
+Profiler::Node* Profiler::s_current = &Profiler::s_root;
+
+Profiler::Node* Profiler::enter(const Implementation* owner, const char* what) {
+  for (Node* child : s_current->children) {
+    if (child->owner == owner && child->what == what) {
+      s_current = child;
+      return child;
+    }
+  }
+
+  Node* node = new Node();
+  node->owner = owner;
+  node->what = what;
+  if (owner == nullptr) {
+    node->label = what;
+  } else {
+    std::string id = owner->get_id() != "_default_id" ? owner->get_id() : owner->get_name();
+    node->label = fmt::format("{}[{}]::{}", owner->get_ifce_name(), id, what);
+  }
+  node->parent = s_current;
+  s_current->children.push_back(node);
+  s_current = node;
+  return node;
+}
+
+void Profiler::configure(const YAML::Node& config) {
+  const YAML::Node& profile_config = config["Profile"];
+  if (!profile_config) {
+    return;
+  }
+  s_path = profile_config["path"].as<std::string>("profile.csv");
+  s_sample_period = std::max<uint64_t>(1, profile_config["sample_period"].as<uint64_t>(1));
+  s_enabled = true;
+  spdlog::info("Profiling one out of every {} memory cycles into {}.", s_sample_period, s_path);
+}
+
+void Profiler::dump(const std::string& suffix) {
+  if (!s_enabled) {
+    return;
+  }
+
+  std::string path = s_path + suffix;
+  std::ofstream file(path);
+  if (!file.is_open()) {
+    spdlog::error("Cannot write the profile to {}!", path);
+    return;
+  }
+
+  // Self time = time of the node minus the time of the profiled calls it made
+  file << "# sample_period: " << s_sample_period << std::endl;
+  file << "stack,calls,total_ns,self_ns" << std::endl;
+  std::function<void(const Node*, const std::string&)> write_node = [&](const Node* node, const std::string& stack) {
+    uint64_t children_ns = 0;
+    for (const Node* child : node->children) {
+      children_ns += child->total_ns;
+    }
+    uint64_t self_ns = node->total_ns > children_ns ? node->total_ns - children_ns : 0;
+    file << stack << "," << node->num_calls << "," << node->total_ns << "," << self_ns << std::endl;
+    for (const Node* child : node->children) {
+      write_node(child, stack + ";" + child->label);
+    }
+  };
+  for (const Node* node : s_root.children) {
+    write_node(node, node->label);
+  }
+}
+
+}        // namespace Ramulator
@@ -0,0 +1,105 @@
+#ifndef     RAMULATOR_BASE_PROFILER_H
+#define     RAMULATOR_BASE_PROFILER_H
+
+#include <chrono>
+#include <string>
+#include <vector>
+#include <cstdint>
+
+#include <yaml-cpp/yaml.h>
+
+namespace Ramulator {
+
+class Implementation;
+
+/**
+ * @brief    Opt-in wall-clock profiler of the simulator itself
+ *
+ * @details
+ * Components wrap their hot calls (tick, send, plugin updates, ...) in RAMULATOR_PROFILE(impl, "what"). The scopes form
+ * a call tree (e.g., MemorySystem::tick -> Controller[Channel 0]::tick -> ControllerPlugin[TraceRecorder]::update) whose
+ * nodes accumulate the number of calls and the time spent in them. When profiling is off, a scope costs one branch.
+ *
+ * Profiling is configured by the top-level Profile section:
+ *   Profile:
+ *     path: ./profile.csv      # Where the call tree is written (one line per node, see profile_report.py)
+ *     sample_period: 1         # Only time one out of every sample_period memory cycles
+ *
+ * The profiler is not thread-safe, it is only used by standalone (and forked) simulations.
+ *
+ */
+class Profiler {
+  public:
+    using Clock_t = std::chrono::steady_clock;
+
+    struct Node {
+      const void* owner = nullptr;
+      const char* what = nullptr;
+      std::string label;
+      Node* parent = nullptr;
+      std::vector<Node*> children;
+      uint64_t num_calls = 0;
+      uint64_t total_ns = 0;
+    };
+
+    class Scope {
+      private:
+        Node* m_node = nullptr;
+        Clock_t::time_point m_start;
+
+      public:
+        Scope(const Implementation* owner, const char* what) {
+          if (s_active) {
+            m_node = enter(owner, what);
+            m_start = Clock_t::now();
+          }
+        };
+
+        ~Scope() {
+          if (m_node) {
+            m_node->total_ns += std::chrono::duration_cast<std::chrono::nanoseconds>(Clock_t::now() - m_start).count();
+            m_node->num_calls++;
+            s_current = m_node->parent;
+          }
+        };
+    };
+
+  private:
+    static bool s_enabled;
+    static bool s_active;
+    static uint64_t s_sample_period;
+    static std::string s_path;
+    static Node s_root;
+    static Node* s_current;
+
+    static Node* enter(const Implementation* owner, const char* what);
+
+  public:
+    /**
+     * @brief    Enables the profiler if the configuration has a Profile section
+     */
+    static void configure(const YAML::Node& config);
+
+    static bool is_enabled() { return s_enabled; };
+
+    /**
+     * @brief    Called by the main loop before every simulated cycle, decides whether this cycle is timed
+     */
+    static void on_cycle(uint64_t mem_cycle) {
+      s_active = s_enabled && (mem_cycle % s_sample_period == 0);
+    };
+
+    /**
+     * @brief    Writes the call tree to the configured path (with the suffix appended, e.g., to separate forked variants)
+     */
+    static void dump(const std::string& suffix = "");
+};
+
+}        // namespace Ramulator
+
+#define RAMULATOR_PROFILE_CONCAT_(a, b) a ## b
+#define RAMULATOR_PROFILE_CONCAT(a, b) RAMULATOR_PROFILE_CONCAT_(a, b)
+#define RAMULATOR_PROFILE(owner, what) ::Ramulator::Profiler::Scope RAMULATOR_PROFILE_CONCAT(_ramulator_profile_scope_, __LINE__)(owner, what)
+
+
+#endif   // RAMULATOR_BASE_PROFILER_H
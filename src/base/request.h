@@ -3,12 +3,17 @@
 
 #include <vector>
 #include <list>
+#include <deque>
+#include <unordered_map>
+#include <algorithm>
 #include <string>
 
 #include "base/base.h"
 
 namespace Ramulator {
 
+struct ReqGroupEntry;
+
 struct Request { 
   Addr_t    addr = -1;
   AddrVec_t addr_vec {};
@@ -36,18 +41,31 @@ struct Request {
   Clk_t last_scheduled = -1;   // Clock cycle when the request is scheduled from the active request buffer.
   Clk_t depart = -1;   // Clock cycle when the request depart the memory controller
 
-  std::function<void(Request&)> callback;
+  int callback_id = -1;  // The memory system callback that is notified when the request is served (-1: none, see IMemorySystem::register_callback)
+  int64_t id = -1;       // An identifier for the sender to find the state of the request when it is served
 
   void* m_payload = nullptr;    // Point to a generic payload
 
+  ReqGroupEntry* group_entry = nullptr;    // Position of the request in its group, if its buffer groups its requests (see ReqBuffer::Group)
+
   Request(Addr_t addr, int type);
   Request(AddrVec_t addr_vec, int type);
-  Request(Addr_t addr, int type, int source_id, std::function<void(Request&)> callback);
+  Request(Addr_t addr, int type, int source_id, int callback_id);
+};
+
+
+struct ReqGroupEntry {
+  uint64_t order = 0;                       // Enqueue order
+  std::list<Request>::iterator req;
+  int group = -1;                           // Slot of the group in ReqBuffer::groups
+  ReqGroupEntry* prev = nullptr;
+  ReqGroupEntry* next = nullptr;
 };
 
 
 struct ReqBuffer {
   std::list<Request> buffer;
+  std::list<Request> free_nodes;    // Nodes of removed requests, reused by the next enqueues instead of allocating new ones
   size_t max_size = 32;
 
 
@@ -58,9 +76,74 @@ struct ReqBuffer {
 
   size_t size() const { return buffer.size(); }
 
+  /**
+   * @brief    Requests to the same row (same address down to the row) with the same final command
+   * @details
+   * They need the same next command and become ready at the same time, so a scheduler only has to evaluate one of them.
+   * The scheduler can cache its evaluation (command, is_ready) in the group, tagged with its own epochs.
+   * The groups live in a pool of slots (groups) that are reused, and live_groups lists the slots in use. Every request
+   * points to its entry in the group, so adding and removing a request never searches the buffer.
+   */
+  using GroupKey = FixedVector<int, AddrVec_t::capacity() + 1>;
+  struct Group {
+    GroupKey key;
+    ReqGroupEntry* head = nullptr;                        // Entries sorted by arrival then enqueue order
+    ReqGroupEntry* tail = nullptr;
+    size_t live_index = 0;                                // Position of the group in live_groups
+    int command = -1;
+    bool is_ready = false;
+    uint64_t epoch = 0;                                   // Epoch of the command
+    uint64_t ready_epoch = 0;                             // Epoch of is_ready
+    bool has_new_requests = true;                         // Requests joined since the scheduler last looked at the group
+  };
+  struct GroupKeyHash {
+    size_t operator()(const GroupKey& key) const {
+      size_t hash = key.size();
+      for (int value : key) {
+        hash ^= std::hash<int>()(value) + 0x9e3779b9 + (hash << 6) + (hash >> 2);
+      }
+      return hash;
+    }
+  };
+
+  std::vector<Group> groups;
+  std::vector<int> free_groups;                                      // Slots of groups that were emptied, reused like free_nodes
+  std::vector<int> live_groups;                                      // Slots of the groups that hold requests, in no particular order
+  std::unordered_map<GroupKey, int, GroupKeyHash> group_slots;       // Slot of the group of every key
+  std::deque<ReqGroupEntry> group_entries;                           // Entries of all groups (a deque keeps them in place as it grows)
+  std::vector<ReqGroupEntry*> free_group_entries;                    // Reused like free_nodes
+  int group_key_length = -1;    // Number of address levels in the group key, -1 if the requests are not grouped
+  uint64_t num_enqueued = 0;
+
+  /**
+   * @brief    Starts grouping the requests by their first key_length address levels and final command
+   */
+  void enable_groups(int key_length) {
+    group_key_length = key_length;
+    groups.clear();
+    free_groups.clear();
+    live_groups.clear();
+    group_slots.clear();
+    group_entries.clear();
+    free_group_entries.clear();
+    for (auto it = buffer.begin(); it != buffer.end(); it++) {
+      add_to_group(it);
+    }
+  }
+
   bool enqueue(const Request& request) {
     if (buffer.size() <= max_size) {
-      buffer.push_back(request);
+      if (free_nodes.empty()) {
+        buffer.push_back(request);
+      } else {
+        buffer.splice(buffer.end(), free_nodes, free_nodes.begin());
+        buffer.back() = request;
+      }
+      // The request may come from another buffer (e.g., into the active buffer) with the entry of its group there
+      buffer.back().group_entry = nullptr;
+      if (group_key_length >= 0) {
+        add_to_group(std::prev(buffer.end()));
+      }
       return true;
     } else {
       return false;
@@ -68,7 +151,80 @@ struct ReqBuffer {
   }
 
   void remove(iterator it) {
-    buffer.erase(it);
+    if (group_key_length >= 0) {
+      remove_from_group(it);
+    }
+    free_nodes.splice(free_nodes.begin(), buffer, it);
+  }
+
+  GroupKey get_group_key(const Request& req) const {
+    int length = std::min<int>(group_key_length, req.addr_vec.size());
+    GroupKey key;
+    for (int i = 0; i < length; i++) {
+      key.push_back(req.addr_vec[i]);
+    }
+    key.push_back(req.final_command);
+    return key;
+  }
+
+  void add_to_group(iterator it) {
+    auto [slot_it, is_new_group] = group_slots.try_emplace(get_group_key(*it), -1);
+    if (is_new_group) {
+      if (free_groups.empty()) {
+        slot_it->second = groups.size();
+        groups.emplace_back();
+      } else {
+        slot_it->second = free_groups.back();
+        free_groups.pop_back();
+        groups[slot_it->second] = Group();
+      }
+      groups[slot_it->second].key = slot_it->first;
+      groups[slot_it->second].live_index = live_groups.size();
+      live_groups.push_back(slot_it->second);
+    }
+    Group& group = groups[slot_it->second];
+
+    ReqGroupEntry* entry = nullptr;
+    if (free_group_entries.empty()) {
+      entry = &group_entries.emplace_back();
+    } else {
+      entry = free_group_entries.back();
+      free_group_entries.pop_back();
+    }
+    *entry = {num_enqueued++, it, slot_it->second, nullptr, nullptr};
+    it->group_entry = entry;
+
+    // Requests moved between buffers (e.g., into the active buffer) are not enqueued in arrival order
+    ReqGroupEntry* prev = group.tail;
+    while (prev && prev->req->arrive > it->arrive) {
+      prev = prev->prev;
+    }
+    entry->prev = prev;
+    entry->next = prev ? prev->next : group.head;
+    (entry->next ? entry->next->prev : group.tail) = entry;
+    (prev ? prev->next : group.head) = entry;
+    group.has_new_requests = true;
+  }
+
+  void remove_from_group(iterator it) {
+    ReqGroupEntry* entry = it->group_entry;
+    if (!entry) {
+      return;
+    }
+    it->group_entry = nullptr;
+    Group& group = groups[entry->group];
+    (entry->prev ? entry->prev->next : group.head) = entry->next;
+    (entry->next ? entry->next->prev : group.tail) = entry->prev;
+    free_group_entries.push_back(entry);
+
+    if (!group.head) {
+      group_slots.erase(group.key);
+      int last = live_groups.back();
+      live_groups[group.live_index] = last;
+      groups[last].live_index = group.live_index;
+      live_groups.pop_back();
+      free_groups.push_back(entry->group);
+    }
   }
 };
 
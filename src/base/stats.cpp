@@ -1,3 +1,6 @@
+#include <filesystem>
+#include <fstream>
+
 #include "base/stats.h"
 
 namespace Ramulator {
@@ -9,4 +12,29 @@ YAML::Emitter& operator << (YAML::Emitter& emitter, const Stats& s) {
 	return emitter;
 }
 
+YAML::Node Stats::to_node() const {
+  YAML::Node node(YAML::NodeType::Map);
+  for (auto [stat_name, stat_ptr] : _registry) {
+    node[stat_name] = stat_ptr->to_node();
+  }
+  return node;
+}
+
+void write_stats_file(const std::string& path, const YAML::Node& records) {
+  std::filesystem::path stats_path(path);
+  if (stats_path.has_parent_path()) {
+    std::filesystem::create_directories(stats_path.parent_path());
+  }
+
+  std::ofstream output(stats_path);
+  if (!output.is_open()) {
+    throw ConfigurationError("Unable to open stats file: {}.", path);
+  }
+
+  YAML::Emitter emitter;
+  emitter << records;
+  output << emitter.c_str() << std::endl;
+  output.close();
+}
+
 }        // namespace Ramulator
@@ -18,6 +18,7 @@ class Implementation;
 class StatWrapperBase {
   public:
     virtual void emit_to(YAML::Emitter& emitter) = 0;
+    virtual YAML::Node to_node() = 0;
 };
 
 template<typename T>
@@ -35,6 +36,12 @@ class Stats {
     bool is_empty() {
       return _registry.size() == 0;
     }
+
+    /**
+     * @brief    Converts all registered stats into a YAML map (stat name -> value).
+     * 
+     */
+    YAML::Node to_node() const;
 };
 
 
@@ -89,8 +96,28 @@ class StatWrapper : public StatWrapperBase {
       }
 
     };
+
+    YAML::Node to_node() override {
+      if (std::holds_alternative<T*>(_ref)) {
+        return YAML::Node(*(std::get<T*>(_ref)));
+      } else {
+        YAML::Node node(YAML::NodeType::Sequence);
+        for (const auto _val : *(std::get<std::vector<T>*>(_ref))) {
+          node.push_back(_val);
+        }
+        return node;
+      }
+    };
 };
 
+/**
+ * @brief    Writes the stats records collected from all components to a machine-readable YAML file.
+ * 
+ * @param    path           Path to the stats file. Parent directories are created if needed.
+ * @param    records        A YAML map (component path -> component record) built by Implementation::collect_stats.
+ */
+void write_stats_file(const std::string& path, const YAML::Node& records);
+
 }        // namespace Ramulator
 
 
@@ -0,0 +1,81 @@
+#include "base/trace_cache.h"
+
+
+namespace Ramulator {
+
+std::shared_ptr<const void> TraceCache::lookup(const std::string& key, std::filesystem::file_time_type mtime, uintmax_t file_size) {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  auto it = s_index.find(key);
+  if (it == s_index.end()) {
+    s_num_misses++;
+    return nullptr;
+  }
+
+  auto entry = it->second;
+  if (entry->mtime != mtime || entry->file_size != file_size) {
+    // The file has changed since it was parsed
+    s_size -= entry->bytes;
+    s_entries.erase(entry);
+    s_index.erase(it);
+    s_num_misses++;
+    return nullptr;
+  }
+
+  s_entries.splice(s_entries.begin(), s_entries, entry);
+  s_num_hits++;
+  return entry->data;
+}
+
+void TraceCache::insert(const std::string& key, std::filesystem::file_time_type mtime, uintmax_t file_size, std::shared_ptr<const void> data, size_t bytes) {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  if (bytes > s_capacity) {
+    return;
+  }
+
+  // Another job may have parsed the same trace in the meantime
+  if (auto it = s_index.find(key); it != s_index.end()) {
+    s_size -= it->second->bytes;
+    s_entries.erase(it->second);
+    s_index.erase(it);
+  }
+
+  s_entries.push_front({key, mtime, file_size, data, bytes});
+  s_index[key] = s_entries.begin();
+  s_size += bytes;
+
+  // Evict the least recently used traces. Jobs still holding them keep their copy alive until they finish.
+  while (s_size > s_capacity) {
+    const Entry& lru = s_entries.back();
+    s_size -= lru.bytes;
+    s_index.erase(lru.key);
+    s_entries.pop_back();
+  }
+}
+
+void TraceCache::set_capacity(size_t bytes) {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  s_capacity = bytes;
+  while (s_size > s_capacity) {
+    const Entry& lru = s_entries.back();
+    s_size -= lru.bytes;
+    s_index.erase(lru.key);
+    s_entries.pop_back();
+  }
+}
+
+size_t TraceCache::get_size() {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  return s_size;
+}
+
+size_t TraceCache::get_num_hits() {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  return s_num_hits;
+}
+
+size_t TraceCache::get_num_misses() {
+  std::lock_guard<std::mutex> lock(s_mutex);
+  return s_num_misses;
+}
+
+}        // namespace Ramulator
@@ -0,0 +1,93 @@
+#ifndef     RAMULATOR_BASE_TRACE_CACHE_H
+#define     RAMULATOR_BASE_TRACE_CACHE_H
+
+#include <list>
+#include <atomic>
+#include <mutex>
+#include <memory>
+#include <string>
+#include <vector>
+#include <functional>
+#include <filesystem>
+#include <unordered_map>
+
+namespace Ramulator {
+
+/**
+ * @brief    Process-wide cache of parsed trace files
+ *
+ * @details
+ * Frontends parse their trace through load(). With the default capacity of 0 nothing is cached and load() simply calls
+ * the parser. A long-lived process (e.g., the simulation daemon) sets a capacity so that jobs running the same trace share
+ * one parsed copy. Entries are keyed by the kind of trace and the canonical path, invalidated when the file changes
+ * (modification time or size), and evicted in LRU order once their total size exceeds the capacity.
+ * All functions are thread-safe.
+ *
+ */
+class TraceCache {
+  private:
+    struct Entry {
+      std::string key;
+      std::filesystem::file_time_type mtime;
+      uintmax_t file_size;
+      std::shared_ptr<const void> data;
+      size_t bytes;
+    };
+
+    inline static std::mutex s_mutex;
+    inline static std::list<Entry> s_entries;    // Most recently used first
+    inline static std::unordered_map<std::string, std::list<Entry>::iterator> s_index;
+    inline static std::atomic<size_t> s_capacity = 0;
+    inline static size_t s_size = 0;
+    inline static size_t s_num_hits = 0;
+    inline static size_t s_num_misses = 0;
+
+    static std::shared_ptr<const void> lookup(const std::string& key, std::filesystem::file_time_type mtime, uintmax_t file_size);
+    static void insert(const std::string& key, std::filesystem::file_time_type mtime, uintmax_t file_size, std::shared_ptr<const void> data, size_t bytes);
+
+  public:
+    /**
+     * @brief    Sets the maximum total size (in bytes) of the cached traces, 0 disables the cache
+     */
+    static void set_capacity(size_t bytes);
+
+    static size_t get_size();
+    static size_t get_num_hits();
+    static size_t get_num_misses();
+
+    /**
+     * @brief    Returns the parsed trace of a file, parsing it only if it is not cached (or has changed)
+     *
+     * @param    kind       Name of the trace format, traces of different formats never share an entry.
+     * @param    path       Path to the trace file.
+     * @param    parse      Parses the file into a vector of trace entries.
+     * @param    bytes      Memory footprint of a parsed trace, counted against the capacity (default: size() * sizeof(T)).
+     */
+    template <class T>
+    static std::shared_ptr<const std::vector<T>> load(const std::string& kind, const std::string& path, const std::function<std::vector<T>()>& parse,
+                                                      const std::function<size_t(const std::vector<T>&)>& bytes = nullptr) {
+      namespace fs = std::filesystem;
+      std::error_code ec;
+      fs::path canonical_path = fs::weakly_canonical(path, ec);
+      if (s_capacity == 0 || ec || !fs::exists(canonical_path)) {
+        return std::make_shared<const std::vector<T>>(parse());
+      }
+
+      std::string key = kind + ":" + canonical_path.string();
+      fs::file_time_type mtime = fs::last_write_time(canonical_path);
+      uintmax_t file_size = fs::file_size(canonical_path);
+      if (auto data = lookup(key, mtime, file_size)) {
+        return std::static_pointer_cast<const std::vector<T>>(data);
+      }
+
+      // Parse outside of the lock, jobs loading other traces are not blocked meanwhile
+      auto trace = std::make_shared<const std::vector<T>>(parse());
+      insert(key, mtime, file_size, trace, bytes ? bytes(*trace) : trace->size() * sizeof(T));
+      return trace;
+    }
+};
+
+}        // namespace Ramulator
+
+
+#endif   // RAMULATOR_BASE_TRACE_CACHE_H
@@ -5,13 +5,130 @@
 #include <unordered_map>
 #include <string>
 #include <type_traits>
+#include <algorithm>
+#include <initializer_list>
+#include <stdexcept>
 
 
 namespace Ramulator {
 
+/**
+ * @brief    A vector with a fixed capacity that stores its elements inline
+ *
+ * @details
+ * Copying it never allocates, which keeps objects that are copied around a lot (e.g., Request) cheap to copy.
+ *
+ */
+template<typename T, size_t N>
+class FixedVector {
+  public:
+    using value_type = T;
+    using iterator = T*;
+    using const_iterator = const T*;
+
+  private:
+    T m_data[N] {};
+    size_t m_size = 0;
+
+  public:
+    FixedVector() = default;
+    explicit FixedVector(size_t size, const T& value = T()) { resize(size, value); };
+    FixedVector(std::initializer_list<T> values) { for (const T& value : values) { push_back(value); } };
+    FixedVector(const std::vector<T>& values) { for (const T& value : values) { push_back(value); } };
+
+    static constexpr size_t capacity() { return N; };
+    size_t size() const { return m_size; };
+    bool empty() const { return m_size == 0; };
+
+    T& operator[](size_t i) { return m_data[i]; };
+    const T& operator[](size_t i) const { return m_data[i]; };
+    T& back() { return m_data[m_size - 1]; };
+    const T& back() const { return m_data[m_size - 1]; };
+
+    iterator begin() { return m_data; };
+    iterator end() { return m_data + m_size; };
+    const_iterator begin() const { return m_data; };
+    const_iterator end() const { return m_data + m_size; };
+
+    void push_back(const T& value) {
+      if (m_size == N) {
+        throw std::length_error("FixedVector is full!");
+      }
+      m_data[m_size++] = value;
+    };
+    void pop_back() { m_size--; };
+    void clear() { m_size = 0; };
+
+    void resize(size_t size, const T& value = T()) {
+      if (size > N) {
+        throw std::length_error("FixedVector is full!");
+      }
+      for (size_t i = m_size; i < size; i++) {
+        m_data[i] = value;
+      }
+      m_size = size;
+    };
+
+    bool operator==(const FixedVector& other) const { return std::equal(begin(), end(), other.begin(), other.end()); };
+    bool operator!=(const FixedVector& other) const { return !(*this == other); };
+    bool operator<(const FixedVector& other) const { return std::lexicographical_compare(begin(), end(), other.begin(), other.end()); };
+};
+
+/**
+ * @brief    A FIFO queue stored in one contiguous buffer that wraps around
+ *
+ * @details
+ * Pushing and popping never allocate, except when the queue outgrows its buffer (the capacity is then doubled).
+ *
+ */
+template<typename T>
+class RingBuffer {
+  private:
+    std::vector<T> m_data;
+    size_t m_head = 0;
+    size_t m_size = 0;
+
+    size_t wrap(size_t i) const { return i & (m_data.size() - 1); };
+
+    // The new slots are filled with copies of value, so that T does not need a default constructor
+    void grow(const T& value) {
+      std::vector<T> data(std::max<size_t>(16, m_data.size() * 2), value);
+      for (size_t i = 0; i < m_size; i++) {
+        data[i] = std::move(m_data[wrap(m_head + i)]);
+      }
+      m_data = std::move(data);
+      m_head = 0;
+    };
+
+  public:
+    size_t size() const { return m_size; };
+    bool empty() const { return m_size == 0; };
+
+    T& operator[](size_t i) { return m_data[wrap(m_head + i)]; };
+    const T& operator[](size_t i) const { return m_data[wrap(m_head + i)]; };
+    T& front() { return m_data[m_head]; };
+    const T& front() const { return m_data[m_head]; };
+
+    void push_back(T value) {
+      if (m_size == m_data.size()) {
+        grow(value);
+      }
+      m_data[wrap(m_head + m_size)] = std::move(value);
+      m_size++;
+    };
+    void pop_front() {
+      m_head = wrap(m_head + 1);
+      m_size--;
+    };
+    void clear() {
+      m_head = 0;
+      m_size = 0;
+    };
+};
+
 using Clk_t     = int64_t;            // Clock cycle
 using Addr_t    = int64_t;            // Plain address as seen by the OS
-using AddrVec_t = std::vector<int>;   // Device address vector as is sent to the device from the controller
+using AddrVec_t = FixedVector<int, 8>;   // Device address vector as is sent to the device from the controller (one entry per level)
 
 template<typename T>
 using Registry_t = std::unordered_map<std::string, T>;
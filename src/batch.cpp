@@ -0,0 +1,112 @@
+#include <mutex>
+#include <atomic>
+#include <memory>
+#include <thread>
+#include <fstream>
+#include <iostream>
+#include <limits>
+#include <algorithm>
+
+#include <spdlog/spdlog.h>
+
+#include "batch.h"
+#include "simulation.h"
+#include "base/config.h"
+#include "base/trace_cache.h"
+
+namespace Ramulator {
+
+namespace {
+
+struct BatchVariant {
+  std::string id;
+  std::string output_path;
+  std::string stats_path;
+  YAML::Node config;
+};
+
+}        // namespace
+
+
+int run_batch(const YAML::Node& config) {
+  const YAML::Node& batch = config["Batch"];
+  const YAML::Node& variant_configs = batch["variants"];
+  if (!variant_configs || !variant_configs.IsSequence() || variant_configs.size() == 0) {
+    spdlog::error("Batch needs a non-empty list of variants!");
+    return 1;
+  }
+  if (config["Fork"]) {
+    spdlog::error("Batch and Fork cannot be used together!");
+    return 1;
+  }
+  size_t max_parallel = batch["max_parallel"].as<size_t>(std::max(1u, std::thread::hardware_concurrency()));
+
+  // Build the configurations upfront, the YAML nodes are not touched by more than one thread afterwards
+  YAML::Node base_config = YAML::Clone(config);
+  base_config.remove("Batch");
+  std::vector<BatchVariant> variants;
+  for (size_t v = 0; v < variant_configs.size(); v++) {
+    const YAML::Node& variant = variant_configs[v];
+    YAML::Node variant_config = YAML::Clone(base_config);
+    Config::Details::override_configs(variant_config, variant["params"].as<std::vector<std::string>>(std::vector<std::string>{}));
+    variants.push_back({
+      variant["id"].as<std::string>(fmt::format("variant_{}", v)),
+      variant["output_path"].as<std::string>(""),
+      variant["stats_path"].as<std::string>(""),
+      variant_config,
+    });
+  }
+
+  // Keep every parsed trace for the whole batch
+  TraceCache::set_capacity(std::numeric_limits<size_t>::max());
+
+  std::mutex build_mutex;
+  std::mutex stdout_mutex;
+  std::atomic<size_t> next_variant = 0;
+  std::atomic<int> num_failed = 0;
+  auto worker = [&]() {
+    for (size_t v = next_variant++; v < variants.size(); v = next_variant++) {
+      const BatchVariant& variant = variants[v];
+      try {
+        // Built one at a time: the first variant parses the trace, the others find it in the cache
+        std::unique_ptr<SimulationInstance> simulation;
+        {
+          std::lock_guard<std::mutex> lock(build_mutex);
+          simulation = std::make_unique<SimulationInstance>(variant.config);
+        }
+        simulation->run();
+
+        std::string output = simulation->finalize();
+        if (variant.output_path.empty()) {
+          std::lock_guard<std::mutex> lock(stdout_mutex);
+          std::cout << output << std::flush;
+        } else {
+          std::ofstream output_file(variant.output_path);
+          if (!output_file.is_open()) {
+            throw std::runtime_error(fmt::format("Cannot open {}!", variant.output_path));
+          }
+          output_file << output;
+        }
+        if (!variant.stats_path.empty()) {
+          write_stats_file(variant.stats_path, simulation->collect_stats());
+        }
+        spdlog::info("Variant {} finished.", variant.id);
+      } catch (const std::exception& e) {
+        spdlog::error("Variant {} failed: {}", variant.id, e.what());
+        num_failed++;
+      }
+    }
+  };
+
+  spdlog::info("Running {} variants on {} threads.", variants.size(), std::min(max_parallel, variants.size()));
+  std::vector<std::thread> threads;
+  for (size_t t = 0; t < std::min(max_parallel, variants.size()); t++) {
+    threads.emplace_back(worker);
+  }
+  for (auto& thread : threads) {
+    thread.join();
+  }
+  return num_failed > 0 ? 1 : 0;
+}
+
+}        // namespace Ramulator
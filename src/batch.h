@@ -0,0 +1,33 @@
+#ifndef     RAMULATOR_BATCH_H
+#define     RAMULATOR_BATCH_H
+
+#include <yaml-cpp/yaml.h>
+
+namespace Ramulator {
+
+/**
+ * @brief    Runs the variants of the top-level Batch section on a pool of threads
+ *
+ * @details
+ * Every variant is the configuration without its Batch section, with the variant's params (KEY=VALUE, same syntax as
+ * the -p command line option) applied on top. The variants read one shared, read-only copy of the trace (see TraceCache),
+ * so the trace is loaded once and kept in memory once no matter how many variants run.
+ *
+ * Batch:
+ *   max_parallel: 8                  # Threads, defaults to the number of hardware threads
+ *   variants:
+ *     - id: mapping_0
+ *       output_path: ./mapping_0.txt   # Stats as ramulator2 prints them (default: stdout)
+ *       stats_path: ./mapping_0.yaml   # Machine-readable stats (optional)
+ *       params:
+ *         - MemorySystem.AddrMapper.mapping=1RA-16R-2B-7C-2BG
+ *         - Frontend.access_log=./mapping_0.csv
+ *
+ * @return   The exit code of the process (1 if any variant failed).
+ */
+int run_batch(const YAML::Node& config);
+
+}        // namespace Ramulator
+
+
+#endif   // RAMULATOR_BATCH_H
@@ -0,0 +1,304 @@
+#include <queue>
+#include <mutex>
+#include <thread>
+#include <atomic>
+#include <chrono>
+#include <csignal>
+#include <filesystem>
+#include <condition_variable>
+
+#include <sched.h>
+#include <unistd.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+
+#include <spdlog/spdlog.h>
+
+#include "daemon.h"
+#include "simulation.h"
+#include "base/base.h"
+#include "base/config.h"
+#include "base/trace_cache.h"
+
+namespace Ramulator {
+
+namespace {
+
+std::atomic<bool> s_stop = false;
+
+// Listening socket, shut down to wake the accepting thread when the daemon stops
+int s_listen_fd = -1;
+
+// Working directory of the jobs that do not give theirs
+std::filesystem::path s_default_cwd;
+
+// Whether the current worker thread has a working directory of its own (see run_daemon)
+thread_local bool t_own_cwd = false;
+
+void stop_accepting() {
+  s_stop = true;
+  shutdown(s_listen_fd, SHUT_RD);
+}
+
+void handle_stop_signal(int) {
+  stop_accepting();
+}
+
+std::string read_all(int fd) {
+  std::string data;
+  char buffer[65536];
+  ssize_t n;
+  while ((n = read(fd, buffer, sizeof(buffer))) > 0) {
+    data.append(buffer, n);
+  }
+  return data;
+}
+
+void write_all(int fd, const std::string& data) {
+  size_t written = 0;
+  while (written < data.size()) {
+    ssize_t n = write(fd, data.data() + written, data.size() - written);
+    if (n <= 0) {
+      return;
+    }
+    written += n;
+  }
+}
+
+std::string error_reply(const std::string& message) {
+  YAML::Emitter emitter;
+  emitter << YAML::BeginMap;
+  emitter << YAML::Key << "status" << YAML::Value << "error";
+  emitter << YAML::Key << "message" << YAML::Value << message;
+  emitter << YAML::EndMap;
+  return emitter.c_str();
+}
+
+/**
+ * @brief    Runs one job to completion and builds the reply
+ */
+std::string run_job(const YAML::Node& request) {
+  auto start = std::chrono::steady_clock::now();
+
+  // Relative paths of the job (config file, includes, traces, logs and stats) resolve against the directory of the client
+  std::filesystem::path cwd = request["cwd"].as<std::string>(s_default_cwd.string());
+  if (cwd != std::filesystem::current_path()) {
+    if (!t_own_cwd) {
+      return error_reply(fmt::format("The daemon cannot run jobs in {}, submit them from {}!", cwd.string(), s_default_cwd.string()));
+    }
+    std::error_code ec;
+    std::filesystem::current_path(cwd, ec);
+    if (ec) {
+      return error_reply(fmt::format("Cannot run the job in {}: {}!", cwd.string(), ec.message()));
+    }
+  }
+
+  YAML::Node config;
+  if (request["config_file"]) {
+    // Config::parse_config_file exits on a missing file
+    std::string config_file = request["config_file"].as<std::string>();
+    if (!std::filesystem::exists(config_file)) {
+      return error_reply(fmt::format("Config file {} does not exist!", config_file));
+    }
+    config = Config::parse_config_file(config_file, request["params"].as<std::vector<std::string>>(std::vector<std::string>{}));
+  } else if (request["config"]) {
+    config = YAML::Load(request["config"].as<std::string>());
+  } else {
+    return error_reply("The request has neither config nor config_file!");
+  }
+  if (config["Fork"]) {
+    return error_reply("Fork is not supported by the daemon, submit the variants as separate jobs!");
+  }
+
+  SimulationInstance simulation(config);
+  simulation.run();
+  std::string output = simulation.finalize();
+  YAML::Node stats_records = simulation.collect_stats();
+  if (auto stats_path = config["stats_path"].as<std::string>(""); !stats_path.empty()) {
+    write_stats_file(stats_path, stats_records);
+  }
+
+  std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+  YAML::Emitter emitter;
+  emitter << YAML::BeginMap;
+  emitter << YAML::Key << "status" << YAML::Value << "ok";
+  emitter << YAML::Key << "output" << YAML::Value << YAML::Literal << output;
+  emitter << YAML::Key << "stats" << YAML::Value << stats_records;
+  emitter << YAML::Key << "elapsed_s" << YAML::Value << elapsed.count();
+  emitter << YAML::EndMap;
+  return emitter.c_str();
+}
+
+std::string status_reply(size_t num_queued, size_t num_done) {
+  YAML::Emitter emitter;
+  emitter << YAML::BeginMap;
+  emitter << YAML::Key << "status" << YAML::Value << "ok";
+  emitter << YAML::Key << "jobs_queued" << YAML::Value << num_queued;
+  emitter << YAML::Key << "jobs_done" << YAML::Value << num_done;
+  emitter << YAML::Key << "trace_cache_bytes" << YAML::Value << TraceCache::get_size();
+  emitter << YAML::Key << "trace_cache_hits" << YAML::Value << TraceCache::get_num_hits();
+  emitter << YAML::Key << "trace_cache_misses" << YAML::Value << TraceCache::get_num_misses();
+  emitter << YAML::EndMap;
+  return emitter.c_str();
+}
+
+}        // namespace
+
+
+int run_daemon(const std::string& socket_path, int num_workers, size_t trace_cache_bytes) {
+  TraceCache::set_capacity(trace_cache_bytes);
+  s_default_cwd = std::filesystem::current_path();
+
+  int listen_fd = s_listen_fd = socket(AF_UNIX, SOCK_STREAM, 0);
+  sockaddr_un addr {};
+  addr.sun_family = AF_UNIX;
+  if (listen_fd < 0 || socket_path.size() >= sizeof(addr.sun_path)) {
+    spdlog::error("Cannot create the socket {}!", socket_path);
+    return 1;
+  }
+  socket_path.copy(addr.sun_path, sizeof(addr.sun_path) - 1);
+  unlink(socket_path.c_str());
+  if (bind(listen_fd, reinterpret_cast<sockaddr*>(&addr), sizeof(addr)) < 0 || listen(listen_fd, 128) < 0) {
+    spdlog::error("Cannot listen on {}!", socket_path);
+    return 1;
+  }
+
+  // Interrupt accept() instead of restarting it so that the daemon can shut down cleanly (the signal may also be delivered
+  // to another thread, so the handler wakes accept() by shutting the socket down as well)
+  struct sigaction action {};
+  action.sa_handler = handle_stop_signal;
+  sigaction(SIGINT, &action, nullptr);
+  sigaction(SIGTERM, &action, nullptr);
+
+  std::mutex queue_mutex;
+  std::condition_variable connections_cv;
+  std::condition_variable queue_cv;
+  // Accepted connections whose request is not read yet, and the jobs read from them
+  std::queue<int> connections;
+  std::queue<std::pair<int, YAML::Node>> jobs;
+  bool stop_readers = false;
+  bool stop_workers = false;
+  std::atomic<size_t> num_done = 0;
+
+  // The requests are read off the accepting thread, so that a slow client only holds up its reader
+  std::vector<std::thread> readers;
+  for (int r = 0; r < num_workers; r++) {
+    readers.emplace_back([&]() {
+      while (true) {
+        int client_fd;
+        {
+          std::unique_lock<std::mutex> lock(queue_mutex);
+          connections_cv.wait(lock, [&]() { return !connections.empty() || stop_readers; });
+          if (connections.empty()) {
+            return;
+          }
+          client_fd = connections.front();
+          connections.pop();
+        }
+
+        YAML::Node request;
+        try {
+          request = YAML::Load(read_all(client_fd));
+        } catch (const std::exception& e) {
+          write_all(client_fd, error_reply(e.what()));
+          close(client_fd);
+          continue;
+        }
+
+        std::string command = request.IsMap() ? request["command"].as<std::string>("run") : "run";
+        if (command == "run") {
+          std::lock_guard<std::mutex> lock(queue_mutex);
+          jobs.push({client_fd, request});
+          queue_cv.notify_one();
+          continue;
+        }
+
+        if (command == "status") {
+          size_t num_queued;
+          {
+            std::lock_guard<std::mutex> lock(queue_mutex);
+            num_queued = jobs.size();
+          }
+          write_all(client_fd, status_reply(num_queued, num_done));
+        } else if (command == "shutdown") {
+          stop_accepting();
+          write_all(client_fd, status_reply(0, num_done));
+        } else {
+          write_all(client_fd, error_reply(fmt::format("Unknown command {}!", command)));
+        }
+        close(client_fd);
+      }
+    });
+  }
+
+  std::vector<std::thread> workers;
+  for (int w = 0; w < num_workers; w++) {
+    workers.emplace_back([&]() {
+      // Unshare the working directory from the other threads, so that every job can run in the directory of its client
+      t_own_cwd = unshare(CLONE_FS) == 0;
+      static std::once_flag warn_once;
+      if (!t_own_cwd) {
+        std::call_once(warn_once, []() {
+          spdlog::warn("The workers share the working directory of the daemon, only jobs from {} can run.", s_default_cwd.string());
+        });
+      }
+      while (true) {
+        std::pair<int, YAML::Node> job;
+        {
+          std::unique_lock<std::mutex> lock(queue_mutex);
+          queue_cv.wait(lock, [&]() { return !jobs.empty() || stop_workers; });
+          if (jobs.empty()) {
+            return;
+          }
+          job = jobs.front();
+          jobs.pop();
+        }
+
+        std::string reply;
+        try {
+          reply = run_job(job.second);
+        } catch (const std::exception& e) {
+          reply = error_reply(e.what());
+        }
+        write_all(job.first, reply);
+        close(job.first);
+        num_done++;
+      }
+    });
+  }
+
+  spdlog::info("Ramulator 2.0 daemon listening on {} with {} workers and a {} MB trace cache.", socket_path, num_workers, trace_cache_bytes >> 20);
+  while (!s_stop) {
+    int client_fd = accept(listen_fd, nullptr, nullptr);
+    if (client_fd < 0) {
+      continue;
+    }
+    std::lock_guard<std::mutex> lock(queue_mutex);
+    connections.push(client_fd);
+    connections_cv.notify_one();
+  }
+
+  // Finish the jobs that were already accepted: read the pending requests first, then run the queued jobs
+  spdlog::info("Shutting down after the queued jobs.");
+  unlink(socket_path.c_str());
+  {
+    std::lock_guard<std::mutex> lock(queue_mutex);
+    stop_readers = true;
+  }
+  connections_cv.notify_all();
+  for (auto& reader : readers) {
+    reader.join();
+  }
+  close(listen_fd);
+  {
+    std::lock_guard<std::mutex> lock(queue_mutex);
+    stop_workers = true;
+  }
+  queue_cv.notify_all();
+  for (auto& worker : workers) {
+    worker.join();
+  }
+  return 0;
+}
+
+}        // namespace Ramulator
@@ -0,0 +1,30 @@
+#ifndef     RAMULATOR_DAEMON_H
+#define     RAMULATOR_DAEMON_H
+
+#include <string>
+
+namespace Ramulator {
+
+/**
+ * @brief    Serves simulation jobs over a Unix domain socket until interrupted or asked to shut down
+ *
+ * @details
+ * Every connection carries one job. The client writes a YAML request and closes its writing end, the daemon reads it on
+ * one of its readers (so the accepting thread never waits for a client), runs the job on one of its workers and answers
+ * with a YAML reply before closing the connection.
+ *
+ * Request:  {config: <dumped YAML configuration>} or {config_file: <path>, params: [KEY=VALUE, ...]},
+ *           optionally with the working directory of the client (cwd); {command: status} or {command: shutdown}.
+ * Reply:    {status: ok, output: <what ramulator2 would have printed>, stats: <per-component stats records>, elapsed_s: <wall time>}
+ *           or {status: error, message: <reason>}.
+ *
+ * Parsed traces are kept in the TraceCache (up to trace_cache_bytes) so that jobs on the same trace skip the parsing.
+ *
+ * @return   The exit code of the process.
+ */
+int run_daemon(const std::string& socket_path, int num_workers, size_t trace_cache_bytes);
+
+}        // namespace Ramulator
+
+
+#endif   // RAMULATOR_DAEMON_H
@@ -4,6 +4,7 @@
 #include <string>
 #include <vector>
 #include <map>
+#include <limits>
 #include <functional>
 
 #include "base/base.h"
@@ -62,6 +63,8 @@ class IDRAM : public Clocked<IDRAM> {
    *          Device Behavior Interface
    ***********************************************/   
   public:
+    bool m_clock_dependent_preqs = false;   // Whether get_preq_command() can change without any command being issued (e.g., it depends on the clock)
+
     /**
      * @brief   Issues a command with its address to the device.
      * @details
@@ -71,6 +74,15 @@ class IDRAM : public Clocked<IDRAM> {
      */
     virtual void issue_command(int command, const AddrVec_t& addr_vec) = 0;
 
+    /**
+     * @brief   Applies a command to the device states only.
+     * @details
+     * Updates the states of the involved nodes (e.g., opens or closes a row) as if the command was issued,
+     * but leaves their timing information untouched. Used to warm the device up functionally (e.g., in sampled simulations).
+     *
+     */
+    virtual void warm_command(int command, const AddrVec_t& addr_vec) = 0;
+
     /**
      * @brief    Returns the prequisite command of the given command and address
      * @details  
@@ -108,6 +120,12 @@ class IDRAM : public Clocked<IDRAM> {
      */
     virtual void notify(std::string_view key, uint64_t value) {};
 
+    /**
+     * @brief     The device model only keeps time (its timing constraints are absolute clock cycles), so it can always skip ticks
+     * 
+     */
+    Clk_t get_idle_ticks() override { return std::numeric_limits<Clk_t>::max(); };
+
 
   /************************************************
    *        Interface to Query Device Spec
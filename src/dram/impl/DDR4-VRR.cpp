@@ -183,6 +183,11 @@ class DDR4VRR : public IDRAM, public Implementation {
       m_channels[channel_id]->update_states(command, addr_vec, m_clk);
     };
 
+    void warm_command(int command, const AddrVec_t& addr_vec) override {
+      int channel_id = addr_vec[m_levels["channel"]];
+      m_channels[channel_id]->update_states(command, addr_vec, m_clk);
+    };
+
     int get_preq_command(int command, const AddrVec_t& addr_vec) override {
       int channel_id = addr_vec[m_levels["channel"]];
       return m_channels[channel_id]->get_preq_command(command, addr_vec, m_clk);
@@ -146,6 +146,8 @@ class LPDDR5 : public IDRAM, public Implementation {
 
     void init() override {
       RAMULATOR_DECLARE_SPECS();
+      // RD16/WR16 need CAS-sync depending on the clock (see set_preqs)
+      m_clock_dependent_preqs = true;
       set_organization();
       set_timing_vals();
 
@@ -163,6 +165,11 @@ class LPDDR5 : public IDRAM, public Implementation {
       m_channels[channel_id]->update_states(command, addr_vec, m_clk);
     };
 
+    void warm_command(int command, const AddrVec_t& addr_vec) override {
+      int channel_id = addr_vec[m_levels["channel"]];
+      m_channels[channel_id]->update_states(command, addr_vec, m_clk);
+    };
+
     int get_preq_command(int command, const AddrVec_t& addr_vec) override {
       int channel_id = addr_vec[m_levels["channel"]];
       return m_channels[channel_id]->get_preq_command(command, addr_vec, m_clk);
@@ -20,6 +20,7 @@ class IDRAMController : public Clocked<IDRAMController> {
   RAMULATOR_REGISTER_INTERFACE(IDRAMController, "Controller", "Memory Controller Interface");
 
   public:
+    IMemorySystem* m_memory_system = nullptr;    // Notified of the served requests
     IDRAM*  m_dram = nullptr;          
     IScheduler*   m_scheduler = nullptr;
     IRefreshManager*   m_refresh = nullptr;
@@ -46,6 +47,25 @@ class IDRAMController : public Clocked<IDRAMController> {
      * 
      */
     virtual void tick() = 0;
+
+    /**
+     * @brief       Functionally applies the request to the bank and row-buffer states of the device, without simulating its timing.
+     *
+     * @details
+     * Used to warm up the device between the detailed intervals of a sampled simulation, while the controller is idle.
+     *
+     */
+    virtual void warm(Request& req) {
+      throw ConfigurationError("Controller {} does not support functional warming!", m_impl->get_name());
+    };
+
+    /**
+     * @brief       Replaces all plugins with the ones in plugin_configs (e.g., when forking variants from a warmed-up simulation).
+     * 
+     */
+    virtual void replace_plugins(const YAML::Node& plugin_configs, IFrontEnd* frontend, IMemorySystem* memory_system) {
+      throw ConfigurationError("Controller {} does not support replacing its plugins!", m_impl->get_name());
+    };
    
 };
 
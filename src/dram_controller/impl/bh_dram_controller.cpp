@@ -4,6 +4,7 @@
 #include "frontend/impl/processor/bhO3/bhllc.h"
 #include "frontend/impl/processor/bhO3/bhO3.h"
 #include "dram_controller/impl/plugin/blockhammer/blockhammer.h"
+#include "base/profiler.h"
 
 namespace Ramulator {
 
@@ -63,6 +64,7 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
 
     void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
       m_llc = static_cast<BHO3*>(frontend)->get_llc();
+      m_memory_system = memory_system;
       m_dram = memory_system->get_ifce<IDRAM>();
       m_rank_addr_idx = m_dram->m_levels("rank");
       m_bankgroup_addr_idx = m_dram->m_levels("bankgroup");
@@ -89,6 +91,7 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
     };
 
     bool send(Request& req) override {
+      RAMULATOR_PROFILE(this, "send");
       req.final_command = m_dram->m_request_translations(req.type_id);
       
       // Forward existing write requests to incoming read requests
@@ -123,6 +126,22 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
       return true;
     };
 
+    void replace_plugins(const YAML::Node& plugin_configs, IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      // The old plugins are detached but not destroyed: their buffered output (e.g., open log files) belongs to the process we were forked from.
+      for (auto plugin : m_plugins) {
+        remove_child(plugin->m_impl);
+      }
+      m_plugins.clear();
+
+      for (YAML::const_iterator it = plugin_configs.begin(); it != plugin_configs.end(); ++it) {
+        IControllerPlugin* plugin = create_child_ifce<IControllerPlugin>(*it);
+        plugin->m_impl->setup(frontend, memory_system);
+        // Bring the new plugin to the current cycle, as if it had been idle since the start (it holds no state yet, so the periodic resets it skips change nothing)
+        plugin->skip_ticks(m_clk);
+        m_plugins.push_back(plugin);
+      }
+    };
+
     bool priority_send(Request& req) override {
       req.final_command = m_dram->m_request_translations(req.type_id);
 
@@ -134,25 +153,42 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
     void tick() override {
       m_clk++;
       // 1. Serve completed reads
-      serve_completed_reads();
+      {
+        RAMULATOR_PROFILE(this, "serve_completed");
+        serve_completed_reads();
+      }
 
-      m_refresh->tick();
-      m_scheduler->tick();
+      {
+        RAMULATOR_PROFILE(m_refresh->m_impl, "tick");
+        m_refresh->tick();
+      }
+      {
+        RAMULATOR_PROFILE(m_scheduler->m_impl, "tick");
+        m_scheduler->tick();
+      }
 
       // 2. Try to find a request to serve.
       ReqBuffer::iterator req_it;
       ReqBuffer* buffer = nullptr;
-      bool request_found = schedule_request(req_it, buffer);
+      bool request_found = false;
+      {
+        RAMULATOR_PROFILE(m_scheduler->m_impl, "schedule");
+        request_found = schedule_request(req_it, buffer);
+      }
 
       // 3. Update all plugins
       for (auto plugin : m_plugins) {
+        RAMULATOR_PROFILE(plugin->m_impl, "update");
         plugin->update(request_found, req_it);
       }
 
       // 4. Finally, issue the commands to serve the request
       if (request_found) {
         // If we find a real request to serve
-        m_dram->issue_command(req_it->command, req_it->addr_vec);
+        {
+          RAMULATOR_PROFILE(m_dram->m_impl, "issue_command");
+          m_dram->issue_command(req_it->command, req_it->addr_vec);
+        }
 
         // If we are issuing the last command, set depart clock cycle and move the request to the pending queue
         if (req_it->command == req_it->final_command) {
@@ -179,7 +215,7 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
      * @details
      * This function is called at the beginning of the tick() function.
      * It checks the pending queue to see if the top request has received data from DRAM.
-     * If so, it finishes this request by calling its callback and poping it from the pending queue.
+     * If so, it finishes this request by notifying its sender and poping it from the pending queue.
      */
     void serve_completed_reads() {
       if (pending.size()) {
@@ -192,9 +228,9 @@ class BHDRAMController final : public IBHDRAMController, public Implementation {
             // TODO add the stats back
           }
 
-          if (req.callback) {
-            // If the request comes from outside (e.g., processor), call its callback
-            req.callback(req);
+          if (req.callback_id >= 0) {
+            // If the request comes from outside (e.g., processor), notify its sender
+            m_memory_system->complete(req);
           }
           // Finally, remove this request from the pending queue
           pending.pop_front();
@@ -1,4 +1,5 @@
 #include "dram_controller/controller.h"
+#include "memory_system/memory_system.h"
 
 namespace Ramulator {
 
@@ -10,17 +11,17 @@ class DummyController final : public IDRAMController, public Implementation {
       return;
     };
 
+    void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      m_memory_system = memory_system;
+    };
+
     bool send(Request& req) override {
-      if (req.callback) {
-        req.callback(req);
-      }
+      m_memory_system->complete(req);
       return true; 
     };
 
     bool priority_send(Request& req) override {
-      if (req.callback) {
-        req.callback(req);
-      }
+      m_memory_system->complete(req);
       return true; 
     };
 
@@ -1,5 +1,6 @@
 #include "dram_controller/controller.h"
 #include "memory_system/memory_system.h"
+#include "base/profiler.h"
 
 namespace Ramulator {
 
@@ -44,12 +45,14 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
     };
 
     void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      m_memory_system = memory_system;
       m_dram = memory_system->get_ifce<IDRAM>();
       m_row_addr_idx = m_dram->m_levels("row");
       m_priority_buffer.max_size = 512*3 + 32;
     };
 
     bool send(Request& req) override {
+      RAMULATOR_PROFILE(this, "send");
       req.final_command = m_dram->m_request_translations(req.type_id);
 
       // Forward existing write requests to incoming read requests
@@ -59,6 +62,7 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
         };
         if (std::find_if(m_write_buffer.begin(), m_write_buffer.end(), compare_addr) != m_write_buffer.end()) {
           // The request will depart at the next cycle
+          req.arrive = m_clk;
           req.depart = m_clk + 1;
           pending.push_back(req);
           return true;
@@ -84,6 +88,22 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
       return true;
     };
 
+    void replace_plugins(const YAML::Node& plugin_configs, IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      // The old plugins are detached but not destroyed: their buffered output (e.g., open log files) belongs to the process we were forked from.
+      for (auto plugin : m_plugins) {
+        remove_child(plugin->m_impl);
+      }
+      m_plugins.clear();
+
+      for (YAML::const_iterator it = plugin_configs.begin(); it != plugin_configs.end(); ++it) {
+        IControllerPlugin* plugin = create_child_ifce<IControllerPlugin>(*it);
+        plugin->m_impl->setup(frontend, memory_system);
+        // Bring the new plugin to the current cycle, as if it had been idle since the start (it holds no state yet, so the periodic resets it skips change nothing)
+        plugin->skip_ticks(m_clk);
+        m_plugins.push_back(plugin);
+      }
+    };
+
     bool priority_send(Request& req) override {
       req.final_command = m_dram->m_request_translations(req.type_id);
 
@@ -92,22 +112,74 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
       return is_success;
     }
 
+    void warm(Request& req) override {
+      req.final_command = m_dram->m_request_translations(req.type_id);
+
+      // Apply the prerequisites (e.g., PRE, ACT) of the request like an open-row policy would, but stop before accessing
+      // or refreshing anything. The number of steps is bounded since some prerequisites can depend on the clock.
+      int command = m_dram->get_preq_command(req.final_command, req.addr_vec);
+      for (size_t i = 0; command != req.final_command && i < m_dram->m_commands.size(); i++) {
+        auto& meta = m_dram->m_command_meta(command);
+        if (meta.is_accessing || meta.is_refreshing) {
+          break;
+        }
+        m_dram->warm_command(command, req.addr_vec);
+        // The cached evaluations of the scheduler may depend on the states we just changed
+        m_scheduler->notify_issued(command, req.addr_vec);
+        command = m_dram->get_preq_command(req.final_command, req.addr_vec);
+      }
+    };
+
+    Clk_t get_idle_ticks() override {
+      // Only the refresh manager and the plugins can make an empty controller do something
+      if (pending.size() || pending_write.size() || m_active_buffer.size() || m_priority_buffer.size() ||
+          m_read_buffer.size() || m_write_buffer.size()) {
+        return 0;
+      }
+      Clk_t idle_ticks = m_refresh->get_idle_ticks();
+      for (auto plugin : m_plugins) {
+        idle_ticks = std::min(idle_ticks, plugin->get_idle_ticks());
+      }
+      return idle_ticks;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+      m_refresh->skip_ticks(num_ticks);
+      // The only state an idle tick changes (after the first idle tick the controller stays in write mode)
+      set_write_mode();
+      for (auto plugin : m_plugins) {
+        plugin->skip_ticks(num_ticks);
+      }
+    };
+
     void tick() override {
       m_clk++;
 
       // 1. Serve completed reads and writes.
-      serve_completed_reads();
-      serve_completed_writes();
+      {
+        RAMULATOR_PROFILE(this, "serve_completed");
+        serve_completed_reads();
+        serve_completed_writes();
+      }
 
-      m_refresh->tick();
+      {
+        RAMULATOR_PROFILE(m_refresh->m_impl, "tick");
+        m_refresh->tick();
+      }
 
       // 2. Try to find a request to serve.
       ReqBuffer::iterator req_it;
       ReqBuffer* buffer = nullptr;
-      bool request_found = schedule_request(req_it, buffer);
+      bool request_found = false;
+      {
+        RAMULATOR_PROFILE(m_scheduler->m_impl, "schedule");
+        request_found = schedule_request(req_it, buffer);
+      }
 
       // 3. Update all plugins
       for (auto plugin : m_plugins) {
+        RAMULATOR_PROFILE(plugin->m_impl, "update");
         plugin->update(request_found, req_it);
       }
 
@@ -119,7 +191,11 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
           req_it->first_scheduled = m_clk;
         }
         // If we find a real request to serve
-        m_dram->issue_command(req_it->command, req_it->addr_vec);
+        {
+          RAMULATOR_PROFILE(m_dram->m_impl, "issue_command");
+          m_dram->issue_command(req_it->command, req_it->addr_vec);
+        }
+        m_scheduler->notify_issued(req_it->command, req_it->addr_vec);
 
         // If we are issuing the last command, set depart clock cycle and move the request to the pending queue
         if (req_it->command == req_it->final_command) {
@@ -150,7 +226,7 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
      * @details
      * This function is called at the beginning of the tick() function.
      * It checks the pending queue to see if the top request has received data from DRAM.
-     * If so, it finishes this request by calling its callback and poping it from the pending queue.
+     * If so, it finishes this request by notifying its sender and poping it from the pending queue.
      */
     void serve_completed_reads() {
       if (pending.size()) {
@@ -164,9 +240,9 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
 
           }
 
-          if (req.callback) {
-            // If the request comes from outside (e.g., processor), call its callback
-            req.callback(req);
+          if (req.callback_id >= 0) {
+            // If the request comes from outside (e.g., processor), notify its sender
+            m_memory_system->complete(req);
           }
           // Finally, remove this request from the pending queue
           pending.pop_front();
@@ -179,7 +255,7 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
      * @details
      * This function is called at the beginning of the tick() function.
      * It checks the pending queue to see if the top request has sent data to DRAM.
-     * If so, it finishes this request by calling its callback and poping it from the pending queue.
+     * If so, it finishes this request by notifying its sender and poping it from the pending queue.
      */
     void serve_completed_writes() {
       if (pending_write.size()) {
@@ -191,9 +267,9 @@ class GenericDRAMController final : public IDRAMController, public Implementatio
             // TODO add the stats back
           }
 
-          if (req.callback) {
-            // If the request comes from outside (e.g., processor), call its callback
-            req.callback(req);
+          if (req.callback_id >= 0) {
+            // If the request comes from outside (e.g., processor), notify its sender
+            m_memory_system->complete(req);
           }
           pending_write.pop_front();
         }
@@ -85,6 +85,19 @@ class BlockHammer : public IControllerPlugin, public Implementation, public IBlo
       }
       return m_filters[flat_bank_id];
     }
+
+    // Advances the history buffers, the filter epochs and the throttler by one cycle
+    void tick() {
+      m_clk++;
+
+      for (int i = 0; i < m_num_ranks; i++) {
+        m_histbufs[i]->update();
+      }
+      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
+        m_filters[i]->update();
+      }
+      m_attack_throttler->update();
+    }
   
   public:
     void init() override {
@@ -186,16 +199,14 @@ class BlockHammer : public IControllerPlugin, public Implementation, public IBlo
       }
     }
 
-    void update(bool request_found, ReqBuffer::iterator& req_it) override {
-      m_clk++;
-
-      for (int i = 0; i < m_num_ranks; i++) {
-        m_histbufs[i]->update();
+    void skip_ticks(Clk_t num_ticks) override {
+      for (Clk_t i = 0; i < num_ticks; i++) {
+        tick();
       }
-      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-        m_filters[i]->update();
-      }
-      m_attack_throttler->update();
+    };
+
+    void update(bool request_found, ReqBuffer::iterator& req_it) override {
+      tick();
 
       // Nothing to do if we don't have a request.
       if (!request_found) {
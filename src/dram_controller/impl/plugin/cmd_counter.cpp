@@ -27,11 +27,13 @@ class CommandCounter : public IControllerPlugin, public Implementation {
     void init() override { 
       m_commands_to_count = param<std::vector<std::string>>("commands_to_count").desc("A list of commands to be counted").required();
 
-      m_save_path = param<std::string>("path").desc("Path to the trace file").required();
-      auto parent_path = m_save_path.parent_path();
-      std::filesystem::create_directories(parent_path);
-      if (!(std::filesystem::exists(parent_path) && std::filesystem::is_directory(parent_path))) {
-        throw ConfigurationError("Invalid path to trace file: {}", parent_path.string());
+      m_save_path = param<std::string>("path").desc("Path to the command count file. The counts are always reported as stats.").default_val("");
+      if (!m_save_path.empty()) {
+        auto parent_path = m_save_path.parent_path();
+        std::filesystem::create_directories(parent_path);
+        if (!(std::filesystem::exists(parent_path) && std::filesystem::is_directory(parent_path))) {
+          throw ConfigurationError("Invalid path to trace file: {}", parent_path.string());
+        }
       }
     };
 
@@ -44,9 +46,14 @@ class CommandCounter : public IControllerPlugin, public Implementation {
           throw ConfigurationError("Command {} does not exist in the DRAM standard {}!", command_name, m_dram->get_name());
         }
         m_command_counters[m_dram->m_commands(command_name)] = 0;
+        register_stat(m_command_counters[m_dram->m_commands(command_name)]).name("num_{}_commands", command_name);
       }
     };
 
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
       if (request_found) {
         m_command_counters[req_it->command]++;
@@ -54,6 +61,9 @@ class CommandCounter : public IControllerPlugin, public Implementation {
     };
 
     void finalize() override {
+      if (m_save_path.empty()) {
+        return;
+      }
       std::ofstream output(m_save_path);
       for (const auto& [cmd_id, count] : m_command_counters) {
         output << fmt::format("{:<6}: {}", m_dram->m_commands(cmd_id), count) << std::endl;
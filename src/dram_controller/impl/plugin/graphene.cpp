@@ -33,17 +33,44 @@ class Graphene : public IControllerPlugin, public Implementation {
     int m_num_banks_per_rank = -1;
     int m_num_rows_per_bank = -1;
 
+    // When a row that is not in the table is activated, Graphene replaces an entry whose count equals the spillover
+    // counter. Any such entry is a valid choice; we pick the one the original per-bank std::unordered_map<int, int>
+    // table found first when iterating over it, so that the mitigation decisions do not change. libstdc++ inserts a
+    // key at the front of its bucket, or at the front of the whole table if the bucket is empty, so the iteration
+    // order only depends on when every key and its bucket were inserted: a later (bucket_stamp, stamp) comes first.
+    struct TableEntry {
+      int row = -1;            // The initial entries (never activated) have negative rows
+      int count = 0;
+      int heap_pos = -1;
+      int64_t bucket_stamp = 0;
+      int64_t stamp = 0;
+    };
+
+    struct BankTable {
+      std::vector<TableEntry> entries;
+      // Entry indices, a binary min-heap of (count, iteration order): heap[0] is the entry to replace if its count
+      // equals the spillover counter, otherwise no entry can be replaced
+      std::vector<int> heap;
+      std::vector<int> entry_of_row;      // -1 if the row is not in the table
+      std::vector<int64_t> bucket_stamps;
+      std::vector<int> bucket_sizes;
+      int spillover_counter = 0;
+      int reset_epoch = 0;                // The counts are reset lazily, on the first activation after a reset
+    };
+
     // per bank activation count table
     // indexed using flattened <rank id, bank id>
     // e.g., if rank 0, bank 4, index is 4
     // if rank 1, bank 5, index is 16 (assuming 16 banks/rank) + 5
-    std::vector<std::unordered_map<int, int>> m_activation_count_table;
-    // spillover counter per bank
-    std::vector<int> m_spillover_counter;
+    std::vector<BankTable> m_activation_count_table;
+    // Gives the bucket of every row in the original table layout
+    std::unordered_map<int, int> m_table_layout;
+    int64_t m_last_stamp = 0;
+    int m_reset_epoch = 0;
 
 
   public:
-    void init() override { 
+    void init() override {
       m_num_table_entries = param<int>("num_table_entries").required();
       m_activation_threshold = param<int>("activation_threshold").required();
       m_reset_period_ns = param<int>("reset_period_ns").required();
@@ -67,22 +94,40 @@ class Graphene : public IControllerPlugin, public Implementation {
       m_row_level = m_dram->m_levels("row");
 
       m_num_ranks = m_dram->get_level_size("rank");
-      m_num_banks_per_rank = m_dram->get_level_size("bankgroup") == -1 ? 
-                             m_dram->get_level_size("bank") : 
+      m_num_banks_per_rank = m_dram->get_level_size("bankgroup") == -1 ?
+                             m_dram->get_level_size("bank") :
                              m_dram->get_level_size("bankgroup") * m_dram->get_level_size("bank");
       m_num_rows_per_bank = m_dram->get_level_size("row");
 
-      // Initialize bank act count tables
-      for (int i = 0; i < m_num_banks_per_rank * m_num_ranks; i++) {
-        std::unordered_map<int, int> table;
-        for (int j = -m_num_rows_per_bank; j < -m_num_rows_per_bank + m_num_table_entries; j++) {
-          table.insert(std::make_pair(j, 0));
+      // The table starts with num_table_entries placeholder rows, in the layout the original table had after inserting them
+      for (int j = -m_num_rows_per_bank; j < -m_num_rows_per_bank + m_num_table_entries; j++) {
+        m_table_layout.insert(std::make_pair(j, 0));
+      }
+      BankTable table;
+      table.entry_of_row.resize(m_num_rows_per_bank, -1);
+      table.bucket_stamps.resize(m_table_layout.bucket_count(), 0);
+      table.bucket_sizes.resize(m_table_layout.bucket_count(), 0);
+      int64_t stamp = 0;
+      for (const auto& [row, count] : m_table_layout) {
+        size_t bucket = m_table_layout.bucket(row);
+        if (table.bucket_sizes[bucket]++ == 0) {
+          table.bucket_stamps[bucket] = stamp;
         }
-        m_activation_count_table.push_back(table);
+        table.entries.push_back({row, 0, -1, table.bucket_stamps[bucket], stamp--});
       }
+      build_heap(table);
+
+      // Initialize bank act count tables
+      m_activation_count_table.resize(m_num_banks_per_rank * m_num_ranks, table);
+    };
+
+    Clk_t get_idle_ticks() override {
+      // Idle until the next reset
+      return m_reset_period_clk - ((m_clk % m_reset_period_clk) + m_reset_period_clk) % m_reset_period_clk - 1;
+    };
 
-      // Initialize spillover counter
-      m_spillover_counter = std::vector<int>(m_num_banks_per_rank * m_num_ranks, 0);
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
     };
 
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
@@ -91,11 +136,7 @@ class Graphene : public IControllerPlugin, public Implementation {
 
       if (m_clk % m_reset_period_clk == 0) {
         // Reset
-        for (int i = 0; i < m_num_banks_per_rank * m_num_ranks; i++) {
-          for (auto it = m_activation_count_table[i].begin(); it != m_activation_count_table[i].end(); it++)
-            it->second = 0;
-          m_spillover_counter[i] = 0;
-        }
+        m_reset_epoch++;
       }
 
       if (request_found) {
@@ -106,7 +147,7 @@ class Graphene : public IControllerPlugin, public Implementation {
             accumulated_dimension *= m_dram->m_organization.count[i + 1];
             flat_bank_id += req_it->addr_vec[i] * accumulated_dimension;
           }
-          
+
           int row_id = req_it->addr_vec[m_row_level];
 
           if (m_is_debug) {
@@ -117,68 +158,130 @@ class Graphene : public IControllerPlugin, public Implementation {
             std::cout << "  └  " << "index: " << flat_bank_id << std::endl;
           }
 
-          if (m_activation_count_table[flat_bank_id].find(row_id) == m_activation_count_table[flat_bank_id].end()) {
-            // if row is not in the table, find an entry 
-            // with a count equal to that of the spillover counter
-            bool found = false;
-            int to_remove = -1;
-            int spillover_value = -1;
-
-            for (auto it = m_activation_count_table[flat_bank_id].begin(); it != m_activation_count_table[flat_bank_id].end(); it++) {
-              if (m_is_debug)
-                std::cout << "  └  " << "checking row " << it->first << " with count " << it->second << std::endl;
-
-              if (it->second == m_spillover_counter[flat_bank_id]) {
-                // if we find an entry, record it
-                spillover_value = it->second;
-                to_remove = it->first;
-                found = true;
-                break;
-              }
+          BankTable& table = m_activation_count_table[flat_bank_id];
+          if (table.reset_epoch != m_reset_epoch) {
+            for (auto& entry : table.entries) {
+              entry.count = 0;
             }
-            if (found) {
+            table.spillover_counter = 0;
+            table.reset_epoch = m_reset_epoch;
+            build_heap(table);
+          }
+
+          int entry_id = table.entry_of_row[row_id];
+          if (entry_id == -1) {
+            // if row is not in the table, find an entry
+            // with a count equal to that of the spillover counter
+            TableEntry& entry = table.entries[table.heap[0]];
+            if (entry.count == table.spillover_counter) {
               // for debug
               if (m_is_debug) {
                 // print the row that is being removed
-                std::cout << "Removing row " << to_remove << " from table " << flat_bank_id << std::endl;
+                std::cout << "Removing row " << entry.row << " from table " << flat_bank_id << std::endl;
                 // print the row that is being added
                 std::cout << "Adding row " << row_id << " to table " << flat_bank_id << std::endl;
-                std::cout << "  └  " << "spillover counter: " << m_spillover_counter[flat_bank_id] << std::endl;
+                std::cout << "  └  " << "spillover counter: " << table.spillover_counter << std::endl;
               }
-              // remove to_remove from the table
-              m_activation_count_table[flat_bank_id].erase(to_remove);
+              // remove the entry's row from the table
+              if (entry.row >= 0) {
+                table.entry_of_row[entry.row] = -1;
+              }
+              table.bucket_sizes[m_table_layout.bucket(entry.row)]--;
               // add row_id to the table
-              m_activation_count_table[flat_bank_id][row_id] = spillover_value + 1;
+              size_t bucket = m_table_layout.bucket(row_id);
+              if (table.bucket_sizes[bucket]++ == 0) {
+                table.bucket_stamps[bucket] = ++m_last_stamp;
+              }
+              entry.row = row_id;
+              entry.count = table.spillover_counter + 1;
+              entry.bucket_stamp = table.bucket_stamps[bucket];
+              entry.stamp = ++m_last_stamp;
+              table.entry_of_row[row_id] = table.heap[0];
+              sift_down(table, 0);
             }
             // if we did not find such an entry, increment spillover counter by one
             else {
-              m_spillover_counter[flat_bank_id] += 1;
+              table.spillover_counter += 1;
             }
           }
           else {
             // if row in table, increment its activation count
-            m_activation_count_table[flat_bank_id][row_id] += 1;
-            
+            TableEntry& entry = table.entries[entry_id];
+            entry.count += 1;
+            sift_down(table, entry.heap_pos);
+
             if (m_is_debug) {
               std::cout << "Row " << row_id << " in table[" << flat_bank_id << "]" << std::endl;
               std::cout << "  └  " << "threshold: " << m_activation_threshold << std::endl;
-              std::cout << "  └  " << "count: " << m_activation_count_table[flat_bank_id][row_id] << std::endl;
+              std::cout << "  └  " << "count: " << entry.count << std::endl;
             }
 
             // check if the count exceeds the threshold
-            if (m_activation_count_table[flat_bank_id][row_id] >= m_activation_threshold) {
+            if (entry.count >= m_activation_threshold) {
               if (m_is_debug) {
                 std::cout << "Row " << row_id << " in table " << flat_bank_id << " has exceeded the threshold!" << std::endl;
               }
               // if yes, schedule preventive refreshes
               Request vrr_req(req_it->addr_vec, m_VRR_req_id);
               m_ctrl->priority_send(vrr_req);
-              m_activation_count_table[flat_bank_id][row_id] = m_spillover_counter[flat_bank_id];
+              entry.count = table.spillover_counter;
+              sift_up(table, entry.heap_pos);
             }
           }
         }
       }
     }
+
+  private:
+    bool is_before(const BankTable& table, int entry_id_1, int entry_id_2) const {
+      const TableEntry& e1 = table.entries[entry_id_1];
+      const TableEntry& e2 = table.entries[entry_id_2];
+      if (e1.count != e2.count) {
+        return e1.count < e2.count;
+      }
+      return std::make_pair(e1.bucket_stamp, e1.stamp) > std::make_pair(e2.bucket_stamp, e2.stamp);
+    };
+
+    void swap_heap_entries(BankTable& table, int pos_1, int pos_2) {
+      std::swap(table.heap[pos_1], table.heap[pos_2]);
+      table.entries[table.heap[pos_1]].heap_pos = pos_1;
+      table.entries[table.heap[pos_2]].heap_pos = pos_2;
+    };
+
+    void sift_up(BankTable& table, int pos) {
+      while (pos > 0 && is_before(table, table.heap[pos], table.heap[(pos - 1) / 2])) {
+        swap_heap_entries(table, pos, (pos - 1) / 2);
+        pos = (pos - 1) / 2;
+      }
+    };
+
+    void sift_down(BankTable& table, int pos) {
+      int size = table.heap.size();
+      while (true) {
+        int first = pos;
+        for (int child = 2 * pos + 1; child <= 2 * pos + 2 && child < size; child++) {
+          if (is_before(table, table.heap[child], table.heap[first])) {
+            first = child;
+          }
+        }
+        if (first == pos) {
+          return;
+        }
+        swap_heap_entries(table, pos, first);
+        pos = first;
+      }
+    };
+
+    void build_heap(BankTable& table) {
+      table.heap.resize(table.entries.size());
+      for (int i = 0; i < table.heap.size(); i++) {
+        table.heap[i] = i;
+        table.entries[i].heap_pos = i;
+      }
+      for (int pos = table.heap.size() / 2 - 1; pos >= 0; pos--) {
+        sift_down(table, pos);
+      }
+    };
 };
 
-}       // namespace Ramulator
+}       // namespace Ramulator
\ No newline at end of file
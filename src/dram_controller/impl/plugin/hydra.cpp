@@ -23,11 +23,18 @@ class Hydra : public IControllerPlugin, public Implementation {
     IAddrMapper* m_addr_mapper = nullptr;
 
     struct GCT_Entry {
-      int group_count;
-      bool initialized;
+      int group_count = 0;
+      bool initialized = false;
+      int reset_epoch = -1;   // The entry is only valid in this reset period (absent otherwise)
+    };
+
+    struct Counter {
+      int count = 0;
+      int reset_epoch = -1;   // The counter is only valid in this reset period (zero otherwise)
     };
 
     int m_clk = -1;
+    int m_reset_epoch = 0;
 
     // input parameters
     int m_tracking_threshold = -1;
@@ -75,12 +82,12 @@ class Hydra : public IControllerPlugin, public Implementation {
     // the second index is the row group id
     // each entry has a group counter and a flag indicating if the group counter has beed initialized
     // the row group id uses the most significant bits of the row id
-    std::vector<std::unordered_map<Addr_t, GCT_Entry>> group_count_table;
+    std::vector<std::vector<GCT_Entry>> group_count_table;
     // per bank RCT,
     // the first index is the flat bank id
     // the second index is the row id
     // each entry has a row counter
-    std::vector<std::unordered_map<Addr_t, int>> row_count_table;
+    std::vector<std::vector<Counter>> row_count_table;
     // per rank RCC,
     // a 16-set associative cache
     // the first index is the rank id
@@ -91,9 +98,9 @@ class Hydra : public IControllerPlugin, public Implementation {
     std::vector<std::vector<std::unordered_map<Addr_t, int>>> row_count_cache;
     // per bank RCT count table,
     // the first index is the flat bank id
-    // the second index is the row id
+    // the second index is the row id (only the rows that store the RCT)
     // each entry has a row counter
-    std::vector<std::unordered_map<Addr_t, int>> rct_count_table;
+    std::vector<std::vector<Counter>> rct_count_table;
 
     // rng for random policy
     std::mt19937 generator;
@@ -177,10 +184,8 @@ class Hydra : public IControllerPlugin, public Implementation {
       m_group_rct_cl_size = m_row_group_size * m_counter_bits / 512;
 
       // Initialize tables
-      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-        std::unordered_map<Addr_t, GCT_Entry> gct_bank;
-        group_count_table.push_back(gct_bank);
-      }
+      // The per bank tables are flat arrays, whose entries are reset by incrementing m_reset_epoch
+      group_count_table.resize(m_num_ranks * m_num_banks_per_rank, std::vector<GCT_Entry>(m_gct_entries_per_bank));
 
       for (int i = 0; i < m_num_ranks; i++) {
         std::vector<std::unordered_map<Addr_t, int>> rcc_rank;
@@ -191,16 +196,8 @@ class Hydra : public IControllerPlugin, public Implementation {
         row_count_cache.push_back(rcc_rank);
       }
       
-      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-        std::unordered_map<Addr_t, int> row_count_table_bank;
-        row_count_table.push_back(row_count_table_bank);
-      }
-
-      rct_count_table.resize(m_num_ranks * m_num_banks_per_rank);
-      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-        std::unordered_map<Addr_t, int> rctct_bank;
-        rct_count_table.push_back(rctct_bank);
-      }
+      row_count_table.resize(m_num_ranks * m_num_banks_per_rank, std::vector<Counter>(m_num_rows_per_bank));
+      rct_count_table.resize(m_num_ranks * m_num_banks_per_rank, std::vector<Counter>(m_total_rct_row_size));
 
       if (m_is_debug) {
         std::cout << "------------------------------------" << std::endl
@@ -251,24 +248,26 @@ class Hydra : public IControllerPlugin, public Implementation {
       distribution = std::uniform_int_distribution<int>(0, 15);
     };
 
+    Clk_t get_idle_ticks() override {
+      // Idle until the next reset
+      return m_reset_period_clk - ((m_clk % m_reset_period_clk) + m_reset_period_clk) % m_reset_period_clk - 1;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
 
       m_clk++;
       if (m_clk % m_reset_period_clk == 0) {
-        for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-          group_count_table[i].clear();
-        }
-        for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-          row_count_table[i].clear();
-        }
+        // Invalidates all GCT, RCT and RCT count table entries
+        m_reset_epoch++;
         for (int i = 0; i < m_num_ranks; i++) {
           for (int j = 0 ; j < m_rcc_set_num; j++){
             row_count_cache[i][j].clear();
           }
         }
-        for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-          rct_count_table[i].clear();
-        }
         if (m_is_debug) {
           std::cout << "----------------------------------" << std::endl;
           std::cout << "Hydra: Reset all tables (" << m_clk << ")" << std::endl;
@@ -307,17 +306,15 @@ class Hydra : public IControllerPlugin, public Implementation {
           // if the row is in the RCT rows, use RCT_count_table
           if (row_id < m_total_rct_row_size){
             // increment RCT_count_table
-            if (rct_count_table[flat_bank_id].find(row_id) == rct_count_table[flat_bank_id].end()){
-              rct_count_table[flat_bank_id][row_id] = 0;
-            }
-            rct_count_table[flat_bank_id][row_id]++;
+            int& rct_count = get_counter(rct_count_table[flat_bank_id][row_id]);
+            rct_count++;
             if (m_is_debug) {
               std::cout << "Hydra: Row in RCT rows" << std::endl;
-              std::cout << "Hydra: RCT_count_table incremented (" << rct_count_table[flat_bank_id][row_id] << ")" << std::endl;
+              std::cout << "Hydra: RCT_count_table incremented (" << rct_count << ")" << std::endl;
             }
             // check rct_count_table
             s_rctct_check++;
-            if (rct_count_table[flat_bank_id][row_id] >= m_tracking_threshold){
+            if (rct_count >= m_tracking_threshold){
               if (m_is_debug) {
                 std::cout << "Hydra: RCT_count_table above threshold, issue VRR, reset counter" << std::endl;
               }
@@ -327,7 +324,7 @@ class Hydra : public IControllerPlugin, public Implementation {
               s_num_vrr_rct++;
               s_num_vrr++;
               // reset rcc
-              rct_count_table[flat_bank_id].erase(row_id);
+              rct_count = 0;
             } else {
               if (m_is_debug) {
                 std::cout << "Hydra: RCT_count_table below threshold, do nothing" << std::endl;
@@ -339,32 +336,30 @@ class Hydra : public IControllerPlugin, public Implementation {
           // check gct
           s_gct_check++;
 
-          if (group_count_table[flat_bank_id].find(gct_index) == group_count_table[flat_bank_id].end()) {
-            GCT_Entry new_group_entry;
-            new_group_entry.group_count = 0;
-            new_group_entry.initialized = false;
-            group_count_table[flat_bank_id][gct_index] = new_group_entry;
+          GCT_Entry& group_entry = group_count_table[flat_bank_id][gct_index];
+          if (group_entry.reset_epoch != m_reset_epoch) {
+            group_entry = {0, false, m_reset_epoch};
           }
 
-          if (group_count_table[flat_bank_id][gct_index].group_count >= m_group_threshold){
+          if (group_entry.group_count >= m_group_threshold){
             if (m_is_debug) {
               std::cout << "Hydra: Checking GCT" << std::endl;
               std::cout << "Hydra: GCT above threshold " 
-                        << group_count_table[flat_bank_id][gct_index].group_count << std::endl;
+                        << group_entry.group_count << std::endl;
             }
 
-            if (!group_count_table[flat_bank_id][gct_index].initialized){
+            if (!group_entry.initialized){
               if (m_is_debug) {
                 std::cout << "Hydra: Group not initialized" << std::endl;
               }
 
               // initialize rct
-              group_count_table[flat_bank_id][gct_index].initialized = true;
+              group_entry.initialized = true;
               s_num_initialization++;
               int row_group_start_row_id = gct_index * m_row_group_size;
               for (int i = 0; i < m_row_group_size; i++){
                 int row = row_group_start_row_id + i;
-                row_count_table[flat_bank_id][row] = m_group_threshold;
+                get_counter(row_count_table[flat_bank_id][row]) = m_group_threshold;
               }
               // generate write request to DRAM for rct
               for (int i = 0; i < m_group_rct_cl_size; i++){
@@ -461,8 +456,9 @@ class Hydra : public IControllerPlugin, public Implementation {
               s_num_read_req++;
 
               // insert new entry and increment rcc
-              row_count_table[flat_bank_id][row_id]++;
-              row_count_cache[rank_id][rcc_index][rcc_tag] = row_count_table[flat_bank_id][row_id];
+              int& row_count = get_counter(row_count_table[flat_bank_id][row_id]);
+              row_count++;
+              row_count_cache[rank_id][rcc_index][rcc_tag] = row_count;
               
               if (m_is_debug) {
                 std::cout << "Hydra: Generating read request to DRAM for RCT" << std::endl
@@ -473,7 +469,7 @@ class Hydra : public IControllerPlugin, public Implementation {
               }
             } else {
               row_count_cache[rank_id][rcc_index][rcc_tag]++;
-              row_count_table[flat_bank_id][row_id]++;
+              get_counter(row_count_table[flat_bank_id][row_id])++;
               if (m_is_debug) {
                 std::cout << "Hydra: RCC hit" << std::endl;
                 std::cout << "Hydra: RCC incrementing" << std::endl;
@@ -495,7 +491,7 @@ class Hydra : public IControllerPlugin, public Implementation {
               s_num_vrr++;
               // reset rcc
               row_count_cache[rank_id][rcc_index][rcc_tag] = 0;
-              row_count_table[flat_bank_id][row_id] = 0;
+              get_counter(row_count_table[flat_bank_id][row_id]) = 0;
             } else {
               if (m_is_debug) {
                 std::cout << "Hydra: RCC below threshold, do nothing" << std::endl;
@@ -505,15 +501,23 @@ class Hydra : public IControllerPlugin, public Implementation {
           else{
             if (m_is_debug) {
               std::cout << "Hydra: Checking GCT" << std::endl;
-              std::cout << "Hydra: GCT below threshold (" << group_count_table[flat_bank_id][gct_index].group_count << ")" << std::endl;
+              std::cout << "Hydra: GCT below threshold (" << group_entry.group_count << ")" << std::endl;
               std::cout << "Hydra: GCT incrementing" << std::endl;
             }
-            group_count_table[flat_bank_id][gct_index].group_count++;
+            group_entry.group_count++;
           }
         }
       }
     };
 
+    // Value of a counter in the current reset period
+    int& get_counter(Counter& counter) {
+      if (counter.reset_epoch != m_reset_epoch) {
+        counter = {0, m_reset_epoch};
+      }
+      return counter.count;
+    };
+
     std::pair<Addr_t, Addr_t> generate_row_col_id(int row_id) {
       Addr_t rct_row_id = row_id / m_rct_per_row;
       Addr_t rct_col_id = (row_id % m_rct_per_row) * m_counter_bits / 512;
@@ -19,17 +19,20 @@ class InfoRecorder : public IControllerPlugin, public Implementation {
 
     std::vector<std::vector<std::vector<std::vector<int>>>> m_rowhit_cnt;
     int m_rowhit_sum = 0;
+    std::vector<int> s_rowhit_per_bank;   // Flattened <channel, rank, bankgroup, bank> row hit table, filled at finalize
 
     std::filesystem::path m_save_path; 
 
 
   public:
     void init() override { 
-      m_save_path = param<std::string>("path").desc("Path to the output file").required();
-      auto parent_path = m_save_path.parent_path();
-      std::filesystem::create_directories(parent_path);
-      if (!(std::filesystem::exists(parent_path) && std::filesystem::is_directory(parent_path))) {
-        throw ConfigurationError("Invalid path to trace file: {}", parent_path.string());
+      m_save_path = param<std::string>("path").desc("Path to the output file. The row hits are always reported as stats.").default_val("");
+      if (!m_save_path.empty()) {
+        auto parent_path = m_save_path.parent_path();
+        std::filesystem::create_directories(parent_path);
+        if (!(std::filesystem::exists(parent_path) && std::filesystem::is_directory(parent_path))) {
+          throw ConfigurationError("Invalid path to trace file: {}", parent_path.string());
+        }
       }
     };
 
@@ -52,6 +55,13 @@ class InfoRecorder : public IControllerPlugin, public Implementation {
             }
         }
       }
+
+      register_stat(m_rowhit_sum).name("num_row_hits");
+      register_stat(s_rowhit_per_bank).name("num_row_hits_per_bank").desc("Flattened in <channel, rank, bankgroup, bank> order");
+    };
+
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
     };
 
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
@@ -81,6 +91,17 @@ class InfoRecorder : public IControllerPlugin, public Implementation {
     };
 
     void finalize() override {
+      for (const auto& ch : m_rowhit_cnt) {
+        for (const auto& rk : ch) {
+          for (const auto& bg : rk) {
+            s_rowhit_per_bank.insert(s_rowhit_per_bank.end(), bg.begin(), bg.end());
+          }
+        }
+      }
+
+      if (m_save_path.empty()) {
+        return;
+      }
       std::ofstream output(m_save_path);
       output << fmt::format("Total row hit count: {}", m_rowhit_sum) << std::endl;
       if (m_dram->m_levels.contains("bankgroup")) {
@@ -65,6 +65,10 @@ class OracleRH : public IControllerPlugin, public Implementation {
       m_rank_REF_counter.resize(m_num_ranks, 0);
     };
 
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
       if (request_found) {
         if (
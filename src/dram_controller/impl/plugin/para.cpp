@@ -53,6 +53,10 @@ class PARA : public IControllerPlugin, public Implementation {
       m_row_level = m_dram->m_levels("row");
     };
 
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
       if (request_found) {
         if (
@@ -118,6 +118,15 @@ class RRS : public IControllerPlugin, public Implementation {
       }
     };
 
+    Clk_t get_idle_ticks() override {
+      // Idle until the next reset
+      return m_reset_period_clk - ((m_clk % m_reset_period_clk) + m_reset_period_clk) % m_reset_period_clk - 1;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
       // Tick myself
       m_clk++;
@@ -47,6 +47,14 @@ class TraceRecorder : public IControllerPlugin, public Implementation {
       m_tracer->set_level(spdlog::level::trace);      
     };
 
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
       m_clk++;
       if (request_found) {
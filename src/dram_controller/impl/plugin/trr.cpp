@@ -125,6 +125,14 @@ class CounterBasedTRR : public IControllerPlugin, public Implementation {
       // m_RFM_id = m_spec->get_command_defs().get_id_of("RFM");
     };
 
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+    };
+
     void update(bool request_found, ReqBuffer::iterator& req_it) {
       m_clk++;
 
@@ -18,6 +18,12 @@ class TWiCeIdeal : public IControllerPlugin, public Implementation {
     struct TwiCeEntry {
       int act_count = -1;
       int life = -1;
+      int row = -1;
+    };
+
+    struct BankTable {
+      std::vector<TwiCeEntry> entries;    // In no particular order
+      std::vector<int> entry_of_row;      // Index in entries, -1 if the row is not in the table
     };
 
     int m_clk = -1;
@@ -40,7 +46,7 @@ class TWiCeIdeal : public IControllerPlugin, public Implementation {
     // indexed using flattened <rank id, bank id>
     // e.g., if rank 0, bank 4, index is 4
     // if rank 1, bank 5, index is 16 (assuming 16 banks/rank) + 5
-    std::vector<std::unordered_map<Addr_t, TwiCeEntry>> m_twice_table;
+    std::vector<BankTable> m_twice_table;
 
   public:
     void init() override { 
@@ -70,10 +76,17 @@ class TWiCeIdeal : public IControllerPlugin, public Implementation {
       m_num_rows_per_bank = m_dram->get_level_size("row");
 
       // Initialize twice table
-      for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-        std::unordered_map<Addr_t, TwiCeEntry> bank_twice_table;
-        m_twice_table.push_back(bank_twice_table);
-      }
+      BankTable bank_twice_table;
+      bank_twice_table.entry_of_row.resize(m_num_rows_per_bank, -1);
+      m_twice_table.resize(m_num_ranks * m_num_banks_per_rank, bank_twice_table);
+    };
+
+    Clk_t get_idle_ticks() override {
+      return std::numeric_limits<Clk_t>::max();
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
     };
 
     void update(bool request_found, ReqBuffer::iterator& req_it) override {
@@ -88,25 +101,26 @@ class TWiCeIdeal : public IControllerPlugin, public Implementation {
             std::cout << "TWiCeIdeal: Refresh command" << std::endl;
           }
           for (int i = 0; i < m_num_ranks * m_num_banks_per_rank; i++) {
-            std::vector<std::unordered_map<Addr_t, TwiCeEntry>::iterator> to_be_pruned;
-            for (auto it = m_twice_table[i].begin(); it != m_twice_table[i].end(); it++) {
-              if (it->second.act_count < it->second.life * m_twice_pruning_interval_threshold) {
-                // Store the entries to be pruned
-                to_be_pruned.emplace_back(it);
+            BankTable& table = m_twice_table[i];
+            // Compact the entries that are kept to the front of the table
+            int num_kept = 0;
+            for (auto& entry : table.entries) {
+              if (entry.act_count < entry.life * m_twice_pruning_interval_threshold) {
+                table.entry_of_row[entry.row] = -1;
                 if (m_is_debug) {
-                  std::cout << "TWiCeIdeal: Pruned entry " << it->first << " from bank " << i << std::endl;
+                  std::cout << "TWiCeIdeal: Pruned entry " << entry.row << " from bank " << i << std::endl;
                 }
               } else {
                 // Increment the life of the entry
-                it->second.life++;
+                entry.life++;
                 if (m_is_debug) {
-                  std::cout << "TWiCeIdeal: Incremented life of entry " << it->first << " in bank " << i << std::endl;
+                  std::cout << "TWiCeIdeal: Incremented life of entry " << entry.row << " in bank " << i << std::endl;
                 }
+                table.entry_of_row[entry.row] = num_kept;
+                table.entries[num_kept++] = entry;
               }
             }
-            for (auto&& it : to_be_pruned) {
-              m_twice_table[i].erase(it);
-            }
+            table.entries.resize(num_kept);
           }
         } else if (m_dram->m_command_meta(req_it->command).is_opening && m_dram->m_command_scopes(req_it->command) == m_row_level) {
           // Activation command
@@ -127,24 +141,30 @@ class TWiCeIdeal : public IControllerPlugin, public Implementation {
             std::cout << "  └  " << "index: " << flat_bank_id << std::endl;
           }
 
-          if (m_twice_table[flat_bank_id].find(row_id) == m_twice_table[flat_bank_id].end()){
+          BankTable& table = m_twice_table[flat_bank_id];
+          if (table.entry_of_row[row_id] == -1){
             // If row is not in the table, insert it
-            m_twice_table[flat_bank_id].insert(std::make_pair(row_id, TwiCeEntry{1, 0}));
+            table.entry_of_row[row_id] = table.entries.size();
+            table.entries.push_back(TwiCeEntry{1, 0, row_id});
             
             if (m_is_debug) {
               std::cout << "TWiCeIdeal: Inserted row " << row_id << " into bank " << flat_bank_id << std::endl;
             }
           } else {
             // If row is in the table, increment the act count
-            m_twice_table[flat_bank_id][row_id].act_count++;
+            int entry_id = table.entry_of_row[row_id];
+            table.entries[entry_id].act_count++;
 
-            if (m_twice_table[flat_bank_id][row_id].act_count >= m_twice_rh_threshold) {
+            if (table.entries[entry_id].act_count >= m_twice_rh_threshold) {
               // If the act count is greater than the threshold, issue a VRR
               Request vrr_req(req_it->addr_vec, m_VRR_req_id);
               m_ctrl->priority_send(vrr_req);
 
-              auto it = m_twice_table[flat_bank_id].find(row_id);
-              m_twice_table[flat_bank_id].erase(it);
+              // Move the last entry into the erased one
+              table.entries[entry_id] = table.entries.back();
+              table.entry_of_row[table.entries[entry_id].row] = entry_id;
+              table.entries.pop_back();
+              table.entry_of_row[row_id] = -1;
 
               if (m_is_debug) {
                 std::cout << "TWiCeIdeal: VRR on row " << row_id << std::endl;
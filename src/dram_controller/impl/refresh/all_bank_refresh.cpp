@@ -56,6 +56,14 @@ class AllBankRefresh : public IRefreshManager, public Implementation {
       }
     };
 
+    Clk_t get_idle_ticks() override {
+      return m_next_refresh_cycle - m_clk - 1;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+    };
+
 };
 
 }       // namespace Ramulator
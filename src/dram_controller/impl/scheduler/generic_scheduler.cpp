@@ -11,13 +11,67 @@ class FRFCFS : public IScheduler, public Implementation {
   private:
     IDRAM* m_dram;
 
+    int m_group_key_length = -1;
+    int m_bank_level = -1;
+
+    // Every issued command starts a new epoch. The cached readiness of the request groups is valid for one epoch, their
+    // cached command until a command changes the states of their bank (m_bank_epochs, indexed by the flat bank id)
+    uint64_t m_epoch = 1;
+    std::vector<uint64_t> m_bank_epochs;
+    std::vector<AddrVec_t> m_bank_addrs;    // Address of every bank of the channel
+
   public:
     void init() override { };
 
     void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
       m_dram = cast_parent<IDRAMController>()->m_dram;
+      m_group_key_length = m_dram->m_levels("row") + 1;
+      m_bank_level = m_dram->m_levels("bank");
+
+      m_bank_addrs.assign(1, AddrVec_t(m_bank_level + 1, 0));
+      for (int level = 1; level <= m_bank_level; level++) {
+        std::vector<AddrVec_t> bank_addrs;
+        for (const auto& addr : m_bank_addrs) {
+          for (int i = 0; i < m_dram->m_organization.count[level]; i++) {
+            bank_addrs.push_back(addr);
+            bank_addrs.back()[level] = i;
+          }
+        }
+        m_bank_addrs = std::move(bank_addrs);
+      }
+      m_bank_epochs.assign(m_bank_addrs.size(), m_epoch);
+    };
+
+    void notify_issued(int command, const AddrVec_t& addr_vec) override {
+      m_epoch++;
+
+      // Commands scoped at a bank (or below) only change the states of their bank, the others (e.g., PREA, PREsb) can
+      // change those of any bank under the parent of their scope. Levels of the address that are -1 match any bank.
+      int scope = m_dram->m_command_scopes(command);
+      int last_level = scope >= m_bank_level ? m_bank_level : scope - 1;
+      for (size_t bank = 0; bank < m_bank_addrs.size(); bank++) {
+        bool is_affected = true;
+        for (int level = 1; level <= last_level && is_affected; level++) {
+          is_affected = addr_vec[level] < 0 || addr_vec[level] == m_bank_addrs[bank][level];
+        }
+        if (is_affected) {
+          m_bank_epochs[bank] = m_epoch;
+        }
+      }
     };
 
+    // Flat id of the bank of the address in the channel, -1 if the address covers several banks
+    int get_bank_id(const AddrVec_t& addr_vec) {
+      int bank_id = 0;
+      for (int level = 1; level <= m_bank_level; level++) {
+        if (addr_vec[level] < 0) {
+          return -1;
+        }
+        bank_id = bank_id * m_dram->m_organization.count[level] + addr_vec[level];
+      }
+      return bank_id;
+    }
+
     ReqBuffer::iterator compare(ReqBuffer::iterator req1, ReqBuffer::iterator req2) override {
       bool ready1 = m_dram->check_ready(req1->command, req1->addr_vec);
       bool ready2 = m_dram->check_ready(req2->command, req2->addr_vec);
@@ -38,18 +92,71 @@ class FRFCFS : public IScheduler, public Implementation {
       } 
     }
 
+    /**
+     * @brief    Returns the first-come request among the ready ones (or among all if none is ready)
+     * 
+     * @details
+     * Same choice as compare() over the whole buffer, but the requests are grouped by row (see ReqBuffer::Group):
+     * every group is evaluated once. Its command is reused until a command changes the states of its bank, and its
+     * readiness until the next command is issued (it cannot be lost before that), so only the groups that are not
+     * ready yet are checked every cycle, and a command only makes the groups of the banks it affects look up theirs.
+     * 
+     */
     ReqBuffer::iterator get_best_request(ReqBuffer& buffer) override {
       if (buffer.size() == 0) {
         return buffer.end();
       }
 
-      for (auto& req : buffer) {
-        req.command = m_dram->get_preq_command(req.final_command, req.addr_vec);
+      if (buffer.group_key_length < 0) {
+        buffer.enable_groups(m_group_key_length);
       }
 
-      auto candidate = buffer.begin();
-      for (auto next = std::next(buffer.begin(), 1); next != buffer.end(); next++) {
-        candidate = compare(candidate, next);
+      ReqBuffer::iterator candidate = buffer.end();
+      uint64_t candidate_order = 0;
+      bool candidate_ready = false;
+      for (int slot : buffer.live_groups) {
+        auto& group = buffer.groups[slot];
+        auto head = group.head->req;
+        uint64_t order = group.head->order;
+
+        int bank_id = get_bank_id(head->addr_vec);
+        if (bank_id < 0 || group.epoch < m_bank_epochs[bank_id] || m_dram->m_clock_dependent_preqs) {
+          int command = m_dram->get_preq_command(head->final_command, head->addr_vec);
+          if (command != group.command) {
+            group.command = command;
+            group.has_new_requests = true;
+          }
+          group.is_ready = false;
+          group.epoch = m_epoch;
+        }
+        if (group.ready_epoch != m_epoch) {
+          group.is_ready = false;
+          group.ready_epoch = m_epoch;
+        }
+        if (group.has_new_requests) {
+          for (auto* entry = group.head; entry; entry = entry->next) {
+            entry->req->command = group.command;
+          }
+          group.has_new_requests = false;
+        }
+        if (!group.is_ready) {
+          group.is_ready = m_dram->check_ready(group.command, head->addr_vec);
+        }
+
+        // Ready first, then first come (the enqueue order breaks ties, as the order in the buffer does in compare())
+        bool is_better = false;
+        if (candidate == buffer.end()) {
+          is_better = true;
+        } else if (group.is_ready ^ candidate_ready) {
+          is_better = group.is_ready;
+        } else {
+          is_better = head->arrive < candidate->arrive || (head->arrive == candidate->arrive && order < candidate_order);
+        }
+        if (is_better) {
+          candidate = head;
+          candidate_order = order;
+          candidate_ready = group.is_ready;
+        }
       }
       return candidate;
     }
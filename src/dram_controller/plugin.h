@@ -18,6 +18,19 @@ class IControllerPlugin {
 
   public:
     virtual void update(bool request_found, ReqBuffer::iterator& req_it) = 0;
+
+    /**
+     * @brief    Returns how many of the upcoming update(false, ...) calls would do nothing but count cycles (0 if unknown)
+     * 
+     */
+    virtual Clk_t get_idle_ticks() { return 0; };
+
+    /**
+     * @brief    Has the same effect as num_ticks calls to update(false, ...), with num_ticks at most get_idle_ticks()
+     *           (or any num_ticks right after setup, to start a plugin created during the simulation at the cycle of its controller)
+     * 
+     */
+    virtual void skip_ticks(Clk_t num_ticks) { };
 };
 
 }        // namespace Ramulator
@@ -14,6 +14,18 @@ class IRefreshManager {
 
   public:
     virtual void tick() = 0;
+
+    /**
+     * @brief    Returns how many of the upcoming ticks would not send any refresh (0 if unknown)
+     * 
+     */
+    virtual Clk_t get_idle_ticks() { return 0; };
+
+    /**
+     * @brief    Advances the refresh manager by num_ticks ticks (at most get_idle_ticks())
+     * 
+     */
+    virtual void skip_ticks(Clk_t num_ticks) { };
 };
 
 }        // namespace Ramulator
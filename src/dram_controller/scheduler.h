@@ -16,6 +16,12 @@ class IScheduler {
     virtual ReqBuffer::iterator compare(ReqBuffer::iterator req1, ReqBuffer::iterator req2) = 0;
 
     virtual ReqBuffer::iterator get_best_request(ReqBuffer& buffer) = 0;
+
+    /**
+     * @brief    Called by the controller after it issued a command (i.e., the states and timings of its channel changed)
+     * 
+     */
+    virtual void notify_issued(int command, const AddrVec_t& addr_vec) {};
 };
 
 }       // namespace Ramulator
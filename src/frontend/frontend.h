@@ -31,7 +31,11 @@ class IFrontEnd : public Clocked<IFrontEnd>, public TopLevel<IFrontEnd> {
 
     virtual bool is_finished() = 0;
 
-    virtual void finalize() { 
+    /**
+     * @brief    Finalizes all components and prints the stats to output
+     * 
+     */
+    virtual void finalize(std::ostream& output = std::cout) { 
       for (auto component : m_components) {
         component->finalize();
       }
@@ -40,11 +44,23 @@ class IFrontEnd : public Clocked<IFrontEnd>, public TopLevel<IFrontEnd> {
       emitter << YAML::BeginMap;
       m_impl->print_stats(emitter);
       emitter << YAML::EndMap;
-      std::cout << emitter.c_str() << std::endl;
+      output << emitter.c_str() << std::endl;
     };
 
     virtual int get_num_cores() { return 1; };
 
+    /**
+     * @brief    Returns the path of the per-request access log the frontend writes ("" if it writes none)
+     * 
+     */
+    virtual std::string get_access_log_path() { return ""; };
+
+    /**
+     * @brief    Continues the access log in a new file that starts with a copy of the log so far (in forked variants)
+     * 
+     */
+    virtual void redirect_access_log(const std::string& path) { };
+
     int get_clock_ratio() { return m_clock_ratio; };
 
     /**
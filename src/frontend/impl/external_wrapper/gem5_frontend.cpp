@@ -11,12 +11,44 @@ namespace Ramulator {
 class GEM5 : public IFrontEnd, public Implementation {
   RAMULATOR_REGISTER_IMPLEMENTATION(IFrontEnd, GEM5, "GEM5", "GEM5 frontend.")
 
+  private:
+    int m_callback_id = -1;
+    std::vector<std::function<void(Request&)>> m_external_callbacks;    // Callbacks of the requests in flight, indexed by Request::id
+    std::vector<int64_t> m_free_ids;                                     // Unused entries of m_external_callbacks
+
   public:
     void init() override { };
     void tick() override { };
 
+    void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      m_callback_id = memory_system->register_callback([this](Request& req) {
+        auto callback = std::move(m_external_callbacks[req.id]);
+        m_external_callbacks[req.id] = nullptr;
+        m_free_ids.push_back(req.id);
+        callback(req);
+      });
+    };
+
     bool receive_external_requests(int req_type_id, Addr_t addr, int source_id, std::function<void(Request&)> callback) override {
-      return m_memory_system->send({addr, req_type_id, source_id, callback});
+      // The callback is stored before sending, the memory system may serve the request right away
+      int64_t id;
+      if (m_free_ids.empty()) {
+        id = m_external_callbacks.size();
+        m_external_callbacks.push_back(std::move(callback));
+      } else {
+        id = m_free_ids.back();
+        m_free_ids.pop_back();
+        m_external_callbacks[id] = std::move(callback);
+      }
+
+      Request req(addr, req_type_id, source_id, m_callback_id);
+      req.id = id;
+      if (!m_memory_system->send(req)) {
+        m_external_callbacks[id] = nullptr;
+        m_free_ids.push_back(id);
+        return false;
+      }
+      return true;
     }
 
   private:
@@ -4,6 +4,7 @@
 
 #include "frontend/frontend.h"
 #include "base/exception.h"
+#include "frontend/impl/memory_trace/trace_sampler.h"
 
 namespace Ramulator {
 
@@ -24,6 +25,10 @@ class LoadStoreTrace : public IFrontEnd, public Implementation {
 
     size_t m_trace_count = 0;
 
+    Clk_t m_clk = 0;
+
+    TraceSampler m_sampler;   // Only simulates some intervals of the trace in detail if the "sampling" group is given
+
     Logger_t m_logger;
 
   public:
@@ -35,13 +40,43 @@ class LoadStoreTrace : public IFrontEnd, public Implementation {
       m_logger->info("Loading trace file {} ...", trace_path_str);
       init_trace(trace_path_str);
       m_logger->info("Loaded {} lines.", m_trace.size());
+
+      register_stat(m_clk).name("frontend_cycles");
+      if (m_config["sampling"]) {
+        m_sampler.init(*this, m_trace_length);
+      }
+    };
+
+    void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      if (m_sampler.is_enabled()) {
+        m_sampler.setup(memory_system, nullptr);
+      }
     };
 
 
     void tick() override {
+      m_clk++;
+      if (m_sampler.is_enabled()) {
+        // Between the detailed intervals, wait until the memory system drains, then warm it up until the next one
+        while (m_sampler.is_warming() && m_trace_count < m_trace_length) {
+          const Trace& t = m_trace[m_curr_trace_idx];
+          m_memory_system->warm({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read});
+          m_sampler.warmed();
+          m_curr_trace_idx = (m_curr_trace_idx + 1) % m_trace_length;
+          m_trace_count++;
+        }
+        if (!m_sampler.is_detailed() || m_trace_count >= m_trace_length) {
+          return;
+        }
+      }
+
       const Trace& t = m_trace[m_curr_trace_idx];
-      bool request_sent = m_memory_system->send({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read});
+      int callback_id = m_sampler.is_enabled() ? m_sampler.get_callback_id() : -1;
+      bool request_sent = m_memory_system->send({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read, -1, callback_id});
       if (request_sent) {
+        if (m_sampler.is_enabled()) {
+          m_sampler.launched(m_clk);
+        }
         m_curr_trace_idx = (m_curr_trace_idx + 1) % m_trace_length;
         m_trace_count++;
       }
@@ -95,6 +130,14 @@ class LoadStoreTrace : public IFrontEnd, public Implementation {
 
     // TODO: FIXME
     bool is_finished() override {
+      if (m_sampler.is_enabled()) {
+        // The last measured requests must be served
+        if (m_trace_count >= m_trace_length && !m_sampler.is_draining()) {
+          m_sampler.finish();
+          return true;
+        }
+        return false;
+      }
       return m_trace_count >= m_trace_length; 
     };
 };
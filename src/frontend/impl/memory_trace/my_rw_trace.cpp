@@ -4,10 +4,13 @@
 #include <algorithm>
 #include <random>
 #include <ctime>
+#include <limits>
 #include <spdlog/spdlog.h>
 
 #include "frontend/frontend.h"
 #include "base/exception.h"
+#include "base/trace_cache.h"
+#include "frontend/impl/memory_trace/trace_sampler.h"
 
 namespace Ramulator {
 
@@ -29,13 +32,29 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       bool shuffle_tracelet; // Whether to shuffle the tracelets of a trace.
       bool shuffle_trace; // Whether to shuffle the traces.
       uint32_t seed; // Random seed.
+      int issue_width; // Maximum number of requests launched every period.
+      int64_t max_outstanding_reads; // Maximum number of reads waiting for callback. -1 means infinity.
+      int64_t max_outstanding_writes; // Maximum number of writes waiting for callback. -1 means infinity.
+    };
+
+    // The traces are dealt round-robin to independent streams: a stream that cannot launch does not block the others.
+    struct Stream {
+      const Trace *curTraceLet;
+      size_t retries_left; // Remained retry chances.
+      bool is_held = false; // curTraceLet was held back by a full outstanding window (without using a retry).
+      size_t m_curr_trace_idx;
+      size_t m_curr_tracelet_idx = 0; // Index in a trace's tracelets.
+
+      size_t s_num_req_sent = 0;
+      size_t s_num_rejected = 0; // Launches rejected by the memory system.
+      size_t s_num_window_stalls = 0; // Launches held back by a full outstanding window.
     };
 
     struct Status {
-      Trace *curTraceLet;
       Clk_t cycles2launch; // Launch a new request or retry after such many cycles.
-      size_t retries_left; // Remained retry chances.
-      size_t m_num_req_pending; // The number of requests which are waiting for callback.
+      size_t m_num_req_pending; // The number of reads which are waiting for callback.
+      size_t m_num_write_pending; // The number of writes which are waiting for callback.
+      size_t next_stream; // The stream served first at the next launch.
     };
 
     // The data size (in byte) of a single read/write DRAM operation.
@@ -44,22 +63,35 @@ class MyRWTrace : public IFrontEnd, public Implementation {
 
     Clk_t m_clk = 0;
 
-    std::vector<Trace> m_trace;
-    std::vector<std::vector<Trace> > m_tracelet;
+    // Read-only, shared by all simulations of the same trace in this process (see TraceCache)
+    std::shared_ptr<const std::vector<Trace> > m_trace;
+    std::shared_ptr<const std::vector<std::vector<Trace> > > m_tracelet;
 
     std::ofstream access_log;
+    std::string m_access_log_path;
 
     size_t m_trace_length;
     size_t m_tracelet_length;
-    size_t m_curr_trace_idx = 0;
-    size_t m_curr_tracelet_idx = 0; // Index in a trace's tracelets.
     size_t num_trace_sent = 0;
     size_t num_read_sent = 0;
     size_t num_write_sent = 0;
+    size_t num_rejected = 0;
+    size_t num_window_stalls = 0;
+    double m_latency_sum = 0;
+    size_t m_num_served = 0;
+    double m_read_latency_sum = 0;
+    size_t m_num_read_served = 0;
+    double avg_latency = 0;
+    double avg_read_latency = 0;
 
     LaunchSetting launch_setting;
 
     Status cur_status;
+    std::vector<Stream> m_streams;
+
+    int m_callback_id = -1;
+
+    TraceSampler m_sampler;   // Only simulates some intervals of the trace in detail if the "sampling" group is given
 
     Logger_t m_logger;    
 
@@ -71,6 +103,7 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       if (!access_log.is_open()) {
         throw ConfigurationError("Unable to open file: {}.", mem_access_log_path_str);
       }
+      m_access_log_path = mem_access_log_path_str;
       access_log << fmt::format("{:>6}, {:>6}, {:>6}, {:>6}, {:>6}, {:>6}, {:>6}, {:>2}", "send", "schedule", "preq", "depart", "issue", "process", "live", "cmds") << std::endl;
 
       m_clock_ratio = param<uint>("clock_ratio").required();
@@ -80,23 +113,69 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       launch_setting.shuffle_trace = param<bool>("shuffle_trace").default_val(false);
       launch_setting.seed = param<uint32_t>("seed").default_val(time(nullptr));
       UNIT_TRANSFER_SIZE = param<uint32_t>("UNIT_TRANSFER_SIZE").default_val(64); // In bytes.
+      launch_setting.issue_width = param<int>("issue_width").desc("Maximum number of requests launched every period.").default_val(1);
+      launch_setting.max_outstanding_reads = param<int64_t>("max_outstanding_reads").desc("Maximum number of reads waiting for callback (-1: unlimited).").default_val(-1);
+      launch_setting.max_outstanding_writes = param<int64_t>("max_outstanding_writes").desc("Maximum number of writes waiting for callback (-1: unlimited).").default_val(-1);
+      size_t num_streams = param<size_t>("num_streams").desc("Number of independent request streams the traces are dealt to.").default_val(1);
+      if (launch_setting.issue_width < 1) {
+        throw ConfigurationError("MyRWTrace: issue_width must be at least 1.");
+      }
+      if (num_streams < 1) {
+        throw ConfigurationError("MyRWTrace: num_streams must be at least 1.");
+      }
 
       m_logger = Logging::create_logger("MyRWTrace");
 
       m_logger->info("Loading trace file {} ...", trace_path_str);
       init_trace(trace_path_str);
-      m_logger->info("Loaded {} lines.", m_trace.size());
+      m_logger->info("Loaded {} lines.", m_trace->size());
       if (!m_trace_length) {
         throw ConfigurationError("Blank trace.");
       }
 
       cur_status.cycles2launch = 0;
-      cur_status.retries_left = 1;
       cur_status.m_num_req_pending = 0;
-      cur_status.curTraceLet = &(m_tracelet[0][0]);
+      cur_status.m_num_write_pending = 0;
+      cur_status.next_stream = 0;
+      // Stream s serves traces s, s + num_streams, ... and starts with its first request pending (as a retry)
+      m_streams.resize(num_streams);
+      for (size_t s = 0; s < num_streams; s++) {
+        Stream& stream = m_streams[s];
+        stream.m_curr_trace_idx = s;
+        stream.curTraceLet = s < m_trace_length ? &((*m_tracelet)[s][0]) : nullptr;
+        stream.retries_left = stream.curTraceLet ? 1 : 0;
+      }
+
+      register_stat(m_clk).name("frontend_cycles");
+      register_stat(m_tracelet_length).name("num_tracelets");
+      register_stat(num_read_sent).name("num_read_requests_sent");
+      register_stat(num_write_sent).name("num_write_requests_sent");
+      register_stat(num_rejected).name("num_rejected_launches");
+      register_stat(num_window_stalls).name("num_window_stalls");
+      register_stat(avg_latency).name("avg_latency");
+      register_stat(avg_read_latency).name("avg_read_latency");
+      if (num_streams > 1) {
+        for (size_t s = 0; s < num_streams; s++) {
+          register_stat(m_streams[s].s_num_req_sent).name("stream_{}_requests_sent", s);
+          register_stat(m_streams[s].s_num_rejected).name("stream_{}_rejected_launches", s);
+          register_stat(m_streams[s].s_num_window_stalls).name("stream_{}_window_stalls", s);
+        }
+      }
+
+      if (m_config["sampling"]) {
+        m_sampler.init(*this, m_tracelet_length);
+      }
     };
 
 
+    void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override {
+      if (m_sampler.is_enabled()) {
+        m_sampler.setup(memory_system, [this](Request& r) { finish_request(r); });
+      } else {
+        m_callback_id = memory_system->register_callback([this](Request& r) { finish_request(r); });
+      }
+    };
+
     void tick() override {
       ++m_clk;
       if (cur_status.cycles2launch) {
@@ -105,52 +184,202 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       } else {
         cur_status.cycles2launch = launch_setting.period - 1;
       }
-      bool isRetry = (cur_status.retries_left > 0);
-      if (isRetry) {
+
+      if (m_sampler.is_enabled()) {
+        // Between the detailed intervals, wait until the memory system drains, then warm it up until the next one
+        warm();
+        if (!m_sampler.is_detailed()) {
+          return;
+        }
+      }
+
+      // The streams take turns being served first. Each launches its requests in order until one cannot be launched
+      // or the issue width is used up.
+      int num_launched = 0;
+      size_t num_streams = m_streams.size();
+      for (size_t i = 0; i < num_streams && num_launched < launch_setting.issue_width; i++) {
+        Stream& stream = m_streams[(cur_status.next_stream + i) % num_streams];
+        while (num_launched < launch_setting.issue_width && launch(stream)) {
+          num_launched++;
+        }
+      }
+      cur_status.next_stream = (cur_status.next_stream + 1) % num_streams;
+    };
+
+    Clk_t get_idle_ticks() override {
+      // Once every request has been launched, ticks only count cycles until the last one is served
+      // (and the loop must not skip the tick after which is_finished() is checked)
+      if (is_all_launched()) {
+        return cur_status.m_num_req_pending == 0 ? 0 : std::numeric_limits<Clk_t>::max();
+      }
+      // Otherwise the next launch (or retry) happens when cycles2launch reaches 0
+      return cur_status.cycles2launch;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+      // cycles2launch counts down modulo period
+      Clk_t period = launch_setting.period;
+      cur_status.cycles2launch = ((cur_status.cycles2launch - num_ticks) % period + period) % period;
+    };
+
+  private:
+    /**
+     * @brief    Tries to launch the current request of the stream, returns whether the memory system accepted it
+     */
+    bool launch(Stream& stream) {
+      if (m_sampler.is_enabled() && !m_sampler.is_detailed()) {
+        return false;
+      }
+      bool isRetry = (stream.retries_left > 0);
+      if (isRetry || stream.is_held) {
         // std::cout << "Retrying" << std::endl;
       } else { // Stop retrying and launch a new request.
-        cur_status.curTraceLet = get_next_tracelet();
+        stream.curTraceLet = get_next_tracelet(stream);
       }
-      if (!cur_status.curTraceLet) { // ALl requests have been launched.
-        return;
+      stream.is_held = false;
+      if (!stream.curTraceLet) { // ALl requests of this stream have been launched.
+        return false;
       }
-      const Trace& t = *(cur_status.curTraceLet);
+      const Trace& t = *(stream.curTraceLet);
       // Print request info.
       // TODO: Add clock info.
       // std::cout << "[REQUEST] " << (t.is_write ? "WRITE" : " READ") << " addr: " << t.addr << std::endl;
 
-      bool success = m_memory_system->send({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read, 0, [this](Request &r) {
-        finish_read(r);
-      }});
+      // Hold the request back while too many requests of its type are waiting for callback
+      int64_t max_outstanding = t.is_write ? launch_setting.max_outstanding_writes : launch_setting.max_outstanding_reads;
+      size_t num_outstanding = t.is_write ? cur_status.m_num_write_pending : cur_status.m_num_req_pending;
+      if (max_outstanding >= 0 && num_outstanding >= (size_t) max_outstanding) {
+        stream.is_held = true;
+        ++stream.s_num_window_stalls;
+        ++num_window_stalls;
+        return false;
+      }
+
+      int callback_id = m_sampler.is_enabled() ? m_sampler.get_callback_id() : m_callback_id;
+      bool success = m_memory_system->send({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read, 0, callback_id});
 
       if (success) {
+        if (m_sampler.is_enabled()) {
+          m_sampler.launched(m_clk);
+        }
         if (!t.is_write) {
           ++num_read_sent;
           cur_status.m_num_req_pending++;
         } else {
           ++num_write_sent;
+          cur_status.m_num_write_pending++;
         }
-        cur_status.retries_left = 0;
+        ++stream.s_num_req_sent;
+        stream.retries_left = 0;
       } else {
-        // std::cout << "[REQUEST FAILED] trace ID: " << m_curr_trace_idx << ". tracelet ID: " << m_curr_tracelet_idx << std::endl;
+        // std::cout << "[REQUEST FAILED] trace ID: " << stream.m_curr_trace_idx << ". tracelet ID: " << stream.m_curr_tracelet_idx << std::endl;
+        ++stream.s_num_rejected;
+        ++num_rejected;
         
         if (!launch_setting.max_retry) { // Never retry.
-          cur_status.retries_left = 0;
+          stream.retries_left = 0;
         } else if (launch_setting.max_retry > 0) { // Finite retries.
           if (!isRetry) {
-            cur_status.retries_left = launch_setting.max_retry;
+            stream.retries_left = launch_setting.max_retry;
           } else {
-            cur_status.retries_left--;
+            stream.retries_left--;
           }
         } else { // Retry until success.
-          cur_status.retries_left = 1; // Keep retries number constant.
+          stream.retries_left = 1; // Keep retries number constant.
         }
         
       }
+      return success;
+    };
+
+    /**
+     * @brief    Warms the memory system up with the requests before the next detailed interval, the streams taking turns
+     */
+    void warm() {
+      size_t num_streams = m_streams.size();
+      bool is_warmed = true;
+      while (m_sampler.is_warming() && is_warmed) {
+        is_warmed = false;
+        for (size_t i = 0; i < num_streams && m_sampler.is_warming(); i++) {
+          Stream& stream = m_streams[(cur_status.next_stream + i) % num_streams];
+          // Like launch(), a request that is still pending goes first
+          if (!stream.retries_left && !stream.is_held) {
+            stream.curTraceLet = get_next_tracelet(stream);
+          }
+          stream.retries_left = 0;
+          stream.is_held = false;
+          if (!stream.curTraceLet) {
+            continue;
+          }
+          const Trace& t = *(stream.curTraceLet);
+          m_memory_system->warm({t.addr, t.is_write ? Request::Type::Write : Request::Type::Read});
+          m_sampler.warmed();
+          is_warmed = true;
+        }
+      }
+    };
+
+    bool is_all_launched() {
+      for (const Stream& stream : m_streams) {
+        if (stream.m_curr_trace_idx < m_trace_length) {
+          return false;
+        }
+      }
+      return true;
     };
 
-  private:
     void init_trace(const std::string& file_path_str) {
+      m_trace = TraceCache::load<Trace>("MyRWTrace", file_path_str, [&file_path_str]() { return parse_trace(file_path_str); });
+
+      // The split (and shuffled) requests only depend on the trace and these parameters
+      std::string image_kind = fmt::format("MyRWTrace[{}", UNIT_TRANSFER_SIZE);
+      if (launch_setting.shuffle_tracelet || launch_setting.shuffle_trace) {
+        image_kind += fmt::format(",{},{},{}", launch_setting.shuffle_tracelet, launch_setting.shuffle_trace, launch_setting.seed);
+      }
+      image_kind += "]";
+      m_tracelet = TraceCache::load<std::vector<Trace>>(image_kind, file_path_str, [this]() { return split_trace(*m_trace); },
+                                                         [](const std::vector<std::vector<Trace>>& tracelet) {
+                                                           size_t bytes = tracelet.size() * sizeof(std::vector<Trace>);
+                                                           for (const auto& requests : tracelet) {
+                                                             bytes += requests.size() * sizeof(Trace);
+                                                           }
+                                                           return bytes;
+                                                         });
+
+      m_trace_length = m_tracelet->size();
+      m_tracelet_length = 0;
+      for (const auto& requests : *m_tracelet) {
+        m_tracelet_length += requests.size();
+      }
+    };
+
+    std::vector<std::vector<Trace>> split_trace(const std::vector<Trace>& trace) {
+      std::mt19937 rand_engine(launch_setting.seed);
+
+      std::vector<std::vector<Trace>> tracelet;
+      for (const Trace& t : trace) {
+        // Parse big memory request into small pieces.
+        // Address alignment.
+        Addr_t addr_musk = ~(UNIT_TRANSFER_SIZE-1);
+        Addr_t init_addr = t.addr & addr_musk;
+        Addr_t end_addr = ((t.addr+t.size)%addr_musk) == 0 ? (t.addr+t.size) : (((t.addr+t.size)&addr_musk)+UNIT_TRANSFER_SIZE);
+        
+        tracelet.push_back({});
+        for (Addr_t cur_addr = init_addr; cur_addr < end_addr; cur_addr += UNIT_TRANSFER_SIZE) {
+          tracelet.back().push_back({t.is_write, cur_addr, UNIT_TRANSFER_SIZE});
+        }
+        if (launch_setting.shuffle_tracelet) {
+          std::shuffle(tracelet.back().begin(), tracelet.back().end(), rand_engine);
+        }
+      }
+      if (launch_setting.shuffle_trace) {
+        std::shuffle(tracelet.begin(), tracelet.end(), rand_engine);
+      }
+      return tracelet;
+    };
+
+    static std::vector<Trace> parse_trace(const std::string& file_path_str) {
       fs::path trace_path(file_path_str);
       if (!fs::exists(trace_path)) {
         throw ConfigurationError("Trace {} does not exist!", file_path_str);
@@ -161,11 +390,7 @@ class MyRWTrace : public IFrontEnd, public Implementation {
         throw ConfigurationError("Trace {} cannot be opened!", file_path_str);
       }
 
-      std::mt19937 rand_engine(launch_setting.seed);
-
-      m_trace_length = 0;
-      m_tracelet_length = 0;
-      
+      std::vector<Trace> trace;
       std::string line;      
       while (std::getline(trace_file, line)) {
         std::vector<std::string> tokens;
@@ -188,32 +413,32 @@ class MyRWTrace : public IFrontEnd, public Implementation {
         Addr_t addr = std::stoll(tokens[1], nullptr, 0);
         Addr_t size = std::stoll(tokens[2], nullptr, 0);
 
-        m_trace.push_back({is_write, addr, size});
-
-        // Parse big memory request into small pieces.
-        // Address alignment.
-        Addr_t addr_musk = ~(UNIT_TRANSFER_SIZE-1);
-        Addr_t init_addr = addr & addr_musk;
-        Addr_t end_addr = ((addr+size)%addr_musk) == 0 ? (addr+size) : (((addr+size)&addr_musk)+UNIT_TRANSFER_SIZE);
-        
-        m_tracelet.push_back({});
-        for (Addr_t cur_addr = init_addr; cur_addr < end_addr; cur_addr += UNIT_TRANSFER_SIZE) {
-          m_tracelet[m_trace_length].push_back({is_write, cur_addr, UNIT_TRANSFER_SIZE});
-          ++m_tracelet_length;
-        }
-        if (launch_setting.shuffle_tracelet) {
-          std::shuffle(m_tracelet[m_trace_length].begin(), m_tracelet[m_trace_length].end(), rand_engine);
-        }
-        ++m_trace_length;
-      }
-      if (launch_setting.shuffle_trace) {
-        std::shuffle(m_tracelet.begin(), m_tracelet.end(), rand_engine);
+        trace.push_back({is_write, addr, size});
       }
       trace_file.close();
+      return trace;
+    };
+
+    std::string get_access_log_path() override { return m_access_log_path; };
+
+    void redirect_access_log(const std::string& path) override {
+      // Every line is flushed (std::endl), so the file already holds the whole log so far
+      access_log.close();
+      std::filesystem::copy_file(m_access_log_path, path, std::filesystem::copy_options::overwrite_existing);
+      access_log.open(path, std::ios::app);
+      if (!access_log.is_open()) {
+        throw ConfigurationError("Unable to open file: {}.", path);
+      }
+      m_access_log_path = path;
     };
 
     bool is_finished() override {
-      if (cur_status.m_num_req_pending == 0 && m_curr_trace_idx >= m_trace_length) {
+      if (cur_status.m_num_req_pending == 0 && is_all_launched() && !m_sampler.is_draining()) {
+        avg_latency = m_num_served ? m_latency_sum / m_num_served : 0;
+        avg_read_latency = m_num_read_served ? m_read_latency_sum / m_num_read_served : 0;
+        if (m_sampler.is_enabled()) {
+          m_sampler.finish();
+        }
         std::cout << "Now: " << m_clk << std::endl;
         std::cout << "Seed: " << launch_setting.seed << std::endl;
         std::cout << "trace number: " << m_tracelet_length << std::endl;
@@ -225,8 +450,16 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       else return false;
     };
     
-    void finish_read(Request &r) {
-      cur_status.m_num_req_pending--;
+    void finish_request(Request &r) {
+      if (r.type_id == Request::Type::Read) {
+        cur_status.m_num_req_pending--;
+        m_read_latency_sum += r.depart - r.arrive;
+        m_num_read_served++;
+      } else {
+        cur_status.m_num_write_pending--;
+      }
+      m_latency_sum += r.depart - r.arrive;
+      m_num_served++;
       std::string time_str = fmt::format("{:6}, {:6}, {:6}, {:6}, {:6}, {:6}, {:6}, {:2}", 
                               r.arrive-r.birth, 
                               r.first_scheduled-r.arrive, 
@@ -240,21 +473,21 @@ class MyRWTrace : public IFrontEnd, public Implementation {
       access_log << time_str << std::endl;
     }
 
-    Trace* get_next_tracelet() {
-      if (m_curr_trace_idx >= m_trace_length) {
+    const Trace* get_next_tracelet(Stream& stream) {
+      if (stream.m_curr_trace_idx >= m_trace_length) {
         return nullptr;
       }
       // Caution! Comparison between unsigned numbers!
-      if (m_curr_tracelet_idx < m_tracelet[m_curr_trace_idx].size()-1) {
-        ++m_curr_tracelet_idx;
+      if (stream.m_curr_tracelet_idx < (*m_tracelet)[stream.m_curr_trace_idx].size()-1) {
+        ++stream.m_curr_tracelet_idx;
       } else {
-        ++m_curr_trace_idx;
-        m_curr_tracelet_idx = 0;
+        stream.m_curr_trace_idx += m_streams.size();
+        stream.m_curr_tracelet_idx = 0;
       }
-      if (m_curr_trace_idx == m_trace_length) {
+      if (stream.m_curr_trace_idx >= m_trace_length) {
         return nullptr;
       } else {
-        return &(m_tracelet[m_curr_trace_idx][m_curr_tracelet_idx]);
+        return &((*m_tracelet)[stream.m_curr_trace_idx][stream.m_curr_tracelet_idx]);
       }
     }
 
@@ -268,35 +501,40 @@ class MyRWTrace : public IFrontEnd, public Implementation {
 
       Addr_t init_addr = 0x000123000;
 
+      std::vector<Trace> trace;
+      std::vector<std::vector<Trace>> tracelet;
       m_trace_length = 0;
+      m_tracelet_length = 0;
       Addr_t addr = init_addr;
       for (uint32_t i = 0; i < trace_num; ++i) {
         Addr_t size = distribution(rand_engine) * 256;
         bool is_write = distribution(rand_engine) < 3;
-        m_trace.push_back({is_write, addr, size});
+        trace.push_back({is_write, addr, size});
         addr += size;
         ++m_trace_length;
       }
-      std::shuffle(m_trace.begin(), m_trace.end(), rand_engine);
+      std::shuffle(trace.begin(), trace.end(), rand_engine);
 
       uint32_t i = 0;
       Addr_t addr_musk = ~(UNIT_TRANSFER_SIZE-1);
-      for (Trace &t : m_trace) {
+      for (Trace &t : trace) {
         ofs << (t.is_write?"W":"R") << " " << t.addr << " " << t.size << std::endl;
 
         Addr_t first_addr = t.addr & addr_musk;
         Addr_t end_addr = ((t.addr+t.size)%addr_musk) == 0 ? (t.addr+t.size) : (((t.addr+t.size)&addr_musk)+UNIT_TRANSFER_SIZE);
         
-        m_tracelet.push_back({});
+        tracelet.push_back({});
         for (Addr_t cur_addr = first_addr; cur_addr < end_addr; cur_addr += UNIT_TRANSFER_SIZE) {
-          m_tracelet[i].push_back({t.is_write, t.addr, UNIT_TRANSFER_SIZE});
+          tracelet[i].push_back({t.is_write, t.addr, UNIT_TRANSFER_SIZE});
           ++m_tracelet_length;
         }
         if (launch_setting.shuffle_tracelet) {
-          std::shuffle(m_tracelet[i].begin(), m_tracelet[i].end(), rand_engine);
+          std::shuffle(tracelet[i].begin(), tracelet[i].end(), rand_engine);
         }
         ++i;
       }
+      m_trace = std::make_shared<const std::vector<Trace>>(std::move(trace));
+      m_tracelet = std::make_shared<const std::vector<std::vector<Trace>>>(std::move(tracelet));
 
       ofs.close();
     }
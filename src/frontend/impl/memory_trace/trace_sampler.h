@@ -0,0 +1,280 @@
+#ifndef RAMULATOR_FRONTEND_MEMORY_TRACE_TRACE_SAMPLER_H
+#define RAMULATOR_FRONTEND_MEMORY_TRACE_TRACE_SAMPLER_H
+
+#include <cmath>
+#include <tuple>
+#include <vector>
+#include <random>
+#include <limits>
+#include <functional>
+
+#include "base/base.h"
+#include "base/exception.h"
+#include "memory_system/memory_system.h"
+
+namespace Ramulator {
+
+/**
+ * @brief    Sampled simulation of a memory trace (systematic sampling with functional warming)
+ *
+ * @details
+ * The requests of the trace are cut into sampling units of `unit` requests. In every unit, `detailed_warmup` + `measured`
+ * consecutive requests are simulated in detail, at the end of the unit (periodic) or at a random offset in it (random).
+ * All other requests only warm the bank and row-buffer states up (see IMemorySystem::warm) and take no simulated time.
+ * After the measured requests of a unit, the frontend launches nothing until the memory system has served all requests
+ * in flight, so that warming never races with them.
+ *
+ * Every unit yields one sample of the cycles per request and of the mean latency of its measured requests. The whole-trace
+ * cycles and mean latencies are extrapolated from them, with the half-widths of their confidence intervals (Student's t).
+ *
+ */
+class TraceSampler {
+  private:
+    size_t m_unit = 0;              // Requests per sampling unit (0: sampling disabled)
+    size_t m_warmup = 0;            // Requests simulated in detail before measuring, in every unit
+    size_t m_measured = 0;          // Requests measured in every unit
+    bool m_is_random = false;       // Whether the detailed interval starts at a random offset in its unit
+    double m_confidence = 0.95;
+    std::mt19937_64 m_rng;
+
+    size_t m_num_requests = 0;      // Requests in the whole trace
+    size_t m_next = 0;              // Index of the next request of the trace
+    size_t m_unit_start = 0;        // Index of the first request of the current unit
+    size_t m_detailed_start = 0;    // Index of the first detailed request of the current unit
+
+    size_t m_num_in_flight = 0;     // Detailed requests not served yet
+    bool m_is_draining = false;     // The current unit is measured, waiting for the requests in flight before going on
+
+    Clk_t m_window_start = 0;       // Frontend cycle of the last launch before the measured requests
+    double m_cycles_per_request = 0;
+    double m_latency_sum = 0;
+    size_t m_num_latencies = 0;
+    double m_read_latency_sum = 0;
+    size_t m_num_read_latencies = 0;
+
+    // One sample per completely measured unit
+    std::vector<double> m_cycles_samples;
+    std::vector<double> m_latency_samples;
+    std::vector<double> m_read_latency_samples;
+
+    std::function<void(Request&)> m_serve;
+    int m_callback_id = -1;
+    int m_measured_callback_id = -1;
+
+    size_t s_num_units = 0;
+    size_t s_num_detailed_requests = 0;
+    size_t s_num_warmed_requests = 0;
+    double s_estimated_cycles = 0;
+    double s_estimated_cycles_ci = 0;
+    double s_estimated_latency = 0;
+    double s_estimated_latency_ci = 0;
+    double s_estimated_read_latency = 0;
+    double s_estimated_read_latency_ci = 0;
+
+  public:
+    /**
+     * @brief    Reads the parameters from the "sampling" group of the frontend and registers the stats
+     *
+     * @param    num_requests   Number of requests in the whole trace.
+     */
+    void init(Implementation& impl, size_t num_requests) {
+      std::string mode = impl.param_group("sampling").param<std::string>("mode").desc("Where the detailed interval is in every sampling unit (periodic: at its end, random: at a random offset).").default_val("periodic");
+      m_unit = impl.param_group("sampling").param<size_t>("unit").desc("Number of requests per sampling unit.").required();
+      m_measured = impl.param_group("sampling").param<size_t>("measured").desc("Number of requests measured in every sampling unit (the sampling rate is measured / unit).").required();
+      m_warmup = impl.param_group("sampling").param<size_t>("detailed_warmup").desc("Number of requests simulated in detail before the measured ones in every sampling unit.").default_val(1000);
+      m_confidence = impl.param_group("sampling").param<double>("confidence").desc("Confidence level of the reported intervals.").default_val(0.95);
+      uint64_t seed = impl.param_group("sampling").param<uint64_t>("seed").desc("Random seed of the random mode.").default_val(0);
+
+      if (mode == "random") {
+        m_is_random = true;
+      } else if (mode != "periodic") {
+        throw ConfigurationError("{}: Unknown sampling mode {}!", impl.get_name(), mode);
+      }
+      if (m_measured < 1 || m_warmup < 1) {
+        throw ConfigurationError("{}: Sampling needs at least one detailed warmup and one measured request per unit.", impl.get_name());
+      }
+      if (m_warmup + m_measured > m_unit) {
+        throw ConfigurationError("{}: The sampling unit ({}) is shorter than its detailed interval ({} + {} requests).", impl.get_name(), m_unit, m_warmup, m_measured);
+      }
+      if (m_confidence <= 0 || m_confidence >= 1) {
+        throw ConfigurationError("{}: The confidence level must be between 0 and 1.", impl.get_name());
+      }
+      m_rng.seed(seed);
+      m_num_requests = num_requests;
+      start_unit(0);
+
+      impl.register_stat(s_num_units).name("sampling_num_units");
+      impl.register_stat(s_num_detailed_requests).name("sampling_num_detailed_requests");
+      impl.register_stat(s_num_warmed_requests).name("sampling_num_warmed_requests");
+      impl.register_stat(s_estimated_cycles).name("estimated_frontend_cycles");
+      impl.register_stat(s_estimated_cycles_ci).name("estimated_frontend_cycles_ci");
+      impl.register_stat(s_estimated_latency).name("estimated_avg_latency");
+      impl.register_stat(s_estimated_latency_ci).name("estimated_avg_latency_ci");
+      impl.register_stat(s_estimated_read_latency).name("estimated_avg_read_latency");
+      impl.register_stat(s_estimated_read_latency_ci).name("estimated_avg_read_latency_ci");
+    };
+
+    /**
+     * @brief    Registers the completion callbacks of the detailed requests, which notify serve after sampling them
+     */
+    void setup(IMemorySystem* memory_system, std::function<void(Request&)> serve) {
+      m_serve = std::move(serve);
+      m_callback_id = memory_system->register_callback([this](Request& req) { served(req, false); });
+      m_measured_callback_id = memory_system->register_callback([this](Request& req) { served(req, true); });
+    };
+
+    bool is_enabled() const { return m_unit > 0; };
+
+    /**
+     * @brief    Whether the next request is to be launched (false: to be warmed, or nothing can happen until the memory system drains)
+     */
+    bool is_detailed() const { return !m_is_draining && is_in_detailed_interval(); };
+
+    /**
+     * @brief    Whether the next request is to be warmed (see IMemorySystem::warm)
+     */
+    bool is_warming() const { return !m_is_draining && !is_in_detailed_interval(); };
+
+    bool is_draining() const { return m_is_draining; };
+
+    /**
+     * @brief    The callback id of the next (detailed) request
+     */
+    int get_callback_id() const { return m_next - m_detailed_start < m_warmup ? m_callback_id : m_measured_callback_id; };
+
+    /**
+     * @brief    Notifies that the next request was launched at the frontend cycle clk
+     */
+    void launched(Clk_t clk) {
+      size_t pos = m_next - m_detailed_start;
+      if (pos == m_warmup - 1) {
+        m_window_start = clk;
+      } else if (pos == m_warmup + m_measured - 1) {
+        m_cycles_per_request = double(clk - m_window_start) / m_measured;
+        m_is_draining = true;
+      }
+      m_num_in_flight++;
+      s_num_detailed_requests++;
+      advance();
+    };
+
+    /**
+     * @brief    Notifies that the next request was warmed
+     */
+    void warmed() {
+      s_num_warmed_requests++;
+      advance();
+    };
+
+    /**
+     * @brief    Extrapolates the whole-trace stats from the samples (a partially measured last unit is not used)
+     */
+    void finish() {
+      s_num_units = m_cycles_samples.size();
+      std::tie(s_estimated_cycles, s_estimated_cycles_ci) = estimate(m_cycles_samples);
+      s_estimated_cycles *= m_num_requests;
+      s_estimated_cycles_ci *= m_num_requests;
+      std::tie(s_estimated_latency, s_estimated_latency_ci) = estimate(m_latency_samples);
+      std::tie(s_estimated_read_latency, s_estimated_read_latency_ci) = estimate(m_read_latency_samples);
+    };
+
+  private:
+    bool is_in_detailed_interval() const {
+      return m_next >= m_detailed_start && m_next < m_detailed_start + m_warmup + m_measured;
+    };
+
+    void start_unit(size_t unit_start) {
+      m_unit_start = unit_start;
+      size_t max_offset = m_unit - m_warmup - m_measured;
+      size_t offset = m_is_random ? std::uniform_int_distribution<size_t>(0, max_offset)(m_rng) : max_offset;
+      m_detailed_start = m_unit_start + offset;
+    };
+
+    void advance() {
+      m_next++;
+      if (m_next == m_unit_start + m_unit) {
+        start_unit(m_next);
+      }
+    };
+
+    void served(Request& req, bool is_measured) {
+      if (is_measured) {
+        double latency = req.depart - req.arrive;
+        m_latency_sum += latency;
+        m_num_latencies++;
+        if (req.type_id == Request::Type::Read) {
+          m_read_latency_sum += latency;
+          m_num_read_latencies++;
+        }
+      }
+      if (m_serve) {
+        m_serve(req);
+      }
+      m_num_in_flight--;
+      if (m_is_draining && m_num_in_flight == 0) {
+        close_unit();
+      }
+    };
+
+    void close_unit() {
+      m_cycles_samples.push_back(m_cycles_per_request);
+      m_latency_samples.push_back(m_num_latencies ? m_latency_sum / m_num_latencies : 0);
+      if (m_num_read_latencies) {
+        m_read_latency_samples.push_back(m_read_latency_sum / m_num_read_latencies);
+      }
+      m_latency_sum = m_read_latency_sum = 0;
+      m_num_latencies = m_num_read_latencies = 0;
+      m_is_draining = false;
+    };
+
+    /**
+     * @brief    Returns the mean of the samples and the half-width of its confidence interval (NaN with less than 2 samples)
+     */
+    std::pair<double, double> estimate(const std::vector<double>& samples) const {
+      size_t n = samples.size();
+      if (n == 0) {
+        return {std::numeric_limits<double>::quiet_NaN(), std::numeric_limits<double>::quiet_NaN()};
+      }
+      double mean = 0;
+      for (double x : samples) {
+        mean += x;
+      }
+      mean /= n;
+      if (n == 1) {
+        return {mean, std::numeric_limits<double>::quiet_NaN()};
+      }
+      double variance = 0;
+      for (double x : samples) {
+        variance += (x - mean) * (x - mean);
+      }
+      variance /= n - 1;
+      return {mean, t_quantile((1 + m_confidence) / 2, n - 1) * std::sqrt(variance / n)};
+    };
+
+    /**
+     * @brief    Quantile of Student's t distribution (Cornish-Fisher expansion around the normal quantile)
+     */
+    static double t_quantile(double p, size_t dof) {
+      // Normal quantile by bisection of its CDF
+      double lo = -40, hi = 40;
+      for (int i = 0; i < 100; i++) {
+        double mid = (lo + hi) / 2;
+        if (0.5 * std::erfc(-mid / std::sqrt(2.0)) < p) {
+          lo = mid;
+        } else {
+          hi = mid;
+        }
+      }
+      double z = (lo + hi) / 2;
+      double z2 = z * z;
+      double v = dof;
+      return z + z * (z2 + 1) / (4 * v)
+               + z * ((5 * z2 + 16) * z2 + 3) / (96 * v * v)
+               + z * (((3 * z2 + 19) * z2 + 17) * z2 - 15) / (384 * v * v * v)
+               + z * ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) / (92160 * v * v * v * v);
+    };
+};
+
+}        // namespace Ramulator
+
+#endif   // RAMULATOR_FRONTEND_MEMORY_TRACE_TRACE_SAMPLER_H
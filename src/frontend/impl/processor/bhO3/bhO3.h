@@ -73,7 +73,6 @@ class BHO3 final : public IFrontEnd, public Implementation {
         BHO3Core* core = new BHO3Core(id, ipc, depth,
           m_num_expected_insts, m_num_max_cycles, active_list[active_id],
           cur_translate, m_llc, lat_hist_sensitivity, lat_dump_path);
-        core->m_callback = [this](Request& req){return this->receive(req);} ;
         m_cores.push_back(core);
       }
 
@@ -114,7 +113,7 @@ class BHO3 final : public IFrontEnd, public Implementation {
       m_llc->receive(req);
 
       // TODO: LLC latency for the core to receive the request?
-      for (auto r : m_llc->m_receive_requests[req.addr]) {
+      for (auto& r : m_llc->m_receive_requests[req.addr]) {
         r.arrive = req.arrive;
         r.depart = req.depart;
         m_cores[r.source_id]->receive(r);
@@ -134,6 +133,10 @@ class BHO3 final : public IFrontEnd, public Implementation {
 
     void connect_memory_system(IMemorySystem* memory_system) override {
       m_llc->connect_memory_system(memory_system);
+      int callback_id = memory_system->register_callback([this](Request& req){ this->receive(req); });
+      for (auto core : m_cores) {
+        core->m_callback_id = callback_id;
+      }
     };
 
     int get_num_cores() override {
@@ -2,6 +2,7 @@
 #define     RAMULATOR_FRONTEND_PROCESSOR_BH_CORE_H
 
 #include <vector>
+#include <memory>
 #include <string>
 #include <functional>
 #include <filesystem>
@@ -24,10 +25,12 @@ class BHO3Core: public Clocked<BHO3Core> {
       Addr_t store_addr = -1;
     };
   
-    std::vector<Inst> m_trace;
+    std::shared_ptr<const std::vector<Inst>> m_trace;    // Shared with other cores/jobs running the same trace
     size_t m_trace_length = 0;
     size_t m_curr_trace_idx = 0;
 
+    static std::vector<Inst> parse_trace(const std::string& file_path_str);
+
     public:
       Trace(std::string file_path_str);
       const Inst& get_next_inst();
@@ -87,7 +90,7 @@ class BHO3Core: public Clocked<BHO3Core> {
     ITranslation* m_translation;
     BHO3LLC* m_llc;
 
-    std::function<void(Request&)> m_callback;
+    int m_callback_id = -1;    // Memory system callback of the processor, which forwards the served requests to the cores
 
     int    m_num_bubbles = 0;
     Addr_t m_load_addr = -1;
@@ -1,4 +1,5 @@
 #include <iostream>
+#include <algorithm>
 #include "frontend/impl/processor/bhO3/bhllc.h"
 #include "dram/dram.h"
 
@@ -12,6 +13,11 @@ m_latency(latency), m_size_bytes(size_bytes), m_linesize_bytes(linesize_bytes),
   m_index_mask = m_set_size - 1;
   m_index_offset = calc_log2(m_linesize_bytes);
   m_tag_offset = calc_log2(m_set_size) + m_index_offset;
+
+  if (m_associativity > 256) {
+    throw std::runtime_error("The LLC supports at most 256 ways per set.");
+  }
+  m_lines.resize((size_t) m_set_size * m_associativity);
   // BH Changes Begin
   m_mshr_per_core = num_mshrs / num_cores;
   m_blacklist_max_mshrs.resize(num_cores);
@@ -28,39 +34,45 @@ void BHO3LLC::tick() {
   m_clk++;
 
   // Send miss requests to the memory system when LLC latency is met
-  // TODO: Optimization by assuming in-order issue?
-  auto it = m_miss_list.begin(); 
-  while (it != m_miss_list.end()) {
-    if (m_clk >= it->first) {
-      if (!m_memory_system->send(it->second)) {
-        it++;
-      }
-      else {
-        it = m_miss_list.erase(it);
+  // The requests are queued with nondecreasing ready cycles, so only a prefix of the queue is due
+  m_miss_sent.clear();
+  size_t num_sent = 0;
+  while (m_miss_sent.size() < m_miss_list.size() && m_clk >= m_miss_list[m_miss_sent.size()].first) {
+    bool sent = m_memory_system->send(m_miss_list[m_miss_sent.size()].second);
+    m_miss_sent.push_back(sent);
+    num_sent += sent;
+  }
+  // Remove the sent requests, the others stay at the head of the queue in order
+  if (num_sent > 0) {
+    size_t dst = m_miss_sent.size();
+    for (size_t src = m_miss_sent.size(); src-- > 0;) {
+      if (!m_miss_sent[src]) {
+        dst--;
+        if (dst != src) {
+          m_miss_list[dst] = std::move(m_miss_list[src]);
+        }
       }
-    } else {
-      it++;
+    }
+    for (size_t i = 0; i < num_sent; i++) {
+      m_miss_list.pop_front();
     }
   }
 
   // call hit request callback when LLC latency is met
-  it = m_hit_list.begin();
-  while (it != m_hit_list.end()) {
-    if (m_clk >= it->first) {
-      std::vector<Request> _req_v{it->second};
-      m_receive_requests[it->second.addr] = _req_v;
-
-      it->second.callback(it->second);
-      it = m_hit_list.erase(it);
-    } 
-    else {
-      it++;
-    }
+  while (!m_hit_list.empty() && m_clk >= m_hit_list.front().first) {
+    Request req = m_hit_list.front().second;
+    m_hit_list.pop_front();
+
+    auto& receive_requests = m_receive_requests[req.addr];
+    receive_requests.clear();
+    receive_requests.push_back(req);
+
+    m_memory_system->complete(req);
   }
 };
 
 bool BHO3LLC::send(Request req) {
-  CacheSet_t& set = get_set(req.addr);
+  Line* set = get_set(req.addr);
 
   if (req.type_id == Request::Type::Read) {
     s_llc_read_access++;
@@ -68,7 +80,7 @@ bool BHO3LLC::send(Request req) {
     s_llc_write_access++;
   }
 
-  if (auto line_it = check_set_hit(set, req.addr); line_it != set.end()) {
+  if (Line* line = check_set_hit(set, req.addr); line != nullptr) {
     // Hit in the set
     DEBUG_LOG(DBHO3LLC, m_logger, 
     "[Clk={}] Request Source: {}, Type: {}, Addr: {}, Index: {}, Tag: {}. Hit, will finish at Clk={}", 
@@ -76,8 +88,9 @@ bool BHO3LLC::send(Request req) {
     );
 
     // Update the LRU status
-    set.push_back({req.addr, get_tag(req.addr), line_it->dirty || (req.type_id == Request::Type::Write), true});
-    set.erase(line_it);
+    line->addr = req.addr;
+    line->dirty = line->dirty || (req.type_id == Request::Type::Write);
+    touch_line(set, line);
 
     // Add to the hit list to callback when finished
     m_hit_list.push_back(std::make_pair(m_clk + m_latency, req));
@@ -130,35 +143,26 @@ bool BHO3LLC::send(Request req) {
     }
 
     // Check if there is available cache line in the set
-    bool line_available = false;
-    if (set.size() < m_associativity) {
-      line_available = true;
-    } else {
-      for (const auto& line : set) {
-        if (line.ready) {
-          line_available = true;
-        }
-      }
-    }
-    if (!line_available) {
+    if (!has_available_line(set)) {
       DEBUG_LOG(DBHO3LLC, m_logger,  "No cache line available in the set.", m_clk);
       return false;
     }
 
     // Allocate a new cache line
-    auto newline_it = allocate_line(set, req.addr);
-    if (newline_it == set.end()) {
+    Line* newline = allocate_line(set, req.addr);
+    if (newline == nullptr) {
       // Should this happen?
       throw std::runtime_error("Failed to allocate new line when there is available entry.");
       return false;
     }
-    newline_it->dirty = dirty;
+    newline->dirty = dirty;
     
     // Add to MSHR entries
-    m_mshrs.push_back(std::make_pair(req.addr, newline_it));
+    m_mshrs.push_back(std::make_pair(req.addr, newline));
     // Add Request to MSHR_requests
-    std::vector<Request> _req_v{req};
-    m_receive_requests[req.addr] = _req_v;
+    auto& receive_requests = m_receive_requests[req.addr];
+    receive_requests.clear();
+    receive_requests.push_back(req);
 
     // Add to the miss request list
     m_miss_list.push_back(std::make_pair(m_clk + m_latency, req));
@@ -191,68 +195,98 @@ void BHO3LLC::receive(Request& req) {
   }
 };
 
-BHO3LLC::CacheSet_t& BHO3LLC::get_set(Addr_t addr) {
-  int set_index = get_index(addr);
-  if (m_cache_sets.find(set_index) == m_cache_sets.end()) {
-    m_cache_sets.insert(make_pair(set_index, std::list<Line>()));
+BHO3LLC::Line* BHO3LLC::allocate_line(Line* set, Addr_t addr) {
+  // Find a free way, or the least-recently-used line that is not inflight to evict
+  Line* free_line = nullptr;
+  Line* victim = nullptr;
+  for (int way = 0; way < m_associativity; way++) {
+    Line* line = &set[way];
+    if (!line->valid) {
+      free_line = (free_line == nullptr) ? line : free_line;
+    } else if (line->ready && (victim == nullptr || line->lru < victim->lru)) {
+      victim = line;
+    }
   }
-  return m_cache_sets[set_index];
-}
 
-BHO3LLC::CacheSet_t::iterator BHO3LLC::allocate_line(CacheSet_t& set, Addr_t addr) {
-  // Check if we need to evict any line
-  if (need_eviction(set, addr)) {
-    // Get a victim to evict
-    auto victim = std::find_if(set.begin(), set.end(), [this](Line line) { return line.ready; });
-    if (victim == set.end())
-      return victim;  // doesn't exist a line that's already unlocked in each level
+  if (free_line == nullptr) {
+    if (victim == nullptr)
+      return nullptr;  // doesn't exist a line that's already unlocked in each level
     evict_line(set, victim);
+    free_line = victim;
   }
 
-  // Allocate new cache line and return an iterator to it
-  set.push_back({addr, get_tag(addr)});
-  return --set.end();
+  // Allocate the new cache line as the most-recently-used line of the set
+  int num_lines = 0;
+  for (int way = 0; way < m_associativity; way++) {
+    num_lines += set[way].valid;
+  }
+  *free_line = {addr, get_tag(addr), true, false, false, (uint8_t) num_lines};
+  return free_line;
 }
 
-bool BHO3LLC::need_eviction(const CacheSet_t& set, Addr_t addr) {
-  if (std::find_if(set.begin(), set.end(), 
-            [addr, this](Line l) { return (get_tag(addr) == l.tag); }) 
-      != set.end()) {
-    // Due to MSHR, the program can't reach here. Just for checking
-    assert(false);
-    return false;
-  } 
-  else {
-    if (set.size() < m_associativity) {
-      return false;
-    } else {
+bool BHO3LLC::has_available_line(const Line* set) {
+  for (int way = 0; way < m_associativity; way++) {
+    if (!set[way].valid || set[way].ready) {
       return true;
     }
   }
+  return false;
 }
 
-void BHO3LLC::evict_line(CacheSet_t& set, CacheSet_t::iterator victim_it) {
-  DEBUG_LOG(DBHO3LLC, m_logger,  "Evicting {}.", victim_it->addr);
+void BHO3LLC::evict_line(Line* set, Line* victim) {
+  DEBUG_LOG(DBHO3LLC, m_logger,  "Evicting {}.", victim->addr);
   s_llc_eviction++;
 
   // Generate writeback request if victim line is dirty
-  if (victim_it->dirty) {
-    Request writeback_req(victim_it->addr, Request::Type::Write);
+  if (victim->dirty) {
+    Request writeback_req(victim->addr, Request::Type::Write);
     m_miss_list.push_back(std::make_pair(m_clk + m_latency, writeback_req));
 
     DEBUG_LOG(DBHO3LLC, m_logger,  "Writeback Request will be issued at Clk={}.", m_clk + m_latency);
   }
 
-  set.erase(victim_it);
+  // The lines that were more recently used than the victim move down by one position
+  for (int way = 0; way < m_associativity; way++) {
+    if (set[way].valid && set[way].lru > victim->lru) {
+      set[way].lru--;
+    }
+  }
+  *victim = Line();
 }
 
-BHO3LLC::CacheSet_t::iterator BHO3LLC::check_set_hit(CacheSet_t& set, Addr_t addr) {
-  auto line_it = std::find_if(set.begin(), set.end(), [addr, this](Line l){return (l.tag == get_tag(addr));});
-  if (!line_it->ready) {
-    return set.end();
-  } else {
-    return line_it;
+void BHO3LLC::touch_line(Line* set, Line* line) {
+  // Make the line the most-recently-used one, the lines that were more recently used move down by one position
+  int num_lines = 0;
+  for (int way = 0; way < m_associativity; way++) {
+    if (set[way].valid) {
+      num_lines++;
+      if (set[way].lru > line->lru) {
+        set[way].lru--;
+      }
+    }
   }
+  line->lru = num_lines - 1;
+}
+
+std::vector<const BHO3LLC::Line*> BHO3LLC::get_lru_order(const Line* set) {
+  std::vector<const Line*> lines;
+  for (int way = 0; way < m_associativity; way++) {
+    if (set[way].valid) {
+      lines.push_back(&set[way]);
+    }
+  }
+  std::sort(lines.begin(), lines.end(), [](const Line* l1, const Line* l2) { return l1->lru < l2->lru; });
+  return lines;
+}
+
+BHO3LLC::Line* BHO3LLC::check_set_hit(Line* set, Addr_t addr) {
+  Addr_t tag = get_tag(addr);
+  for (int way = 0; way < m_associativity; way++) {
+    if (set[way].valid && set[way].tag == tag) {
+      return set[way].ready ? &set[way] : nullptr;
+    }
+  }
+  return nullptr;
 }
 
 BHO3LLC::MSHR_t::iterator BHO3LLC::check_mshr_hit(Addr_t addr) {
@@ -269,9 +303,9 @@ void BHO3LLC::serialize(std::string serialization_filename) {
   serialization_file.open(serialization_filename, std::ios::out);
 
   serialization_file << "index,addr,tag,dirty" << std::endl;
-  for (auto it1 = m_cache_sets.begin(); it1 != m_cache_sets.end(); it1++) {
-    for (auto it2 = it1->second.begin(); it2 != it1->second.end(); it2++) {
-      serialization_file << it1->first << "," << it2->addr << "," << it2->tag << "," << it2->dirty << std::endl;
+  for (int index = 0; index < m_set_size; index++) {
+    for (const Line* line : get_lru_order(&m_lines[(size_t) index * m_associativity])) {
+      serialization_file << index << "," << line->addr << "," << line->tag << "," << line->dirty << std::endl;
     }
   }
   serialization_file.close();
@@ -296,10 +330,17 @@ void BHO3LLC::deserialize(std::string serialization_filename) {
     Addr_t addr = std::stoll(addr_str);
     Addr_t tag = std::stoll(tag_str);
     bool dirty = std::stoi(dirty_str);
-    if(m_cache_sets.find(index) == m_cache_sets.end()){
-      m_cache_sets.insert({index, std::list<BHO3LLC::Line>()});
+    if (index < 0 || index >= m_set_size) {
+      throw std::runtime_error("Serialized LLC set index " + index_str + " is out of range.");
+    }
+    Line* set = &m_lines[(size_t) index * m_associativity];
+    Line* free_line = std::find_if(set, set + m_associativity, [](const Line& line) { return !line.valid; });
+    if (free_line == set + m_associativity) {
+      throw std::runtime_error("Serialized LLC set " + index_str + " has more lines than ways.");
     }
-    m_cache_sets[index].push_back({addr, tag, dirty, 1});
+    // Lines are serialized from the least- to the most-recently-used one
+    int num_lines = std::count_if(set, set + m_associativity, [](const Line& line) { return line.valid; });
+    *free_line = {addr, tag, true, dirty, true, (uint8_t) num_lines};
   }
   serialization_file.close();
 }
@@ -311,9 +352,9 @@ void BHO3LLC::dump_llc() {
    */
   std::cout << "Dumping LLC" << std::endl;
   std::cout << "index,addr,tag,dirty,ready" << std::endl;
-  for (auto it1 = m_cache_sets.begin(); it1 != m_cache_sets.end(); it1++) {
-    for (auto it2 = it1->second.begin(); it2 != it1->second.end(); it2++) {
-      std::cout << it1->first << "," << it2->addr << "," << it2->tag << "," << it2->dirty << "," << it2->ready << std::endl;
+  for (int index = 0; index < m_set_size; index++) {
+    for (const Line* line : get_lru_order(&m_lines[(size_t) index * m_associativity])) {
+      std::cout << index << "," << line->addr << "," << line->tag << "," << line->dirty << "," << line->ready << std::endl;
     }
   }
 }
@@ -6,6 +6,7 @@
 
 #include "base/exception.h"
 #include "base/utils.h"
+#include "base/trace_cache.h"
 #include "frontend/impl/processor/simpleO3/core.h"
 #include "frontend/impl/processor/simpleO3/llc.h"
 
@@ -14,6 +15,11 @@ namespace Ramulator {
 namespace fs = std::filesystem;
 
 SimpleO3Core::Trace::Trace(std::string file_path_str) {
+  m_trace = TraceCache::load<Inst>("SimpleO3", file_path_str, [&file_path_str]() { return parse_trace(file_path_str); });
+  m_trace_length = m_trace->size();
+}
+
+std::vector<SimpleO3Core::Trace::Inst> SimpleO3Core::Trace::parse_trace(const std::string& file_path_str) {
   fs::path trace_path(file_path_str);
   if (!fs::exists(trace_path)) {
     throw ConfigurationError("Trace {} does not exist!", file_path_str);
@@ -24,6 +30,7 @@ SimpleO3Core::Trace::Trace(std::string file_path_str) {
     throw ConfigurationError("Trace {} cannot be opened!", file_path_str);
   }
 
+  std::vector<Inst> trace;
   std::string line;
   while (std::getline(trace_file, line)) {
     std::vector<std::string> tokens;
@@ -39,18 +46,18 @@ SimpleO3Core::Trace::Trace(std::string file_path_str) {
     bool has_store = num_tokens == 2 ? false : true; 
     if (has_store) {
       Addr_t store_addr = std::stoll(tokens[2]);
-      m_trace.push_back({bubble_count, load_addr, store_addr});
+      trace.push_back({bubble_count, load_addr, store_addr});
     } else {
-      m_trace.push_back({bubble_count, load_addr, -1});
+      trace.push_back({bubble_count, load_addr, -1});
     }
   }
 
   trace_file.close();
-  m_trace_length = m_trace.size();
+  return trace;
 }
 
 const SimpleO3Core::Trace::Inst& SimpleO3Core::Trace::get_next_inst() {
-  const Inst& inst = m_trace[m_curr_trace_idx];
+  const Inst& inst = (*m_trace)[m_curr_trace_idx];
   m_curr_trace_idx = (m_curr_trace_idx + 1) % m_trace_length;
   return inst;
 }
@@ -145,7 +152,7 @@ void SimpleO3Core::tick() {
       return;
     };
 
-    Request load_request(m_load_addr, Request::Type::Read, m_id, m_callback);
+    Request load_request(m_load_addr, Request::Type::Read, m_id, m_callback_id);
     if (!m_translation->translate(load_request)) {
       return;
     };
@@ -166,7 +173,7 @@ void SimpleO3Core::tick() {
 
   // Third, try to send the writeback to the LLC
   if (m_writeback_addr != -1) {
-    Request writeback_request(m_writeback_addr, Request::Type::Write, m_id, m_callback);
+    Request writeback_request(m_writeback_addr, Request::Type::Write, m_id, m_callback_id);
     if (!m_translation->translate(writeback_request)) {
       return;
     };
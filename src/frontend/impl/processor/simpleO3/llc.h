@@ -2,7 +2,6 @@
 #define     RAMULATOR_FRONTEND_PROCESSOR_SIMPLEO3_LLC_H
 
 #include <vector>
-#include <list>
 #include <unordered_map>
 #include <iostream>
 #include <fstream>
@@ -23,26 +22,30 @@ class SimpleO3LLC : public Clocked<SimpleO3LLC> {
   struct Line {
     Addr_t addr = -1;
     Addr_t tag = -1;
+    bool valid = false;
     bool dirty = false;
     bool ready = false;   // Whether this line is ready (i.e., is still inflight?)
+    uint8_t lru = 0;      // Position of the line in the LRU order of its set (0 is the least-recently-used valid line)
   };
 
   private:
-    using CacheSet_t = std::list<Line>;   // LRU queue for the set. The head of the list is the least-recently-used way.
-    std::unordered_map<int, CacheSet_t> m_cache_sets;
+    // All ways of all sets, preallocated. The ways of set i are [i * m_associativity, (i + 1) * m_associativity).
+    std::vector<Line> m_lines;
     
-    using MSHREntry_t = std::pair<Addr_t, CacheSet_t::iterator>;
+    using MSHREntry_t = std::pair<Addr_t, Line*>;
     using MSHR_t = std::vector<MSHREntry_t>;
     MSHR_t m_mshrs;
     std::unordered_map<Addr_t, std::vector<Request>> m_receive_requests;
 
     // Request that miss in the LLC with the clock cycle (current cycle + llc latency) that they 
     // should be sent to the memory system
-    std::list<std::pair<Clk_t, Request>> m_miss_list;
+    RingBuffer<std::pair<Clk_t, Request>> m_miss_list;
+    // Whether each due miss request was accepted by the memory system in this cycle
+    std::vector<bool> m_miss_sent;
 
     // Request that hit in the LLC with the clock cycle (current cycle + llc latency) that they 
     // should be sent back to the core (calls the callback)
-    std::list<std::pair<Clk_t, Request>> m_hit_list;
+    RingBuffer<std::pair<Clk_t, Request>> m_hit_list;
 
     IMemorySystem* m_memory_system;
 
@@ -88,12 +91,14 @@ class SimpleO3LLC : public Clocked<SimpleO3LLC> {
     Addr_t get_tag(Addr_t addr) { return (addr >> m_tag_offset); };
     Addr_t align(Addr_t addr)   { return (addr & ~(m_linesize_bytes-1l)); };
 
-    CacheSet_t& get_set(Addr_t addr);
-    CacheSet_t::iterator allocate_line(CacheSet_t& set, Addr_t addr);
-    bool need_eviction(const CacheSet_t& set, Addr_t addr);
-    void evict_line(CacheSet_t& set, CacheSet_t::iterator victim_it);
+    Line* get_set(Addr_t addr)  { return &m_lines[(size_t) get_index(addr) * m_associativity]; };
+    Line* allocate_line(Line* set, Addr_t addr);
+    bool has_available_line(const Line* set);
+    void evict_line(Line* set, Line* victim);
+    void touch_line(Line* set, Line* line);
+    std::vector<const Line*> get_lru_order(const Line* set);
 
-    CacheSet_t::iterator check_set_hit(CacheSet_t& set, Addr_t addr);
+    Line* check_set_hit(Line* set, Addr_t addr);
     MSHR_t::iterator check_mshr_hit(Addr_t addr);
 };
 
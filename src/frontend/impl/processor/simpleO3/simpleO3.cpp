@@ -56,7 +56,6 @@ class SimpleO3 final : public IFrontEnd, public Implementation {
       // Create the cores
       for (int id = 0; id < m_num_cores; id++) {
         SimpleO3Core* core = new SimpleO3Core(id, ipc, depth, m_num_expected_insts, trace_list[id], m_translation, m_llc);
-        core->m_callback = [this](Request& req){return this->receive(req);} ;
         m_cores.push_back(core);
       }
 
@@ -95,7 +94,7 @@ class SimpleO3 final : public IFrontEnd, public Implementation {
       m_llc->receive(req);
 
       // TODO: LLC latency for the core to receive the request?
-      for (auto r : m_llc->m_receive_requests[req.addr]) {
+      for (auto& r : m_llc->m_receive_requests[req.addr]) {
         r.arrive = req.arrive;
         r.depart = req.depart;
         m_cores[r.source_id]->receive(r);
@@ -114,6 +113,10 @@ class SimpleO3 final : public IFrontEnd, public Implementation {
 
     void connect_memory_system(IMemorySystem* memory_system) override {
       m_llc->connect_memory_system(memory_system);
+      int callback_id = memory_system->register_callback([this](Request& req){ this->receive(req); });
+      for (auto core : m_cores) {
+        core->m_callback_id = callback_id;
+      }
     };
 
     int get_num_cores() override {
@@ -1,4 +1,12 @@
 #include <iostream>
+#include <map>
+#include <set>
+#include <limits>
+#include <thread>
+#include <algorithm>
+
+#include <unistd.h>
+#include <sys/wait.h>
 
 #include <argparse/argparse.hpp>
 #include <spdlog/spdlog.h>
@@ -6,9 +14,28 @@
 
 #include "base/base.h"
 #include "base/config.h"
+#include "base/profiler.h"
 #include "frontend/frontend.h"
 #include "memory_system/memory_system.h"
+#include "dram_controller/controller.h"
 #include "example/example_ifce.h"
+#include "simulation.h"
+#include "daemon.h"
+#include "batch.h"
+
+void finalize_simulation(Ramulator::IFrontEnd* frontend, Ramulator::IMemorySystem* memory_system, const std::string& stats_path) {
+  // Finalize the simulation. Recursively print all statistics from all components
+  frontend->finalize();
+  memory_system->finalize();
+
+  // Dump the statistics of all components into one machine-readable file if a path is given
+  if (!stats_path.empty()) {
+    YAML::Node stats_records;
+    frontend->m_impl->collect_stats(stats_records);
+    memory_system->m_impl->collect_stats(stats_records);
+    Ramulator::write_stats_file(stats_path, stats_records);
+  }
+}
 
 int main(int argc, char* argv[]) {
   // Parse command line arguments
@@ -20,6 +47,16 @@ int main(int argc, char* argv[]) {
   program.add_argument("-p", "--param").metavar("KEY=VALUE")
     .append()
     .help("Specify parameter to override in the configuration file. Repeat this option to change multiple parameters.");
+  program.add_argument("--daemon").metavar("path-to-socket")
+    .help("Run as a daemon that accepts simulation jobs on this Unix socket (see ramulator_client.py).");
+  program.add_argument("--workers").metavar("N")
+    .help("Number of jobs the daemon simulates at the same time.")
+    .default_value(int(std::max(1u, std::thread::hardware_concurrency())))
+    .scan<'i', int>();
+  program.add_argument("--trace_cache_mb").metavar("MB")
+    .help("Memory the daemon may use to keep parsed traces across jobs.")
+    .default_value(1024)
+    .scan<'i', int>();
 
   try {
     program.parse_args(argc, argv);
@@ -30,6 +67,10 @@ int main(int argc, char* argv[]) {
     std::exit(1);
   }
 
+  if (auto arg = program.present<std::string>("--daemon")) {
+    return Ramulator::run_daemon(*arg, program.get<int>("--workers"), size_t(program.get<int>("--trace_cache_mb")) << 20);
+  }
+
   // Are we accepting the configuration YAML through commandline dump?
   bool use_dumped_yaml = false;
   std::string dumped_config;
@@ -78,6 +119,12 @@ int main(int argc, char* argv[]) {
     config = Ramulator::Config::parse_config_file(config_file_path, params);
   }
 
+  if (config["Batch"]) {
+    return Ramulator::run_batch(config);
+  }
+
+  Ramulator::Profiler::configure(config);
+
   // Instaniate the frontend of the simulated system, this is one of the top-level objects in Ramulator 2.0.
   // It also recursively instaniate all components in the frontend.
   auto frontend = Ramulator::Factory::create_frontend(config);
@@ -97,23 +144,167 @@ int main(int argc, char* argv[]) {
 
   int tick_mult = frontend_tick * mem_tick;
 
-  for (uint64_t i = 0;; i++) {
-    if (((i % tick_mult) % mem_tick) == 0) {
-      frontend->tick();
+  // Simulate until the frontend finishes (returns true) or the memory system has been ticked max_mem_cycles times (returns false)
+  uint64_t i = 0;
+  uint64_t mem_cycles = 0;
+  auto simulate = [&](uint64_t max_mem_cycles) {
+    for (;; i++) {
+      // Jump over idle stretches, only at the start of a clock period
+      if (i % tick_mult == 0) {
+        mem_cycles += Ramulator::skip_idle_cycles(frontend, memory_system, max_mem_cycles - mem_cycles);
+      }
+
+      bool mem_ticks = (i % tick_mult) % frontend_tick == 0;
+      if (mem_ticks && mem_cycles == max_mem_cycles) {
+        return false;
+      }
+
+      Ramulator::Profiler::on_cycle(mem_cycles);
+      if (((i % tick_mult) % mem_tick) == 0) {
+        RAMULATOR_PROFILE(frontend->m_impl, "tick");
+        frontend->tick();
+      }
+
+      if (frontend->is_finished()) {
+        return true;
+      }
+
+      if (mem_ticks) {
+        RAMULATOR_PROFILE(memory_system->m_impl, "tick");
+        memory_system->tick();
+        mem_cycles++;
+      }
     }
+  };
+
+  std::string stats_path = config["stats_path"].as<std::string>("");
+
+  const YAML::Node& fork_config = config["Fork"];
+  if (!fork_config) {
+    simulate(std::numeric_limits<uint64_t>::max());
+    finalize_simulation(frontend, memory_system, stats_path);
+    Ramulator::Profiler::dump();
+    return 0;
+  }
+
+  // Simulate the shared warmup once, then fork one process per variant that continues from the warmed-up state
+  const YAML::Node& variants = fork_config["variants"];
+  if (!variants || !variants.IsSequence() || variants.size() == 0) {
+    spdlog::error("Fork needs a non-empty list of variants!");
+    std::exit(1);
+  }
+  uint64_t warmup_cycles = fork_config["warmup_cycles"].as<uint64_t>(0);
+  size_t max_parallel = fork_config["max_parallel"].as<size_t>(1);
 
-    if (frontend->is_finished()) {
-      break;
+  auto get_variant_id = [&](size_t v) {
+    return variants[v]["id"].as<std::string>(fmt::format("variant_{}", v));
+  };
+  // Files the controller plugins write to (TraceRecorder, CommandCounter, ...)
+  auto get_plugin_paths = [](const YAML::Node& plugins) {
+    std::vector<std::string> paths;
+    for (const auto& plugin : plugins) {
+      if (plugin["ControllerPlugin"] && plugin["ControllerPlugin"]["path"]) {
+        paths.push_back(plugin["ControllerPlugin"]["path"].as<std::string>());
+      }
     }
+    return paths;
+  };
 
-    if ((i % tick_mult) % frontend_tick == 0) {
-      memory_system->tick();
+  // The children would all write to (or append to) the same files otherwise, so every variant needs its own
+  std::string access_log = frontend->get_access_log_path();
+  std::vector<std::string> plugin_paths = get_plugin_paths(config["MemorySystem"]["Controller"]["plugins"]);
+  std::set<std::string> used_paths(plugin_paths.begin(), plugin_paths.end());
+  for (const auto& path : {stats_path, access_log}) {
+    if (!path.empty()) {
+      used_paths.insert(path);
+    }
+  }
+  for (size_t v = 0; v < variants.size(); v++) {
+    const YAML::Node& variant = variants[v];
+    auto check_own_path = [&](const std::string& key, const std::string& path) {
+      if (path.empty() || !used_paths.insert(path).second) {
+        spdlog::error("Variant {} of Fork needs its own {}, different from those of the base config and of the other variants!", get_variant_id(v), key);
+        std::exit(1);
+      }
+    };
+    check_own_path("output_path", variant["output_path"].as<std::string>(""));
+    if (!stats_path.empty() || variant["stats_path"]) {
+      check_own_path("stats_path", variant["stats_path"].as<std::string>(""));
+    }
+    if (!access_log.empty()) {
+      check_own_path("access_log", variant["access_log"].as<std::string>(""));
+    }
+    if (!plugin_paths.empty() && !variant["plugins"]) {
+      spdlog::error("The controller plugins write to files, variant {} of Fork needs its own plugins!", get_variant_id(v));
+      std::exit(1);
+    }
+    for (const auto& path : get_plugin_paths(variant["plugins"])) {
+      check_own_path("plugin path", path);
     }
   }
 
-  // Finalize the simulation. Recursively print all statistics from all components
-  frontend->finalize();
-  memory_system->finalize();
+  if (simulate(warmup_cycles)) {
+    spdlog::warn("The simulation finished during the warmup ({} memory cycles).", mem_cycles);
+  }
+  spdlog::info("Warmed up for {} memory cycles, forking {} variants.", mem_cycles, variants.size());
+  // Anything still buffered would otherwise be written once by every child
+  std::cout.flush();
+  std::fflush(nullptr);
+
+  std::map<pid_t, std::string> running;
+  int num_failed = 0;
+  auto wait_variant = [&]() {
+    int status = 0;
+    pid_t pid = wait(&status);
+    if (WIFEXITED(status) && WEXITSTATUS(status) == 0) {
+      spdlog::info("Variant {} finished.", running[pid]);
+    } else {
+      spdlog::error("Variant {} failed!", running[pid]);
+      num_failed++;
+    }
+    running.erase(pid);
+  };
 
-  return 0;
-}
\ No newline at end of file
+  for (size_t v = 0; v < variants.size(); v++) {
+    const YAML::Node& variant = variants[v];
+    std::string variant_id = get_variant_id(v);
+
+    if (running.size() >= max_parallel) {
+      wait_variant();
+    }
+
+    pid_t pid = fork();
+    if (pid < 0) {
+      spdlog::error("Failed to fork variant {}!", variant_id);
+      std::exit(1);
+    } else if (pid > 0) {
+      running[pid] = variant_id;
+      continue;
+    }
+
+    // Child: apply the variant and finish the simulation
+    memory_system->after_fork();
+    if (auto output_path = variant["output_path"].as<std::string>(); std::freopen(output_path.c_str(), "w", stdout) == nullptr) {
+      spdlog::error("Cannot open {} for variant {}!", output_path, variant_id);
+      std::exit(1);
+    }
+    if (!access_log.empty()) {
+      frontend->redirect_access_log(variant["access_log"].as<std::string>());
+    }
+    if (variant["plugins"]) {
+      for (auto controller : memory_system->get_ifces<Ramulator::IDRAMController>()) {
+        controller->replace_plugins(variant["plugins"], frontend, memory_system);
+      }
+      memory_system->gather_components();
+    }
+    simulate(std::numeric_limits<uint64_t>::max());
+    finalize_simulation(frontend, memory_system, variant["stats_path"].as<std::string>(""));
+    Ramulator::Profiler::dump("." + variant_id);
+    std::exit(0);
+  }
+
+  while (!running.empty()) {
+    wait_variant();
+  }
+  return num_failed > 0 ? 1 : 0;
+}
@@ -3,6 +3,7 @@
 #include "dram_controller/bh_controller.h"
 #include "addr_mapper/addr_mapper.h"
 #include "dram/dram.h"
+#include "base/profiler.h"
 
 namespace Ramulator {
 
@@ -48,7 +49,11 @@ class BHDRAMSystem final : public IBHMemorySystem, public Implementation {
     void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override { }
 
     bool send(Request req) override {
-      m_addr_mapper->apply(req);
+      RAMULATOR_PROFILE(this, "send");
+      {
+        RAMULATOR_PROFILE(m_addr_mapper->m_impl, "apply");
+        m_addr_mapper->apply(req);
+      }
       int channel_id = req.addr_vec[0];
       bool is_success = m_controllers[channel_id]->send(req);
 
@@ -73,8 +78,12 @@ class BHDRAMSystem final : public IBHMemorySystem, public Implementation {
     
     void tick() override {
       m_clk++;
-      m_dram->tick();
+      {
+        RAMULATOR_PROFILE(m_dram->m_impl, "tick");
+        m_dram->tick();
+      }
       for (auto controller : m_controllers) {
+        RAMULATOR_PROFILE(controller->m_impl, "tick");
         controller->tick();
       }
     };
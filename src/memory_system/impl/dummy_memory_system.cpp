@@ -11,9 +11,7 @@ class DummyMemorySystem final : public IMemorySystem, public Implementation {
     };
 
     bool send(Request req) override { 
-      if (req.callback) {
-        req.callback(req);
-      }
+      complete(req);
       return true; 
     };
 
@@ -3,6 +3,8 @@
 #include "dram_controller/controller.h"
 #include "addr_mapper/addr_mapper.h"
 #include "dram/dram.h"
+#include "base/profiler.h"
+#include "base/lockstep_pool.h"
 
 namespace Ramulator {
 
@@ -15,10 +17,21 @@ class GenericDRAMSystem final : public IMemorySystem, public Implementation {
     IAddrMapper*  m_addr_mapper;
     std::vector<IDRAMController*> m_controllers;
 
+    std::unique_ptr<LockstepPool> m_channel_pool;     // Ticks the controllers in parallel (nullptr: one after another)
+    std::vector<std::vector<Request>> m_completed;    // Requests served by each channel during a parallel tick
+    bool m_is_parallel_tick = false;
+
+    void create_channel_pool(size_t num_threads) {
+      m_channel_pool = std::make_unique<LockstepPool>(num_threads, m_controllers.size(), [this](size_t channel_id) {
+        m_controllers[channel_id]->tick();
+      });
+    }
+
   public:
     int s_num_read_requests = 0;
     int s_num_write_requests = 0;
     int s_num_other_requests = 0;
+    size_t s_num_warmed_requests = 0;
 
 
   public:
@@ -39,16 +52,41 @@ class GenericDRAMSystem final : public IMemorySystem, public Implementation {
 
       m_clock_ratio = param<uint>("clock_ratio").required();
 
+      int num_threads = param<int>("num_threads").desc("Number of threads that tick the channel controllers in parallel (1: tick them one after another).").default_val(1);
+      if (num_threads > 1 && num_channels > 1) {
+        if (Profiler::is_enabled()) {
+          // The profiler is not thread-safe
+          spdlog::warn("GenericDRAM: Ignoring num_threads = {} while profiling, the channels are ticked one after another.", num_threads);
+        } else {
+          create_channel_pool(num_threads);
+          m_completed.resize(num_channels);
+        }
+      }
+
       register_stat(m_clk).name("memory_system_cycles");
       register_stat(s_num_read_requests).name("total_num_read_requests");
       register_stat(s_num_write_requests).name("total_num_write_requests");
       register_stat(s_num_other_requests).name("total_num_other_requests");
+      register_stat(s_num_warmed_requests).name("total_num_warmed_requests");
     };
 
     void setup(IFrontEnd* frontend, IMemorySystem* memory_system) override { }
 
+    void after_fork() override {
+      if (m_channel_pool) {
+        // The workers of the pool only exist in the parent, so the pool can neither run nor be joined here: leave it behind
+        size_t num_threads = m_channel_pool->get_num_threads();
+        m_channel_pool.release();
+        create_channel_pool(num_threads);
+      }
+    };
+
     bool send(Request req) override {
-      m_addr_mapper->apply(req);
+      RAMULATOR_PROFILE(this, "send");
+      {
+        RAMULATOR_PROFILE(m_addr_mapper->m_impl, "apply");
+        m_addr_mapper->apply(req);
+      }
       int channel_id = req.addr_vec[0];
       bool is_success = m_controllers[channel_id]->send(req);
 
@@ -71,12 +109,64 @@ class GenericDRAMSystem final : public IMemorySystem, public Implementation {
 
       return is_success;
     };
+
+    void warm(Request req) override {
+      m_addr_mapper->apply(req);
+      int channel_id = req.addr_vec[0];
+      m_controllers[channel_id]->warm(req);
+      s_num_warmed_requests++;
+    };
     
     void tick() override {
       m_clk++;
-      m_dram->tick();
+      {
+        RAMULATOR_PROFILE(m_dram->m_impl, "tick");
+        m_dram->tick();
+      }
+      if (m_channel_pool) {
+        // The channels share no state, only the senders of their requests need to be notified in a deterministic order
+        m_is_parallel_tick = true;
+        m_channel_pool->run();
+        m_is_parallel_tick = false;
+        for (auto& completed : m_completed) {
+          for (auto& req : completed) {
+            IMemorySystem::complete(req);
+          }
+          completed.clear();
+        }
+      } else {
+        for (auto controller : m_controllers) {
+          RAMULATOR_PROFILE(controller->m_impl, "tick");
+          controller->tick();
+        }
+      }
+    };
+
+    void complete(Request& req) override {
+      if (m_is_parallel_tick) {
+        // Delay the callback until all channels are ticked, so that the senders see the same order as with sequential ticking
+        m_completed[req.addr_vec[0]].push_back(req);
+      } else {
+        IMemorySystem::complete(req);
+      }
+    };
+
+    Clk_t get_idle_ticks() override {
+      Clk_t idle_ticks = m_dram->get_idle_ticks();
+      for (auto controller : m_controllers) {
+        idle_ticks = std::min(idle_ticks, controller->get_idle_ticks());
+        if (idle_ticks == 0) {
+          break;
+        }
+      }
+      return idle_ticks;
+    };
+
+    void skip_ticks(Clk_t num_ticks) override {
+      m_clk += num_ticks;
+      m_dram->skip_ticks(num_ticks);
       for (auto controller : m_controllers) {
-        controller->tick();
+        controller->skip_ticks(num_ticks);
       }
     };
 
@@ -20,6 +20,7 @@ class IMemorySystem : public TopLevel<IMemorySystem> {
   protected:
     IFrontEnd* m_frontend;
     uint m_clock_ratio = 1;
+    std::vector<std::function<void(Request&)>> m_callbacks;    // Completion callbacks, indexed by Request::callback_id
 
   public:
     virtual void connect_frontend(IFrontEnd* frontend) { 
@@ -30,7 +31,11 @@ class IMemorySystem : public TopLevel<IMemorySystem> {
       }
     };
 
-    virtual void finalize() { 
+    /**
+     * @brief    Finalizes all components and prints the stats to output
+     * 
+     */
+    virtual void finalize(std::ostream& output = std::cout) { 
       for (auto component : m_components) {
         component->finalize();
       }
@@ -39,7 +44,7 @@ class IMemorySystem : public TopLevel<IMemorySystem> {
       emitter << YAML::BeginMap;
       m_impl->print_stats(emitter);
       emitter << YAML::EndMap;
-      std::cout << emitter.c_str() << std::endl;
+      output << emitter.c_str() << std::endl;
     };
 
     /**
@@ -51,12 +56,66 @@ class IMemorySystem : public TopLevel<IMemorySystem> {
      */
     virtual bool send(Request req) = 0;
 
+    /**
+     * @brief         Functionally applies the request to the memory system states (e.g., opens its row) without simulating its timing
+     * 
+     * @details
+     * Used by sampled simulations to keep the bank and row-buffer states warm between the detailed intervals.
+     * Should only be called while the memory system has no request in flight.
+     * 
+     */
+    virtual void warm(Request req) {
+      throw ConfigurationError("Memory system {} does not support functional warming!", m_impl->get_name());
+    };
+
+    /**
+     * @brief         Registers a function to call when a request is served
+     * 
+     * @details
+     * Senders register their completion callback once and tag their requests with the returned id (Request::callback_id),
+     * so that the requests do not have to carry a closure each.
+     * 
+     * @return   int      The callback id.
+     */
+    int register_callback(std::function<void(Request&)> callback) {
+      m_callbacks.push_back(std::move(callback));
+      return m_callbacks.size() - 1;
+    };
+
+    /**
+     * @brief         Notifies the sender of a served request through its callback (nothing if it has none)
+     * 
+     */
+    virtual void complete(Request& req) {
+      if (req.callback_id >= 0) {
+        m_callbacks[req.callback_id](req);
+      }
+    };
+
     /**
      * @brief         Ticks the memory system
      * 
      */
     virtual void tick() = 0;
 
+    /**
+     * @brief         Returns how many of the upcoming ticks would only advance the clocks of the memory system (0 if unknown)
+     * 
+     */
+    virtual Clk_t get_idle_ticks() { return 0; };
+
+    /**
+     * @brief         Advances the clocks of the memory system by num_ticks ticks (at most get_idle_ticks())
+     * 
+     */
+    virtual void skip_ticks(Clk_t num_ticks) { };
+
+    /**
+     * @brief         Restarts the threads of the memory system in a child process created by fork() (only the forking thread is copied)
+     * 
+     */
+    virtual void after_fork() { };
+
     /**
      * @brief    Returns 
      * 
@@ -0,0 +1,307 @@
+#include <string>
+#include <vector>
+#include <limits>
+#include <sstream>
+#include <optional>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+
+#include "base/base.h"
+#include "base/request.h"
+#include "frontend/frontend.h"
+#include "memory_system/memory_system.h"
+#include "addr_mapper/addr_mapper.h"
+#include "dram/dram.h"
+
+namespace py = pybind11;
+
+namespace Ramulator {
+
+/**
+ * @brief    Converts a (nested) Python dict/list config into the YAML node the factory expects
+ */
+YAML::Node to_yaml(const py::handle& obj) {
+  YAML::Node node;
+  if (obj.is_none()) {
+    return node;
+  } else if (py::isinstance<py::dict>(obj)) {
+    for (auto item : py::reinterpret_borrow<py::dict>(obj)) {
+      node[py::str(item.first).cast<std::string>()] = to_yaml(item.second);
+    }
+  } else if (py::isinstance<py::list>(obj) || py::isinstance<py::tuple>(obj)) {
+    for (auto item : obj) {
+      node.push_back(to_yaml(item));
+    }
+  } else if (py::isinstance<py::bool_>(obj)) {
+    node = obj.cast<bool>();
+  } else {
+    node = py::str(obj).cast<std::string>();
+  }
+  return node;
+}
+
+/**
+ * @brief    Converts the stats records (see Implementation::collect_stats) into Python objects
+ *
+ * @details
+ * Scalars are returned as int, float or str (in this order of preference), sequences as lists.
+ *
+ */
+py::object to_python(const YAML::Node& node) {
+  switch (node.Type()) {
+    case YAML::NodeType::Map: {
+      py::dict d;
+      for (auto it = node.begin(); it != node.end(); ++it) {
+        d[py::str(it->first.as<std::string>())] = to_python(it->second);
+      }
+      return d;
+    }
+    case YAML::NodeType::Sequence: {
+      py::list l;
+      for (auto it = node.begin(); it != node.end(); ++it) {
+        l.append(to_python(*it));
+      }
+      return l;
+    }
+    case YAML::NodeType::Scalar: {
+      int64_t i;
+      double f;
+      if (YAML::convert<int64_t>::decode(node, i)) {
+        return py::int_(i);
+      } else if (YAML::convert<double>::decode(node, f)) {
+        return py::float_(f);
+      }
+      return py::str(node.as<std::string>());
+    }
+    default:
+      return py::none();
+  }
+}
+
+
+/**
+ * @brief    One simulated system driven from Python
+ *
+ * @details
+ * The memory system is built from the "MemorySystem" section of the config exactly as in main.cpp. The frontend is always
+ * the external-request (GEM5) frontend: requests come from NumPy arrays passed to run() instead of a trace file.
+ * Nothing is printed or written to disk, all results are returned as Python objects.
+ *
+ */
+class Simulation {
+  private:
+    IFrontEnd* m_frontend = nullptr;
+    IMemorySystem* m_memory_system = nullptr;
+    uint64_t m_clk = 0;
+    bool m_finalized = false;
+
+    // Completion cycle of every request in flight, indexed by the source id we gave it
+    std::vector<int64_t> m_done;
+    std::vector<int> m_remaining_lines;
+    size_t m_num_done = 0;
+
+  public:
+    Simulation(const py::dict& config_dict) {
+      YAML::Node config = to_yaml(config_dict);
+      if (!config["MemorySystem"]) {
+        throw py::value_error("The config needs a MemorySystem section!");
+      }
+      YAML::Node frontend_config;
+      frontend_config["impl"] = "GEM5";
+      config["Frontend"] = frontend_config;
+
+      m_frontend = Factory::create_frontend(config);
+      m_memory_system = Factory::create_memory_system(config);
+      m_frontend->connect_memory_system(m_memory_system);
+      m_memory_system->connect_frontend(m_frontend);
+    }
+
+    ~Simulation() {
+      for (auto component : m_frontend->get_ifces<Implementation>()) {
+        delete component;
+      }
+      for (auto component : m_memory_system->get_ifces<Implementation>()) {
+        delete component;
+      }
+      delete m_frontend->m_impl;
+      delete m_memory_system->m_impl;
+    }
+
+    Simulation(const Simulation&) = delete;
+    Simulation& operator=(const Simulation&) = delete;
+
+    uint64_t cycles() const { return m_clk; };
+
+    /**
+     * @brief    Sends the requests in order and ticks the memory system until all of them are served
+     *
+     * @param    ops            Request type of every request (0 = Read, 1 = Write).
+     * @param    addrs          Byte address of every request.
+     * @param    sizes          Size in bytes of every request (optional). Requests are split into line_size accesses.
+     * @param    issue_width    Maximum number of accesses sent per memory cycle.
+     * @param    max_cycles     Give up (raise) after this many memory cycles.
+     * @return   Dict with the per-request numpy arrays "issue", "accept", "done" (memory cycles) and "latency" (done - issue),
+     *           and the number of memory cycles simulated by this call.
+     */
+    py::dict run(py::array_t<int64_t, py::array::c_style | py::array::forcecast> ops,
+                 py::array_t<int64_t, py::array::c_style | py::array::forcecast> addrs,
+                 std::optional<py::array_t<int64_t, py::array::c_style | py::array::forcecast>> sizes,
+                 int line_size, int issue_width, uint64_t max_cycles) {
+      if (m_finalized) {
+        throw std::runtime_error("The simulation has already been finalized by stats()!");
+      }
+      if (ops.ndim() != 1 || addrs.ndim() != 1 || ops.shape(0) != addrs.shape(0) ||
+          (sizes && (sizes->ndim() != 1 || sizes->shape(0) != ops.shape(0)))) {
+        throw py::value_error("ops, addrs and sizes must be 1-D arrays of the same length!");
+      }
+      if (line_size <= 0 || issue_width <= 0) {
+        throw py::value_error("line_size and issue_width must be positive!");
+      }
+
+      size_t num_reqs = ops.shape(0);
+      auto op = ops.unchecked<1>();
+      auto addr = addrs.unchecked<1>();
+
+      py::array_t<int64_t> issue(num_reqs), accept(num_reqs), done(num_reqs), latency(num_reqs);
+      auto r_issue = issue.mutable_unchecked<1>();
+      auto r_accept = accept.mutable_unchecked<1>();
+      auto r_done = done.mutable_unchecked<1>();
+      auto r_latency = latency.mutable_unchecked<1>();
+
+      m_done.assign(num_reqs, -1);
+      m_remaining_lines.assign(num_reqs, 0);
+      std::vector<int> num_lines(num_reqs, 1);
+      for (size_t i = 0; i < num_reqs; i++) {
+        if (sizes) {
+          int64_t size = sizes->at(i);
+          Addr_t first = addr(i) / line_size;
+          Addr_t last = (addr(i) + std::max<int64_t>(size, 1) - 1) / line_size;
+          num_lines[i] = last - first + 1;
+        }
+        m_remaining_lines[i] = num_lines[i];
+        r_issue(i) = -1;
+      }
+
+      auto callback = [this](Request& req) {
+        if (--m_remaining_lines[req.source_id] == 0) {
+          m_done[req.source_id] = m_clk;
+          m_num_done++;
+        }
+      };
+
+      uint64_t start_clk = m_clk;
+      size_t next_req = 0;
+      int next_line = 0;
+      m_num_done = 0;
+      while (m_num_done < num_reqs) {
+        if (m_clk - start_clk >= max_cycles) {
+          throw std::runtime_error(fmt::format("{} of {} requests still outstanding after {} memory cycles!",
+                                               num_reqs - m_num_done, num_reqs, max_cycles));
+        }
+
+        // Send up to issue_width accesses in order, stop at the first one the memory system rejects
+        for (int sent = 0; sent < issue_width && next_req < num_reqs; sent++) {
+          Addr_t line_addr = (sizes ? (addr(next_req) / line_size + next_line) * line_size : addr(next_req));
+          if (next_line == 0 && r_issue(next_req) < 0) {
+            r_issue(next_req) = m_clk - start_clk;
+          }
+          if (!m_frontend->receive_external_requests(op(next_req), line_addr, next_req, callback)) {
+            break;
+          }
+          if (++next_line == num_lines[next_req]) {
+            r_accept(next_req) = m_clk - start_clk;
+            next_req++;
+            next_line = 0;
+          }
+        }
+
+        m_memory_system->tick();
+        m_clk++;
+      }
+
+      for (size_t i = 0; i < num_reqs; i++) {
+        r_done(i) = m_done[i] - start_clk;
+        r_latency(i) = r_done(i) - r_issue(i);
+      }
+
+      py::dict result;
+      result["issue"] = issue;
+      result["accept"] = accept;
+      result["done"] = done;
+      result["latency"] = latency;
+      result["cycles"] = m_clk - start_clk;
+      return result;
+    }
+
+    /**
+     * @brief    Decodes byte addresses with the address mapper of the memory system, without simulating them
+     *
+     * @return   (len(addrs), number of levels) int32 array with the DRAM address vector of every address.
+     */
+    py::array_t<int32_t> decode(py::array_t<int64_t, py::array::c_style | py::array::forcecast> addrs) {
+      if (addrs.ndim() != 1) {
+        throw py::value_error("addrs must be a 1-D array!");
+      }
+      IAddrMapper* mapper = m_memory_system->get_ifce<IAddrMapper>();
+      IDRAM* dram = m_memory_system->get_ifce<IDRAM>();
+
+      size_t num_addrs = addrs.shape(0);
+      size_t num_levels = dram->m_organization.count.size();
+      std::vector<AddrVec_t> addr_vecs(num_addrs);
+      mapper->decode(addrs.data(), num_addrs, addr_vecs.data());
+
+      py::array_t<int32_t> result({num_addrs, num_levels});
+      auto r = result.mutable_unchecked<2>();
+      for (size_t i = 0; i < num_addrs; i++) {
+        for (size_t level = 0; level < num_levels; level++) {
+          r(i, level) = addr_vecs[i][level];
+        }
+      }
+      return result;
+    }
+
+    /**
+     * @brief    Finalizes all components (once) and returns their stats records, keyed by component path
+     *
+     * @details
+     * The records have the same layout as the stats file written by ramulator2 with stats_path.
+     *
+     */
+    py::dict stats() {
+      if (!m_finalized) {
+        // Same sequence as ramulator2, the printed stats are dropped since the records hold them all
+        std::ostringstream output;
+        m_frontend->finalize(output);
+        m_memory_system->finalize(output);
+        m_finalized = true;
+      }
+
+      YAML::Node records;
+      m_frontend->m_impl->collect_stats(records);
+      m_memory_system->m_impl->collect_stats(records);
+      return to_python(records);
+    }
+};
+
+}        // namespace Ramulator
+
+
+PYBIND11_MODULE(pyramulator, m) {
+  m.doc() = "In-process Ramulator 2.0 simulations driven by NumPy arrays.";
+
+  py::class_<Ramulator::Simulation>(m, "Simulation")
+    .def(py::init<const py::dict&>(), py::arg("config"))
+    .def("run", &Ramulator::Simulation::run,
+         py::arg("ops"), py::arg("addrs"), py::arg("sizes") = py::none(),
+         py::arg("line_size") = 64, py::arg("issue_width") = 1,
+         py::arg("max_cycles") = std::numeric_limits<uint64_t>::max(),
+         "Serve the requests (ops: 0 = Read, 1 = Write) and return their per-request cycles as numpy arrays.")
+    .def("decode", &Ramulator::Simulation::decode, py::arg("addrs"),
+         "Decode byte addresses into DRAM address vectors (one row per address, one column per level) with the address mapper.")
+    .def("stats", &Ramulator::Simulation::stats,
+         "Finalize the simulation and return the stats records of all components.")
+    .def_property_readonly("cycles", &Ramulator::Simulation::cycles,
+         "Memory cycles simulated so far.");
+}
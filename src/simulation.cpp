@@ -0,0 +1,92 @@
+#include <limits>
+#include <sstream>
+#include <algorithm>
+
+#include "simulation.h"
+
+
+namespace Ramulator {
+
+uint64_t skip_idle_cycles(IFrontEnd* frontend, IMemorySystem* memory_system, uint64_t max_mem_cycles) {
+  // Query the frontend first, it is cheap and rarely idle when the memory system is busy
+  Clk_t frontend_idle_ticks = frontend->get_idle_ticks();
+  if (frontend_idle_ticks == 0) {
+    return 0;
+  }
+  Clk_t mem_idle_ticks = memory_system->get_idle_ticks();
+  if (mem_idle_ticks == 0) {
+    return 0;
+  }
+
+  // In one clock period, the frontend and the memory system tick as many times as their clock ratios
+  Clk_t frontend_period_ticks = frontend->get_clock_ratio();
+  Clk_t mem_period_ticks = memory_system->get_clock_ratio();
+  Clk_t num_periods = std::min({
+    frontend_idle_ticks / frontend_period_ticks,
+    mem_idle_ticks / mem_period_ticks,
+    (Clk_t) std::min<uint64_t>(max_mem_cycles, std::numeric_limits<Clk_t>::max()) / mem_period_ticks
+  });
+  if (num_periods == 0) {
+    return 0;
+  }
+
+  frontend->skip_ticks(num_periods * frontend_period_ticks);
+  memory_system->skip_ticks(num_periods * mem_period_ticks);
+  return num_periods * mem_period_ticks;
+}
+
+SimulationInstance::SimulationInstance(const YAML::Node& config) {
+  m_frontend = Factory::create_frontend(config);
+  m_memory_system = Factory::create_memory_system(config);
+  m_frontend->connect_memory_system(m_memory_system);
+  m_memory_system->connect_frontend(m_frontend);
+}
+
+SimulationInstance::~SimulationInstance() {
+  for (auto component : m_frontend->get_ifces<Implementation>()) {
+    delete component;
+  }
+  for (auto component : m_memory_system->get_ifces<Implementation>()) {
+    delete component;
+  }
+  delete m_frontend->m_impl;
+  delete m_memory_system->m_impl;
+}
+
+void SimulationInstance::run() {
+  int frontend_tick = m_frontend->get_clock_ratio();
+  int mem_tick = m_memory_system->get_clock_ratio();
+  int tick_mult = frontend_tick * mem_tick;
+
+  for (uint64_t i = 0;; i++) {
+    if (i % tick_mult == 0) {
+      skip_idle_cycles(m_frontend, m_memory_system, std::numeric_limits<uint64_t>::max());
+    }
+    if (((i % tick_mult) % mem_tick) == 0) {
+      m_frontend->tick();
+    }
+    if (m_frontend->is_finished()) {
+      break;
+    }
+    if ((i % tick_mult) % frontend_tick == 0) {
+      m_memory_system->tick();
+    }
+  }
+}
+
+std::string SimulationInstance::finalize() {
+  // Same sequence as a standalone ramulator2 run, but the stats are returned instead of printed
+  std::ostringstream output;
+  m_frontend->finalize(output);
+  m_memory_system->finalize(output);
+  return output.str();
+}
+
+YAML::Node SimulationInstance::collect_stats() {
+  YAML::Node records;
+  m_frontend->m_impl->collect_stats(records);
+  m_memory_system->m_impl->collect_stats(records);
+  return records;
+}
+
+}        // namespace Ramulator
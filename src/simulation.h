@@ -0,0 +1,67 @@
+#ifndef     RAMULATOR_SIMULATION_H
+#define     RAMULATOR_SIMULATION_H
+
+#include <string>
+
+#include <yaml-cpp/yaml.h>
+
+#include "frontend/frontend.h"
+#include "memory_system/memory_system.h"
+
+namespace Ramulator {
+
+/**
+ * @brief    Jumps the clocks of the frontend and the memory system over the upcoming cycles in which neither has anything to do
+ *
+ * @details
+ * Must be called at the start of a clock period of the simulation loop (i.e., when both the frontend and the memory system
+ * are about to tick). Only whole periods are skipped and the components advance exactly as if they had been ticked, so the
+ * loop continues with cycle-identical results.
+ *
+ * @param    max_mem_cycles   At most this many memory cycles are skipped.
+ * @return   The number of memory cycles skipped.
+ */
+uint64_t skip_idle_cycles(IFrontEnd* frontend, IMemorySystem* memory_system, uint64_t max_mem_cycles);
+
+/**
+ * @brief    One self-contained simulation (frontend + memory system) that can run next to others in the same process
+ *
+ * @details
+ * Runs exactly like a standalone ramulator2 run without Fork, but finalize() returns the stats that ramulator2 prints
+ * instead of writing them to stdout. All components are deleted with the simulation.
+ *
+ */
+class SimulationInstance {
+  private:
+    IFrontEnd* m_frontend = nullptr;
+    IMemorySystem* m_memory_system = nullptr;
+
+  public:
+    SimulationInstance(const YAML::Node& config);
+    ~SimulationInstance();
+
+    SimulationInstance(const SimulationInstance&) = delete;
+    SimulationInstance& operator=(const SimulationInstance&) = delete;
+
+    /**
+     * @brief    Simulates until the frontend is finished
+     */
+    void run();
+
+    /**
+     * @brief    Finalizes all components
+     *
+     * @return   The YAML stats of the frontend and the memory system as ramulator2 prints them.
+     */
+    std::string finalize();
+
+    /**
+     * @brief    Collects the per-component stats records (see Implementation::collect_stats)
+     */
+    YAML::Node collect_stats();
+};
+
+}        // namespace Ramulator
+
+
+#endif   // RAMULATOR_SIMULATION_H
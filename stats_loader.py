@@ -0,0 +1,135 @@
+# Usage: python3 stats_loader.py [-i stats_yaml] [-c component_filter]
+# Encoded in UTF-8
+
+import argparse
+import pandas as pd
+import yaml
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+
+def load_stats(file_path):
+    """
+    Load the stats file written by ramulator2 (set `stats_path` in the config).
+
+    :param file_path: Path to the stats file.
+    :return: Dict of component path -> {'interface', 'impl', 'id', 'stats'}.
+             Stat values keep their types (int/float/str, or lists of them).
+    """
+    with open(file_path, 'r') as file:
+        records = yaml.load(file, Loader=_YAML_LOADER) or {}
+
+    for record in records.values():
+        record.setdefault('id', None)
+        record['stats'] = record.get('stats') or {}
+    return records
+
+
+def find_components(records, impl=None, interface=None):
+    """
+    Select the components matching the given implementation and/or interface names.
+
+    :return: Dict of component path -> record, in the order of the stats file.
+    """
+    return {path: record for path, record in records.items()
+            if (impl is None or record['impl'] == impl)
+            and (interface is None or record['interface'] == interface)}
+
+
+def component_frame(record):
+    """
+    Convert the stats of one component into a tidy DataFrame.
+
+    Scalar stats get a single row with index 0, vector stats one row per element.
+
+    :return: DataFrame with columns [stat, index, value].
+    """
+    rows = []
+    for stat, value in record['stats'].items():
+        if isinstance(value, list):
+            rows.extend((stat, i, v) for i, v in enumerate(value))
+        else:
+            rows.append((stat, 0, value))
+    return pd.DataFrame(rows, columns=['stat', 'index', 'value'])
+
+
+def load_stats_frames(file_path):
+    """
+    Load the stats file as one DataFrame per component.
+
+    :return: Dict of component path -> DataFrame (see `component_frame`).
+    """
+    return {path: component_frame(record) for path, record in load_stats(file_path).items()}
+
+
+def memory_stats(records):
+    """
+    Request counters and cycles of the memory system.
+
+    :return: Dict with `total_num_*_requests` and `memory_system_cycles`.
+    """
+    return dict(find_components(records, interface='MemorySystem')['MemorySystem']['stats'])
+
+
+def frontend_stats(records):
+    """
+    Stats of the frontend (e.g., `frontend_cycles` of the trace frontends).
+
+    :return: Dict of stat name -> value.
+    """
+    return dict(find_components(records, interface='Frontend')['Frontend']['stats'])
+
+
+def command_counts(records):
+    """
+    Sum the CommandCounter plugin counts over all channels.
+
+    :return: Dict of command name -> count.
+    """
+    counts = {}
+    for record in find_components(records, impl='CommandCounter').values():
+        for stat, value in record['stats'].items():
+            command = stat[len('num_'):-len('_commands')]
+            counts[command] = counts.get(command, 0) + value
+    return counts
+
+
+def row_hits(records):
+    """
+    Per-bank row hit tables of all InfoRecorder plugins.
+
+    :return: DataFrame with columns [component, flat_bank, row_hits].
+    """
+    frames = []
+    for path, record in find_components(records, impl='InfoRecorder').items():
+        per_bank = record['stats'].get('num_row_hits_per_bank', [])
+        frames.append(pd.DataFrame({
+            'component': path,
+            'flat_bank': range(len(per_bank)),
+            'row_hits': per_bank,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['component', 'flat_bank', 'row_hits'])
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Print the stats of a ramulator2 stats file.")
+
+    parser.add_argument('-i', '--input', required=False, help='Input stats file.', default='stats.yaml')
+    parser.add_argument('-c', '--component', required=False, help='Only print components whose path contains this string.')
+
+    args = parser.parse_args()
+
+    records = load_stats(args.input)
+    for path, record in records.items():
+        if args.component and args.component not in path:
+            continue
+        if not record['stats']:
+            continue
+        print(f"{path} ({record['impl']})")
+        for stat, value in record['stats'].items():
+            print(f"  {stat}: {value}")
@@ -0,0 +1,380 @@
+# Usage: python3 sweep.py spec_yaml [-o output_dir] [--ramulator path] [--dry_run] [-j jobs] [--backend local|slurm|daemon|queue]
+# Encoded in UTF-8
+#
+# Runs a declarative parameter sweep. A sweep spec is a YAML file:
+#
+#   extends: common_sweep.yaml      # Optional, spec whose keys this one overrides (dicts are merged, overlays appended,
+#                                   # the rest replaced)
+#   base: ../ddr4.yaml              # Base ramulator2 config (path relative to the spec, or an inline dict)
+#   output_dir: ./results           # Where the files of the jobs go (relative to the working directory)
+#   params:                         # Constants, usable like the axes
+#     trace_path: ./cputraces
+#   axes:                           # Cartesian product, the first axis varies slowest
+#     - tRH: [1000, 500]                                    # One parameter
+#     - zip: {pattern: [stream, random], trace: [a, b]}     # Parameters that vary together
+#     - cases: [{mitigation: PARA}, {mitigation: NoDefence, plugin: null}]   # One dict of parameters per value
+#     - trace: {function: module:function, args: ["{trace_path}"]}          # Values returned by a Python function
+#       when: "mitigation != 'NoDefence'"                   # Conditional axis, skipped (no parameter) otherwise
+#   derived:                        # Computed in order for every point, after the axes
+#     rh_params: {function: calc_rh_parameters:get_rh_parameters, args: ["{mitigation}", "{tRH}"], when: "..."}
+#     label: {value: "{mitigation}_{tRH}"}
+#   overlays:                       # Merged into the base config in order (dicts are merged, the rest replaced)
+#     - config: {Frontend: {traces: ["{trace_path}/{trace}"]}}
+#     - when: "mitigation != 'NoDefence'"
+#       config: {MemorySystem: {Controller: {plugins: [{ControllerPlugin: "{plugin}"}]}}}
+#   name: "{mitigation}/{tRH}_{trace}"                      # Unique job name
+#   files:                          # Files of a job, relative to output_dir. config, log and stats are required
+#     config: "{mitigation}/configs/{tRH}_{trace}.yaml"
+#     log: "{mitigation}/stats/{tRH}_{trace}.txt"         # stdout and stderr of ramulator2
+#     stats: "{mitigation}/stats/{tRH}_{trace}.yaml"      # stats_path of the config
+#     cmd_count: "{mitigation}/cmd_count/{tRH}_{trace}.cmd.count"   # Referenced as "{files.cmd_count}"
+#   command: ["{ramulator}", "-f", "{files.config}"]        # Default
+#
+# Strings are Python format strings over the parameters. A string that is a single field ("{plugin}", "{rh_params[0]}")
+# is replaced by the value itself (a number, list, dict...), whose own strings are then formatted in turn; "when"
+# expressions are evaluated over the parameters. Functions are looked up next to the spec first.
+#
+# The points are expanded lazily. Points whose config and command are the same once the paths of their files are left
+# out (e.g., NoDefence for every tRH) run as one job, and the files of that job are copied to the others when it is
+# done. sweep_index.jsonl in output_dir maps every point to its parameters and to the job that simulated it.
+
+import os
+import re
+import sys
+import copy
+import json
+import shutil
+import string
+import hashlib
+import argparse
+import importlib
+from types import SimpleNamespace
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "rh_study"))
+from job_queue import Job, JobQueue, add_queue_arguments
+
+SPEC_KEYS = ["extends", "base", "output_dir", "params", "axes", "derived", "overlays", "name", "files", "command"]
+REQUIRED_FILES = ["config", "log", "stats"]
+DEFAULT_COMMAND = ["{ramulator}", "-f", "{files.config}"]
+DEFAULT_RAMULATOR = "./build/ramulator2"
+SINGLE_FIELD = re.compile(r"\{([^{}!:]+)\}")
+EXPR_BUILTINS = {"len": len, "min": min, "max": max, "abs": abs, "int": int, "float": float, "str": str}
+_FORMATTER = string.Formatter()
+
+
+def merge(data, updates):
+    """
+    Recursively merge `updates` into `data` (dicts are merged, everything else is replaced).
+
+    :return: `data`.
+    """
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            merge(data[key], value)
+        else:
+            data[key] = copy.deepcopy(value)
+    return data
+
+
+def resolve(template, ns, depth=0):
+    """
+    Format every string of a (nested) template with the parameters in `ns` (see the header of this file).
+    """
+    if depth > 32:
+        raise ValueError(f"Too deeply nested parameter references in {template!r}")
+    if isinstance(template, str):
+        if "{" not in template:
+            return template
+        match = SINGLE_FIELD.fullmatch(template)
+        if match:
+            return resolve(_FORMATTER.get_field(match.group(1), (), ns)[0], ns, depth + 1)
+        return template.format_map(ns)
+    if isinstance(template, dict):
+        return {key: resolve(value, ns, depth) for key, value in template.items()}
+    if isinstance(template, (list, tuple)):
+        return [resolve(value, ns, depth) for value in template]
+    return template
+
+
+def evaluate(expression, ns):
+    try:
+        return eval(expression, {"__builtins__": EXPR_BUILTINS}, ns)
+    except Exception as e:
+        raise ValueError(f"Cannot evaluate \"{expression}\" with parameters {sorted(ns)}: {e}") from e
+
+
+class Point:
+    """
+    One point of a sweep: its parameters, the job files and the resolved config and command.
+
+    `key` identifies what is simulated (the config and the command without the paths of the files), `job` is the name of
+    the job that simulates it (the first point with the same key).
+    """
+    def __init__(self, name, params, files, config, command, key):
+        self.name = name
+        self.params = params
+        self.files = files
+        self.config = config
+        self.command = command
+        self.key = key
+        self.job = name
+
+    def is_duplicate(self):
+        return self.job != self.name
+
+
+class Sweep:
+    """
+    A sweep spec (see the header of this file).
+
+    :param spec_filename: Path to the spec.
+    :param output_dir: Overrides the output_dir of the spec.
+    :param base: Overrides the base config of the spec (path relative to the working directory).
+    :param params: Overrides parameters of the spec.
+    """
+    def __init__(self, spec_filename, output_dir=None, base=None, params=None):
+        self.spec_filename = spec_filename
+        self.spec = self.load_spec(spec_filename)
+        self.spec_dir = os.path.dirname(os.path.abspath(spec_filename))
+
+        for key in ["base", "name", "files"]:
+            if key not in self.spec:
+                raise ValueError(f"Sweep spec {spec_filename} has no {key}")
+        missing = [name for name in REQUIRED_FILES if name not in self.spec["files"]]
+        if missing:
+            raise ValueError(f"Sweep spec {spec_filename} does not name the {', '.join(missing)} file of the jobs")
+
+        self.output_dir = output_dir or self.spec.get("output_dir", ".")
+        if base is not None:
+            self.base_config = self.load_yaml(base)
+        elif isinstance(self.spec["base"], dict):
+            self.base_config = self.spec["base"]
+        else:
+            self.base_config = self.load_yaml(os.path.join(self.spec_dir, self.spec["base"]))
+
+        self.params = {"ramulator": DEFAULT_RAMULATOR, "output_dir": self.output_dir}
+        self.params.update(self.spec.get("params") or {})
+        self.params.update(params or {})
+        self.duplicates = {}
+
+    @staticmethod
+    def load_yaml(filename):
+        with open(filename, 'r') as file:
+            data = yaml.safe_load(file)
+        if not isinstance(data, dict):
+            raise ValueError(f"{filename} is not a YAML mapping")
+        return data
+
+    @classmethod
+    def load_spec(cls, spec_filename):
+        spec = cls.load_yaml(spec_filename)
+        unknown = [key for key in spec if key not in SPEC_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown keys {unknown} in sweep spec {spec_filename}, expected {SPEC_KEYS}")
+        parent = spec.pop("extends", None)
+        if parent is None:
+            return spec
+        parent_filename = os.path.join(os.path.dirname(spec_filename), parent)
+        parent_spec = cls.load_spec(parent_filename)
+        # A base given as a path is relative to the spec that names it
+        if isinstance(parent_spec.get("base"), str) and "base" not in spec:
+            spec["base"] = os.path.relpath(os.path.join(os.path.dirname(parent_filename), parent_spec["base"]),
+                                           os.path.dirname(spec_filename) or ".")
+        # The overlays of a spec apply after those of the spec it extends
+        overlays = (parent_spec.pop("overlays", None) or []) + (spec.pop("overlays", None) or [])
+        return merge(parent_spec, dict(spec, overlays=overlays))
+
+    def call(self, spec, ns):
+        """ Call the `module:function` of a function spec with its resolved args and kwargs. """
+        module_name, _, function_name = spec["function"].partition(":")
+        if self.spec_dir not in sys.path:
+            sys.path.insert(0, self.spec_dir)
+        function = getattr(importlib.import_module(module_name), function_name)
+        return function(*resolve(spec.get("args", []), ns), **resolve(spec.get("kwargs", {}), ns))
+
+    def axis_cases(self, axis, ns):
+        """ :return: List of dicts, the parameters set by every value of the axis. """
+        if "when" in axis and not evaluate(axis["when"], ns):
+            return [{}]
+        keys = [key for key in axis if key != "when"]
+        if keys == ["zip"]:
+            columns = {name: self.axis_values(values, ns) for name, values in axis["zip"].items()}
+            lengths = {len(values) for values in columns.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"The zipped axes {list(columns)} have different lengths")
+            return [dict(zip(columns, values)) for values in zip(*columns.values())]
+        if keys == ["cases"]:
+            cases = self.axis_values(axis["cases"], ns)
+            if not all(isinstance(case, dict) for case in cases):
+                raise ValueError(f"The cases of an axis must be dicts of parameters: {cases}")
+            return cases
+        if len(keys) != 1:
+            raise ValueError(f"An axis sets one parameter, or uses zip or cases: {axis}")
+        return [{keys[0]: value} for value in self.axis_values(axis[keys[0]], ns)]
+
+    def axis_values(self, values, ns):
+        if isinstance(values, dict) and "function" in values:
+            values = self.call(values, ns)
+        elif isinstance(values, str) and SINGLE_FIELD.fullmatch(values):
+            # The values are taken as they are, their strings are only formatted where they are used (e.g., in overlays)
+            values = _FORMATTER.get_field(values[1:-1], (), ns)[0]
+        if not isinstance(values, (list, tuple)):
+            raise ValueError(f"Axis values must be a list: {values!r}")
+        return list(values)
+
+    def expand_axes(self, axes, params):
+        if not axes:
+            yield params
+            return
+        for case in self.axis_cases(axes[0], params):
+            yield from self.expand_axes(axes[1:], {**params, **case})
+
+    def points(self):
+        """
+        Expand the spec lazily.
+
+        :return: Iterator of Points, in the order of the axes.
+        """
+        for params in self.expand_axes(self.spec.get("axes") or [], dict(self.params)):
+            for name, spec in (self.spec.get("derived") or {}).items():
+                if "when" in spec and not evaluate(spec["when"], params):
+                    continue
+                params[name] = self.call(spec, params) if "function" in spec else resolve(spec.get("value"), params)
+
+            name = resolve(self.spec["name"], params)
+            files = {key: os.path.join(self.output_dir, resolve(path, params)) for key, path in self.spec["files"].items()}
+            # The key leaves the paths of the files out, so that points that only differ in them are the same job
+            key_config, key_command = self.resolve_config(params, {key: f"<{key}>" for key in files})
+            config, command = self.resolve_config(params, files)
+            key = hashlib.sha1(json.dumps([key_config, key_command], sort_keys=True, default=str).encode()).hexdigest()
+            yield Point(name, params, files, config, command, key)
+
+    def resolve_config(self, params, files):
+        ns = dict(params, files=SimpleNamespace(**files))
+        config = copy.deepcopy(self.base_config)
+        for overlay in self.spec.get("overlays") or []:
+            if "when" in overlay and not evaluate(overlay["when"], ns):
+                continue
+            merge(config, resolve(overlay.get("config", {}), ns))
+        config["stats_path"] = files["stats"]
+        command = resolve(self.spec.get("command", DEFAULT_COMMAND), ns)
+        return config, command
+
+    def jobs(self, write_configs=True):
+        """
+        Expand the spec lazily into deduplicated jobs, writing their configs (and sweep_index.jsonl) as they are expanded.
+        The points that duplicate a job are recorded in `duplicates` (job name -> list of points).
+
+        :return: Iterator of (Job, Point).
+        """
+        self.duplicates = {}
+        jobs_by_key = {}
+        names = set()
+        index_file = None
+        if write_configs:
+            os.makedirs(self.output_dir, exist_ok=True)
+            index_file = open(os.path.join(self.output_dir, "sweep_index.jsonl"), 'w')
+        try:
+            for point in self.points():
+                if point.name in names:
+                    raise ValueError(f"Two points of the sweep are named {point.name}, make the name template unique")
+                names.add(point.name)
+                if index_file:
+                    # Only the parameters set by the axes and derived ones, the constants are in the spec
+                    params = {key: value for key, value in point.params.items() if self.params.get(key, self) is not value}
+                    index_file.write(json.dumps({"name": point.name, "job": jobs_by_key.get(point.key, point.name),
+                                                 "params": params, "files": point.files}, default=str) + "\n")
+                if point.key in jobs_by_key:
+                    point.job = jobs_by_key[point.key]
+                    self.duplicates.setdefault(point.job, []).append(point)
+                    continue
+                jobs_by_key[point.key] = point.name
+                if write_configs:
+                    for filename in point.files.values():
+                        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+                    with open(point.files["config"], 'w') as config_file:
+                        yaml.dump(point.config, config_file, default_flow_style=False)
+                yield Job(point.name, point.command, point.files["log"], point.files["stats"]), point
+        finally:
+            if index_file:
+                index_file.close()
+
+    def copy_duplicates(self, done):
+        """ Copy the files of every done job to the points that duplicate it. """
+        for job_name, points in self.duplicates.items():
+            if job_name not in done:
+                continue
+            for point in points:
+                for key, filename in point.files.items():
+                    source = done[job_name].files[key]
+                    if key == "config" or not os.path.exists(source) or filename == source:
+                        continue
+                    if os.path.exists(filename) and os.path.getmtime(filename) >= os.path.getmtime(source):
+                        continue
+                    shutil.copyfile(source, filename)
+
+    def run(self, queue):
+        """
+        Run the jobs of the sweep on a JobQueue.
+
+        :return: Names of the jobs that failed.
+        """
+        points = {}
+        def jobs():
+            for job, point in self.jobs():
+                points[job.name] = point
+                yield job
+        failed = queue.run(jobs())
+        num_duplicates = sum(len(duplicates) for duplicates in self.duplicates.values())
+        if num_duplicates:
+            print(f"{num_duplicates} points duplicate another one and reuse its results.")
+        self.copy_duplicates({name: point for name, point in points.items() if name not in failed})
+        return failed
+
+
+def parse_params(items):
+    params = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got {item}")
+        params[key] = yaml.safe_load(value)
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a declarative Ramulator 2.0 parameter sweep.")
+    parser.add_argument('spec', help='Sweep spec (YAML).')
+    parser.add_argument('-o', '--output_dir', default=None, help='Output directory (default: output_dir of the spec).')
+    parser.add_argument('-c', '--config', default=None, help='Base ramulator config (default: base of the spec).')
+    parser.add_argument('--ramulator', default=None, help='Ramulator 2.0 executable (the ramulator parameter of the commands).')
+    parser.add_argument('-p', '--param', nargs='+', default=[], help='Override parameters of the spec (KEY=VALUE, values are parsed as YAML).')
+    parser.add_argument('--dry_run', action='store_true', help='Only list the jobs and the duplicate points.')
+    add_queue_arguments(parser)
+    args = parser.parse_args(argv)
+
+    params = parse_params(args.param)
+    if args.ramulator is not None:
+        params["ramulator"] = args.ramulator
+    sweep = Sweep(args.spec, output_dir=args.output_dir, base=args.config, params=params)
+
+    if args.dry_run:
+        num_jobs = 0
+        for job, point in sweep.jobs(write_configs=False):
+            num_jobs += 1
+            print(f"{job.name}: {' '.join(job.cmd)}")
+        for job_name, points in sweep.duplicates.items():
+            print(f"{job_name} also stands for {', '.join(point.name for point in points)}")
+        num_duplicates = sum(len(points) for points in sweep.duplicates.values())
+        print(f"{num_jobs + num_duplicates} points, {num_jobs} jobs.")
+        return 0
+
+    queue = JobQueue(os.path.join(sweep.output_dir, "jobs.json"), max_jobs=args.jobs, backend=args.backend, max_retries=args.retries,
+                     srun_args=args.srun_args.split(), daemon_socket=args.daemon_socket, queue=args.queue)
+    failed = sweep.run(queue)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
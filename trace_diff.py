@@ -0,0 +1,243 @@
+# Usage: python3 trace_diff.py log_a log_b [-w window] [-c config_yaml | -l levels] [--ignore_timing] [-n context] [--drift_csv csv]
+# Encoded in UTF-8
+#
+# Finds the first command where two TraceRecorder logs (issue_log_ch*.log, e.g. of the same simulation before and after a
+# scheduler or mapper change) diverge, prints the commands around it and how far the two runs drift apart afterwards.
+
+import argparse
+import bisect
+import hashlib
+import mmap
+import re
+import sys
+from collections import Counter
+import numpy as np
+import pandas as pd
+import yaml
+
+# Organization levels of the DRAM standards, i.e. the fields of the address vectors in the logs
+DRAM_LEVELS = {
+    'DDR3': ['channel', 'rank', 'bank', 'row', 'column'],
+    'DDR4': ['channel', 'rank', 'bankgroup', 'bank', 'row', 'column'],
+    'DDR4-VRR': ['channel', 'rank', 'bankgroup', 'bank', 'row', 'column'],
+    'DDR5': ['channel', 'rank', 'bankgroup', 'bank', 'row', 'column'],
+    'LPDDR5': ['channel', 'rank', 'bankgroup', 'bank', 'row', 'column'],
+    'GDDR6': ['channel', 'bankgroup', 'bank', 'row', 'column'],
+    'HBM': ['channel', 'bankgroup', 'bank', 'row', 'column'],
+    'HBM2': ['channel', 'pseudochannel', 'bankgroup', 'bank', 'row', 'column'],
+    'HBM3': ['channel', 'pseudochannel', 'bankgroup', 'bank', 'row', 'column'],
+}
+
+# "<cycles since the previous command>, <cycle>, <command>, <address vector>"
+LINE = re.compile(rb'^\s*(\d+),\s*(\d+),\s*([^,\s]+),(.*)$')
+TIMING_COLUMNS = re.compile(rb'^[^,\n]*,[^,\n]*,', re.MULTILINE)
+COMMAND_COLUMN = re.compile(rb'^[^,\n]*,[^,\n]*,\s*([^,\s]+),', re.MULTILINE)
+
+
+class CommandLog:
+    """
+    A TraceRecorder log, memory-mapped and cut into windows of `window` commands.
+
+    Every window gets the hash of its commands and a chained hash (of the window and all windows before it), so the chained
+    hashes of two logs are equal up to the first window where they differ, and differ from there on. The command counts
+    and the cycle of the last command of every window are kept to measure how far two runs drift apart.
+
+    :param ignore_timing: Only compare the commands and their addresses, not the cycles they are issued at.
+    :param chunk_size: Bytes of the log scanned at once for line ends.
+    """
+    def __init__(self, filename, window, ignore_timing=False, chunk_size=64 << 20):
+        self.filename = filename
+        self.window = window
+        self.ignore_timing = ignore_timing
+        with open(filename, 'rb') as file:
+            size = file.seek(0, 2)
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.offsets = [0]              # Byte offset of every window, and the end of the log
+        self.hashes = []
+        self.chained_hashes = []
+        self.counts = []
+        self.end_clks = []
+        self.num_commands = 0
+        self.scan(chunk_size)
+
+    def scan(self, chunk_size):
+        size = len(self.data)
+        num_pending = 0                 # Lines of the current window in the chunks before
+        for chunk_start in range(0, size, chunk_size):
+            chunk = np.frombuffer(self.data, dtype=np.uint8, count=min(chunk_size, size - chunk_start), offset=chunk_start)
+            line_ends = np.flatnonzero(chunk == ord('\n')) + chunk_start + 1
+            for end in line_ends[self.window - num_pending - 1::self.window]:
+                self.add_window(int(end))
+            num_pending = (num_pending + len(line_ends)) % self.window
+        if self.offsets[-1] < size:
+            self.add_window(size)
+
+    def add_window(self, end):
+        text = self.data[self.offsets[-1]:end]
+        key = TIMING_COLUMNS.sub(b'', text) if self.ignore_timing else text
+        window_hash = hashlib.blake2b(key, digest_size=16).digest()
+        previous = self.chained_hashes[-1] if self.chained_hashes else b''
+        self.hashes.append(window_hash)
+        self.chained_hashes.append(hashlib.blake2b(previous + window_hash, digest_size=16).digest())
+        self.counts.append(Counter(command.decode() for command in COMMAND_COLUMN.findall(text)))
+        lines = text.splitlines()
+        match = LINE.match(lines[-1]) if lines else None
+        self.end_clks.append(int(match.group(2)) if match else -1)
+        self.num_commands += len(lines)
+        self.offsets.append(end)
+
+    @property
+    def num_windows(self):
+        return len(self.hashes)
+
+    def lines(self, first, last):
+        """ :return: The commands first to last (excluded) as raw lines. """
+        first = max(first, 0)
+        last = min(last, self.num_commands)
+        if first >= last:
+            return []
+        first_window, last_window = first // self.window, (last - 1) // self.window
+        text = self.data[self.offsets[first_window]:self.offsets[last_window + 1]]
+        lines = text.splitlines()
+        skip = first - first_window * self.window
+        return lines[skip:skip + last - first]
+
+    def key(self, line):
+        return TIMING_COLUMNS.sub(b'', line) if self.ignore_timing else line
+
+
+def first_divergence(log_a, log_b):
+    """
+    Binary-search the chained window hashes, then compare the commands of the first differing window.
+
+    :return: Index of the first command that differs (or that only one of the logs has), None if the logs are the same.
+    """
+    num_windows = min(log_a.num_windows, log_b.num_windows)
+    window = bisect.bisect_left(range(num_windows), True,
+                                key=lambda i: log_a.chained_hashes[i] != log_b.chained_hashes[i])
+    if window == num_windows and log_a.num_commands == log_b.num_commands:
+        return None
+    first = window * log_a.window
+    lines_a = log_a.lines(first, first + log_a.window)
+    lines_b = log_b.lines(first, first + log_b.window)
+    for i, (line_a, line_b) in enumerate(zip(lines_a, lines_b)):
+        if log_a.key(line_a) != log_b.key(line_b):
+            return first + i
+    return first + min(len(lines_a), len(lines_b))
+
+
+def decode(line, levels):
+    """ Decode a command of the log into "<cycle> <command> <level>=<index> ...". """
+    match = LINE.match(line)
+    if match is None:
+        return line.decode(errors='replace').strip()
+    addr_vec = [field.strip() for field in match.group(4).decode().split(',')]
+    names = levels if levels and len(levels) == len(addr_vec) else [f"level{i}" for i in range(len(addr_vec))]
+    fields = " ".join(f"{name}={value}" for name, value in zip(names, addr_vec))
+    return f"{int(match.group(2)):>10}  {match.group(3).decode():<6} {fields}"
+
+
+def print_context(log_a, log_b, divergence, context, levels):
+    first = max(divergence - context, 0)
+    lines_a = log_a.lines(first, divergence + context + 1)
+    lines_b = log_b.lines(first, divergence + context + 1)
+    width = max([len(decode(line, levels)) for line in lines_a] + [10])
+    print(f"{'#':>10}  {'A: ' + log_a.filename:<{width}}  B: {log_b.filename}")
+    for i in range(max(len(lines_a), len(lines_b))):
+        line_a = decode(lines_a[i], levels) if i < len(lines_a) else ""
+        line_b = decode(lines_b[i], levels) if i < len(lines_b) else ""
+        same = i < len(lines_a) and i < len(lines_b) and log_a.key(lines_a[i]) == log_b.key(lines_b[i])
+        marker = ">" if first + i == divergence else ("=" if same else "!")
+        print(f"{first + i:>9}{marker}  {line_a:<{width}}  {line_b}")
+
+
+def drift(log_a, log_b, divergence):
+    """
+    Per-window comparison of the two runs from the window of the first divergence on.
+
+    :return: DataFrame with one row per window: the cycle of its last command in both runs, their difference, whether the
+             window holds the same commands and the command counts of both runs (<command>_a, <command>_b).
+    """
+    commands = sorted(set().union(*log_a.counts, *log_b.counts))
+    rows = []
+    for i in range(divergence // log_a.window, min(log_a.num_windows, log_b.num_windows)):
+        row = {
+            'window': i,
+            'clk_a': log_a.end_clks[i],
+            'clk_b': log_b.end_clks[i],
+            'clk_drift': log_b.end_clks[i] - log_a.end_clks[i],
+            'same_commands': log_a.hashes[i] == log_b.hashes[i],
+        }
+        for command in commands:
+            row[f"{command}_a"] = log_a.counts[i][command]
+            row[f"{command}_b"] = log_b.counts[i][command]
+        rows.append(row)
+    return pd.DataFrame(rows), commands
+
+
+def print_drift(log_a, log_b, df, commands):
+    if df.empty:
+        return
+    print(f"\nDrift over the {len(df)} windows of {log_a.window} commands from the first divergence on "
+          f"({df['same_commands'].sum()} of them hold the same commands in both runs):")
+    print(f"  Cycle of the last command, B - A: {df['clk_drift'].iloc[0]:+d} in the first window, "
+          f"{df['clk_drift'].iloc[-1]:+d} in the last, {df['clk_drift'].abs().max()} at most")
+    totals = []
+    for command in commands:
+        diff = df[f"{command}_b"] - df[f"{command}_a"]
+        totals.append({
+            'command': command,
+            'total_a': sum(counts[command] for counts in log_a.counts),
+            'total_b': sum(counts[command] for counts in log_b.counts),
+            'max_window_diff': diff.abs().max(),
+            'mean_window_diff': diff.abs().mean(),
+            'cumulative_diff': diff.sum(),
+        })
+    print(pd.DataFrame(totals).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+
+def get_levels(args):
+    if args.levels:
+        return args.levels.split(',')
+    if args.config:
+        with open(args.config, 'r') as file:
+            config = yaml.safe_load(file)
+        impl = config['MemorySystem']['DRAM']['impl']
+        if impl not in DRAM_LEVELS:
+            print(f"Warning: Unknown DRAM standard {impl}, the address vectors are not decoded.")
+        return DRAM_LEVELS.get(impl)
+    return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Find where two TraceRecorder command logs diverge.")
+
+    parser.add_argument('log_a', help='Reference command log (e.g., issue_log_ch0.log).')
+    parser.add_argument('log_b', help='Command log to compare with it.')
+    parser.add_argument('-w', '--window', type=int, default=4096, help='Commands per hashed window.')
+    parser.add_argument('-c', '--config', required=False, help='Config of the runs, to name the fields of the address vectors.')
+    parser.add_argument('-l', '--levels', required=False, help='Comma-separated names of the address vector fields (overrides -c).')
+    parser.add_argument('--ignore_timing', action='store_true', help='Only compare the commands and their addresses, not their cycles.')
+    parser.add_argument('-n', '--context', type=int, default=5, help='Commands printed before and after the first divergence.')
+    parser.add_argument('--drift_csv', required=False, help='Write the per-window drift to this csv file.')
+
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error("The window must hold at least one command.")
+
+    log_a = CommandLog(args.log_a, args.window, args.ignore_timing)
+    log_b = CommandLog(args.log_b, args.window, args.ignore_timing)
+    print(f"A: {log_a.num_commands} commands, B: {log_b.num_commands} commands.")
+
+    divergence = first_divergence(log_a, log_b)
+    if divergence is None:
+        print("The logs are the same.")
+        sys.exit(0)
+
+    print(f"First divergence at command {divergence} (window {divergence // args.window}):\n")
+    print_context(log_a, log_b, divergence, args.context, get_levels(args))
+    df, commands = drift(log_a, log_b, divergence)
+    print_drift(log_a, log_b, df, commands)
+    if args.drift_csv:
+        df.to_csv(args.drift_csv, index=False)
+    sys.exit(1)
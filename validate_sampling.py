@@ -0,0 +1,132 @@
+# Usage: python3 validate_sampling.py [spec_yaml] [-o output_dir] [-p KEY=VALUE ...] [--max_error 0.05] [--report_only] [-j jobs] [--backend local|slurm|daemon|queue]
+# Encoded in UTF-8
+#
+# Validates the sampled simulation mode of the trace frontends (the `sampling` group of MyRWTrace and LoadStoreTrace):
+# every trace of the sweep spec (sampling_sweep.yaml by default, see sweep.py) is simulated in full and sampled, and
+# the extrapolated stats are compared with those of the full run.
+
+import os
+import sys
+import argparse
+import json
+import pandas as pd
+from stats_loader import load_stats, frontend_stats
+from sweep import Sweep, JobQueue, parse_params
+from job_queue import add_queue_arguments
+
+# Stat of a full run -> its estimate in a sampled run (with the half-width of its confidence interval in <estimate>_ci)
+METRICS = {
+    'frontend_cycles': 'estimated_frontend_cycles',
+    'avg_latency': 'estimated_avg_latency',
+    'avg_read_latency': 'estimated_avg_read_latency',
+}
+
+
+def trace_name(trace):
+    """ Name of the trace in the output paths. """
+    return os.path.splitext(os.path.basename(trace))[0]
+
+
+def run_name(mode, seed):
+    """ Name of the run of a trace in the output paths. """
+    return f"random_{seed}" if mode == 'random' else mode
+
+
+def compare(sweep, elapsed):
+    """
+    Compare the sampled runs of the sweep with the full runs of the same traces.
+
+    :param sweep: The Sweep, whose points have the `trace` and `mode` parameters.
+    :param elapsed: Dict of job name -> wall time of the job in seconds.
+    :return: DataFrame with one row per sampled run and metric.
+    """
+    points = list(sweep.points())
+    full_runs = {point.params['trace']: point for point in points if point.params['mode'] == 'full'}
+    rows = []
+    for point in points:
+        if point.params['mode'] == 'full':
+            continue
+        full_run = full_runs.get(point.params['trace'])
+        if full_run is None or not os.path.exists(full_run.files['stats']) or not os.path.exists(point.files['stats']):
+            print(f"Skipping {point.name}: missing stats.")
+            continue
+        reference = frontend_stats(load_stats(full_run.files['stats']))
+        stats = frontend_stats(load_stats(point.files['stats']))
+        num_detailed = stats['sampling_num_detailed_requests']
+        num_warmed = stats['sampling_num_warmed_requests']
+        for metric, estimate in METRICS.items():
+            if metric not in reference or estimate not in stats:
+                continue
+            value = reference[metric]
+            ci = stats[estimate + '_ci']
+            rows.append({
+                'trace': point.params['trace'],
+                'run': point.params['run'],
+                'metric': metric,
+                'full': value,
+                'estimate': stats[estimate],
+                'ci': ci,
+                'error': (stats[estimate] - value) / value if value else float('nan'),
+                'in_ci': abs(stats[estimate] - value) <= ci,
+                'units': stats['sampling_num_units'],
+                'detailed_fraction': num_detailed / (num_detailed + num_warmed) if num_detailed + num_warmed else float('nan'),
+                'speedup': elapsed[full_run.job] / elapsed[point.job] if elapsed.get(full_run.job) and elapsed.get(point.job) else float('nan'),
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the sampled simulation mode against full simulations.")
+    parser.add_argument('spec', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sampling_sweep.yaml'),
+                        help='Sweep spec with the trace and mode (full, periodic or random) parameters.')
+    parser.add_argument('-o', '--output_dir', default=None, help='Output directory (default: output_dir of the spec).')
+    parser.add_argument('-c', '--config', default=None, help='Base ramulator config (default: base of the spec).')
+    parser.add_argument('--ramulator', default=None, help='Ramulator 2.0 executable.')
+    parser.add_argument('-p', '--param', nargs='+', default=[], help='Override parameters of the spec (KEY=VALUE, e.g. "traces=[a.trace]" unit=50000).')
+    parser.add_argument('--max_error', type=float, default=0.05, help='Largest relative error of an estimate that passes.')
+    parser.add_argument('--report_only', action='store_true', help='Only compare the results of an earlier run.')
+    add_queue_arguments(parser)
+    args = parser.parse_args(argv)
+
+    params = parse_params(args.param)
+    if args.ramulator is not None:
+        params['ramulator'] = args.ramulator
+    sweep = Sweep(args.spec, output_dir=args.output_dir, base=args.config, params=params)
+
+    state_filename = os.path.join(sweep.output_dir, "jobs.json")
+    if not args.report_only:
+        queue = JobQueue(state_filename, max_jobs=args.jobs, backend=args.backend, max_retries=args.retries,
+                         srun_args=args.srun_args.split(), daemon_socket=args.daemon_socket, queue=args.queue)
+        sweep.run(queue)
+
+    elapsed = {}
+    if os.path.exists(state_filename):
+        with open(state_filename, 'r') as state_file:
+            elapsed = {name: entry['elapsed'] for name, entry in json.load(state_file).items() if 'elapsed' in entry}
+
+    df = compare(sweep, elapsed)
+    if df.empty:
+        print("No sampled run to compare.")
+        return 1
+    df.to_csv(os.path.join(sweep.output_dir, "sampling_validation.csv"), index=False)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(df.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+
+    summary = df.groupby('metric', sort=False).agg(
+        max_abs_error=('error', lambda e: e.abs().max()),
+        in_ci=('in_ci', 'mean'),
+        speedup=('speedup', 'median'),
+    )
+    print()
+    print(summary.to_string(float_format=lambda x: f"{x:.4g}"))
+
+    failed = df[df['error'].abs() > args.max_error]
+    if not failed.empty:
+        print(f"\n{len(failed)} estimates are off by more than {args.max_error:.1%}.")
+        return 1
+    print(f"\nAll estimates are within {args.max_error:.1%} of the full runs.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+# Usage: python3 timing_checker.py -i issue_log_ch0.log [-o output_log] [--org DDR4_8Gb_x8] [--timing DDR4_2400R] [-c config_yaml]
+# Encoded in UTF-8
+#
+# Checks a TraceRecorder command log against the DDR4 timing constraints without ModelSim.
+# The organization/timing presets and the JEDEC secondary timing tables are read from
+# src/dram/impl/DDR4.cpp so that the checker always agrees with the simulator.
+
+import argparse
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+import yaml
+
+DDR4_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'dram', 'impl', 'DDR4.cpp')
+
+COMMANDS = ['ACT', 'PRE', 'PREA', 'RD', 'WR', 'RDA', 'WRA', 'REFab']
+CMD_ID = {cmd: i for i, cmd in enumerate(COMMANDS)}
+RATES = [1600, 1866, 2133, 2400, 2666, 2933, 3200]
+DENSITIES = [2048, 4096, 8192, 16384]
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _parse_int_expr(expr):
+    """ Evaluate the integer literals used in the preset tables (e.g., `2<<10`). """
+    expr = expr.strip()
+    if '<<' in expr:
+        base, shift = expr.split('<<')
+        return int(base) << int(shift)
+    return int(expr)
+
+
+def _parse_table(source, name):
+    """ Parse a `constexpr int NAME[a][b] = {{...}, ...};` table into a list of rows. """
+    match = re.search(name + r'\[\d+\]\[\d+\]\s*=\s*\{(.*?)\};', source, re.S)
+    if match is None:
+        raise ValueError(f"Table {name} not found in {DDR4_SOURCE}.")
+    body = re.sub(r'//[^\n]*', '', match.group(1))
+    return [[int(v) for v in row.split(',') if v.strip()] for row in re.findall(r'\{([^{}]*)\}', body)]
+
+
+def load_ddr4_spec(source_path=DDR4_SOURCE):
+    """
+    Load the DDR4 levels, organization presets, timing presets and JEDEC tables from the simulator source.
+
+    :return: Dict with keys 'levels', 'org_presets', 'timings', 'timing_presets' and the secondary timing tables.
+    """
+    with open(source_path, 'r') as file:
+        source = file.read()
+
+    spec = {}
+    levels = re.search(r'm_levels\s*=\s*\{([^}]*)\}', source).group(1)
+    spec['levels'] = re.findall(r'"(\w+)"', levels)
+    timings = re.search(r'm_timings\s*=\s*\{([^}]*)\}', source).group(1)
+    spec['timings'] = re.findall(r'"(\w+)"', timings)
+
+    spec['org_presets'] = {}
+    for name, density, dq, counts in re.findall(r'\{"(DDR4_\d+Gb_x\d+)",\s*\{([^,]+),\s*(\d+),\s*\{([^}]*)\}\}\}', source):
+        spec['org_presets'][name] = {
+            'density': _parse_int_expr(density),
+            'dq': int(dq),
+            'count': dict(zip(spec['levels'], [_parse_int_expr(c) for c in counts.split(',')])),
+        }
+
+    spec['timing_presets'] = {}
+    for name, values in re.findall(r'\{"(DDR4_\d+[A-Z]+)",\s*\{([^}]*)\}\s*\}', source):
+        spec['timing_presets'][name] = dict(zip(spec['timings'], [int(v) for v in values.split(',')]))
+
+    for table in ['nRRDS_TABLE', 'nRRDL_TABLE', 'nFAW_TABLE', 'tRFC_TABLE']:
+        spec[table] = _parse_table(source, table)
+    return spec
+
+
+def jedec_rounding(t_ns, tCK_ps):
+    """ Same as Ramulator::JEDEC_rounding. """
+    t_ps = int(t_ns * 1000)
+    return ((t_ps * 1000 // tCK_ps) + 974) // 1000
+
+
+def get_timing_vals(spec, org_preset, timing_preset):
+    """
+    Derive the timing values (in cycles) exactly like DDR4::set_timing_vals does for presets.
+
+    :return: Dict of timing name -> cycles.
+    """
+    if org_preset not in spec['org_presets']:
+        raise ValueError(f"Unrecognized organization preset \"{org_preset}\". Choices: {sorted(spec['org_presets'])}")
+    if timing_preset not in spec['timing_presets']:
+        raise ValueError(f"Unrecognized timing preset \"{timing_preset}\". Choices: {sorted(spec['timing_presets'])}")
+
+    org = spec['org_presets'][org_preset]
+    vals = dict(spec['timing_presets'][timing_preset])
+    tCK_ps = int(1E6 / (vals['rate'] / 2))
+    vals['tCK_ps'] = tCK_ps
+
+    dq_id = {4: 0, 8: 1, 16: 2}[org['dq']]
+    rate_id = RATES.index(vals['rate'])
+    vals['nRRDS'] = spec['nRRDS_TABLE'][dq_id][rate_id]
+    vals['nRRDL'] = spec['nRRDL_TABLE'][dq_id][rate_id]
+    vals['nFAW'] = spec['nFAW_TABLE'][dq_id][rate_id]
+    vals['nRFC'] = jedec_rounding(spec['tRFC_TABLE'][0][DENSITIES.index(org['density'])], tCK_ps)
+    vals['nREFI'] = jedec_rounding(7800, tCK_ps)
+    return vals
+
+
+def get_constraints(v):
+    """
+    The checked constraints: (name, scope, preceding commands, following commands, latency).
+
+    The scope is the address level at which both commands must match
+    ('rank', 'bankgroup' or 'bank').
+    """
+    return [
+        ('tRCD',   'bank',      ['ACT'],               ['RD', 'RDA', 'WR', 'WRA'], v['nRCD']),
+        ('tRP',    'bank',      ['PRE'],               ['ACT'],                    v['nRP']),
+        ('tRP',    'bank',      ['RDA'],               ['ACT'],                    v['nRTP'] + v['nRP']),
+        ('tRP',    'bank',      ['WRA'],               ['ACT'],                    v['nCWL'] + v['nBL'] + v['nWR'] + v['nRP']),
+        ('tRP',    'rank',      ['PREA'],              ['ACT'],                    v['nRP']),
+        ('tRP',    'rank',      ['PRE', 'PREA'],       ['REFab'],                  v['nRP']),
+        ('tRAS',   'bank',      ['ACT'],               ['PRE'],                    v['nRAS']),
+        ('tRAS',   'rank',      ['ACT'],               ['PREA'],                   v['nRAS']),
+        ('tRC',    'bank',      ['ACT'],               ['ACT'],                    v['nRC']),
+        ('tRC',    'rank',      ['ACT'],               ['REFab'],                  v['nRC']),
+        ('tCCD_S', 'rank',      ['RD', 'RDA'],         ['RD', 'RDA'],              v['nCCDS']),
+        ('tCCD_S', 'rank',      ['WR', 'WRA'],         ['WR', 'WRA'],              v['nCCDS']),
+        ('tCCD_L', 'bankgroup', ['RD', 'RDA'],         ['RD', 'RDA'],              v['nCCDL']),
+        ('tCCD_L', 'bankgroup', ['WR', 'WRA'],         ['WR', 'WRA'],              v['nCCDL']),
+        ('tRRD_S', 'rank',      ['ACT'],               ['ACT'],                    v['nRRDS']),
+        ('tRRD_L', 'bankgroup', ['ACT'],               ['ACT'],                    v['nRRDL']),
+        ('tWTR_S', 'rank',      ['WR', 'WRA'],         ['RD', 'RDA'],              v['nCWL'] + v['nBL'] + v['nWTRS']),
+        ('tWTR_L', 'bankgroup', ['WR', 'WRA'],         ['RD', 'RDA'],              v['nCWL'] + v['nBL'] + v['nWTRL']),
+        ('tRFC',   'rank',      ['REFab'],             ['ACT', 'REFab'],           v['nRFC']),
+    ]
+
+
+def read_trace_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a TraceRecorder log in chunks.
+
+    Both the current format (interval, clk, cmd, ch, ra, bg, ba, ro, co) and the
+    original Ramulator 2.0 format (clk, cmd, ch, ra, bg, ba, ro, co) are accepted.
+
+    :return: Iterator of DataFrames with columns [clk, cmd, rank, bankgroup, bank, row, column].
+    """
+    with open(file_path, 'r') as file:
+        first_line = file.readline()
+    num_fields = len(first_line.split(','))
+    if num_fields == 9:
+        names = ['interval', 'clk', 'cmd', 'channel', 'rank', 'bankgroup', 'bank', 'row', 'column']
+    elif num_fields == 8:
+        names = ['clk', 'cmd', 'channel', 'rank', 'bankgroup', 'bank', 'row', 'column']
+    else:
+        raise ValueError(f"Unrecognized TraceRecorder format in {file_path}: {first_line.strip()}")
+
+    reader = pd.read_csv(file_path, header=None, names=names, skipinitialspace=True,
+                         chunksize=chunk_size, dtype={'cmd': str})
+    for chunk in reader:
+        yield chunk[['clk', 'cmd', 'rank', 'bankgroup', 'bank', 'row', 'column']]
+
+
+class Violation:
+    cmd = ""
+    message = ""
+    timing_params = []
+
+
+def _scope_key(chunk, scope, num_bankgroups, num_banks):
+    key = chunk['rank'].astype(np.int64)
+    if scope in ('bankgroup', 'bank'):
+        key = key * num_bankgroups + chunk['bankgroup']
+    if scope == 'bank':
+        key = key * num_banks + chunk['bank']
+    return key
+
+
+def _check_constraint(clk, cmd, key, preceding, following, latency):
+    """
+    For every `following` command, find the latest `preceding` command with the same
+    scope key issued before it and flag the pairs that are closer than `latency`.
+
+    :return: (indices of the violating commands, indices of their preceding commands).
+    """
+    order = np.lexsort((np.arange(len(key)), key))
+    s_key = key[order]
+    s_cmd = cmd[order]
+    is_preceding = np.isin(s_cmd, preceding)
+    is_following = np.isin(s_cmd, following)
+
+    # Position of the latest preceding command up to (and excluding) each position
+    pos = np.arange(len(order))
+    last = np.maximum.accumulate(np.where(is_preceding, pos, -1))
+    last = np.concatenate(([-1], last[:-1]))
+
+    valid = is_following & (last >= 0)
+    valid[valid] &= s_key[last[valid]] == s_key[valid]
+    cand = np.nonzero(valid)[0]
+    too_close = clk[order[cand]] - clk[order[last[cand]]] < latency
+    return order[cand[too_close]], order[last[cand[too_close]]]
+
+
+def _check_faw(clk, cmd, rank, window, latency):
+    """ Flag every ACT that is the (window+1)-th ACT of its rank within `latency` cycles. """
+    act = np.nonzero(cmd == CMD_ID['ACT'])[0]
+    act = act[np.lexsort((act, rank[act]))]
+    if len(act) <= window:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    curr, prev = act[window:], act[:-window]
+    bad = (rank[curr] == rank[prev]) & (clk[curr] - clk[prev] < latency)
+    return curr[bad], prev[bad]
+
+
+def _format_cmd(row):
+    return (f"Cycle {row.clk}: {row.cmd} rank {row.rank} bg {row.bankgroup} ba {row.bank} "
+            f"row {row.row} col {row.column}")
+
+
+def check_trace(file_path, org_preset, timing_preset, chunk_size=DEFAULT_CHUNK_SIZE, spec=None):
+    """
+    Check a TraceRecorder log chunk by chunk.
+
+    Each chunk is checked together with the tail of the previous chunk that is still within the
+    largest timing window, so chunking never hides a violation.
+
+    :return: (list of Violation, timing values used).
+    """
+    spec = spec or load_ddr4_spec()
+    v = get_timing_vals(spec, org_preset, timing_preset)
+    count = spec['org_presets'][org_preset]['count']
+    constraints = get_constraints(v)
+    max_latency = max([c[4] for c in constraints] + [v['nFAW']])
+
+    violations = []
+    carry = None
+    for chunk in read_trace_chunks(file_path, chunk_size):
+        num_carried = 0
+        if carry is not None:
+            num_carried = len(carry)
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        chunk = chunk.reset_index(drop=True)
+
+        clk = chunk['clk'].to_numpy(dtype=np.int64)
+        cmd = chunk['cmd'].map(CMD_ID).fillna(-1).to_numpy(dtype=np.int64)
+
+        found = []
+        for name, scope, preceding, following, latency in constraints:
+            key = _scope_key(chunk, scope, count['bankgroup'], count['bank']).to_numpy()
+            curr, prev = _check_constraint(clk, cmd, key, [CMD_ID[c] for c in preceding], [CMD_ID[c] for c in following], latency)
+            found += [(i, j, name, latency) for i, j in zip(curr, prev)]
+        curr, prev = _check_faw(clk, cmd, chunk['rank'].to_numpy(), 4, v['nFAW'])
+        found += [(i, j, 'tFAW', v['nFAW']) for i, j in zip(curr, prev)]
+
+        rows = list(chunk.itertuples(index=False))
+        for i, j, name, latency in sorted(found, key=lambda f: (f[0], f[2])):
+            if i < num_carried:
+                continue
+            violation = Violation()
+            violation.cmd = _format_cmd(rows[i])
+            violation.message = f"{name} violation"
+            violation.timing_params = [
+                f"{name}: required {latency} cycles, observed {rows[i].clk - rows[j].clk} cycles since {rows[j].cmd} at cycle {rows[j].clk}"
+            ]
+            violations.append(violation)
+
+        carry = chunk[chunk['clk'] > clk[-1] - max_latency]
+    return violations, v
+
+
+def write_report(violations, timing_vals, org_preset, timing_preset, out_file):
+    """ Write the violations in the same layout as trace_verifier.filter_log_file. """
+    out_file.write("Configurations:\n")
+    out_file.write(f"Organization: {org_preset}\n")
+    out_file.write(f"Timing: {timing_preset}\n")
+    out_file.write(", ".join(f"{k}={timing_vals[k]}" for k in timing_vals) + "\n")
+    out_file.write("Errors:\n")
+    for violation in violations:
+        out_file.write(violation.cmd + "\n")
+        out_file.write(violation.message + "\n")
+        for timing_param in violation.timing_params:
+            out_file.write(timing_param + "\n")
+        out_file.write("\n")
+    out_file.write("Total number of errors: " + str(len(violations)) + "\n")
+
+
+def presets_from_config(config_path):
+    """ Get the (organization, timing) presets from a Ramulator YAML config. """
+    with open(config_path, 'r') as file:
+        config = yaml.safe_load(file)
+    dram = config['MemorySystem']['DRAM']
+    return dram['org']['preset'], dram['timing']['preset']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check a TraceRecorder log against the DDR4 timing constraints.")
+
+    parser.add_argument('-i', '--input', required=True, help='TraceRecorder log file (e.g., issue_log_ch0.log).')
+    parser.add_argument('-o', '--output', required=False, help='Output report file. Printed to stdout if not given.')
+    parser.add_argument('-c', '--config', required=False, help='Ramulator config to take the DRAM presets from.')
+    parser.add_argument('--org', required=False, help='Organization preset.', default='DDR4_8Gb_x8')
+    parser.add_argument('--timing', required=False, help='Timing preset (DDR4_1600J ... DDR4_3200AC).', default='DDR4_2400R')
+    parser.add_argument('--chunk_size', type=int, required=False, help='Number of commands per chunk.', default=DEFAULT_CHUNK_SIZE)
+
+    args = parser.parse_args()
+
+    org_preset, timing_preset = args.org, args.timing
+    if args.config:
+        org_preset, timing_preset = presets_from_config(args.config)
+
+    violations, timing_vals = check_trace(args.input, org_preset, timing_preset, args.chunk_size)
+    if args.output:
+        with open(args.output, 'w') as out_file:
+            write_report(violations, timing_vals, org_preset, timing_preset, out_file)
+        print(f"Total number of errors: {len(violations)}. Report: \"{args.output}\".")
+    else:
+        write_report(violations, timing_vals, org_preset, timing_preset, sys.stdout)
+    exit(1 if violations else 0)
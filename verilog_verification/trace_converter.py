@@ -1,4 +1,11 @@
-import os, sys
+import argparse, collections, itertools, os, shutil
+
+# Idle cycles between preamble steps. Longer than any DDR4 minimum-spacing constraint (tRFC of 16Gb at 3200 is 880 cycles).
+PREAMBLE_SETTLE_CYCLES = 1000
+# Spacing between the re-activations in the preamble. Longer than tFAW and tRRD_L of every speed bin.
+PREAMBLE_ACT_SPACING = 64
+# Commands of the previous shard replayed for timing context. Longer than any constraint window.
+OVERLAP_CYCLES = 1000
 
 class Error:
     cmd = ""
@@ -32,35 +39,158 @@ def get_tb_cmd(bubble_cycle, cmd, ra, bg, ba, ro, co):
         exit(1)
     return tb_cmd
 
-def convert_trace_to_tb(trace_filename, out_tb_filename):
-    trace_file = open(trace_filename, "r")
-    out_tb_file = open(out_tb_filename, "w")
+def parse_trace_line(line):
+    """
+    Parse one TraceRecorder line into (cycle, cmd, ra, bg, ba, ro, co).
 
-    last_cycle = 0
-    inst_num = 0
-    for line in trace_file:
-        line = line.strip()
-        if(line == ""):
-            continue
-        line = line.split(",")
-        current_cycle = int(line[0])
-        cmd = line[1].strip()
-        ra = int(line[3])
-        bg = int(line[4])
-        ba = int(line[5])
-        ro = int(line[6])
-        co = int(line[7])
+    Both the current format (interval, clk, cmd, ch, ra, bg, ba, ro, co) and the
+    original format (clk, cmd, ch, ra, bg, ba, ro, co) are accepted.
+    """
+    fields = [field.strip() for field in line.split(",")]
+    if(len(fields) == 9):
+        fields = fields[1:]
+    if(len(fields) != 8):
+        print("Error: Unrecognized trace line: " + line)
+        exit(1)
+    return (int(fields[0]), fields[1], int(fields[3]), int(fields[4]), int(fields[5]), int(fields[6]), int(fields[7]))
+
+def read_trace(trace_filename):
+    """ Stream the commands of a TraceRecorder log without loading the whole file. """
+    with open(trace_filename, "r") as trace_file:
+        for line in trace_file:
+            line = line.strip()
+            if(line == ""):
+                continue
+            yield parse_trace_line(line)
+
+def count_trace_commands(trace_filename):
+    """ Count the commands of a TraceRecorder log by counting non-empty lines in binary chunks. """
+    num_cmds = 0
+    with open(trace_filename, "rb") as trace_file:
+        last = b"\n"
+        while True:
+            block = trace_file.read(1 << 24)
+            if(not block):
+                break
+            num_cmds += block.count(b"\n") - block.count(b"\n\n")
+            last = block[-1:]
+        if(last != b"\n"):
+            num_cmds += 1
+    return num_cmds
+
+def write_commands(commands, out_tb_file, last_cycle, max_bubble=None):
+    """
+    Write a sequence of commands as testbench tasks and return the cycle of the last one.
+
+    Idle gaps longer than `max_bubble` cycles are shortened to `max_bubble`. This keeps every
+    minimum-spacing constraint intact as long as `max_bubble` is larger than the longest one (e.g., nRFC).
+    """
+    for (current_cycle, cmd, ra, bg, ba, ro, co) in commands:
         if(current_cycle <= last_cycle):
             print("Error: Traces are not incremental.")
             exit(1)
-        tb_cmd = get_tb_cmd(current_cycle - last_cycle, cmd, ra, bg, ba, ro, co)
-        out_tb_file.write(tb_cmd)
+        bubble_cycle = current_cycle - last_cycle
+        if(max_bubble is not None and bubble_cycle > max_bubble):
+            bubble_cycle = max_bubble
+        out_tb_file.write(get_tb_cmd(bubble_cycle, cmd, ra, bg, ba, ro, co))
         last_cycle = current_cycle
-        inst_num += 1
-        if(inst_num > 300000):
-            break
-    trace_file.close()
-    out_tb_file.close()
+    return last_cycle
+
+def convert_trace_to_tb(trace_filename, out_tb_filename, max_cmds=None, max_bubble=None):
+    """ Stream the whole trace (or its first `max_cmds` commands) into one testbench file. """
+    commands = read_trace(trace_filename)
+    if(max_cmds is not None):
+        commands = itertools.islice(commands, max_cmds)
+    with open(out_tb_filename, "w") as out_tb_file:
+        write_commands(commands, out_tb_file, 0, max_bubble)
+
+class BankStates:
+    """ Rows left open by a command sequence, keyed by (rank, bankgroup, bank). """
+    def __init__(self):
+        self.open_rows = {}
+
+    def apply(self, cmd, ra, bg, ba, ro):
+        if(cmd == "ACT"):
+            self.open_rows[(ra, bg, ba)] = ro
+        elif(cmd in ("PRE", "RDA", "WRA")):
+            self.open_rows.pop((ra, bg, ba), None)
+        elif(cmd == "PREA"):
+            for key in [key for key in self.open_rows if key[0] == ra]:
+                del self.open_rows[key]
+
+def write_state_preamble(out_tb_file, states, ranks):
+    """
+    Bring a freshly powered-up device into the state a shard expects.
+
+    Every rank is refreshed once so that the shard starts a new refresh window, then the open rows
+    are re-activated one at a time, far enough apart to satisfy tRRD and tFAW.
+    """
+    out_tb_file.write("\t// State preamble\n")
+    for ra in ranks:
+        out_tb_file.write(get_tb_cmd(PREAMBLE_SETTLE_CYCLES, "REFab", ra, 0, 0, 0, 0))
+    bubble_cycle = PREAMBLE_SETTLE_CYCLES
+    for (ra, bg, ba), ro in sorted(states.open_rows.items()):
+        out_tb_file.write(get_tb_cmd(bubble_cycle, "ACT", ra, bg, ba, ro, 0))
+        bubble_cycle = PREAMBLE_ACT_SPACING
+    out_tb_file.write(f"\tdeselect({PREAMBLE_SETTLE_CYCLES});\n")
+
+def convert_trace_to_shards(trace_filename, out_dir, num_shards, ranks, sources_dir=None, dram_config=None, max_bubble=None):
+    """
+    Split a trace into `num_shards` testbenches that can be verified independently.
+
+    Each shard directory holds a copy of the Verilog sources (if `sources_dir` is given), its own
+    trace_config.vh and trace_tb.v. A shard starts with a preamble that restores the rows open at the
+    beginning of its overlap window, replays the commands of the last OVERLAP_CYCLES cycles of the
+    previous shard for timing context, then prints "Shard Starts" before its own commands. Errors
+    before that marker belong to the previous shard and are dropped by trace_verifier.
+
+    :return: List of shard directories.
+    """
+    num_cmds = count_trace_commands(trace_filename)
+    cmds_per_shard = max(1, -(-num_cmds // num_shards))
+    shard_dirs = []
+
+    states = BankStates()       # State after the commands that fell out of the overlap window
+    window = collections.deque()
+    out_tb_file = None
+    last_cycle = 0
+    for idx, command in enumerate(read_trace(trace_filename)):
+        if(idx % cmds_per_shard == 0):
+            if(out_tb_file is not None):
+                out_tb_file.close()
+            shard_dir = os.path.join(out_dir, f"shard_{len(shard_dirs)}")
+            shard_dirs.append(shard_dir)
+            prepare_shard_dir(shard_dir, sources_dir, dram_config)
+            out_tb_file = open(os.path.join(shard_dir, "trace_tb.v"), "w")
+            out_tb_file.write(f"\t// Shard {len(shard_dirs) - 1}: commands {idx} to {min(idx + cmds_per_shard, num_cmds) - 1} of {trace_filename}\n")
+            if(idx > 0):
+                write_state_preamble(out_tb_file, states, ranks)
+                out_tb_file.write("\t// Overlap with the previous shard\n")
+                last_cycle = write_commands(window, out_tb_file, window[0][0] - 1 if window else 0, max_bubble)
+                out_tb_file.write("\t$display(\"Shard Starts\");\n")
+            else:
+                last_cycle = 0
+
+        last_cycle = write_commands([command], out_tb_file, last_cycle, max_bubble)
+
+        window.append(command)
+        while(window[0][0] <= command[0] - OVERLAP_CYCLES):
+            (_, cmd, ra, bg, ba, ro, _) = window.popleft()
+            states.apply(cmd, ra, bg, ba, ro)
+
+    if(out_tb_file is not None):
+        out_tb_file.close()
+    return shard_dirs
+
+def prepare_shard_dir(shard_dir, sources_dir, dram_config):
+    os.makedirs(shard_dir, exist_ok=True)
+    if(sources_dir is not None):
+        for filename in os.listdir(sources_dir):
+            src = os.path.join(sources_dir, filename)
+            if(os.path.isfile(src) and filename not in ("trace_tb.v", "trace_config.vh")):
+                shutil.copy(src, shard_dir)
+    if(dram_config is not None):
+        configure_dram(*dram_config, os.path.join(shard_dir, "trace_config.vh"))
     
 def configure_dram(dram_org, rank, time_spec, out_config_filename):
     config_file = open(out_config_filename, "w")
@@ -88,22 +218,30 @@ def check_input(dram_org, rank, time_spec):
 
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a TraceRecorder log into testbench(es) for the Micron DDR4 Verilog model.")
+    parser.add_argument("dram_org", help="DRAM organization (e.g., DDR4_8G_X8).")
+    parser.add_argument("rank", help="Number of ranks (1 or 2).")
+    parser.add_argument("time_spec", help="Speed grade (e.g., DDR4_2400).")
+    parser.add_argument("trace_filepath", help="TraceRecorder log to convert.")
+    parser.add_argument("--max_cmds", type=int, default=None, help="Only convert the first N commands.")
+    parser.add_argument("--max_bubble", type=int, default=None, help="Shorten idle gaps to this many cycles (must exceed the longest timing constraint).")
+    parser.add_argument("--shards", type=int, default=1, help="Split the trace into this many independently verifiable testbenches.")
+    parser.add_argument("--shard_root", default="shards", help="Directory for the shard sessions.")
+    args = parser.parse_args()
 
-if(len(sys.argv) != 5):
-    print("Usage: python3 trace_verifier.py <DRAM Org.> <Rank> <Time Spec.> <trace_filepath>")
-    exit(1)
-
-dram_org = sys.argv[1]
-rank = sys.argv[2]
-time_spec = sys.argv[3]
-trace_filepath = sys.argv[4]
+    check_input(args.dram_org, args.rank, args.time_spec)
 
-check_input(dram_org, rank, time_spec)
-
-pwd = os.getcwd()
-out_tb_filename = pwd + "/sources/trace_tb.v"
-out_config_filename = pwd + "/sources/trace_config.vh"
-
-print("Converting trace: " + trace_filepath)
-configure_dram(dram_org, rank, time_spec, out_config_filename)
-convert_trace_to_tb(trace_filepath, out_tb_filename)
+    pwd = os.getcwd()
+    print("Converting trace: " + args.trace_filepath)
+    if(args.shards > 1):
+        ranks = list(range(int(args.rank)))
+        shard_dirs = convert_trace_to_shards(args.trace_filepath, args.shard_root, args.shards, ranks,
+                                             sources_dir=pwd + "/sources", dram_config=(args.dram_org, args.rank, args.time_spec),
+                                             max_bubble=args.max_bubble)
+        print(f"Wrote {len(shard_dirs)} shards to \"{args.shard_root}\".")
+    else:
+        out_tb_filename = pwd + "/sources/trace_tb.v"
+        out_config_filename = pwd + "/sources/trace_config.vh"
+        configure_dram(args.dram_org, args.rank, args.time_spec, out_config_filename)
+        convert_trace_to_tb(args.trace_filepath, out_tb_filename, args.max_cmds, args.max_bubble)
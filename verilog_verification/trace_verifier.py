@@ -1,88 +1,117 @@
-import os, sys
+import argparse, concurrent.futures, os, subprocess
 
 class Error:
     cmd = ""
     message = ""
     timing_params = []
     
-def filter_log_file(log_filename):
-    log_file = open(log_filename, "r")
-    logs = log_file.readlines()
-    log_file.close()
-    log_file = open(log_filename, "w")
-    
+def filter_log_file(log_filename, out_filename, shard=False):
+    """
+    Reduce a ModelSim log to the DRAM configuration and the errors of the trace.
+
+    The log is streamed line by line, so memory use does not grow with the trace length.
+    With `shard`, errors before the "Shard Starts" marker (the overlap with the previous shard)
+    are not counted.
+
+    :return: Number of errors.
+    """
     trace_started = False
     config_started = False
+    counting = not shard
     num_errors = 0
     last_cmd = ""
-    
-    for i in range(len(logs)):
-        if("Configurations" in logs[i]):
-            config_started = True
-        if("Trace Starts" in logs[i]):
-            config_started = False
-            trace_started = True
-            log_file.write("Errors:\n")
-            
-        if(config_started):
-            log_file.write(logs[i])
-                
-        if("test_done" in logs[i]):
-            break
-        
-        if(trace_started):
-            if("Reading unwritten address" in logs[i]):
-                continue
-            if("Cycle" in logs[i]):
-                last_cmd = logs[i]
-            
-            if("WARNING" in logs[i] or "VIOLATION" in logs[i] or "ERROR" in logs[i]):
-                error = Error()
-                error.cmd = last_cmd.strip()
-                error.message = logs[i].partition(":")[2].strip()
-                error.timing_params = []
-                for j in range(i+1, len(logs)):
-                    if("Cycle" in logs[j]):
-                        last_cmd = logs[j]
-                        break
-                    if("test_done" in logs[j]):
-                        break
-                    if("Reading unwritten address" in logs[j]):
-                        continue
-                    if("toggle around write burst" in logs[j]):
-                        continue
-                    error.timing_params.append(logs[j][1:].strip())
+    open_errors = []    # Errors still collecting their timing parameters
 
+    with open(log_filename, "r") as log_file, open(out_filename, "w") as out_file:
+        def close_errors():
+            nonlocal num_errors
+            for error in open_errors:
                 if(len(error.timing_params) == 1 and "tRFC_dlr" in error.timing_params[0]):
                     continue
                 if(len(error.timing_params) == 0):
                     continue
-                log_file.write(error.cmd + "\n")
-                log_file.write(error.message + "\n")
+                out_file.write(error.cmd + "\n")
+                out_file.write(error.message + "\n")
                 for timing_param in error.timing_params:
-                    log_file.write(timing_param + "\n")
-                log_file.write("\n")
-
-                i = j
+                    out_file.write(timing_param + "\n")
+                out_file.write("\n")
                 num_errors += 1
-    
-    log_file.write("Total number of errors: " + str(num_errors) + "\n")
-    log_file.close()
+            open_errors.clear()
+
+        for line in log_file:
+            if("Configurations" in line):
+                config_started = True
+            if("Trace Starts" in line):
+                config_started = False
+                trace_started = True
+                out_file.write("Errors:\n")
+
+            if(config_started):
+                out_file.write(line)
+
+            if("test_done" in line):
+                break
+
+            if(not trace_started):
+                continue
+            if("Shard Starts" in line):
+                open_errors.clear()
+                counting = True
+                continue
+            if("Reading unwritten address" in line):
+                continue
+            if("Cycle" in line):
+                close_errors()
+                last_cmd = line
+                continue
+
+            if("toggle around write burst" not in line):
+                for error in open_errors:
+                    error.timing_params.append(line[1:].strip())
+
+            if(counting and ("WARNING" in line or "VIOLATION" in line or "ERROR" in line)):
+                error = Error()
+                error.cmd = last_cmd.strip()
+                error.message = line.partition(":")[2].strip()
+                error.timing_params = []
+                open_errors.append(error)
 
+        close_errors()
+        out_file.write("Total number of errors: " + str(num_errors) + "\n")
+    return num_errors
 
-if(len(sys.argv) != 3):
-    print("Usage: python3 trace_verifier.py <trace_filepath> <output_filepath>")
-    exit(1)
+def verify(work_dir, log_filename, shard=False):
+    """ Run ModelSim on the testbench in `work_dir` and filter its log. Return the number of errors. """
+    with open(log_filename + ".unfiltered", "w") as raw_log:
+        subprocess.run(["vsim", "-do", os.path.join(work_dir, "modelsim.do"), "-batch"], cwd=work_dir, stdout=raw_log)
+    return filter_log_file(log_filename + ".unfiltered", log_filename, shard)
 
-trace_filepath = sys.argv[1]
-output_filepath = sys.argv[2]
+def verify_shards(shard_root, output_filepath, jobs):
+    """ Verify every shard written by `trace_converter.py --shards` in parallel. Return the total number of errors. """
+    shard_dirs = sorted((os.path.join(shard_root, d) for d in os.listdir(shard_root) if d.startswith("shard_")),
+                        key=lambda d: int(d.rpartition("_")[2]))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(verify, os.path.abspath(shard_dir), f"{output_filepath}_{os.path.basename(shard_dir)}.log", idx > 0)
+                   for idx, shard_dir in enumerate(shard_dirs)]
+        num_errors = [future.result() for future in futures]
+    for shard_dir, n in zip(shard_dirs, num_errors):
+        print(f"{shard_dir}: {n} errors")
+    return sum(num_errors)
 
-pwd = os.getcwd()
-log_filename = output_filepath + ".log"
 
-print("Verifying trace: " + trace_filepath)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Micron DDR4 Verilog model on converted traces and collect the errors.")
+    parser.add_argument("trace_filepath", help="TraceRecorder log that was converted.")
+    parser.add_argument("output_filepath", help="Prefix of the filtered log file(s).")
+    parser.add_argument("--shard_root", default=None, help="Verify the shards written by trace_converter.py --shards.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of shards simulated at the same time.")
+    args = parser.parse_args()
 
-os.system("vsim -do " + pwd + "/modelsim.do -batch > " + log_filename)
-os.system("cp " + log_filename + " " + log_filename + ".unfiltered")
-filter_log_file(log_filename)
-print("Filtered log file: " + log_filename)
\ No newline at end of file
+    print("Verifying trace: " + args.trace_filepath)
+    if(args.shard_root is not None):
+        num_errors = verify_shards(args.shard_root, args.output_filepath, args.jobs)
+        print("Total number of errors: " + str(num_errors))
+    else:
+        log_filename = args.output_filepath + ".log"
+        verify(os.getcwd(), log_filename)
+        print("Filtered log file: " + log_filename)